@@ -22,9 +22,19 @@ import pytest
 sys.path.insert(0, os.path.dirname(__file__))
 
 pytest_plugins = [
+    "fixtures.parallel",
     "fixtures.acl",
     "fixtures.directory",
     "fixtures.session",
+    "fixtures.metrics",
+    "fixtures.trace",
+    "fixtures.budget",
+    "fixtures.benchmark",
+    "fixtures.fuzz",
+    "fixtures.mirror",
+    "fixtures.health",
+    "fixtures.fleet",
+    "fixtures.shard",
 ]
 
 
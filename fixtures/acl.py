@@ -1,8 +1,13 @@
-"""ACL fixtures – cleanup is handled by the session-level purge_stale_acls fixture."""
+"""ACL fixtures – cleanup is handled by the session-level purge_stale_acls fixture.
+
+ACL-creating fixtures are parallel fixtures (fixtures/parallel.py).
+"""
 import pytest
 from helpers import QDocSE
 from helpers.system import get_valid_uids, get_valid_gids
 
+from fixtures.parallel import parallel_fixture
+
 
 # =============================================================================
 # System User/Group Fixtures
@@ -65,7 +70,7 @@ def some_valid_gids():
 # =============================================================================
 
 
-@pytest.fixture
+@parallel_fixture
 def acl_id():
     """Create empty ACL. Cleanup deferred to next session's pre-run purge."""
     result = QDocSE.acl_create().execute()
@@ -87,7 +92,7 @@ def acl_with_entries(acl_id, some_valid_uids):
     return acl_id
 
 
-@pytest.fixture
+@parallel_fixture
 def user_acl_with_allow_deny(some_valid_uids):
     """ACL with allow/deny entries using valid system UIDs."""
     result = QDocSE.acl_create().execute()
@@ -107,7 +112,7 @@ def user_acl_with_allow_deny(some_valid_uids):
     return acl_id
 
 
-@pytest.fixture
+@parallel_fixture
 def program_acl():
     """ACL with a program entry for program access control.
 
@@ -140,7 +145,7 @@ def program_acl():
     return acl_id
 
 
-@pytest.fixture
+@parallel_fixture
 def multiple_acls(some_valid_uids):
     """Create 3 ACLs, each with one user entry using valid UIDs."""
     acl_ids = []
@@ -161,7 +166,7 @@ def multiple_acls(some_valid_uids):
     return acl_ids
 
 
-@pytest.fixture
+@parallel_fixture
 def empty_acl():
     """Empty ACL (denies all by default)."""
     result = QDocSE.acl_create().execute()
@@ -175,7 +180,7 @@ def empty_acl():
     return acl_id
 
 
-@pytest.fixture
+@parallel_fixture
 def acl_with_time_window(some_valid_uids):
     """ACL with time-restricted entry (09:00-18:00) using valid UID."""
     result = QDocSE.acl_create().execute()
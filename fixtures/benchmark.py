@@ -0,0 +1,81 @@
+"""Benchmark plugin - opt-in performance suites under tests/performance/.
+
+Tests marked ``@pytest.mark.benchmark`` are skipped unless ``--benchmark``
+is given, so regular runs never generate multi-GB corpora.
+
+Options:
+    --benchmark           run benchmark tests
+    --bench-scale         small | medium | full (corpus sizes, default small)
+    --bench-threads       comma-separated thread counts (default: powers of
+                          two up to the target's CPU count, max 63)
+    --daemon-pattern      pgrep pattern for the QDocSE daemon whose CPU
+                          time benchmarks record (default: QDocSE)
+"""
+import pytest
+from helpers.bench import ProcessCPU
+from helpers.executor import get_executor
+
+# QDocSEConsole rejects -t values above this
+MAX_THREADS = 63
+
+
+def pytest_addoption(parser):
+    group = parser.getgroup("qdocse")
+    group.addoption("--benchmark", action="store_true", default=False,
+                    help="Run benchmark tests (tests/performance)")
+    group.addoption("--bench-scale", default="small", choices=["small", "medium", "full"],
+                    help="Benchmark corpus scale")
+    group.addoption("--bench-threads", default=None,
+                    help="Comma-separated thread counts for -t scaling runs")
+    group.addoption("--daemon-pattern", default="QDocSE",
+                    help="pgrep pattern of the daemon whose CPU time is sampled")
+
+
+def pytest_configure(config):
+    config.addinivalue_line("markers", "benchmark: performance benchmark (needs --benchmark)")
+
+
+def pytest_collection_modifyitems(config, items):
+    if config.getoption("--benchmark"):
+        return
+    skip = pytest.mark.skip(reason="benchmark: use --benchmark to run")
+    for item in items:
+        if item.get_closest_marker("benchmark"):
+            item.add_marker(skip)
+
+
+def target_cpu_count() -> int:
+    """CPU count of the target (via the current executor), 1 if unknown."""
+    result = get_executor().run(["nproc"], timeout=10)
+    try:
+        return max(int(result.stdout), 1)
+    except ValueError:
+        return 1
+
+
+@pytest.fixture(scope="session")
+def bench_scale(request):
+    """Corpus scale: 'small', 'medium' or 'full'."""
+    return request.config.getoption("--bench-scale")
+
+
+@pytest.fixture(scope="session")
+def bench_threads(request):
+    """Thread counts for scaling runs, e.g. [1, 2, 4, 8]."""
+    opt = request.config.getoption("--bench-threads")
+    if opt:
+        return sorted({min(int(t), MAX_THREADS) for t in opt.split(",") if t.strip()})
+    cpus = min(target_cpu_count(), MAX_THREADS)
+    threads, t = [], 1
+    while t < cpus:
+        threads.append(t)
+        t *= 2
+    threads.append(cpus)
+    return threads
+
+
+@pytest.fixture(scope="session")
+def daemon_cpu(request):
+    """ProcessCPU for the QDocSE daemon, or None if no process matches."""
+    cpu = ProcessCPU(request.config.getoption("--daemon-pattern"))
+    return cpu if cpu.pids() else None
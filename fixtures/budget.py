@@ -0,0 +1,166 @@
+"""Command budget plugin - per-test command accounting and regression guard.
+
+Counts executor commands, ``push_config`` calls and output bytes for every
+test (setup, call and teardown). Work done by wider-scoped fixtures, in setup
+and teardown, is filed under that fixture's scope rather than the test that
+happened to trigger it: ``(session)`` for session fixtures, otherwise
+``(module) <nodeid>``, ``(class) <nodeid>`` or ``(package) <nodeid>``, so
+per-test budgets do not depend on test order or ``-k``. A test may declare
+its budget:
+
+    @pytest.mark.command_budget(n=12, push=2)
+    def test_apply_acl(protected_dir, allow_r_acl):
+        ...
+
+Any of ``n`` (commands), ``push`` (push_config calls) and ``bytes`` (output
+bytes) may be given. Overruns are listed in the terminal summary; with
+``--strict-budget`` the test errors at teardown. The full per-test table is
+written to ``reports/command_budget.json`` (see ``--budget-report``).
+"""
+import json
+from dataclasses import asdict
+from pathlib import Path
+
+import pytest
+from helpers.budget import BudgetLedger, CommandUsage, overruns
+from helpers.executor import add_observer, remove_observer
+from fixtures.metrics import REPORTS_DIR, SESSION_SCOPE
+
+# Rows shown in the terminal summary
+TOP_N = 15
+
+_ledger_key = pytest.StashKey[BudgetLedger]()
+# Scope to return to once a wider-scoped fixture has finished tearing down
+_teardown_key = pytest.StashKey[dict]()
+
+
+def pytest_addoption(parser):
+    group = parser.getgroup("qdocse")
+    group.addoption(
+        "--strict-budget", action="store_true", default=False,
+        help="Fail tests that exceed their command_budget marker",
+    )
+    group.addoption(
+        "--budget-report",
+        default=str(REPORTS_DIR / "command_budget.json"),
+        help="JSON file for per-test command usage ('' to disable)",
+    )
+
+
+def pytest_configure(config):
+    config.addinivalue_line(
+        "markers",
+        "command_budget(n=None, push=None, bytes=None): max commands, "
+        "push_config calls and output bytes for this test",
+    )
+    ledger = BudgetLedger(SESSION_SCOPE)
+    config.stash[_ledger_key] = ledger
+    config.stash[_teardown_key] = {}
+    add_observer(ledger.observe)
+
+
+def pytest_unconfigure(config):
+    ledger = config.stash.get(_ledger_key, None)
+    if ledger is not None:
+        remove_observer(ledger.observe)
+
+
+@pytest.hookimpl(tryfirst=True)
+def pytest_runtest_setup(item):
+    item.config.stash[_ledger_key].scope = item.nodeid
+
+
+def _fixture_scope(fixturedef, request) -> str:
+    """Ledger scope for a fixture's own work; '' for function-scoped fixtures."""
+    if fixturedef.scope == "function":
+        return ""
+    if fixturedef.scope == "session":
+        return SESSION_SCOPE
+    return f"({fixturedef.scope}) {request.node.nodeid}"
+
+
+@pytest.hookimpl(hookwrapper=True)
+def pytest_fixture_setup(fixturedef, request):
+    ledger = request.config.stash[_ledger_key]
+    scope = _fixture_scope(fixturedef, request)
+    previous = ledger.scope
+    if scope:
+        ledger.scope = scope
+    try:
+        yield
+    finally:
+        ledger.scope = previous
+    if not scope:
+        return
+    pending = request.config.stash[_teardown_key]
+
+    def enter_teardown():
+        # Added last, so it runs before the fixture's own finalizers
+        pending[fixturedef] = ledger.scope
+        ledger.scope = scope
+
+    fixturedef.addfinalizer(enter_teardown)
+
+
+def pytest_fixture_post_finalizer(fixturedef, request):
+    pending = request.config.stash.get(_teardown_key, {})
+    if fixturedef in pending:
+        request.config.stash[_ledger_key].scope = pending.pop(fixturedef)
+
+
+def _overruns(item, usage: CommandUsage) -> list[str]:
+    marker = item.get_closest_marker("command_budget")
+    if marker is None:
+        return []
+    limits = marker.kwargs
+    return overruns(usage, n=limits.get("n"), push=limits.get("push"), bytes=limits.get("bytes"))
+
+
+@pytest.hookimpl(hookwrapper=True)
+def pytest_runtest_makereport(item, call):
+    outcome = yield
+    report = outcome.get_result()
+    if call.when != "teardown":
+        return
+
+    ledger = item.config.stash[_ledger_key]
+    problems = _overruns(item, ledger.get(item.nodeid))
+    if not problems:
+        return
+    ledger.overruns[item.nodeid] = problems
+    if item.config.getoption("--strict-budget") and report.passed:
+        report.outcome = "failed"
+        report.longrepr = "Command budget exceeded: " + ", ".join(problems)
+
+
+def pytest_terminal_summary(terminalreporter, config):
+    ledger = config.stash.get(_ledger_key, None)
+    if ledger is None or not ledger.usage:
+        return
+
+    tr = terminalreporter
+    tr.write_sep("=", "QDocSE command budget")
+    rows = sorted(ledger.usage.items(), key=lambda kv: -kv[1].commands)
+    width = max(len(k) for k, _ in rows[:TOP_N])
+    tr.write_line(f"{'test':<{width}}  {'commands':>8}  {'pushes':>6}  {'bytes':>10}")
+    for scope, usage in rows[:TOP_N]:
+        tr.write_line(f"{scope:<{width}}  {usage.commands:>8}  {usage.pushes:>6}  {usage.bytes:>10}")
+    total = sum(u.commands for u in ledger.usage.values())
+    pushes = sum(u.pushes for u in ledger.usage.values())
+    tr.write_line(f"Total: {total} commands, {pushes} push_config, {len(ledger.usage)} scopes")
+
+    for nodeid, problems in ledger.overruns.items():
+        tr.write_line(f"OVER BUDGET {nodeid}: {', '.join(problems)}")
+
+    report = config.getoption("--budget-report")
+    if report:
+        path = Path(report)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps(
+            {
+                "usage": {scope: asdict(usage) for scope, usage in sorted(ledger.usage.items())},
+                "overruns": ledger.overruns,
+            },
+            indent=2,
+        ))
+        tr.write_line(f"Command usage written to {path}")
@@ -1,6 +1,92 @@
-"""Directory fixtures with auto-cleanup."""
+"""Directory fixtures with auto-cleanup.
+
+``protected_dir``, ``encrypted_dir``, ``protected_test_dir`` and
+``encrypted_test_dir`` lease from a session-wide ProtectedDirPool
+(helpers/dir_pool.py): each content template is protected once and reset by
+restoring its files between tests. The pool drains in one batched unprotect
+at session end and the protect time saved is shown in the terminal summary.
+With ``--no-dir-pool`` they bypass the pool: each test protects a fresh
+directory and unprotects it at teardown.
+They are parallel fixtures (fixtures/parallel.py): a test needing several
+gets them set up concurrently.
+"""
 import pytest
-from helpers import QDocSE
+from helpers import CommandError, QDocSE
+from helpers.corpus import MB, CorpusSpec, generate, write_file
+from helpers.dir_pool import PoolStats, ProtectedDirPool
+
+from fixtures.parallel import parallel_fixture
+
+_pool_stats_key = pytest.StashKey[PoolStats]()
+
+PROTECTED_FILES = {"secret.txt": "secret content", "data.dat": "important data"}
+ENCRYPTED_FILES = {"encrypted.txt": "encrypted content"}
+PROTECTED_TEST_FILES = {
+    "public.txt": "This is a public file",
+    "sensitive.txt": "This is sensitive data",
+    "data.csv": "id,name,value\n1,test,100",
+}
+ENCRYPTED_TEST_FILES = {"encrypted.txt": "This data should be encrypted at rest"}
+
+
+def pytest_addoption(parser):
+    group = parser.getgroup("qdocse")
+    group.addoption(
+        "--no-dir-pool", action="store_true", default=False,
+        help="Protect a fresh directory for every test instead of leasing from the pool",
+    )
+
+
+@pytest.fixture(scope="session")
+def dir_pool(request, setup_executor):
+    """Session-wide ProtectedDirPool; drained (batched unprotect) at session end."""
+    pool = ProtectedDirPool()
+    request.config.stash[_pool_stats_key] = pool.stats
+    yield pool
+    pool.drain()
+
+
+def _lease(pool, config, tmp_path, files, encrypt, what):
+    """Leased protected directory, released after the test; skips if protect fails."""
+    if config.getoption("--no-dir-pool"):
+        yield from _fresh(tmp_path, files, encrypt, what)
+        return
+    try:
+        path = pool.lease(files, encrypt=encrypt)
+    except CommandError as e:
+        pytest.skip(f"Cannot {what} directory: {e}")
+    yield path
+    pool.release(path)
+
+
+def _fresh(tmp_path, files, encrypt, what):
+    """Protected directory for this test only, unprotected afterwards."""
+    d = tmp_path / "protected"
+    for name, content in files.items():
+        f = d / name
+        f.parent.mkdir(parents=True, exist_ok=True)
+        f.write_bytes(content.encode() if isinstance(content, str) else content)
+
+    dir_path = str(d)
+    protect_result = QDocSE.protect(dir_path, encrypt=encrypt).execute()
+    if protect_result.result.failed:
+        pytest.skip(f"Cannot {what} directory: {protect_result.result.stderr}")
+    if encrypt:
+        QDocSE.push_config().execute()
+    yield dir_path
+    QDocSE.unprotect(dir_path).execute()
+
+
+def pytest_terminal_summary(terminalreporter, config):
+    stats = config.stash.get(_pool_stats_key, None)
+    if stats is None or not stats.created:
+        return
+    terminalreporter.section("Protected directory pool")
+    terminalreporter.write_line(
+        f"created {stats.created}, reused {stats.reused}, discarded {stats.discarded}; "
+        f"protect {stats.protect_seconds:.2f}s, reset {stats.reset_seconds:.2f}s, "
+        f"saved {stats.saved_seconds - stats.reset_seconds:.2f}s"
+    )
 
 
 @pytest.fixture
@@ -35,38 +121,16 @@ def test_dir_with_files(tmp_path):
     return str(d)
 
 
-@pytest.fixture
-def protected_dir(tmp_path, request):
+@parallel_fixture
+def protected_dir(dir_pool, pytestconfig, tmp_path):
     """Protected directory (no encryption). Requires Elevated/Learning mode."""
-    d = tmp_path / "protected_test"
-    d.mkdir()
-    (d / "secret.txt").write_text("secret content")
-    (d / "data.dat").write_text("important data")
+    yield from _lease(dir_pool, pytestconfig, tmp_path, PROTECTED_FILES, False, "protect")
 
-    dir_path = str(d)
-    protect_result = QDocSE.protect(dir_path, encrypt=False).execute()
-    if protect_result.result.failed:
-        pytest.skip(f"Cannot protect directory: {protect_result.result.stderr}")
 
-    request.addfinalizer(lambda: QDocSE.unprotect(dir_path).execute())
-    return dir_path
-
-
-@pytest.fixture
-def encrypted_dir(tmp_path, request):
+@parallel_fixture
+def encrypted_dir(dir_pool, pytestconfig, tmp_path):
     """Protected and encrypted directory (TDE)."""
-    d = tmp_path / "encrypted_test"
-    d.mkdir()
-    (d / "encrypted.txt").write_text("encrypted content")
-
-    dir_path = str(d)
-    protect_result = QDocSE.protect(dir_path, encrypt=True).execute()
-    if protect_result.result.failed:
-        pytest.skip(f"Cannot encrypt directory: {protect_result.result.stderr}")
-
-    QDocSE.push_config().execute()
-    request.addfinalizer(lambda: QDocSE.unprotect(dir_path).execute())
-    return dir_path
+    yield from _lease(dir_pool, pytestconfig, tmp_path, ENCRYPTED_FILES, True, "encrypt")
 
 
 @pytest.fixture
@@ -96,11 +160,24 @@ def large_file_dir(tmp_path):
     """Directory with 1MB file for performance testing."""
     d = tmp_path / "large_files"
     d.mkdir()
-    (d / "large_file.bin").write_bytes(b"x" * (1024 * 1024))
+    write_file(d / "large_file.bin", 1 * MB, content="random", seed="large_file_dir")
     (d / "small_file.txt").write_text("small content")
     return str(d)
 
 
+@pytest.fixture
+def corpus_factory(tmp_path):
+    """Build deterministic corpora: corpus_factory(name, **CorpusSpec fields).
+
+    Returns (dir_path, Manifest); ``manifest.verify(dir_path)`` re-checks digests.
+    """
+    def make(name="corpus", **spec):
+        root = tmp_path / name
+        manifest = generate(root, CorpusSpec(**spec))
+        return str(root), manifest
+    return make
+
+
 @pytest.fixture
 def sensitive_files_dir(tmp_path):
     """Directory with common sensitive file types."""
@@ -140,56 +217,13 @@ def protected_dir_with_acl(tmp_path, request, acl_id):
     return {"dir_path": dir_path, "acl_id": acl_id}
 
 
-@pytest.fixture
-def protected_test_dir(request):
+@parallel_fixture
+def protected_test_dir(dir_pool, pytestconfig, tmp_path):
     """Protected directory for integration tests."""
-    import tempfile
-    import shutil
-    from pathlib import Path
-
-    test_dir = tempfile.mkdtemp(prefix="qdocse_test_")
-
-    test_files = {
-        "public.txt": "This is a public file",
-        "sensitive.txt": "This is sensitive data",
-        "data.csv": "id,name,value\n1,test,100",
-    }
-    for name, content in test_files.items():
-        Path(test_dir, name).write_text(content)
-
-    protect_result = QDocSE.protect(test_dir, encrypt=False).execute()
-    if protect_result.result.failed:
-        shutil.rmtree(test_dir, ignore_errors=True)
-        pytest.skip(f"Cannot protect directory: {protect_result.result.stderr}")
+    yield from _lease(dir_pool, pytestconfig, tmp_path, PROTECTED_TEST_FILES, False, "protect")
 
-    def cleanup():
-        QDocSE.unprotect(test_dir).execute()
-        shutil.rmtree(test_dir, ignore_errors=True)
 
-    request.addfinalizer(cleanup)
-    return test_dir
-
-
-@pytest.fixture
-def encrypted_test_dir(request):
+@parallel_fixture
+def encrypted_test_dir(dir_pool, pytestconfig, tmp_path):
     """Encrypted directory for TDE integration tests."""
-    import tempfile
-    import shutil
-    from pathlib import Path
-
-    test_dir = tempfile.mkdtemp(prefix="qdocse_enc_test_")
-    Path(test_dir, "encrypted.txt").write_text("This data should be encrypted at rest")
-
-    protect_result = QDocSE.protect(test_dir, encrypt=True).execute()
-    if protect_result.result.failed:
-        shutil.rmtree(test_dir, ignore_errors=True)
-        pytest.skip(f"Cannot protect with encryption: {protect_result.result.stderr}")
-
-    QDocSE.push_config().execute()
-
-    def cleanup():
-        QDocSE.unprotect(test_dir).execute()
-        shutil.rmtree(test_dir, ignore_errors=True)
-
-    request.addfinalizer(cleanup)
-    return test_dir
+    yield from _lease(dir_pool, pytestconfig, tmp_path, ENCRYPTED_TEST_FILES, True, "protect with encryption")
@@ -0,0 +1,149 @@
+"""Fleet plugin - one pytest invocation verifies many targets concurrently.
+
+    pytest tests/integration --hosts qa1,qa2,qa3
+
+With ``--hosts`` this session collects as usual but runs nothing itself. It
+starts one worker session per host at the same time (helpers.fleet), each
+isolated with its own SSH executor and report directory under
+``reports/fleet/<host>/``. Every worker result is replayed here as a
+host-parametrized test (``test_x[qa1]``), so ``-v`` output, ``-ra``
+summaries and the exit code cover the whole fleet. The terminal summary
+shows the host x test matrix for tests that did not pass everywhere; the full
+matrix goes to ``reports/fleet/matrix.json``.
+"""
+import argparse
+import json
+import threading
+import time
+
+import pytest
+from helpers.fleet import FleetMatrix, HostRun, run_fleet, write_matrix
+from fixtures.metrics import REPORTS_DIR
+
+FLEET_DIR = REPORTS_DIR / "fleet"
+
+_matrix_key = pytest.StashKey[FleetMatrix]()
+_wall_key = pytest.StashKey[float]()
+_writer_key = pytest.StashKey["ReportWriter"]()
+
+
+def pytest_addoption(parser):
+    group = parser.getgroup("qdocse")
+    group.addoption("--hosts", default=None, help="Comma-separated targets to verify concurrently (fleet mode)")
+    group.addoption("--fleet-workers", type=int, default=None, help="Hosts run at once (default: all)")
+    group.addoption("--fleet-timeout", type=float, default=None, help="Seconds before a host's worker is abandoned")
+    group.addoption("--fleet-report", default=None, help=argparse.SUPPRESS)
+
+
+def _hosts(config) -> list[str]:
+    value = config.getoption("--hosts")
+    return [h.strip() for h in value.split(",") if h.strip()] if value else []
+
+
+class ReportWriter:
+    """Worker side: append each phase report to ``--fleet-report`` as JSON."""
+
+    def __init__(self, path: str):
+        self.file = open(path, "a")
+        self.lock = threading.Lock()
+
+    def pytest_runtest_logreport(self, report) -> None:
+        longrepr = None
+        if report.longrepr:
+            longrepr = list(report.longrepr) if isinstance(report.longrepr, tuple) else str(report.longrepr)
+        line = json.dumps({
+            "nodeid": report.nodeid, "when": report.when, "outcome": report.outcome,
+            "duration": report.duration, "longrepr": longrepr,
+            "wasxfail": getattr(report, "wasxfail", None),
+        })
+        with self.lock:
+            self.file.write(line + "\n")
+            self.file.flush()
+
+
+def pytest_configure(config):
+    path = config.getoption("--fleet-report")
+    if path:
+        writer = config.stash[_writer_key] = ReportWriter(path)
+        config.pluginmanager.register(writer, "fleet-report-writer")
+
+
+def pytest_unconfigure(config):
+    writer = config.stash.get(_writer_key, None)
+    if writer is not None:
+        writer.file.close()
+
+
+def host_nodeid(nodeid: str, host: str) -> str:
+    """``test_x`` -> ``test_x[host]``, ``test_x[p]`` -> ``test_x[p-host]``."""
+    return f"{nodeid[:-1]}-{host}]" if nodeid.endswith("]") else f"{nodeid}[{host}]"
+
+
+def replay(session, run: HostRun, locations: dict, nodeid_for=host_nodeid) -> None:
+    """Log a worker's reports in this session as ``nodeid_for(nodeid, host)``."""
+    ihook = session.ihook
+    if not run.reports:
+        nodeid = f"fleet::{run.host}"
+        location = (nodeid, None, nodeid)
+        tail = run.log.read_text(errors="replace")[-3000:] if run.log and run.log.exists() else ""
+        reason = run.error or f"worker exited {run.returncode} without results"
+        ihook.pytest_runtest_logstart(nodeid=nodeid, location=location)
+        ihook.pytest_runtest_logreport(report=pytest.TestReport(
+            nodeid, location, {}, "failed", f"{reason}\n{tail}", "setup"))
+        ihook.pytest_runtest_logfinish(nodeid=nodeid, location=location)
+        return
+    started = set()
+    for r in run.reports:
+        nodeid = nodeid_for(r["nodeid"], run.host)
+        location = locations.get(r["nodeid"], (r["nodeid"].split("::")[0], None, r["nodeid"]))
+        if nodeid not in started:
+            started.add(nodeid)
+            ihook.pytest_runtest_logstart(nodeid=nodeid, location=location)
+        longrepr = r["longrepr"]
+        if isinstance(longrepr, list):
+            longrepr = tuple(longrepr)
+        extra = {"wasxfail": r["wasxfail"]} if r.get("wasxfail") is not None else {}
+        ihook.pytest_runtest_logreport(report=pytest.TestReport(
+            nodeid, location, {}, r["outcome"], longrepr, r["when"], duration=r["duration"], **extra))
+        if r["when"] == "teardown":
+            ihook.pytest_runtest_logfinish(nodeid=nodeid, location=location)
+
+
+@pytest.hookimpl(tryfirst=True)
+def pytest_runtestloop(session):
+    hosts = _hosts(session.config)
+    if not hosts or session.config.option.collectonly:
+        return None
+    config = session.config
+    locations = {item.nodeid: item.location for item in session.items}
+    start = time.perf_counter()
+    runs = run_fleet(
+        hosts, config.invocation_params.args, FLEET_DIR,
+        workers=config.getoption("--fleet-workers"),
+        timeout=config.getoption("--fleet-timeout"),
+        on_done=lambda run: replay(session, run, locations),
+    )
+    config.stash[_wall_key] = time.perf_counter() - start
+    matrix = FleetMatrix.from_runs(runs)
+    config.stash[_matrix_key] = matrix
+    write_matrix(matrix, FLEET_DIR / "matrix.json")
+    return True
+
+
+def pytest_terminal_summary(terminalreporter, config):
+    matrix = config.stash.get(_matrix_key, None)
+    if matrix is None:
+        return
+    wall = config.stash[_wall_key]
+    terminalreporter.section("QDocSE fleet")
+    for host in matrix.hosts:
+        totals = ", ".join(f"{k}={v}" for k, v in sorted(matrix.totals(host).items()))
+        error = f"  ERROR: {matrix.errors[host]}" if host in matrix.errors else ""
+        terminalreporter.write_line(f"{host:<24} {matrix.seconds[host]:8.1f}s  {totals}{error}")
+    serial = sum(matrix.seconds.values())
+    terminalreporter.write_line(f"wall {wall:.1f}s for {len(matrix.hosts)} host(s), {serial:.1f}s if run one by one")
+    if matrix.divergent():
+        terminalreporter.write_line("")
+        for line in matrix.render().splitlines():
+            terminalreporter.write_line(line)
+    terminalreporter.write_line(f"matrix: {FLEET_DIR / 'matrix.json'}")
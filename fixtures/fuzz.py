@@ -0,0 +1,55 @@
+"""Fuzz plugin - opt-in argv fuzzing of the local QDocSEConsole.
+
+Tests marked ``@pytest.mark.fuzz`` are skipped unless ``--fuzz-seconds`` is
+given. The fuzzer execs the console directly, so it needs ``--target local``.
+
+Options:
+    --fuzz-seconds        fuzzing budget in seconds (0 = skip fuzz tests)
+    --fuzz-workers        worker processes (default: CPU count)
+    --fuzz-all-commands   also fuzz ACL edits, protect/encrypt/set_mode/adjust/...
+                          (only on a disposable target)
+
+Fixtures:
+    fuzz_summary          list of lines for the "QDocSE fuzzing" terminal summary
+"""
+import pytest
+
+_summary_key = pytest.StashKey[list[str]]()
+
+
+def pytest_addoption(parser):
+    group = parser.getgroup("qdocse")
+    group.addoption("--fuzz-seconds", type=float, default=0,
+                    help="Run argv fuzz tests for this many seconds")
+    group.addoption("--fuzz-workers", type=int, default=None,
+                    help="Fuzzer worker processes (default: CPU count)")
+    group.addoption("--fuzz-all-commands", action="store_true", default=False,
+                    help="Fuzz state-changing subcommands too (disposable targets only)")
+
+
+def pytest_configure(config):
+    config.addinivalue_line("markers", "fuzz: argv fuzzing (needs --fuzz-seconds)")
+
+
+def pytest_collection_modifyitems(config, items):
+    if config.getoption("--fuzz-seconds") > 0:
+        return
+    skip = pytest.mark.skip(reason="fuzz: use --fuzz-seconds to run")
+    for item in items:
+        if item.get_closest_marker("fuzz"):
+            item.add_marker(skip)
+
+
+@pytest.fixture
+def fuzz_summary(pytestconfig):
+    """Lines appended here are shown in the "QDocSE fuzzing" terminal summary."""
+    return pytestconfig.stash.setdefault(_summary_key, [])
+
+
+def pytest_terminal_summary(terminalreporter, config):
+    lines = config.stash.get(_summary_key, None)
+    if not lines:
+        return
+    terminalreporter.section("QDocSE fuzzing")
+    for line in lines:
+        terminalreporter.write_line(line)
@@ -0,0 +1,80 @@
+"""Target health plugin - fail fast while the target is unresponsive.
+
+The session executor runs behind a helpers.health.CircuitBreaker. After
+``--breaker-threshold`` consecutive timeouts or transport errors, commands
+are refused at once, and each following test errors in setup with the cause.
+This lasts until a reconnect + ``version`` probe (exponential backoff)
+succeeds. ``--breaker-threshold=0`` disables the breaker.
+
+Hang diagnostics captured for timed-out commands (helpers.hang) are attached
+to the report of the test phase that ran them.
+"""
+import pytest
+from helpers.executor import CommandEvent, add_observer, get_executor, remove_observer
+from helpers.health import CircuitBreaker, GuardedExecutor
+
+_breaker_key = pytest.StashKey[CircuitBreaker]()
+_hangs_key = pytest.StashKey[list]()
+_observer_key = pytest.StashKey[object]()
+
+
+def pytest_addoption(parser):
+    group = parser.getgroup("qdocse")
+    group.addoption(
+        "--breaker-threshold", type=int, default=3, metavar="N",
+        help="Consecutive timeouts/transport errors before failing fast (0 = off)",
+    )
+
+
+def pytest_configure(config):
+    hangs = config.stash[_hangs_key] = []
+
+    def observe(event: CommandEvent) -> None:
+        if event.result.diagnostics:
+            hangs.append(f"$ {event.result.command}\n{event.result.diagnostics}")
+
+    config.stash[_observer_key] = observe
+    add_observer(observe)
+
+
+def pytest_unconfigure(config):
+    observe = config.stash.get(_observer_key, None)
+    if observe is not None:
+        remove_observer(observe)
+
+
+@pytest.fixture(scope="session")
+def circuit_breaker(request):
+    """Session CircuitBreaker (None when disabled); used by setup_executor."""
+    threshold = request.config.getoption("--breaker-threshold")
+    if threshold <= 0:
+        return None
+    breaker = CircuitBreaker(threshold)
+    request.config.stash[_breaker_key] = breaker
+    return breaker
+
+
+@pytest.hookimpl(tryfirst=True)
+def pytest_runtest_setup(item):
+    executor = get_executor()
+    if isinstance(executor, GuardedExecutor) and not executor.available():
+        pytest.fail(f"Target unresponsive: {executor.describe()}", pytrace=False)
+
+
+@pytest.hookimpl(hookwrapper=True)
+def pytest_runtest_makereport(item, call):
+    outcome = yield
+    hangs = item.config.stash[_hangs_key]
+    if hangs:
+        report = outcome.get_result()
+        report.sections.append((f"Captured hang diagnostics {call.when}", "\n".join(hangs)))
+        hangs.clear()
+
+
+def pytest_terminal_summary(terminalreporter, config):
+    breaker = config.stash.get(_breaker_key, None)
+    if breaker is None or not breaker.trips:
+        return
+    terminalreporter.section("Target health")
+    state = f"still open: {breaker.cause}" if breaker.is_open else "recovered"
+    terminalreporter.write_line(f"circuit breaker tripped {breaker.trips} time(s); {state}")
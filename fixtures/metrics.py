@@ -0,0 +1,88 @@
+"""Command latency plugin - per-subcommand and per-module timing summary.
+
+Every command run through an executor is timed. At the end of the session
+the terminal summary shows count, p50, p95, p99 and max per QDocSEConsole
+subcommand and per test module, and the full histograms are written to
+``reports/command_latency.json`` (see ``--latency-report``).
+
+Commands issued while a session-scoped fixture is being set up (pre-run
+purges, executor setup) are filed under ``(session)`` instead of the module
+that happened to trigger them.
+"""
+from pathlib import Path
+
+import pytest
+from helpers.executor import add_observer, remove_observer
+from helpers.metrics import LatencyRecorder
+
+REPORTS_DIR = Path(__file__).parent.parent / "reports"
+SESSION_SCOPE = "(session)"
+
+_recorder_key = pytest.StashKey[LatencyRecorder]()
+
+
+def pytest_addoption(parser):
+    group = parser.getgroup("qdocse")
+    group.addoption(
+        "--latency-report",
+        default=str(REPORTS_DIR / "command_latency.json"),
+        help="JSON file for command latency histograms ('' to disable)",
+    )
+
+
+def pytest_configure(config):
+    recorder = LatencyRecorder()
+    config.stash[_recorder_key] = recorder
+    add_observer(recorder.observe)
+
+
+def pytest_unconfigure(config):
+    recorder = config.stash.get(_recorder_key, None)
+    if recorder is not None:
+        remove_observer(recorder.observe)
+
+
+def _module_of(item) -> str:
+    return item.nodeid.split("::", 1)[0]
+
+
+@pytest.hookimpl(tryfirst=True)
+def pytest_runtest_setup(item):
+    item.config.stash[_recorder_key].scope = _module_of(item)
+
+
+@pytest.hookimpl(hookwrapper=True)
+def pytest_fixture_setup(fixturedef, request):
+    recorder = request.config.stash[_recorder_key]
+    previous = recorder.scope
+    if fixturedef.scope == "session":
+        recorder.scope = SESSION_SCOPE
+    try:
+        yield
+    finally:
+        recorder.scope = previous
+
+
+def pytest_terminal_summary(terminalreporter, config):
+    recorder = config.stash.get(_recorder_key, None)
+    if recorder is None or not recorder.by_command:
+        return
+
+    tr = terminalreporter
+    tr.write_sep("=", "QDocSE command latency")
+    for line in recorder.format_table(recorder.by_command, "subcommand"):
+        tr.write_line(line)
+    tr.write_line("")
+    for line in recorder.format_table(recorder.scope_totals(), "module"):
+        tr.write_line(line)
+
+    report = config.getoption("--latency-report")
+    if report:
+        path = recorder.dump(report)
+        tr.write_line(f"\nLatency histograms written to {path}")
+
+
+@pytest.fixture(scope="session")
+def command_latency(request):
+    """Session LatencyRecorder, for tests that want to inspect timings."""
+    return request.config.stash[_recorder_key]
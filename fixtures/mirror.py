@@ -0,0 +1,69 @@
+"""Configuration mirror plugin - answer state assertions from memory.
+
+The ``config_mirror`` session fixture is a helpers.mirror.ConfigMirror seeded
+from the target and kept current from every Command the session runs:
+
+    def test_add(acl_id, config_mirror):
+        QDocSE.acl_add(acl_id, user=1000, mode="r").execute().ok()
+        assert config_mirror.acl(acl_id) == [EntrySpec(user=1000, mode="r")]
+
+``--mirror-check=test`` verifies the mirror against the target after every
+test that uses it, ``session`` once at the end. Diverged objects are attached
+to the test report and listed in the terminal summary.
+"""
+import pytest
+from helpers.commands import add_listener, remove_listener
+from helpers.mirror import ConfigMirror
+
+_drift_key = pytest.StashKey[dict]()
+
+
+def pytest_addoption(parser):
+    group = parser.getgroup("qdocse")
+    group.addoption(
+        "--mirror-check", default="off", choices=["off", "test", "session"],
+        help="Verify config_mirror against the target after each test or at session end",
+    )
+
+
+def pytest_configure(config):
+    config.stash[_drift_key] = {}
+
+
+@pytest.fixture(scope="session")
+def config_mirror(request, setup_executor):
+    """ConfigMirror fed by every command; verified per --mirror-check."""
+    mirror = ConfigMirror()
+    add_listener(mirror.observe)
+    mirror.sync()
+    yield mirror
+    try:
+        if request.config.getoption("--mirror-check") == "session":
+            drift = mirror.verify()
+            if drift:
+                request.config.stash[_drift_key]["(session)"] = [str(d) for d in drift]
+    finally:
+        remove_listener(mirror.observe)
+
+
+@pytest.fixture(autouse=True)
+def _mirror_check(request):
+    yield
+    if request.config.getoption("--mirror-check") != "test" or "config_mirror" not in request.fixturenames:
+        return
+    drift = request.getfixturevalue("config_mirror").verify()
+    if drift:
+        lines = [str(d) for d in drift]
+        request.config.stash[_drift_key][request.node.nodeid] = lines
+        request.node.add_report_section("teardown", "mirror drift", "\n".join(lines))
+
+
+def pytest_terminal_summary(terminalreporter, config):
+    drift = config.stash.get(_drift_key, {})
+    if not drift:
+        return
+    terminalreporter.section("QDocSE config mirror drift")
+    for scope, lines in drift.items():
+        terminalreporter.write_line(scope)
+        for line in lines:
+            terminalreporter.write_line(f"    {line}")
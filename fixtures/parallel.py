@@ -0,0 +1,152 @@
+"""Concurrent setup of independent expensive fixtures.
+
+Declare a fixture with ``@parallel_fixture`` instead of ``@pytest.fixture``.
+When a test needs two or more of them and none depends (directly or
+transitively) on another, their dependencies are resolved on the main thread
+and the fixture bodies then run concurrently on a thread pool:
+
+    @parallel_fixture
+    def encrypted_dir(dir_pool, pytestconfig):
+        path = dir_pool.lease(...)
+        yield path
+        dir_pool.release(path)
+
+pytest still sets the fixtures up (and tears them down) in its usual order;
+it just finds the values ready. Each teardown runs in the fixture's own
+finalizer, so teardown order is unchanged. Skips and errors raised on a
+worker surface when pytest reaches the fixture.
+
+Parallel fixtures run off the main thread, so they cannot take ``request``
+or be parametrized. ``--parallel-fixtures=N`` sets the pool size (0 sets
+everything up sequentially); with ``--target ssh`` the executor keeps up to
+N connections (helpers.executor.PooledExecutor).
+"""
+import functools
+import inspect
+import logging
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Optional
+
+import pytest
+
+logger = logging.getLogger(__name__)
+
+_PARALLEL_ATTR = "_qdocse_parallel"
+DEFAULT_WORKERS = 4
+
+_pool: Optional[ThreadPoolExecutor] = None
+# fixture name -> Future[(generator or None, value)], main thread only
+_prefetched: dict[str, Future] = {}
+
+
+def parallel_fixture(fn=None, **fixture_kwargs):
+    """``@pytest.fixture`` whose body may run concurrently with its siblings."""
+    if fn is None:
+        return lambda f: parallel_fixture(f, **fixture_kwargs)
+    params = inspect.signature(fn).parameters
+    if "request" in params or "params" in fixture_kwargs:
+        raise TypeError(f"parallel fixture {fn.__name__} cannot use 'request' or params")
+    name = fixture_kwargs.get("name", fn.__name__)
+
+    @functools.wraps(fn)
+    def wrapper(**kwargs):
+        future = _prefetched.pop(name, None)
+        gen, value = future.result() if future else _start(fn, kwargs)
+        yield value
+        if gen is not None:
+            _finish(gen, name)
+
+    setattr(wrapper, _PARALLEL_ATTR, fn)
+    return pytest.fixture(**fixture_kwargs)(wrapper)
+
+
+def _start(fn, kwargs):
+    if inspect.isgeneratorfunction(fn):
+        gen = fn(**kwargs)
+        return gen, next(gen)
+    return None, fn(**kwargs)
+
+
+def _finish(gen, name: str) -> None:
+    try:
+        next(gen)
+    except StopIteration:
+        return
+    raise RuntimeError(f"fixture {name} has more than one 'yield'")
+
+
+def pytest_addoption(parser):
+    group = parser.getgroup("qdocse")
+    group.addoption(
+        "--parallel-fixtures", type=int, default=DEFAULT_WORKERS, metavar="N",
+        help="Threads for concurrent @parallel_fixture setup (0 = sequential)",
+    )
+
+
+def pytest_configure(config):
+    global _pool
+    workers = config.getoption("--parallel-fixtures")
+    if workers > 0:
+        _pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="fixture")
+
+
+def pytest_unconfigure(config):
+    global _pool
+    if _pool is not None:
+        _pool.shutdown(wait=True)
+        _pool = None
+
+
+def independent(names: list[str], argnames: dict[str, tuple[str, ...]]) -> list[str]:
+    """Names in ``names`` whose transitive dependencies include no other name."""
+    wanted = set(names)
+
+    def closure(name):
+        seen, stack = set(), list(argnames.get(name, ()))
+        while stack:
+            arg = stack.pop()
+            if arg not in seen:
+                seen.add(arg)
+                stack.extend(argnames.get(arg, ()))
+        return seen
+
+    return [n for n in names if not (closure(n) & wanted)]
+
+
+@pytest.fixture(autouse=True)
+def _parallel_fixtures(request):
+    """Start the test's independent parallel fixtures before pytest asks for them."""
+    started = _prefetch(request) if _pool is not None else []
+    yield
+    for name in started:
+        future = _prefetched.pop(name, None)
+        if future is None:
+            continue
+        try:
+            gen, _ = future.result()
+            if gen is not None:
+                _finish(gen, name)
+        except BaseException as e:
+            logger.warning(f"[Parallel] Unused fixture {name} failed: {e}")
+
+
+def _prefetch(request) -> list[str]:
+    defs = request._pyfuncitem._fixtureinfo.name2fixturedefs
+    fixturedefs = {name: d[-1] for name, d in defs.items() if d}
+    argnames = {name: tuple(fd.argnames) for name, fd in fixturedefs.items()}
+    candidates = [
+        name for name in request.fixturenames
+        if name in fixturedefs
+        and getattr(fixturedefs[name].func, _PARALLEL_ATTR, None)
+        and fixturedefs[name].cached_result is None
+    ]
+    ready = independent(candidates, argnames)
+    if len(ready) < 2:
+        return []
+    jobs = []
+    for name in ready:
+        kwargs = {arg: request.getfixturevalue(arg) for arg in argnames[name]}
+        jobs.append((name, getattr(fixturedefs[name].func, _PARALLEL_ATTR), kwargs))
+    for name, fn, kwargs in jobs:
+        _prefetched[name] = _pool.submit(_start, fn, kwargs)
+    return [name for name, _, _ in jobs]
@@ -1,9 +1,10 @@
 """Session-level fixtures for test configuration and cleanup."""
-import re
 import os
 import logging
 import pytest
 from helpers import QDocSE
+from helpers.purge import purge_stale
+from helpers.reconcile import Reconciler
 
 logger = logging.getLogger(__name__)
 
@@ -63,8 +64,12 @@ def target_config(request):
 
 
 @pytest.fixture(scope="session", autouse=True)
-def setup_executor(target_config):
-    """Setup command executor based on config (SSH or local)."""
+def setup_executor(request, target_config, circuit_breaker):
+    """Setup command executor based on config (SSH or local).
+
+    SSH keeps one connection per --parallel-fixtures worker. Both run behind
+    the session circuit breaker (fixtures/health.py).
+    """
     cfg = target_config
 
     if cfg.get("host"):
@@ -74,12 +79,14 @@ def setup_executor(target_config):
             port=cfg["port"],
             key_file=cfg["key_file"],
             password=cfg["password"],
+            pool_size=request.config.getoption("--parallel-fixtures"),
+            breaker=circuit_breaker,
         )
         print(f"\n[Executor] SSH: {cfg['user']}@{cfg['host']}:{cfg['port']}")
     elif cfg.get("_ssh_mode"):
         pytest.exit("SSH mode requires --host or TARGET_HOST")
     else:
-        QDocSE.use_local()
+        QDocSE.use_local(breaker=circuit_breaker)
         print("\n[Executor] Local")
 
     yield
@@ -87,7 +94,29 @@ def setup_executor(target_config):
 
 
 @pytest.fixture(scope="session", autouse=True)
-def purge_stale_acls(setup_executor):
+def stale_purge(setup_executor):
+    """Purge stale ACLs, watchpoints and programs before the session starts.
+
+    The three purges run concurrently, removals go out in batched round
+    trips and one push_config commits them (helpers.purge). Post-test state
+    is deliberately preserved so failures can be inspected manually; the
+    next session cleans up.
+    """
+    report = purge_stale()
+    for r in report.results:
+        if r.error:
+            logger.warning("[Pre-run purge] Could not purge %s: %s", r.kind, r.error)
+        for label in r.failed:
+            logger.warning("[Pre-run purge] Failed to purge %s %s", r.kind, label)
+    if report.purged:
+        logger.info("[Pre-run purge] Purged %s", report.summary())
+    else:
+        logger.info("[Pre-run purge] No stale objects found")
+    yield report
+
+
+@pytest.fixture(scope="session", autouse=True)
+def purge_stale_acls(stale_purge):
     """Purge all existing ACLs before test session starts.
 
     This ensures a clean slate regardless of how previous runs ended
@@ -95,63 +124,22 @@ def purge_stale_acls(setup_executor):
     deliberately preserved so failures can be inspected manually via
     ``QDocSEConsole -c acl_list``.
     """
-    try:
-        result = QDocSE.acl_list().execute()
-        if result.result.success:
-            acl_ids = [int(m) for m in re.findall(r"ACL ID (\d+)", result.result.stdout)]
-            destroyed = 0
-            for aid in acl_ids:
-                try:
-                    QDocSE.acl_destroy(aid, force=True).execute()
-                    destroyed += 1
-                except Exception:
-                    logger.warning("Failed to destroy ACL ID %s", aid)
-            if destroyed:
-                QDocSE.push_config().execute()
-                logger.info("[Pre-run purge] Destroyed %d stale ACL(s)", destroyed)
-            else:
-                logger.info("[Pre-run purge] No stale ACLs found")
-    except Exception as e:
-        logger.warning("[Pre-run purge] Could not list ACLs: %s", e)
     yield
 
 
 @pytest.fixture(scope="session", autouse=True)
-def purge_stale_watchpoints(setup_executor):
+def purge_stale_watchpoints(stale_purge):
     """Unprotect stale test watchpoints before test session starts.
 
     Previous test runs may leave behind protected directories (watchpoints)
     under /tmp/pytest-*.  These accumulate across runs because post-test
     cleanup was removed in favour of pre-run purge.
     """
-    try:
-        result = QDocSE.view().watchpoints().execute()
-        if result.result.success:
-            parsed = result.parse()
-            removed = 0
-            for wp in parsed.get("watchpoints", []):
-                if "/tmp/" not in wp["path"]:
-                    continue
-                try:
-                    QDocSE.unprotect(wp["path"]).execute()
-                    removed += 1
-                except Exception:
-                    logger.warning("Failed to unprotect %s", wp["path"])
-            if removed:
-                QDocSE.push_config().execute()
-                logger.info(
-                    "[Pre-run purge] Unprotected %d stale watchpoint(s)",
-                    removed,
-                )
-            else:
-                logger.info("[Pre-run purge] No stale watchpoints found")
-    except Exception as e:
-        logger.warning("[Pre-run purge] Could not list watchpoints: %s", e)
     yield
 
 
 @pytest.fixture(scope="session", autouse=True)
-def purge_stale_programs(setup_executor):
+def purge_stale_programs(stale_purge):
     """Block stale test programs from the authorized list before test session.
 
     Previous test runs may leave behind authorized programs under /tmp/
@@ -160,35 +148,19 @@ def purge_stale_programs(setup_executor):
     Moving stale /tmp/ programs to the blocked list is sufficient cleanup:
     entries pointing to deleted files are harmless in the blocked list.
     """
-    try:
-        result = QDocSE.view().execute()
-        if result.result.success:
-            parsed = result.parse()
-            blocked = 0
-            for prog in parsed.get("authorized", []):
-                if "/tmp/" not in prog["path"]:
-                    continue
-                try:
-                    QDocSE.adjust().block_index(prog["index"]).execute()
-                    blocked += 1
-                except Exception:
-                    logger.warning(
-                        "Failed to block stale program %s (index %s)",
-                        prog["path"], prog["index"],
-                    )
-            if blocked:
-                QDocSE.push_config().execute()
-                logger.info(
-                    "[Pre-run purge] Blocked %d stale program(s) from authorized list",
-                    blocked,
-                )
-            else:
-                logger.info("[Pre-run purge] No stale programs in authorized list")
-    except Exception as e:
-        logger.warning("[Pre-run purge] Could not list programs: %s", e)
     yield
 
 
+@pytest.fixture(scope="session")
+def reconciler(purge_stale_acls, purge_stale_watchpoints, purge_stale_programs):
+    """Session-wide Reconciler for declarative setup (helpers.reconcile).
+
+    Shared so that consecutive tests converging to similar states only pay
+    for the difference.
+    """
+    return Reconciler()
+
+
 @pytest.fixture(scope="module")
 def module_cleanup():
     """Module-level cleanup: push_config after each module."""
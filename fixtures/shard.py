@@ -0,0 +1,141 @@
+"""Sharding plugin - split one suite across identical targets by duration.
+
+    pytest tests/integration --shard-targets lab1,lab2,lab3
+
+Per-test durations from earlier sessions are kept in
+``reports/test_durations.json`` (``--durations-cache``; every normal or
+sharded session updates it). With ``--shard-targets`` the collected tests
+are assigned to hosts by LPT bin packing (helpers.shard). Each host runs its
+share in its own worker session with its own executor (helpers.fleet), and
+all results come back as one merged report in this session, including
+``--junitxml``. The terminal summary compares the predicted and actual load
+per host with the ideal makespan (total / N).
+"""
+import argparse
+import time
+
+import pytest
+from helpers.fleet import host_dir, run_fleet
+from helpers.shard import DurationCache, Shard, lpt
+from fixtures.fleet import replay
+from fixtures.metrics import REPORTS_DIR
+
+SHARD_DIR = REPORTS_DIR / "shard"
+
+_shards_key = pytest.StashKey[dict]()
+_wall_key = pytest.StashKey[float]()
+
+
+def pytest_addoption(parser):
+    group = parser.getgroup("qdocse")
+    group.addoption(
+        "--shard-targets", default=None,
+        help="Comma-separated identical targets to split the suite across by duration",
+    )
+    group.addoption(
+        "--durations-cache", default=str(REPORTS_DIR / "test_durations.json"),
+        help="JSON file of per-test durations used for sharding ('' to disable)",
+    )
+    group.addoption("--shard-file", default=None, help=argparse.SUPPRESS)
+
+
+def _targets(config) -> list[str]:
+    value = config.getoption("--shard-targets")
+    return [h.strip() for h in value.split(",") if h.strip()] if value else []
+
+
+class DurationRecorder:
+    """Adds up each collected test's phase durations; saved at session end."""
+
+    def __init__(self, cache: DurationCache):
+        self.cache = cache
+        self.nodeids: set[str] = set()
+        self.totals: dict[str, float] = {}
+
+    def pytest_collection_finish(self, session) -> None:
+        self.nodeids = {item.nodeid for item in session.items}
+
+    def pytest_runtest_logreport(self, report) -> None:
+        if report.nodeid in self.nodeids:
+            self.totals[report.nodeid] = self.totals.get(report.nodeid, 0.0) + report.duration
+
+    def pytest_sessionfinish(self, session) -> None:
+        if not self.totals:
+            return
+        for nodeid, seconds in self.totals.items():
+            self.cache.update(nodeid, seconds)
+        self.cache.save()
+
+
+def pytest_configure(config):
+    if _targets(config) and config.getoption("--hosts"):
+        raise pytest.UsageError("--shard-targets and --hosts cannot be combined")
+    path = config.getoption("--durations-cache")
+    # Workers report back to the controller, which records for them
+    if path and not config.getoption("--fleet-report"):
+        config.pluginmanager.register(DurationRecorder(DurationCache(path)), "duration-recorder")
+
+
+def pytest_collection_modifyitems(config, items):
+    path = config.getoption("--shard-file")
+    if not path:
+        return
+    with open(path) as f:
+        wanted = {line.strip() for line in f if line.strip()}
+    keep = [item for item in items if item.nodeid in wanted]
+    dropped = [item for item in items if item.nodeid not in wanted]
+    if dropped:
+        config.hook.pytest_deselected(items=dropped)
+        items[:] = keep
+
+
+@pytest.hookimpl(tryfirst=True)
+def pytest_runtestloop(session):
+    targets = _targets(session.config)
+    if not targets or session.config.option.collectonly:
+        return None
+    config = session.config
+    path = config.getoption("--durations-cache")
+    cache = DurationCache(path) if path else None
+    tests = [item.nodeid for item in session.items]
+    shards = lpt({t: cache.get(t) if cache else None for t in tests}, targets)
+    busy = [host for host in targets if shards[host].tests]
+    for host in busy:
+        shard_file = host_dir(SHARD_DIR, host) / "tests.txt"
+        shard_file.parent.mkdir(parents=True, exist_ok=True)
+        shard_file.write_text("\n".join(shards[host].tests) + "\n")
+
+    locations = {item.nodeid: item.location for item in session.items}
+    start = time.perf_counter()
+    runs = run_fleet(
+        busy, config.invocation_params.args, SHARD_DIR,
+        timeout=config.getoption("--fleet-timeout"),
+        on_done=lambda run: replay(session, run, locations, nodeid_for=lambda nodeid, host: nodeid),
+        host_args=lambda host: ["--shard-file", str(host_dir(SHARD_DIR, host) / "tests.txt")],
+    )
+    config.stash[_wall_key] = time.perf_counter() - start
+    config.stash[_shards_key] = {"shards": shards, "runs": {r.host: r for r in runs}}
+    return True
+
+
+def pytest_terminal_summary(terminalreporter, config):
+    state = config.stash.get(_shards_key, None)
+    if state is None:
+        return
+    shards: dict[str, Shard] = state["shards"]
+    runs = state["runs"]
+    terminalreporter.section("QDocSE shards")
+    measured = 0.0
+    for host, shard in shards.items():
+        run = runs.get(host)
+        spent = sum(r["duration"] for r in run.reports) if run else 0.0
+        measured += spent
+        actual = f"{run.seconds:8.1f}s" if run else "       -"
+        error = f"  ERROR: {run.error}" if run and run.error else ""
+        terminalreporter.write_line(
+            f"{host:<24} {len(shard.tests):5d} tests  predicted {shard.predicted:8.1f}s  "
+            f"actual {actual}{error}")
+    ideal = measured / len(shards) if shards else 0.0
+    terminalreporter.write_line(
+        f"makespan {config.stash[_wall_key]:.1f}s, ideal total/N {ideal:.1f}s "
+        f"({measured:.1f}s of tests over {len(shards)} host(s))")
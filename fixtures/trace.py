@@ -0,0 +1,143 @@
+"""Session timeline plugin - Chrome trace of tests, fixtures, commands and sleeps.
+
+Writes ``reports/session_trace.json`` (see ``--trace-timeline``); open it in
+https://ui.perfetto.dev or chrome://tracing. Spans, outermost first:
+
+- ``test``     one per test item (nodeid)
+- ``phase``    setup / call / teardown of each item
+- ``fixture``  setup and teardown of each fixture, e.g. ``protected_dir``,
+               ``purge_stale_acls``, ``elevated_mode``
+- ``command``  every executor command (QDocSEConsole subcommand or program)
+- ``sleep``    every ``time.sleep()`` call
+"""
+import time
+
+import pytest
+from helpers.executor import add_observer, remove_observer
+from helpers.trace import Tracer
+from fixtures.metrics import REPORTS_DIR
+
+_tracer_key = pytest.StashKey[Tracer]()
+_teardown_key = pytest.StashKey[dict]()
+
+
+def pytest_addoption(parser):
+    group = parser.getgroup("qdocse")
+    group.addoption(
+        "--trace-timeline",
+        default=str(REPORTS_DIR / "session_trace.json"),
+        help="Chrome trace-event JSON for the session timeline ('' to disable)",
+    )
+
+
+def _tracer(config):
+    return config.stash.get(_tracer_key, None)
+
+
+def pytest_configure(config):
+    if not config.getoption("--trace-timeline"):
+        return
+    tracer = Tracer()
+    config.stash[_tracer_key] = tracer
+    config.stash[_teardown_key] = {}
+    add_observer(tracer.observe)
+    tracer.patch_sleep()
+
+
+def pytest_unconfigure(config):
+    tracer = _tracer(config)
+    if tracer is not None:
+        remove_observer(tracer.observe)
+        tracer.restore_sleep()
+
+
+@pytest.hookimpl(hookwrapper=True)
+def pytest_runtest_protocol(item, nextitem):
+    tracer = _tracer(item.config)
+    if tracer is None:
+        yield
+        return
+    with tracer.span(item.nodeid, "test"):
+        yield
+
+
+def _phase(item, name):
+    tracer = _tracer(item.config)
+    if tracer is None:
+        return None
+    return tracer.span(name, "phase", nodeid=item.nodeid)
+
+
+@pytest.hookimpl(hookwrapper=True)
+def pytest_runtest_setup(item):
+    span = _phase(item, "setup")
+    if span is None:
+        yield
+        return
+    with span:
+        yield
+
+
+@pytest.hookimpl(hookwrapper=True)
+def pytest_runtest_call(item):
+    span = _phase(item, "call")
+    if span is None:
+        yield
+        return
+    with span:
+        yield
+
+
+@pytest.hookimpl(hookwrapper=True)
+def pytest_runtest_teardown(item, nextitem):
+    span = _phase(item, "teardown")
+    if span is None:
+        yield
+        return
+    with span:
+        yield
+
+
+@pytest.hookimpl(hookwrapper=True)
+def pytest_fixture_setup(fixturedef, request):
+    tracer = _tracer(request.config)
+    if tracer is None:
+        yield
+        return
+
+    name = f"{fixturedef.argname} (setup)"
+    with tracer.span(name, "fixture", scope=fixturedef.scope):
+        yield
+
+    # Finalizers run last-in first-out, so this one runs before the fixture's
+    # own teardown code; pytest_fixture_post_finalizer runs after it.
+    starts = request.config.stash[_teardown_key]
+    key = id(fixturedef)
+    fixturedef.addfinalizer(lambda: starts.__setitem__(key, time.perf_counter()))
+
+
+def pytest_fixture_post_finalizer(fixturedef, request):
+    tracer = _tracer(request.config)
+    if tracer is None:
+        return
+    start = request.config.stash[_teardown_key].pop(id(fixturedef), None)
+    if start is None:
+        return
+    tracer.complete(
+        f"{fixturedef.argname} (teardown)", "fixture",
+        start, time.perf_counter() - start,
+        args={"scope": fixturedef.scope},
+    )
+
+
+def pytest_sessionfinish(session):
+    tracer = _tracer(session.config)
+    if tracer is not None:
+        tracer.dump(session.config.getoption("--trace-timeline"))
+
+
+def pytest_terminal_summary(terminalreporter, config):
+    if _tracer(config) is not None:
+        terminalreporter.write_line(
+            f"Session timeline written to {config.getoption('--trace-timeline')}"
+        )
@@ -1,10 +1,10 @@
 """QDocSE test helpers - command wrappers and executors."""
 from .client import QDocSE
-from .executor import Executor, LocalExecutor, SSHExecutor
-from .result import ExecResult, CommandError
+from .executor import Executor, LocalExecutor, PooledExecutor, SSHExecutor
+from .result import ExecResult, BinaryExecResult, CommandError
 
 __all__ = [
     "QDocSE",
-    "Executor", "LocalExecutor", "SSHExecutor",
-    "ExecResult", "CommandError",
+    "Executor", "LocalExecutor", "PooledExecutor", "SSHExecutor",
+    "ExecResult", "BinaryExecResult", "CommandError",
 ]
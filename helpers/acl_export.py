@@ -0,0 +1,802 @@
+"""
+acl_export files - offline reader, writer and validator.
+
+The export format is undocumented beyond what acl_import reports ("Bad magic
+number", "ACL import hash verify error"), so the layout is not hard-coded.
+``calibrate_from_target()`` learns it from real exports: it exports the
+configuration after a series of controlled changes (one empty ACL, two, one
+entry, another UID, a group, a deny entry, other modes), diffs the files and
+derives
+
+- the magic prefix and header template,
+- the digest algorithm, its position and the bytes it covers,
+- the ACL record and entry record sizes and templates,
+- the offsets of the ACL id, entry count, principal id, allow/deny type and
+  mode fields.
+
+The layout model is fixed-size little-endian records: a header, then every
+ACL record followed by its entries, with the digest at a fixed position.
+Calibration re-encodes every sample and requires a byte-identical result, so
+a product whose format does not fit the model fails loudly with
+ExportFormatError rather than producing files acl_import would reject.
+Entries with time rules or program principals are not calibrated; the
+reader rejects records it cannot decode.
+
+Layouts are cached per product version in reports/acl_export_layout.json.
+
+Usage:
+    from helpers.acl_export import ACLRecord, EntryRecord, load_layout, provision
+
+    layout = load_layout()                 # calibrates on first use
+    acls = [ACLRecord(i, [EntryRecord(True, user=1000 + i, mode="r")])
+            for i in range(1, 10001)]
+    provision(acls, layout)                # a single acl_import
+    QDocSE.push_config().execute().ok()
+
+    for acl in read_export("/tmp/acl_config", layout):   # streaming
+        print(acl.acl_id, len(acl.entries))
+"""
+import hashlib
+import json
+import os
+import tempfile
+import uuid
+import zlib
+from dataclasses import dataclass, field
+from functools import cached_property
+from pathlib import Path
+from typing import Any, BinaryIO, Iterable, Iterator, Optional, Union
+
+from .client import QDocSE
+from .executor import get_executor
+
+LAYOUT_PATH = Path(__file__).parent.parent / "reports" / "acl_export_layout.json"
+
+# Digest search window at each end of the file
+_DIGEST_WINDOW = 256
+_MAX_MAGIC = 8
+_FIELD_SIZES = (4, 8, 2, 1)
+
+_MODE_LETTERS = "rwx"
+
+# Distinctive principal ids used while calibrating (numeric, never resolved)
+CALIBRATION_UIDS = (271828, 314159)
+CALIBRATION_GID = 161803
+
+
+class ExportFormatError(Exception):
+    """An export file, or the product's format, does not match the layout."""
+
+
+# =============================================================================
+# Records
+# =============================================================================
+
+def normalize_mode(mode: str) -> str:
+    """'rw-' / 'wr' / 'rw' -> 'rw'."""
+    letters = set(mode.replace("-", ""))
+    if not letters or letters - set(_MODE_LETTERS):
+        raise ValueError(f"Invalid mode: {mode!r}")
+    return "".join(c for c in _MODE_LETTERS if c in letters)
+
+
+@dataclass
+class EntryRecord:
+    """One user or group entry (first-match, see acl_add)."""
+    allow: bool
+    user: Optional[int] = None
+    group: Optional[int] = None
+    mode: str = "r"
+
+    def __post_init__(self):
+        if (self.user is None) == (self.group is None):
+            raise ValueError("EntryRecord needs exactly one of user or group")
+        self.mode = normalize_mode(self.mode)
+
+
+@dataclass
+class ACLRecord:
+    acl_id: int
+    entries: list[EntryRecord] = field(default_factory=list)
+
+
+# =============================================================================
+# Layout
+# =============================================================================
+
+@dataclass(frozen=True)
+class Field:
+    """Little-endian unsigned integer at ``offset`` within a record."""
+    offset: int
+    size: int
+
+    def get(self, buf, base: int = 0) -> int:
+        return int.from_bytes(buf[base + self.offset:base + self.offset + self.size], "little")
+
+    def put(self, buf: bytearray, value: int, base: int = 0) -> None:
+        try:
+            buf[base + self.offset:base + self.offset + self.size] = value.to_bytes(self.size, "little")
+        except OverflowError:
+            raise ValueError(f"{value} does not fit in {self.size} bytes") from None
+
+    def span(self) -> range:
+        return range(self.offset, self.offset + self.size)
+
+
+class _Crc32:
+    def __init__(self, big_endian: bool = False):
+        self.value = 0
+        self.order = "big" if big_endian else "little"
+
+    def update(self, data) -> None:
+        self.value = zlib.crc32(data, self.value)
+
+    def digest(self) -> bytes:
+        return self.value.to_bytes(4, self.order)
+
+
+DIGESTS = {
+    "md5": 16,
+    "sha1": 20,
+    "sha256": 32,
+    "sha512": 64,
+    "crc32": 4,
+    "crc32be": 4,
+}
+
+
+def _new_digest(name: str):
+    if name == "crc32":
+        return _Crc32()
+    if name == "crc32be":
+        return _Crc32(big_endian=True)
+    return hashlib.new(name)
+
+
+@dataclass(frozen=True)
+class DigestSpec:
+    """Where the digest lives and which payload bytes it covers.
+
+    ``offset`` counts from the start of the file, or from the end when
+    negative. ``covers`` is ``rest`` (every other byte), ``before`` or
+    ``after`` (the bytes before / after the digest).
+    """
+    algorithm: str
+    offset: int
+    covers: str
+
+    @property
+    def size(self) -> int:
+        return DIGESTS[self.algorithm]
+
+    def position(self, file_size: int) -> int:
+        return self.offset if self.offset >= 0 else file_size + self.offset
+
+    def compute(self, data: bytes) -> bytes:
+        """Digest of a complete file image (digest bytes are ignored)."""
+        pos = self.position(len(data))
+        h = _new_digest(self.algorithm)
+        if self.covers in ("rest", "before"):
+            h.update(data[:pos])
+        if self.covers in ("rest", "after"):
+            h.update(data[pos + self.size:])
+        return h.digest()
+
+
+@dataclass
+class ExportLayout:
+    """Calibrated acl_export layout (see module docstring)."""
+    magic: bytes
+    header: bytes
+    acl_count: Field
+    entry_total: Optional[Field]
+    acl_template: bytes
+    acl_id: Field
+    entry_count: Field
+    user_entry: bytes
+    group_entry: bytes
+    user_id: Field
+    group_id: Field
+    entry_type: Field
+    allow_value: int
+    deny_value: int
+    mode: Field
+    mode_bits: dict[str, int]
+    digest: DigestSpec
+    product_version: str = ""
+
+    @property
+    def acl_size(self) -> int:
+        return len(self.acl_template)
+
+    @property
+    def entry_size(self) -> int:
+        return len(self.user_entry)
+
+    def file_size(self, acls: int, entries: int) -> int:
+        return len(self.header) + acls * self.acl_size + entries * self.entry_size + self.digest.size
+
+    # --- records -----------------------------------------------------------
+
+    def encode_acl(self, acl: ACLRecord) -> bytes:
+        buf = bytearray(self.acl_template)
+        self.acl_id.put(buf, acl.acl_id)
+        self.entry_count.put(buf, len(acl.entries))
+        return bytes(buf)
+
+    def encode_entry(self, entry: EntryRecord) -> bytes:
+        if entry.user is not None:
+            buf = bytearray(self.user_entry)
+            self.user_id.put(buf, entry.user)
+        else:
+            buf = bytearray(self.group_entry)
+            self.group_id.put(buf, entry.group)
+        self.entry_type.put(buf, self.allow_value if entry.allow else self.deny_value)
+        self.mode.put(buf, sum(self.mode_bits[c] for c in entry.mode))
+        return bytes(buf)
+
+    def decode_entry(self, rec: bytes) -> EntryRecord:
+        static = self._static
+        if all(rec[i] == self.user_entry[i] for i in static):
+            kind = "user"
+        elif all(rec[i] == self.group_entry[i] for i in static):
+            kind = "group"
+        else:
+            raise ExportFormatError(
+                "Unrecognized entry record (time rules and program entries are not supported)"
+            )
+        type_value = self.entry_type.get(rec)
+        if type_value not in (self.allow_value, self.deny_value):
+            raise ExportFormatError(f"Unknown entry type value {type_value}")
+        mode_value = self.mode.get(rec)
+        mode = "".join(c for c in _MODE_LETTERS if mode_value & self.mode_bits[c])
+        if not mode or sum(self.mode_bits[c] for c in mode) != mode_value:
+            raise ExportFormatError(f"Unknown mode value {mode_value:#x}")
+        if kind == "user":
+            return EntryRecord(type_value == self.allow_value, user=self.user_id.get(rec), mode=mode)
+        return EntryRecord(type_value == self.allow_value, group=self.group_id.get(rec), mode=mode)
+
+    @cached_property
+    def _static(self) -> list[int]:
+        """Entry offsets outside the variable fields (they identify user vs group)."""
+        variable = set()
+        for f in (self.user_id, self.group_id, self.entry_type, self.mode):
+            variable.update(f.span())
+        return [i for i in range(self.entry_size) if i not in variable]
+
+    # --- persistence -------------------------------------------------------
+
+    def to_dict(self) -> dict[str, Any]:
+        data: dict[str, Any] = {}
+        for key, value in vars(self).items():
+            if key.startswith("_"):
+                continue
+            if isinstance(value, bytes):
+                value = value.hex()
+            elif isinstance(value, (Field, DigestSpec)):
+                value = vars(value)
+            data[key] = value
+        return data
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any]) -> "ExportLayout":
+        kwargs = dict(data)
+        for key in ("magic", "header", "acl_template", "user_entry", "group_entry"):
+            kwargs[key] = bytes.fromhex(kwargs[key])
+        for key in ("acl_count", "acl_id", "entry_count", "user_id", "group_id", "entry_type", "mode"):
+            kwargs[key] = Field(**kwargs[key])
+        if kwargs.get("entry_total"):
+            kwargs["entry_total"] = Field(**kwargs["entry_total"])
+        kwargs["digest"] = DigestSpec(**kwargs["digest"])
+        return cls(**kwargs)
+
+    def dump(self, path: Union[str, Path] = LAYOUT_PATH) -> Path:
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps(self.to_dict(), indent=2))
+        return path
+
+    @classmethod
+    def load(cls, path: Union[str, Path] = LAYOUT_PATH) -> "ExportLayout":
+        return cls.from_dict(json.loads(Path(path).read_text()))
+
+
+# =============================================================================
+# Streaming reader / writer
+# =============================================================================
+
+class _PayloadReader:
+    """Reads the file minus its digest bytes, hashing what the digest covers."""
+
+    def __init__(self, f: BinaryIO, file_size: int, spec: DigestSpec):
+        self.f = f
+        self.spec = spec
+        self.dpos = spec.position(file_size)
+        self.fpos = 0
+        self.size = file_size
+        self.stored: Optional[bytes] = None
+        self.hash = _new_digest(spec.algorithm)
+
+    def _take_digest(self) -> None:
+        self.stored = self.f.read(self.spec.size)
+        self.fpos += len(self.stored)
+
+    def read(self, n: int) -> bytes:
+        out = bytearray()
+        while len(out) < n:
+            if self.fpos == self.dpos and self.stored is None:
+                self._take_digest()
+                continue
+            want = n - len(out)
+            if self.fpos < self.dpos:
+                want = min(want, self.dpos - self.fpos)
+            chunk = self.f.read(want)
+            if not chunk:
+                break
+            if self.spec.covers == "rest" or (self.spec.covers == "before") == (self.fpos < self.dpos):
+                self.hash.update(chunk)
+            self.fpos += len(chunk)
+            out += chunk
+        return bytes(out)
+
+    def remaining(self) -> int:
+        left = self.size - self.fpos
+        return left - self.spec.size if self.stored is None else left
+
+    def verify(self) -> None:
+        if self.stored is None and self.fpos == self.dpos:
+            self._take_digest()
+        if self.stored != self.hash.digest():
+            raise ExportFormatError("Digest mismatch (acl_import would report a hash verify error)")
+
+
+def iter_export(f: BinaryIO, layout: ExportLayout, verify: bool = True) -> Iterator[ACLRecord]:
+    """Yield ACLs from an open export file, one record at a time.
+
+    Memory use is one ACL record plus its entries. The digest is checked
+    after the last ACL has been yielded.
+    """
+    size = os.fstat(f.fileno()).st_size
+    if size < len(layout.header) + layout.digest.size:
+        raise ExportFormatError(f"File too short ({size} bytes)")
+    payload = _PayloadReader(f, size, layout.digest)
+
+    header = payload.read(len(layout.header))
+    if not header.startswith(layout.magic):
+        raise ExportFormatError("Bad magic number")
+    acl_count = layout.acl_count.get(header)
+    entry_total = 0
+
+    for index in range(acl_count):
+        rec = payload.read(layout.acl_size)
+        if len(rec) < layout.acl_size:
+            raise ExportFormatError(f"Truncated ACL record {index + 1} of {acl_count}")
+        acl = ACLRecord(layout.acl_id.get(rec))
+        count = layout.entry_count.get(rec)
+        for _ in range(count):
+            entry = payload.read(layout.entry_size)
+            if len(entry) < layout.entry_size:
+                raise ExportFormatError(f"Truncated entry in ACL {acl.acl_id}")
+            acl.entries.append(layout.decode_entry(entry))
+        entry_total += count
+        yield acl
+
+    if payload.remaining():
+        raise ExportFormatError(f"{payload.remaining()} trailing bytes after {acl_count} ACLs")
+    if layout.entry_total is not None and layout.entry_total.get(header) != entry_total:
+        raise ExportFormatError(
+            f"Header entry total {layout.entry_total.get(header)} != {entry_total} entries read"
+        )
+    if verify:
+        payload.verify()
+
+
+def read_export(path: Union[str, Path], layout: ExportLayout, verify: bool = True) -> Iterator[ACLRecord]:
+    """Stream the ACLs of a local export file."""
+    with open(path, "rb") as f:
+        yield from iter_export(f, layout, verify)
+
+
+def parse_export(data: bytes, layout: ExportLayout, verify: bool = True) -> list[ACLRecord]:
+    """Decode an in-memory export image."""
+    with tempfile.TemporaryFile() as f:
+        f.write(data)
+        f.seek(0)
+        return list(iter_export(f, layout, verify))
+
+
+def validate_export(path: Union[str, Path], layout: ExportLayout) -> list[str]:
+    """Problems found in an export file; empty when acl_import should accept it."""
+    problems = []
+    seen: set[int] = set()
+    try:
+        for acl in read_export(path, layout):
+            if acl.acl_id in seen:
+                problems.append(f"Duplicate ACL ID {acl.acl_id}")
+            seen.add(acl.acl_id)
+    except ExportFormatError as e:
+        problems.append(str(e))
+    return problems
+
+
+class _PayloadWriter:
+    """Writes payload bytes, reserving and later filling the digest slot."""
+
+    def __init__(self, f: BinaryIO, file_size: int, spec: DigestSpec):
+        self.f = f
+        self.spec = spec
+        self.dpos = spec.position(file_size)
+        self.fpos = 0
+        self.reserved = False
+        self.hash = _new_digest(spec.algorithm)
+
+    def _reserve(self) -> None:
+        self.f.write(bytes(self.spec.size))
+        self.fpos += self.spec.size
+        self.reserved = True
+
+    def write(self, data: bytes) -> None:
+        view = memoryview(data)
+        while view:
+            if self.fpos == self.dpos and not self.reserved:
+                self._reserve()
+                continue
+            n = len(view)
+            if self.fpos < self.dpos:
+                n = min(n, self.dpos - self.fpos)
+            chunk = view[:n]
+            if self.spec.covers == "rest" or (self.spec.covers == "before") == (self.fpos < self.dpos):
+                self.hash.update(chunk)
+            self.f.write(chunk)
+            self.fpos += n
+            view = view[n:]
+
+    def finish(self) -> None:
+        if not self.reserved:
+            self._reserve()
+        end = self.f.tell()
+        self.f.seek(self.dpos)
+        self.f.write(self.hash.digest())
+        self.f.seek(end)
+
+
+def write_export(path: Union[str, Path], acls: Iterable[ACLRecord], layout: ExportLayout) -> Path:
+    """Write ``acls`` as an export file that acl_import accepts."""
+    acls = list(acls)
+    ids = [a.acl_id for a in acls]
+    if len(set(ids)) != len(ids):
+        raise ValueError("Duplicate ACL IDs")
+    entries = sum(len(a.entries) for a in acls)
+
+    header = bytearray(layout.header)
+    layout.acl_count.put(header, len(acls))
+    if layout.entry_total is not None:
+        layout.entry_total.put(header, entries)
+
+    path = Path(path)
+    with open(path, "wb") as f:
+        out = _PayloadWriter(f, layout.file_size(len(acls), entries), layout.digest)
+        out.write(bytes(header))
+        for acl in acls:
+            out.write(layout.encode_acl(acl))
+            for entry in acl.entries:
+                out.write(layout.encode_entry(entry))
+        out.finish()
+    return path
+
+
+def encode_export(acls: Iterable[ACLRecord], layout: ExportLayout) -> bytes:
+    with tempfile.NamedTemporaryFile() as f:
+        write_export(f.name, acls, layout)
+        return Path(f.name).read_bytes()
+
+
+# =============================================================================
+# Calibration
+# =============================================================================
+
+@dataclass
+class Sample:
+    """An export taken after adding ``added`` ACLs on top of the base config."""
+    data: bytes
+    added: list[ACLRecord]
+
+
+def _entries(*specs) -> list[EntryRecord]:
+    return [EntryRecord(allow, user=user, group=group, mode=mode) for allow, user, group, mode in specs]
+
+
+_U1, _U2 = CALIBRATION_UIDS
+_G1 = CALIBRATION_GID
+
+# sample name -> ACLs to add (each a list of entries)
+CALIBRATION_PLAN: dict[str, list[list[EntryRecord]]] = {
+    "one": [[]],
+    "two": [[], []],
+    "entry": [_entries((True, _U1, None, "r"))],
+    "entry2": [_entries((True, _U1, None, "r"), (True, _U2, None, "r"))],
+    "uid": [_entries((True, _U2, None, "r"))],
+    "group": [_entries((True, None, _G1, "r"))],
+    "deny": [_entries((False, _U1, None, "r"))],
+    "mode_w": [_entries((True, _U1, None, "w"))],
+    "mode_x": [_entries((True, _U1, None, "x"))],
+    "mode_rwx": [_entries((True, _U1, None, "rwx"))],
+}
+
+
+def _find_digest(samples: list[bytes]) -> DigestSpec:
+    smallest = min(samples, key=len)
+    n = len(smallest)
+    for algorithm, size in DIGESTS.items():
+        offsets = list(range(0, min(_DIGEST_WINDOW, n - size + 1)))
+        offsets += [-k for k in range(size, min(_DIGEST_WINDOW, n) + 1)]
+        for offset in offsets:
+            for covers in ("rest", "before", "after"):
+                spec = DigestSpec(algorithm, offset, covers)
+                if all(_digest_matches(spec, data) for data in samples):
+                    return spec
+    raise ExportFormatError("No known digest (md5/sha*/crc32) found in the export files")
+
+
+def _digest_matches(spec: DigestSpec, data: bytes) -> bool:
+    pos = spec.position(len(data))
+    if pos < 0 or pos + spec.size > len(data):
+        return False
+    if spec.covers == "before" and pos == 0 or spec.covers == "after" and pos + spec.size == len(data):
+        return False  # a digest of nothing is a constant, not a match
+    return data[pos:pos + spec.size] == spec.compute(data)
+
+
+def _strip_digest(spec: DigestSpec, data: bytes) -> bytes:
+    pos = spec.position(len(data))
+    return data[:pos] + data[pos + spec.size:]
+
+
+def _diff(a: bytes, b: bytes) -> list[int]:
+    if len(a) != len(b):
+        raise ExportFormatError(f"Record sizes differ ({len(a)} != {len(b)})")
+    return [i for i in range(len(a)) if a[i] != b[i]]
+
+
+def _find_field(a: bytes, b: bytes, va: int, vb: int, what: str) -> Field:
+    """Field holding ``va`` in ``a`` and ``vb`` in ``b``, covering every differing byte."""
+    diffs = _diff(a, b)
+    if not diffs:
+        raise ExportFormatError(f"Cannot locate {what}: samples are identical")
+    for size in _FIELD_SIZES:
+        for offset in range(max(diffs[-1] - size + 1, 0), diffs[0] + 1):
+            if offset + size > len(a):
+                continue
+            f = Field(offset, size)
+            if f.get(a) == va and f.get(b) == vb:
+                return f
+    raise ExportFormatError(f"Cannot locate {what} (bytes {diffs[0]}..{diffs[-1]} differ)")
+
+
+def _find_value(rec: bytes, other: bytes, value: int, what: str) -> Field:
+    """Field holding ``value`` in ``rec`` but not in ``other``."""
+    for size in _FIELD_SIZES:
+        for offset in range(len(rec) - size + 1):
+            f = Field(offset, size)
+            if f.get(rec) == value and f.get(other) != value:
+                return f
+    raise ExportFormatError(f"Cannot locate {what}")
+
+
+def _span_field(recs: list[bytes], what: str) -> Field:
+    """Smallest field covering every byte that differs between ``recs``."""
+    diffs = sorted({i for r in recs[1:] for i in _diff(recs[0], r)})
+    if not diffs:
+        raise ExportFormatError(f"Cannot locate {what}: samples are identical")
+    return Field(diffs[0], diffs[-1] - diffs[0] + 1)
+
+
+def _zero(rec: bytes, *fields: Field) -> bytes:
+    buf = bytearray(rec)
+    for f in fields:
+        f.put(buf, 0)
+    return bytes(buf)
+
+
+def calibrate(base: bytes, base_acls: int, base_entries: int, samples: dict[str, Sample]) -> ExportLayout:
+    """Derive the layout from a base export and the CALIBRATION_PLAN samples.
+
+    ``base_acls`` / ``base_entries`` are the ACL and entry counts of the base
+    configuration (from acl_list). Raises ExportFormatError when the exports
+    do not fit the fixed-record model.
+    """
+    missing = set(CALIBRATION_PLAN) - set(samples)
+    if missing:
+        raise ValueError(f"Missing calibration samples: {sorted(missing)}")
+
+    digest = _find_digest([base] + [s.data for s in samples.values()])
+    pb = _strip_digest(digest, base)
+    p = {name: _strip_digest(digest, s.data) for name, s in samples.items()}
+
+    magic = os.path.commonprefix([pb] + list(p.values()))[:_MAX_MAGIC]
+    if len(magic) < 2:
+        raise ExportFormatError("No common magic prefix")
+
+    acl_size = len(p["one"]) - len(pb)
+    entry_size = len(p["entry"]) - len(p["one"])
+    if acl_size <= 0 or entry_size <= 0 or len(p["two"]) - len(p["one"]) != acl_size \
+            or len(p["entry2"]) - len(p["entry"]) != entry_size:
+        raise ExportFormatError("Record sizes are not constant; not a fixed-record layout")
+    header_size = len(pb) - base_acls * acl_size - base_entries * entry_size
+    if header_size < len(magic):
+        raise ExportFormatError("Base configuration does not fit the fixed-record model")
+
+    # Header: ACL count, optionally a total entry count
+    acl_count = _find_field(pb[:header_size], p["one"][:header_size], base_acls, base_acls + 1,
+                            "ACL count")
+    entry_total = None
+    h_one, h_entry = p["one"][:header_size], p["entry"][:header_size]
+    if h_one != h_entry:
+        entry_total = _find_field(h_one, h_entry, base_entries, base_entries + 1, "entry total")
+
+    # ACL records are appended after the base configuration
+    start = len(pb)
+    one = samples["one"].added[0]
+    rec_one = p["one"][start:]
+    two = samples["two"].added
+    if two[0].acl_id == two[1].acl_id:
+        raise ValueError("Calibration sample 'two' needs two distinct ACL ids")
+    acl_id = _find_field(p["two"][start:start + acl_size], p["two"][start + acl_size:],
+                         two[0].acl_id, two[1].acl_id, "ACL id")
+    if acl_id.get(rec_one) != one.acl_id:
+        raise ExportFormatError("ACL id field does not hold the created ACL id")
+    rec_entry_acl = p["entry"][start:start + acl_size]
+    entry_count = _find_field(_zero(rec_one, acl_id), _zero(rec_entry_acl, acl_id), 0, 1, "entry count")
+
+    # Entry records
+    def entry_rec(name: str, index: int = 0) -> bytes:
+        off = start + acl_size + index * entry_size
+        return p[name][off:off + entry_size]
+
+    e_user, e_uid, e_group, e_deny = entry_rec("entry"), entry_rec("uid"), entry_rec("group"), entry_rec("deny")
+    user_id = _find_field(e_user, e_uid, _U1, _U2, "user id")
+    group_id = _find_value(e_group, e_user, _G1, "group id")
+    entry_type = _span_field([e_user, e_deny], "entry type")
+    mode_recs = {m: entry_rec(f"mode_{m}") for m in ("w", "x", "rwx")}
+    mode_recs["r"] = e_user
+    mode = _span_field(list(mode_recs.values()), "mode")
+    values = {m: mode.get(r) for m, r in mode_recs.items()}
+    bits = {m: values[m] for m in _MODE_LETTERS}
+    if values["rwx"] != bits["r"] | bits["w"] | bits["x"] or len({*bits.values()}) != 3 \
+            or any(bin(v).count("1") != 1 for v in bits.values()):
+        raise ExportFormatError(f"Mode encoding is not a bitmask: {values}")
+
+    layout = ExportLayout(
+        magic=magic,
+        header=_zero(pb[:header_size], acl_count, *([entry_total] if entry_total else [])),
+        acl_count=acl_count,
+        entry_total=entry_total,
+        acl_template=_zero(rec_one, acl_id, entry_count),
+        acl_id=acl_id,
+        entry_count=entry_count,
+        user_entry=_zero(e_user, user_id, entry_type, mode),
+        group_entry=_zero(e_group, group_id, entry_type, mode),
+        user_id=user_id,
+        group_id=group_id,
+        entry_type=entry_type,
+        allow_value=entry_type.get(e_user),
+        deny_value=entry_type.get(e_deny),
+        mode=mode,
+        mode_bits=bits,
+        digest=digest,
+    )
+    if all(layout.user_entry[i] == layout.group_entry[i] for i in layout._static):
+        raise ExportFormatError("User and group entries cannot be told apart")
+
+    # The model must reproduce every sample exactly
+    for name, sample in [("base", Sample(base, []))] + list(samples.items()):
+        try:
+            decoded = parse_export(sample.data, layout)
+        except ExportFormatError as e:
+            raise ExportFormatError(f"Calibration sample {name!r} does not decode: {e}") from e
+        if sample.added and decoded[-len(sample.added):] != sample.added:
+            raise ExportFormatError(f"Calibration sample {name!r} decodes to different ACLs")
+        if encode_export(decoded, layout) != sample.data:
+            raise ExportFormatError(f"Calibration sample {name!r} does not re-encode identically")
+    return layout
+
+
+# =============================================================================
+# Target operations
+# =============================================================================
+
+def _remote_tmp(tag: str) -> str:
+    return f"/tmp/qdocse_{tag}_{os.getpid()}_{uuid.uuid4().hex[:8]}.acl"
+
+
+def product_version() -> str:
+    return get_executor().run(["QDocSEConsole", "-c", "version"], timeout=10).stdout
+
+
+def export_bytes() -> bytes:
+    """Run acl_export on the target and return the file contents."""
+    path = _remote_tmp("export")
+    executor = get_executor()
+    try:
+        QDocSE.acl_export(path).execute().ok()
+        return executor.read_file(path)
+    finally:
+        executor.run(["rm", "-f", path], timeout=10)
+
+
+def _add_acls(plan: list[list[EntryRecord]]) -> list[ACLRecord]:
+    created = []
+    try:
+        for entries in plan:
+            acl_id = QDocSE.acl_create().execute().ok().parse()["acl_id"]
+            created.append(ACLRecord(acl_id, list(entries)))
+            for e in entries:
+                QDocSE.acl_add(acl_id, allow=e.allow, user=e.user, group=e.group, mode=e.mode).execute().ok()
+    except Exception:
+        for acl in created:
+            QDocSE.acl_destroy(acl.acl_id, force=True).execute()
+        raise
+    return created
+
+
+def calibrate_from_target() -> ExportLayout:
+    """Learn the export layout from the target (adds and destroys a few ACLs).
+
+    Works best on a configuration without time-rule or program entries,
+    e.g. right after the session's stale-ACL purge.
+    """
+    listing = QDocSE.acl_list().execute().ok().parse()
+    base_acls = len(listing["acls"])
+    base_entries = sum(len(a["entries"]) for a in listing["acls"])
+    base = export_bytes()
+
+    samples = {}
+    for name, plan in CALIBRATION_PLAN.items():
+        created = _add_acls(plan)
+        try:
+            samples[name] = Sample(export_bytes(), created)
+        finally:
+            for acl in created:
+                QDocSE.acl_destroy(acl.acl_id, force=True).execute()
+
+    layout = calibrate(base, base_acls, base_entries, samples)
+    layout.product_version = product_version()
+    return layout
+
+
+def load_layout(path: Union[str, Path] = LAYOUT_PATH, refresh: bool = False) -> ExportLayout:
+    """Cached layout for the target's product version, calibrating if needed."""
+    path = Path(path)
+    version = product_version()
+    if path.exists() and not refresh:
+        layout = ExportLayout.load(path)
+        if layout.product_version == version:
+            return layout
+    layout = calibrate_from_target()
+    layout.dump(path)
+    return layout
+
+
+def provision(acls: Iterable[ACLRecord], layout: ExportLayout, keep_existing: bool = False) -> list[ACLRecord]:
+    """Load ``acls`` with one acl_import; returns the ACLs now configured.
+
+    acl_import replaces the whole ACL configuration. With ``keep_existing``
+    the current ACLs are exported, decoded and kept in front of ``acls``.
+    Callers still run push_config to commit.
+    """
+    acls = list(acls)
+    if keep_existing:
+        acls = parse_export(export_bytes(), layout) + acls
+
+    with tempfile.NamedTemporaryFile(suffix=".acl") as f:
+        write_export(f.name, acls, layout)
+        data = Path(f.name).read_bytes()
+
+    path = _remote_tmp("import")
+    executor = get_executor()
+    executor.write_file(path, data)
+    try:
+        QDocSE.acl_import(path).execute().ok()
+    finally:
+        executor.run(["rm", "-f", path], timeout=10)
+    return acls
@@ -0,0 +1,202 @@
+"""
+ACL decision oracle: computes what QDocSE should decide for an access.
+
+Evaluation rules (user guide, acl_list):
+
+- entries are checked in order; an entry whose UID / GID / program index does
+  not match the request is skipped;
+- the first entry whose principal matches decides: its type (Allow / Deny)
+  if the requested modes are a subset of the entry's modes and the time is
+  inside its schedule, otherwise Deny;
+- no matching entry (including an empty ACL) means Deny.
+
+Only the first principal match matters, so ``ACLOracle`` keeps one sorted
+entry list per principal and the decision takes the earliest head among the
+request's user, groups and program. Time rules become a ``WeeklySchedule``:
+merged half-open intervals over the seconds of a week (Monday 00:00 = 0),
+queried by bisection. A window whose end is before its start crosses
+midnight into the next day (Sunday wraps to Monday). Ends are inclusive to
+the second, as in ``00:00:00-23:59:59``.
+
+A decision costs O(g + log k) for g groups and k intervals in the deciding
+entry's schedule, whatever the number of entries.
+
+Usage:
+    oracle = ACLOracle.load(acl_id)  # or ACLOracle.from_parsed(acl_list.parse()["acls"][0])
+    expected = oracle.allowed(os.getuid(), os.getgroups(), None, "r", datetime.now())
+"""
+import bisect
+import re
+import time
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Iterable, Optional, Sequence, Union
+
+from .client import QDocSE
+from .reconcile import EntrySpec
+
+DAY = 24 * 3600
+WEEK = 7 * DAY
+DAYS = ("monday", "tuesday", "wednesday", "thursday", "friday", "saturday", "sunday")
+
+_RANGE_RE = re.compile(r"^(\d{1,2}):(\d{2}):(\d{2})-(\d{1,2}):(\d{2}):(\d{2})$")
+
+Timestamp = Union[datetime, float, None]
+
+
+def day_index(name: str) -> int:
+    """Monday = 0 ... Sunday = 6; full names or three-letter abbreviations."""
+    key = name.strip().lower()[:3]
+    for i, day in enumerate(DAYS):
+        if day[:3] == key:
+            return i
+    raise ValueError(f"Unknown day {name!r}")
+
+
+def week_second(when: Timestamp = None) -> int:
+    """Seconds since Monday 00:00 (local time) for a datetime or epoch seconds."""
+    if when is None:
+        when = time.time()
+    if not isinstance(when, datetime):
+        when = datetime.fromtimestamp(when)
+    return when.weekday() * DAY + when.hour * 3600 + when.minute * 60 + when.second
+
+
+class WeeklySchedule:
+    """Disjoint, sorted [start, end) second intervals within one week."""
+
+    def __init__(self, intervals: Iterable[tuple[int, int]] = ((0, WEEK),)):
+        merged: list[list[int]] = []
+        for start, end in sorted(intervals):
+            if start >= end:
+                continue
+            if merged and start <= merged[-1][1]:
+                merged[-1][1] = max(merged[-1][1], end)
+            else:
+                merged.append([start, end])
+        self.starts = [s for s, _ in merged]
+        self.ends = [e for _, e in merged]
+
+    @classmethod
+    def from_rules(cls, rules: Sequence[dict]) -> "WeeklySchedule":
+        """Parsed ``time`` rules (``{"days": [...], "range": "HH:MM:SS-HH:MM:SS"}``); none = always."""
+        if not rules:
+            return cls()
+        intervals = []
+        for rule in rules:
+            m = _RANGE_RE.match(rule["range"].strip())
+            if not m:
+                raise ValueError(f"Unparseable time range {rule['range']!r}")
+            h1, m1, s1, h2, m2, s2 = map(int, m.groups())
+            start, end = h1 * 3600 + m1 * 60 + s1, h2 * 3600 + m2 * 60 + s2 + 1
+            if end <= start:
+                end += DAY  # crosses midnight into the next day
+            days = [day_index(d) for d in rule.get("days") or DAYS]
+            for day in days:
+                a, b = day * DAY + start, day * DAY + end
+                if b > WEEK:  # Sunday night into Monday morning
+                    intervals += [(a, WEEK), (0, b - WEEK)]
+                else:
+                    intervals.append((a, b))
+        return cls(intervals)
+
+    @classmethod
+    def from_spec(cls, spec: Optional[str]) -> "WeeklySchedule":
+        """``EntrySpec.time``: None (always) or a daily ``HH:MM:SS-HH:MM:SS`` range."""
+        if spec is None:
+            return cls()
+        if not _RANGE_RE.match(spec):
+            raise ValueError(f"Day-restricted time {spec!r} needs the parsed acl_list rules")
+        return cls.from_rules([{"days": list(DAYS), "range": spec}])
+
+    def __contains__(self, second: int) -> bool:
+        i = bisect.bisect_right(self.starts, second % WEEK) - 1
+        return i >= 0 and second % WEEK < self.ends[i]
+
+    def __len__(self) -> int:
+        return len(self.starts)
+
+
+@dataclass(frozen=True)
+class IndexedEntry:
+    position: int  # 1-based, as acl_list numbers entries
+    allow: bool
+    mode: frozenset
+    schedule: WeeklySchedule
+
+
+@dataclass(frozen=True)
+class Decision:
+    allowed: bool
+    entry: Optional[int]  # deciding entry number, None if no entry matched
+    reason: str
+
+
+def _modes(mode: str) -> frozenset:
+    letters = frozenset(mode.replace("-", ""))
+    if letters - set("rwx"):
+        raise ValueError(f"Invalid mode {mode!r}")
+    return letters
+
+
+class ACLOracle:
+    """One ACL indexed for decisions; see the module docstring."""
+
+    def __init__(self):
+        # (kind, id) -> entries in position order
+        self.index: dict[tuple[str, int], list[IndexedEntry]] = {}
+        self.size = 0
+
+    def _add(self, kind: str, principal: int, allow: bool, mode: str, schedule: WeeklySchedule) -> None:
+        self.size += 1
+        entry = IndexedEntry(self.size, allow, _modes(mode or ""), schedule)
+        self.index.setdefault((kind, principal), []).append(entry)
+
+    @classmethod
+    def from_parsed(cls, acl: dict) -> "ACLOracle":
+        """One ACL from ``ACLList.parse()["acls"]``."""
+        oracle = cls()
+        for e in acl["entries"]:
+            kind = "user" if e["user"] is not None else "group" if e["group"] is not None else "program"
+            oracle._add(kind, e[kind], e["type"] == "Allow", e["mode"] or "",
+                        WeeklySchedule.from_rules(e.get("time") or []))
+        return oracle
+
+    @classmethod
+    def from_specs(cls, entries: Sequence[EntrySpec]) -> "ACLOracle":
+        """Entries as EntrySpec (e.g. a reconcile ACLSpec), in order."""
+        oracle = cls()
+        for e in entries:
+            kind = "user" if e.user is not None else "group" if e.group is not None else "program"
+            oracle._add(kind, getattr(e, kind), e.allow, e.mode, WeeklySchedule.from_spec(e.time))
+        return oracle
+
+    @classmethod
+    def load(cls, acl_id: int) -> "ACLOracle":
+        """Read ``acl_id`` from the target (acl_list -i)."""
+        acls = QDocSE.acl_list(acl_id).execute().ok().parse()["acls"]
+        match = [a for a in acls if a["acl_id"] == acl_id]
+        if not match:
+            raise LookupError(f"ACL {acl_id} not found")
+        return cls.from_parsed(match[0])
+
+    def decide(self, uid: Optional[int], gids: Iterable[int] = (), program: Optional[int] = None,
+               mode: str = "r", when: Timestamp = None) -> Decision:
+        """Decision for an open with ``mode`` by ``uid``/``gids``/``program`` at ``when``."""
+        requested = _modes(mode)
+        if not requested:
+            raise ValueError("Empty request mode")
+        keys = [("user", uid), *(("group", g) for g in set(gids)), ("program", program)]
+        heads = [self.index[k][0] for k in keys if k[1] is not None and k in self.index]
+        if not heads:
+            return Decision(False, None, "no entry matches (default Deny)")
+        entry = min(heads, key=lambda e: e.position)
+        if not requested <= entry.mode:
+            return Decision(False, entry.position, f"mode {mode} not within {''.join(sorted(entry.mode))}")
+        if week_second(when) not in entry.schedule:
+            return Decision(False, entry.position, "outside the entry's time window")
+        return Decision(entry.allow, entry.position, "Allow entry" if entry.allow else "Deny entry")
+
+    def allowed(self, uid: Optional[int], gids: Iterable[int] = (), program: Optional[int] = None,
+                mode: str = "r", when: Timestamp = None) -> bool:
+        return self.decide(uid, gids, program, mode, when).allowed
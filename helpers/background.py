@@ -0,0 +1,232 @@
+"""
+Completion handles for background (-B) protect / unprotect / encrypt / unencrypt.
+
+With ``-B`` QDocSEConsole detaches and returns at once. ``execute_background()``
+on those commands returns a ``BackgroundOperation`` that finds out when the
+work is really finished by polling the target: the detached console process
+(``ps``), the watchpoint list (``view -w``) and, for encrypt, the ``-o``
+output file the guide recommends pairing with ``-B``. All of that is one
+batched round trip per poll; polls back off adaptively (fast at first, slower
+while nothing changes, fast again when progress moves).
+
+Once the process is gone the watchpoint list may lag behind for a moment, so
+a wrong final state only fails the operation after ``SETTLE_TIME`` seconds.
+An output file generated by ``start()`` is removed when the operation ends.
+
+Several operations can be started and awaited together with ``wait_all``,
+which probes all of them in the same round trip.
+
+Usage:
+    op = QDocSE.encrypt(path).execute_background()
+    ...other setup...
+    op.result(timeout=600).raise_on_error()
+
+    ops = [QDocSE.protect(d, encrypt=True).execute_background() for d in dirs]
+    wait_all(ops, timeout=600)
+"""
+import logging
+import re
+import shlex
+import time
+import uuid
+from typing import Optional, Sequence
+
+from .batch import run_batch
+from .commands import Command, View
+from .executor import get_executor
+from .result import ExecResult
+
+logger = logging.getLogger(__name__)
+
+# Adaptive poll interval (seconds)
+MIN_INTERVAL = 0.05
+MAX_INTERVAL = 2.0
+BACKOFF = 1.5
+
+# Seconds the watchpoint state may take to converge after the process exits
+SETTLE_TIME = 2.0
+
+# Subcommands that accept ``-o <output_file>`` (documented for encrypt only)
+OUTPUT_OPTION = {"encrypt"}
+
+_COUNT_RE = re.compile(r"(\d+)\s*(?:/|of)\s*(\d+)")
+_PERCENT_RE = re.compile(r"(\d+(?:\.\d+)?)\s*%")
+
+
+def parse_progress(text: str) -> tuple[Optional[tuple[int, int]], Optional[float]]:
+    """Last "done/total" (or "done of total") and last percentage in ``text``."""
+    counts = _COUNT_RE.findall(text)
+    percents = _PERCENT_RE.findall(text)
+    count = (int(counts[-1][0]), int(counts[-1][1])) if counts else None
+    percent = float(percents[-1]) / 100 if percents else None
+    return count, percent
+
+
+class BackgroundOperation:
+    """Future-like handle for one detached console operation."""
+
+    def __init__(self, command: Command, output: Optional[str] = None):
+        self.command = command
+        self.output_path = output
+        self.directory = _opt(command, "-d")
+        self.output = ""
+        self.progress: Optional[tuple[int, int]] = None
+        self.fraction: Optional[float] = None
+        self.started = time.perf_counter()
+        self.finished: Optional[float] = None
+        self._running = True
+        self._state_ok = False
+        self._gone_since: Optional[float] = None
+        self._owns_output = False
+        self._result: Optional[ExecResult] = None
+
+    @classmethod
+    def start(cls, command: Command, output: Optional[str] = None, timeout: int = 30) -> "BackgroundOperation":
+        """Add -B (and -o where supported) to ``command`` and launch it."""
+        if "-B" not in command.args:
+            command.args.append("-B")
+        generated = False
+        if command.cmd in OUTPUT_OPTION and "-o" not in command.args:
+            generated = output is None
+            output = output or f"/tmp/qdocse_bg_{uuid.uuid4().hex}.log"
+            command.args.extend(["-o", output])
+        elif "-o" in command.args:
+            output = _opt(command, "-o")
+        op = cls(command, output)
+        op._owns_output = generated
+        command.execute(timeout)
+        if command.result.failed:
+            op._finish(command.result)
+        return op
+
+    # -------------------------------------------------------------------------
+    # Probing
+    # -------------------------------------------------------------------------
+
+    def _probes(self) -> list[list[str]]:
+        return [["cat", self.output_path]] if self.output_path else []
+
+    def _update(self, processes: str, watchpoints: list[dict], outputs: list[ExecResult]) -> None:
+        if outputs and outputs[0].success and outputs[0].stdout != self.output:
+            self.output = outputs[0].stdout
+            self.progress, self.fraction = parse_progress(self.output)
+        self._running = any(self._is_mine(line) for line in processes.splitlines())
+        self._state_ok = self._expected_state(watchpoints)
+        if self._running:
+            self._gone_since = None
+            return
+        if self._state_ok:
+            self._finish(ExecResult(str(self.command), self.output, "", 0))
+            return
+        now = time.monotonic()
+        if self._gone_since is None:
+            self._gone_since = now
+        if now - self._gone_since >= SETTLE_TIME:
+            stderr = f"{self.command.cmd} finished but {self.directory} is not in the expected state"
+            self._finish(ExecResult(str(self.command), self.output, stderr, 1))
+
+    def _is_mine(self, ps_line: str) -> bool:
+        try:
+            argv = shlex.split(ps_line)[1:]
+        except ValueError:
+            argv = ps_line.split()[1:]
+        return (any(a.endswith(Command.EXECUTABLE) for a in argv[:1])
+                and f"-c {self.command.cmd}" in " ".join(argv)
+                and self.directory in argv)
+
+    def _expected_state(self, watchpoints: list[dict]) -> bool:
+        from .reconcile import watchpoint_encrypted
+        wp = next((w for w in watchpoints if w["path"] == self.directory), None)
+        cmd = self.command.cmd
+        if cmd == "unprotect":
+            return wp is None
+        if cmd == "unencrypt":
+            return wp is None or not watchpoint_encrypted(wp["encryption"])
+        if wp is None:
+            return False
+        if cmd == "encrypt" or _opt(self.command, "-e") == "yes":
+            return watchpoint_encrypted(wp["encryption"])
+        return True
+
+    def _finish(self, result: ExecResult) -> None:
+        self._running = False
+        self._result = result
+        self.finished = time.perf_counter()
+        if self._owns_output:
+            get_executor().run(["rm", "-f", self.output_path], timeout=10)
+
+    def poll(self) -> bool:
+        """Probe the target once; True when the operation has finished."""
+        if not self.done():
+            _probe([self])
+        return self.done()
+
+    # -------------------------------------------------------------------------
+    # Future-like API
+    # -------------------------------------------------------------------------
+
+    def done(self) -> bool:
+        return self._result is not None
+
+    @property
+    def elapsed(self) -> float:
+        return (self.finished or time.perf_counter()) - self.started
+
+    def result(self, timeout: Optional[float] = None) -> ExecResult:
+        """Wait for completion; TimeoutError if ``timeout`` seconds pass first."""
+        wait_all([self], timeout)
+        return self._result
+
+    def __repr__(self) -> str:
+        state = "done" if self.done() else "running"
+        progress = f" {self.progress[0]}/{self.progress[1]}" if self.progress else ""
+        return f"<BackgroundOperation {self.command.cmd} {self.directory} {state}{progress}>"
+
+
+def _opt(command: Command, option: str) -> Optional[str]:
+    if option in command.args:
+        i = command.args.index(option)
+        if i + 1 < len(command.args):
+            return command.args[i + 1]
+    return None
+
+
+def _probe(ops: Sequence[BackgroundOperation]) -> None:
+    """One batched round trip: processes, watchpoints, each op's output file."""
+    view = View().watchpoints()
+    items = [["ps", "-eo", "pid=,args="], view]
+    for op in ops:
+        items += op._probes()
+    results = run_batch(items, timeout=30)
+    if results[0].failed or view.result.failed:
+        logger.debug(f"[Background] Probe failed: {results[0].stderr} {view.result.stderr}")
+        return
+    watchpoints = view.parse()["watchpoints"]
+    i = 2
+    for op in ops:
+        n = len(op._probes())
+        op._update(results[0].stdout, watchpoints, results[i:i + n])
+        i += n
+
+
+def wait_all(ops: Sequence[BackgroundOperation], timeout: Optional[float] = None) -> list[ExecResult]:
+    """Wait for every operation, polling all of them per round trip."""
+    deadline = None if timeout is None else time.monotonic() + timeout
+    interval = MIN_INTERVAL
+    while True:
+        pending = [op for op in ops if not op.done()]
+        if not pending:
+            return [op._result for op in ops]
+        before = [(op.progress, op.fraction, op.output) for op in pending]
+        _probe(pending)
+        if all(op.done() for op in pending):
+            continue
+        moved = before != [(op.progress, op.fraction, op.output) for op in pending]
+        interval = MIN_INTERVAL if moved else min(interval * BACKOFF, MAX_INTERVAL)
+        if deadline is not None:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                names = ", ".join(repr(op) for op in ops if not op.done())
+                raise TimeoutError(f"Background operation(s) still running: {names}")
+            interval = min(interval, remaining)
+        time.sleep(interval)
@@ -0,0 +1,155 @@
+"""
+Batched command execution - many commands, one executor round trip.
+
+``run_batch`` runs a list of commands inside a single ``sh -c`` script and
+splits the combined output back into one ExecResult per command, using a
+random marker line on stdout and stderr around each command and the marker
+line's exit-status field. Over SSH this replaces N channel round trips with
+one; locally it replaces N process spawns of the executor with one shell.
+
+Command objects get their ``result`` set, so ``.parse()`` / ``.ok()`` work
+as after ``execute()``, and command listeners are notified as usual.
+
+Executor observers (metrics, trace, budget) get one CommandEvent per batched
+command, not one for the ``sh -c`` wrapper, so batched ``push_config`` or
+``acl_destroy`` calls are counted and timed under their own subcommand. Each
+end marker carries the target's ``date +%s%N``; where ``%N`` is not
+supported the batch's wall time is split evenly.
+
+Usage:
+    from helpers.batch import run_batch
+
+    acls, view, mode = run_batch([QDocSE.acl_list(), QDocSE.view(), QDocSE.show_mode()])
+    acls.ok().parse()
+"""
+import logging
+import shlex
+import time
+import uuid
+from typing import Optional, Sequence, Union
+
+from .commands import Command
+from .executor import CommandEvent, get_executor, notify_observers
+from .result import ExecResult
+
+logger = logging.getLogger(__name__)
+
+# Return code of commands skipped after an earlier failure (stop_on_error)
+NOT_RUN = -3
+
+BatchItem = Union[Command, Sequence[str]]
+
+
+def _argv(item: BatchItem) -> list[str]:
+    return item.build() if isinstance(item, Command) else list(item)
+
+
+def build_script(argvs: list[list[str]], marker: str, stop_on_error: bool = False) -> str:
+    """Shell script running ``argvs`` in order with framing markers."""
+    lines = [f"printf '%s\\n' \"{marker}:T:$(date +%s%N)\""]
+    for i, argv in enumerate(argvs):
+        lines.append(f"printf '%s\\n' '{marker}:B:{i}'; printf '%s\\n' '{marker}:B:{i}' >&2")
+        lines.append(f"{shlex.join(argv)} </dev/null")
+        lines.append("rc=$?")
+        lines.append(f"printf '\\n%s\\n' \"{marker}:E:{i}:$rc:$(date +%s%N)\"; "
+                     f"printf '\\n%s\\n' '{marker}:E:{i}' >&2")
+        if stop_on_error:
+            lines.append('[ "$rc" -eq 0 ] || exit "$rc"')
+    return "\n".join(lines)
+
+
+def _nanoseconds(value: str) -> Optional[int]:
+    return int(value) if value.isdigit() else None
+
+
+def _split(text: str, marker: str) -> tuple[dict[int, str], dict[int, int], dict[int, Optional[int]]]:
+    """Output per command index, and exit codes and end times from end markers.
+
+    The start time of the batch is filed under index -1.
+    """
+    outputs: dict[int, list[str]] = {}
+    codes: dict[int, int] = {}
+    times: dict[int, Optional[int]] = {}
+    current = None
+    for line in text.split("\n"):
+        if line.startswith(marker + ":"):
+            parts = line[len(marker) + 1:].split(":")
+            if parts[0] == "T":
+                times[-1] = _nanoseconds(parts[1])
+                continue
+            index = int(parts[1])
+            if parts[0] == "B":
+                current = index
+                outputs[index] = []
+            else:
+                current = None
+                if len(parts) > 2:
+                    codes[index] = int(parts[2])
+                    times[index] = _nanoseconds(parts[3]) if len(parts) > 3 else None
+        elif current is not None:
+            outputs[current].append(line)
+    return {i: "\n".join(lines) for i, lines in outputs.items()}, codes, times
+
+
+def _timings(times: dict[int, Optional[int]], count: int, start: float, wall: float) -> list[tuple[float, float]]:
+    """(perf_counter start, duration) per command from the marker times.
+
+    Commands without both neighbouring times get an even share of ``wall``.
+    """
+    t0, share = times.get(-1), wall / count
+    out = []
+    for i in range(count):
+        begin, end = times.get(i - 1), times.get(i)
+        if None in (t0, begin, end):
+            out.append((start + i * share, share))
+        else:
+            out.append((start + (begin - t0) / 1e9, (end - begin) / 1e9))
+    return out
+
+
+def run_batch(
+    items: Sequence[BatchItem],
+    timeout: int = 60,
+    stop_on_error: bool = False,
+) -> list[ExecResult]:
+    """Run ``items`` (Commands or argv lists) in one shell; one result each.
+
+    With ``stop_on_error`` the batch stops at the first non-zero exit; the
+    remaining commands get returncode NOT_RUN. If the whole batch fails
+    (timeout, transport error), unfinished commands get the batch's result.
+    """
+    if not items:
+        return []
+    argvs = [_argv(item) for item in items]
+    marker = f"__QDOCSE_BATCH_{uuid.uuid4().hex}__"
+    script = build_script(argvs, marker, stop_on_error)
+    start = time.perf_counter()
+    batch = get_executor().run(["sh", "-c", script], timeout=timeout, notify=False)
+    wall = time.perf_counter() - start
+
+    out, codes, times = _split(batch.stdout, marker)
+    err, _, _ = _split(batch.stderr, marker)
+    timings = _timings(times, len(argvs), start, wall)
+
+    stopped = False
+    results = []
+    for i, argv in enumerate(argvs):
+        command = shlex.join(argv)
+        if i in codes:
+            result = ExecResult(command, out.get(i, "").strip(), err.get(i, "").strip(), codes[i])
+            stopped = stop_on_error and result.failed
+        elif stopped:
+            result = ExecResult(command, "", "Not run: earlier batch command failed", NOT_RUN)
+        else:
+            # Batch died inside this command (timeout, lost connection)
+            stderr = "\n".join(s for s in (err.get(i, "").strip(), batch.stderr) if s)
+            result = ExecResult(command, out.get(i, "").strip(), stderr, batch.returncode or -1)
+            stopped = True
+        results.append(result)
+        logger.info(result)
+        if result.returncode != NOT_RUN:
+            notify_observers(CommandEvent(argv, result, *timings[i]))
+        if isinstance(items[i], Command):
+            items[i]._result = result
+            items[i]._notify()
+    return results
@@ -0,0 +1,279 @@
+"""
+Benchmark helpers - timing, result collection and scaling plots.
+
+Benchmarks record ``BenchResult`` rows into a ``BenchReport``. The report is
+written to ``reports/benchmarks/<name>.json`` and, for scaling runs, a plot
+of one metric against one parameter is rendered with matplotlib when it is
+installed, or as a text chart otherwise.
+
+Usage:
+    from helpers.bench import BenchReport, timed
+
+    report = BenchReport("encrypt_throughput")
+    with timed() as t:
+        QDocSE.encrypt(path).threads(4).execute(timeout=600).ok()
+    report.add("encrypt", {"threads": 4, "corpus": "mixed"},
+               seconds=t.seconds, bytes=total_bytes, files=file_count)
+    report.dump()
+
+``fit_complexity`` picks the best of O(1) .. O(n^2) for a scaling series, and
+``ProcessCPU`` samples a target daemon's CPU time from /proc.
+"""
+import json
+import math
+import platform
+import time
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Any, Iterator, Optional, Union
+
+from .executor import get_executor
+
+REPORTS_DIR = Path(__file__).parent.parent / "reports" / "benchmarks"
+
+MB = 1024 * 1024
+
+
+@dataclass
+class Timer:
+    """Elapsed wall time, filled in when the ``timed()`` block exits."""
+    start: float = 0.0
+    seconds: float = 0.0
+
+
+@contextmanager
+def timed() -> Iterator[Timer]:
+    t = Timer(start=time.perf_counter())
+    try:
+        yield t
+    finally:
+        t.seconds = time.perf_counter() - t.start
+
+
+@dataclass
+class BenchResult:
+    """One measurement: an operation, its parameters and what it moved."""
+    operation: str
+    params: dict[str, Any]
+    seconds: float
+    bytes: int = 0
+    files: int = 0
+    extra: dict[str, Any] = field(default_factory=dict)
+
+    @property
+    def mb_per_s(self) -> Optional[float]:
+        return self.bytes / MB / self.seconds if self.seconds > 0 and self.bytes else None
+
+    @property
+    def files_per_s(self) -> Optional[float]:
+        return self.files / self.seconds if self.seconds > 0 and self.files else None
+
+    def to_dict(self) -> dict[str, Any]:
+        data = asdict(self)
+        data["mb_per_s"] = self.mb_per_s
+        data["files_per_s"] = self.files_per_s
+        return data
+
+
+class BenchReport:
+    """Collect BenchResults for one benchmark and write them out."""
+
+    def __init__(self, name: str, out_dir: Union[str, Path] = REPORTS_DIR):
+        self.name = name
+        self.out_dir = Path(out_dir)
+        self.results: list[BenchResult] = []
+        self.meta: dict[str, Any] = {
+            "host": platform.node(),
+            "python": platform.python_version(),
+            "started": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        }
+
+    def add(self, operation: str, params: dict[str, Any], seconds: float, **kwargs: Any) -> BenchResult:
+        result = BenchResult(operation, dict(params), seconds, **kwargs)
+        self.results.append(result)
+        return result
+
+    def select(self, operation: Optional[str] = None, **params: Any) -> list[BenchResult]:
+        """Results matching an operation and a subset of parameter values."""
+        return [
+            r for r in self.results
+            if (operation is None or r.operation == operation)
+            and all(r.params.get(k) == v for k, v in params.items())
+        ]
+
+    def dump(self) -> Path:
+        self.out_dir.mkdir(parents=True, exist_ok=True)
+        path = self.out_dir / f"{self.name}.json"
+        path.write_text(json.dumps(
+            {"name": self.name, "meta": self.meta, "results": [r.to_dict() for r in self.results]},
+            indent=2,
+        ))
+        return path
+
+    def plot(
+        self,
+        x: str,
+        y: str,
+        series: str,
+        operation: Optional[str] = None,
+        title: Optional[str] = None,
+    ) -> Path:
+        """Plot metric ``y`` against parameter ``x``, one line per ``series``.
+
+        ``y`` may be a parameter, a BenchResult attribute (``mb_per_s``,
+        ``files_per_s``, ``seconds``) or a key of ``extra``. Writes a PNG when
+        matplotlib is available, otherwise a text chart.
+        """
+        lines: dict[Any, list[tuple[float, float]]] = {}
+        for r in self.select(operation):
+            xv = r.params.get(x)
+            yv = _metric(r, y)
+            if xv is None or yv is None:
+                continue
+            lines.setdefault(r.params.get(series), []).append((xv, yv))
+        for points in lines.values():
+            points.sort()
+
+        title = title or f"{self.name}: {y} vs {x}"
+        stem = f"{self.name}_{operation or 'all'}_{y}_vs_{x}"
+        self.out_dir.mkdir(parents=True, exist_ok=True)
+        try:
+            import matplotlib
+            matplotlib.use("Agg")
+            import matplotlib.pyplot as plt
+        except ImportError:
+            path = self.out_dir / f"{stem}.txt"
+            path.write_text("\n".join(text_chart(lines, x, y, title)) + "\n")
+            return path
+
+        fig, ax = plt.subplots(figsize=(8, 5))
+        for name, points in sorted(lines.items(), key=lambda kv: str(kv[0])):
+            ax.plot([p[0] for p in points], [p[1] for p in points], marker="o", label=str(name))
+        ax.set_xlabel(x)
+        ax.set_ylabel(y)
+        ax.set_title(title)
+        ax.grid(True, alpha=0.3)
+        ax.legend(title=series)
+        path = self.out_dir / f"{stem}.png"
+        fig.savefig(path, dpi=120, bbox_inches="tight")
+        plt.close(fig)
+        return path
+
+
+def _metric(result: BenchResult, name: str) -> Optional[float]:
+    if name in result.params:
+        return result.params[name]
+    if name in result.extra:
+        return result.extra[name]
+    return getattr(result, name, None)
+
+
+def text_chart(
+    lines: dict[Any, list[tuple[float, float]]],
+    x: str,
+    y: str,
+    title: str,
+    width: int = 50,
+) -> list[str]:
+    """Horizontal bar chart, one block per series."""
+    out = [title, "=" * len(title)]
+    peak = max((v for pts in lines.values() for _, v in pts), default=0) or 1
+    for name, points in sorted(lines.items(), key=lambda kv: str(kv[0])):
+        out.append(f"{name}:")
+        for xv, yv in points:
+            bar = "#" * max(int(yv / peak * width), 1)
+            out.append(f"  {x}={xv:<6} {bar} {yv:.2f}")
+    out.append(f"(y = {y})")
+    return out
+
+
+# name -> f(n); the fitted model is  y = a + b * f(n)
+COMPLEXITY_MODELS = {
+    "O(1)": lambda n: 0.0,
+    "O(log n)": lambda n: math.log2(n) if n > 1 else 0.0,
+    "O(n)": lambda n: float(n),
+    "O(n log n)": lambda n: n * math.log2(n) if n > 1 else 0.0,
+    "O(n^2)": lambda n: float(n) ** 2,
+}
+
+
+@dataclass
+class ComplexityFit:
+    """Least-squares fit of ``y = a + b * f(n)`` for one complexity model."""
+    model: str
+    a: float
+    b: float
+    r2: float
+    rms: float
+
+    def predict(self, n: float) -> float:
+        return self.a + self.b * COMPLEXITY_MODELS[self.model](n)
+
+    def to_dict(self) -> dict[str, Any]:
+        return asdict(self)
+
+
+def _fit_model(model: str, xs: list[float], ys: list[float]) -> ComplexityFit:
+    f = COMPLEXITY_MODELS[model]
+    fx = [f(x) for x in xs]
+    n = len(xs)
+    mean_f = sum(fx) / n
+    mean_y = sum(ys) / n
+    var_f = sum((v - mean_f) ** 2 for v in fx)
+    b = sum((v - mean_f) * (y - mean_y) for v, y in zip(fx, ys)) / var_f if var_f else 0.0
+    a = mean_y - b * mean_f
+    ss_res = sum((y - (a + b * v)) ** 2 for v, y in zip(fx, ys))
+    ss_tot = sum((y - mean_y) ** 2 for y in ys)
+    r2 = 1 - ss_res / ss_tot if ss_tot else 1.0
+    return ComplexityFit(model, a, b, r2, math.sqrt(ss_res / n))
+
+
+def fit_complexity(xs: list[float], ys: list[float]) -> ComplexityFit:
+    """Best-fitting complexity model for measurements ``ys`` at sizes ``xs``.
+
+    Every model in COMPLEXITY_MODELS is fitted with a non-negative slope;
+    the one with the smallest residual wins. A simpler model is preferred
+    unless a more complex one cuts the residual by more than 10%.
+    """
+    if len(xs) != len(ys) or len(xs) < 2:
+        raise ValueError("need at least two (x, y) points")
+    best: Optional[ComplexityFit] = None
+    for model in COMPLEXITY_MODELS:
+        fit = _fit_model(model, xs, ys)
+        if fit.b < 0:
+            continue
+        if best is None or fit.rms < best.rms * 0.9:
+            best = fit
+    return best or _fit_model("O(1)", xs, ys)
+
+
+class ProcessCPU:
+    """CPU time (user + system) of processes on the target, via /proc.
+
+    Runs through the current executor, so it measures the SSH target when
+    one is configured. Processes are found with ``pgrep <pattern>``.
+    """
+
+    def __init__(self, pattern: str):
+        self.pattern = pattern
+        ticks = get_executor().run(["getconf", "CLK_TCK"], timeout=10).stdout
+        self.clock_ticks = int(ticks) if ticks.isdigit() else 100
+
+    def pids(self) -> list[int]:
+        result = get_executor().run(["pgrep", self.pattern], timeout=10)
+        return [int(p) for p in result.stdout.split() if p.isdigit()]
+
+    def sample(self) -> Optional[float]:
+        """Total CPU seconds of the matching processes, None if none run."""
+        pids = self.pids()
+        if not pids:
+            return None
+        result = get_executor().run(["cat"] + [f"/proc/{p}/stat" for p in pids], timeout=10)
+        ticks = 0
+        for line in result.stdout.splitlines():
+            # Fields after "(comm)": state ppid ... utime(11) stime(12)
+            fields = line.rpartition(")")[2].split()
+            if len(fields) > 12:
+                ticks += int(fields[11]) + int(fields[12])
+        return ticks / self.clock_ticks
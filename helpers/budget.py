@@ -0,0 +1,70 @@
+"""
+Per-scope command accounting.
+
+``BudgetLedger`` is an executor observer that counts commands,
+``push_config`` calls and output bytes under the scope that issued them
+(normally the test node id). ``overruns`` compares a scope's usage with its
+limits.
+
+Usage:
+    from helpers.executor import add_observer
+    from helpers.budget import BudgetLedger, overruns
+
+    ledger = BudgetLedger()
+    add_observer(ledger.observe)
+    ledger.scope = "test_x"
+    ...
+    overruns(ledger.get("test_x"), n=12, push=2)
+"""
+import threading
+from dataclasses import dataclass
+from typing import Optional
+
+from .executor import CommandEvent
+from .result import AnyResult, BinaryExecResult
+
+
+@dataclass
+class CommandUsage:
+    """Commands issued on behalf of one scope."""
+    commands: int = 0
+    pushes: int = 0
+    bytes: int = 0
+
+
+def output_size(result: AnyResult) -> int:
+    """Bytes of stdout + stderr, without decoding binary results."""
+    if isinstance(result, BinaryExecResult):
+        return len(result.raw_stdout) + len(result.raw_stderr)
+    return len(result.stdout.encode()) + len(result.stderr.encode())
+
+
+def overruns(usage: CommandUsage, n: Optional[int] = None, push: Optional[int] = None,
+             bytes: Optional[int] = None) -> list[str]:
+    """One line per limit that ``usage`` exceeds; None means no limit."""
+    problems = []
+    for key, used, limit in (("n", usage.commands, n), ("push", usage.pushes, push), ("bytes", usage.bytes, bytes)):
+        if limit is not None and used > limit:
+            problems.append(f"{key}={used} > budget {limit}")
+    return problems
+
+
+class BudgetLedger:
+    """Executor observer that accumulates CommandUsage per scope."""
+
+    def __init__(self, scope: str = "(session)"):
+        self.scope = scope
+        self.usage: dict[str, CommandUsage] = {}
+        self.overruns: dict[str, list[str]] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, event: CommandEvent) -> None:
+        size = output_size(event.result)
+        with self._lock:
+            usage = self.usage.setdefault(self.scope, CommandUsage())
+            usage.commands += 1
+            usage.pushes += event.subcommand == "push_config"
+            usage.bytes += size
+
+    def get(self, scope: str) -> CommandUsage:
+        return self.usage.get(scope, CommandUsage())
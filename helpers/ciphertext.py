@@ -0,0 +1,363 @@
+"""
+Statistical ciphertext detection.
+
+Classifies data as at-rest ciphertext or plaintext from its byte histogram
+instead of ad-hoc checks such as ``plaintext not in content``. Three scores
+are combined:
+
+- Shannon entropy of the byte histogram (bits per byte, 8.0 is uniform)
+- Pearson chi-square of the byte histogram against a uniform distribution
+- Chi-square of the bigram (2-gram) histogram, when there is enough data
+
+Data is consumed in chunks through ``memoryview`` so files larger than RAM can
+be scored in one pass. NumPy's ``bincount`` is used when available (install
+the ``ciphertext`` extra) and keeps up with disk reads; without it a
+pure-Python fallback counts bytes at a few tens of MB/s and only samples
+bigrams.
+
+Well-compressed data (zip, jpeg, ...) is also close to uniform and will
+usually score as "encrypted"; use plaintext payloads when asserting on TDE.
+
+Usage:
+    from helpers.ciphertext import assert_ciphertext, score_file
+
+    score = score_file("/data/encrypted/secret.txt")
+    assert score.encrypted, score
+
+    assert_ciphertext(raw_bytes, plaintext=b"secret content")
+"""
+import math
+import os
+from collections import Counter
+from dataclasses import dataclass
+from typing import BinaryIO, Optional, Union
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+CHUNK_SIZE = 1 << 20
+
+# Below this many bytes the statistics are too noisy to call either way
+MIN_BYTES = 256
+
+# Byte chi-square p-values below this reject "uniformly distributed"
+ALPHA = 1e-4
+
+# Entropy may fall this far below the value expected for uniform data
+ENTROPY_MARGIN = 0.05
+
+# Pure-Python bigram counting is slow, so only the first N bytes are used
+FALLBACK_BIGRAM_LIMIT = 4 << 20
+
+# Expected count per bigram cell needed before the bigram test is meaningful
+_BIGRAM_MIN_EXPECTED = 5
+
+_PRINTABLE = frozenset(range(0x20, 0x7F)) | {0x09, 0x0A, 0x0D}
+
+Data = Union[bytes, bytearray, memoryview]
+
+
+@dataclass
+class CipherScore:
+    """Result of scoring a byte sequence."""
+    size: int
+    entropy: float
+    chi_square: float
+    chi_square_p: float
+    bigram_chi_square: Optional[float]
+    bigram_p: Optional[float]
+    printable_ratio: float
+    verdict: str  # "encrypted", "plaintext" or "inconclusive"
+
+    @property
+    def encrypted(self) -> bool:
+        return self.verdict == "encrypted"
+
+    @property
+    def plaintext(self) -> bool:
+        return self.verdict == "plaintext"
+
+    def __str__(self) -> str:
+        bigram = f"{self.bigram_p:.3g}" if self.bigram_p is not None else "n/a"
+        return (
+            f"[{self.verdict}] {self.size} bytes, "
+            f"entropy={self.entropy:.4f} bits/byte, "
+            f"chi2={self.chi_square:.1f} (p={self.chi_square_p:.3g}), "
+            f"bigram p={bigram}, printable={self.printable_ratio:.1%}"
+        )
+
+
+class ByteHistogram:
+    """Streaming byte and bigram histogram.
+
+    Feed chunks with ``update()``; bigrams that straddle a chunk boundary are
+    carried over so chunked and one-shot scoring give identical results.
+    """
+
+    def __init__(self, bigrams: bool = True):
+        self.size = 0
+        self.bigram_size = 0
+        self._last: Optional[int] = None
+        if np is not None:
+            self._counts = np.zeros(256, dtype=np.int64)
+            self._pairs = np.zeros(65536, dtype=np.int64) if bigrams else None
+        else:
+            self._counts = Counter()
+            self._pairs = Counter() if bigrams else None
+
+    def update(self, data: Data) -> None:
+        view = memoryview(data).cast("B")
+        if not len(view):
+            return
+        if np is not None:
+            self._update_numpy(view)
+        else:
+            self._update_python(view)
+        self.size += len(view)
+        self._last = view[-1]
+
+    def _update_numpy(self, view: memoryview) -> None:
+        arr = np.frombuffer(view, dtype=np.uint8)
+        self._counts += np.bincount(arr, minlength=256)
+        if self._pairs is None:
+            return
+        if self._last is not None:
+            self._pairs[(self._last << 8) | int(arr[0])] += 1
+            self.bigram_size += 1
+        if len(arr) > 1:
+            idx = (arr[:-1].astype(np.uint16) << 8) | arr[1:]
+            self._pairs += np.bincount(idx, minlength=65536)
+            self.bigram_size += len(arr) - 1
+
+    def _update_python(self, view: memoryview) -> None:
+        self._counts.update(view)
+        if self._pairs is None:
+            return
+        budget = FALLBACK_BIGRAM_LIMIT - self.bigram_size
+        if budget <= 0:
+            return
+        if self._last is not None and self.bigram_size == self.size - 1:
+            self._pairs[(self._last << 8) | view[0]] += 1
+            self.bigram_size += 1
+            budget -= 1
+        sample = view[:budget + 1]
+        self._pairs.update((a << 8) | b for a, b in zip(sample, sample[1:]))
+        self.bigram_size += max(len(sample) - 1, 0)
+
+    def counts(self) -> list[int]:
+        """Byte counts indexed by byte value."""
+        if np is not None:
+            return self._counts.tolist()
+        return [self._counts.get(b, 0) for b in range(256)]
+
+    def pair_counts(self) -> Optional[list[int]]:
+        """Bigram counts indexed by ``(first << 8) | second``."""
+        if self._pairs is None:
+            return None
+        if np is not None:
+            return self._pairs.tolist()
+        return [self._pairs.get(i, 0) for i in range(65536)]
+
+    def score(self, min_bytes: int = MIN_BYTES, alpha: float = ALPHA) -> CipherScore:
+        counts = self.counts()
+        n = self.size
+        entropy = _entropy(counts, n)
+        chi2 = _chi_square(counts, n)
+        chi2_p = _chi_square_sf(chi2, 255)
+
+        bigram_chi2 = bigram_p = None
+        pairs = self.pair_counts()
+        if pairs is not None and self.bigram_size >= 65536 * _BIGRAM_MIN_EXPECTED:
+            bigram_chi2 = _chi_square(pairs, self.bigram_size)
+            bigram_p = _chi_square_sf(bigram_chi2, 65535)
+
+        printable = sum(counts[b] for b in _PRINTABLE)
+        printable_ratio = printable / n if n else 0.0
+
+        if n < min_bytes:
+            verdict = "inconclusive"
+        elif (
+            entropy >= entropy_floor(n)
+            and chi2_p >= alpha
+            and (bigram_p is None or bigram_p >= alpha)
+        ):
+            verdict = "encrypted"
+        else:
+            verdict = "plaintext"
+
+        return CipherScore(
+            size=n,
+            entropy=entropy,
+            chi_square=chi2,
+            chi_square_p=chi2_p,
+            bigram_chi_square=bigram_chi2,
+            bigram_p=bigram_p,
+            printable_ratio=printable_ratio,
+            verdict=verdict,
+        )
+
+
+def expected_entropy(n: int) -> float:
+    """Expected entropy of ``n`` uniformly random bytes.
+
+    A finite sample never reaches 8.0 bits/byte; the Miller-Madow bias
+    correction gives the expected shortfall of (k - 1) / (2 n ln 2).
+    """
+    if n <= 0:
+        return 0.0
+    return max(8.0 - 255 / (2 * n * math.log(2)), 0.0)
+
+
+def entropy_floor(n: int) -> float:
+    """Lowest entropy still accepted as uniform for ``n`` bytes.
+
+    To first order the entropy shortfall is chi2 / (2 n ln 2), so its standard
+    deviation under uniformity is sqrt(2 * 255) / (2 n ln 2). Four standard
+    deviations plus a fixed margin keep false "plaintext" calls rare on
+    small samples.
+    """
+    if n <= 0:
+        return 0.0
+    sigma = math.sqrt(2 * 255) / (2 * n * math.log(2))
+    return expected_entropy(n) - ENTROPY_MARGIN - 4 * sigma
+
+
+def _entropy(counts: list[int], n: int) -> float:
+    if n == 0:
+        return 0.0
+    h = 0.0
+    for c in counts:
+        if c:
+            p = c / n
+            h -= p * math.log2(p)
+    return h
+
+
+def _chi_square(counts: list[int], n: int) -> float:
+    if n == 0:
+        return 0.0
+    expected = n / len(counts)
+    return sum((c - expected) ** 2 for c in counts) / expected
+
+
+def _chi_square_sf(x: float, df: int) -> float:
+    """Upper tail probability of chi-square (Wilson-Hilferty approximation)."""
+    if x <= 0:
+        return 1.0
+    k = 2.0 / (9.0 * df)
+    z = ((x / df) ** (1.0 / 3.0) - (1.0 - k)) / math.sqrt(k)
+    return 0.5 * math.erfc(z / math.sqrt(2))
+
+
+def score_bytes(data: Data, *, bigrams: bool = True) -> CipherScore:
+    """Score an in-memory buffer."""
+    hist = ByteHistogram(bigrams=bigrams)
+    hist.update(data)
+    return hist.score()
+
+
+def score_stream(
+    fp: BinaryIO,
+    *,
+    chunk_size: int = CHUNK_SIZE,
+    limit: Optional[int] = None,
+    bigrams: bool = True,
+) -> CipherScore:
+    """Score a binary stream chunk by chunk with a single reusable buffer.
+
+    Args:
+        fp: Binary file object supporting ``readinto``.
+        chunk_size: Read size in bytes.
+        limit: Stop after this many bytes. None reads to EOF.
+    """
+    return _scan(fp, chunk_size, limit, bigrams)[0]
+
+
+def _scan(
+    fp: BinaryIO,
+    chunk_size: int = CHUNK_SIZE,
+    limit: Optional[int] = None,
+    bigrams: bool = True,
+    needle: Optional[bytes] = None,
+) -> tuple[CipherScore, bool]:
+    """Score a stream and report whether ``needle`` occurs in it, in one pass."""
+    hist = ByteHistogram(bigrams=bigrams)
+    buf = bytearray(chunk_size)
+    view = memoryview(buf)
+    remaining = limit
+    found = False
+    # Matches across a chunk boundary are looked for in a small window of the
+    # previous chunk's last k bytes plus this chunk's first k; the chunk
+    # itself is searched in place
+    k = len(needle) - 1 if needle else 0
+    tail = b""
+    while remaining is None or remaining > 0:
+        want = chunk_size if remaining is None else min(chunk_size, remaining)
+        n = fp.readinto(view[:want])
+        if not n:
+            break
+        hist.update(view[:n])
+        if needle and not found:
+            edge = tail + buf[:min(n, k)]
+            found = needle in edge or buf.find(needle, 0, n) != -1
+            tail = buf[n - k:n] if n >= k else edge[max(len(edge) - k, 0):]
+        if remaining is not None:
+            remaining -= n
+    return hist.score(), found
+
+
+def _open(path: str) -> BinaryIO:
+    f = open(path, "rb", buffering=0)
+    if hasattr(os, "posix_fadvise"):
+        os.posix_fadvise(f.fileno(), 0, 0, os.POSIX_FADV_SEQUENTIAL)
+    return f
+
+
+def score_file(path: str, **kwargs) -> CipherScore:
+    """Score a file on disk. Accepts the same options as ``score_stream``."""
+    with _open(path) as f:
+        return score_stream(f, **kwargs)
+
+
+def _score_any(
+    data: Union[Data, str, os.PathLike], needle: Optional[bytes] = None,
+) -> tuple[CipherScore, bool]:
+    """Score of a buffer or file, and whether ``needle`` occurs in it."""
+    if isinstance(data, (str, os.PathLike)):
+        with _open(os.fspath(data)) as f:
+            return _scan(f, needle=needle)
+    return score_bytes(data), bool(needle) and needle in bytes(data)
+
+
+def assert_ciphertext(
+    data: Union[Data, str, os.PathLike],
+    plaintext: Optional[bytes] = None,
+    msg: str = "",
+) -> CipherScore:
+    """Assert that a buffer or file holds ciphertext.
+
+    Args:
+        data: Raw bytes, or a path to read (scored and searched in one pass).
+        plaintext: Known plaintext that must not appear in the data.
+        msg: Extra context for the failure message.
+
+    Raises:
+        AssertionError: If the data looks like plaintext, is too short to
+            classify, or contains ``plaintext`` verbatim.
+    """
+    score, found = _score_any(data, plaintext)
+    if found:
+        raise AssertionError(f"Plaintext found in data: {score}\n{msg}")
+    if not score.encrypted:
+        raise AssertionError(f"Data does not look encrypted: {score}\n{msg}")
+    return score
+
+
+def assert_plaintext(data: Union[Data, str, os.PathLike], msg: str = "") -> CipherScore:
+    """Assert that a buffer or file does not look like ciphertext."""
+    score, _ = _score_any(data)
+    if score.encrypted:
+        raise AssertionError(f"Data looks encrypted: {score}\n{msg}")
+    return score
@@ -1,12 +1,13 @@
 """QDocSE client - main API entry point."""
-from typing import Optional, Union
+from typing import Callable, Optional, Union
 
 from .commands import (
     ACLCreate, ACLList, ACLAdd, ACLRemove, ACLEdit, ACLFile, ACLProgram,
-    ACLDestroy, PushConfig, ACLExport, ACLImport, SetMode,
+    ACLDestroy, PushConfig, ACLExport, ACLImport, SetMode, SetAccess,
     Adjust, View, Protect, Unprotect, Encrypt, Unencrypt, ShowMode, List
 )
-from .executor import LocalExecutor, SSHExecutor, set_executor
+from .executor import Executor, LocalExecutor, PooledExecutor, SSHExecutor, set_executor
+from .health import CircuitBreaker, GuardedExecutor
 
 
 class QDocSE:
@@ -14,9 +15,9 @@ class QDocSE:
 
     # Executor configuration
     @staticmethod
-    def use_local() -> None:
-        """Use local command executor."""
-        set_executor(LocalExecutor())
+    def use_local(*, breaker: Optional[CircuitBreaker] = None) -> None:
+        """Use local command executor (behind ``breaker`` if given)."""
+        QDocSE._use(LocalExecutor, breaker)
 
     @staticmethod
     def use_ssh(
@@ -26,9 +27,29 @@ class QDocSE:
         port: int = 22,
         key_file: Optional[str] = None,
         password: Optional[str] = None,
+        pool_size: int = 1,
+        breaker: Optional[CircuitBreaker] = None,
     ) -> None:
-        """Use SSH executor for remote commands."""
-        set_executor(SSHExecutor(host, user, port, key_file, password))
+        """Use SSH executor for remote commands.
+
+        With ``pool_size`` > 1 concurrent commands use up to that many
+        connections (PooledExecutor); the first one is opened immediately.
+        With ``breaker`` the executor is a GuardedExecutor that reconnects
+        through the same factory (helpers.health).
+        """
+        def connect() -> Executor:
+            if pool_size <= 1:
+                return SSHExecutor(host, user, port, key_file, password)
+            pooled = PooledExecutor(lambda: SSHExecutor(host, user, port, key_file, password), pool_size)
+            with pooled._borrow():
+                pass
+            return pooled
+
+        QDocSE._use(connect, breaker)
+
+    @staticmethod
+    def _use(factory: Callable[[], Executor], breaker: Optional[CircuitBreaker]) -> None:
+        set_executor(GuardedExecutor(factory, breaker) if breaker else factory())
 
     # ACL Commands
     @staticmethod
@@ -149,6 +170,11 @@ class QDocSE:
         """Set QDocSE operating mode (elevated/learning/normal)."""
         return SetMode(mode)
 
+    @staticmethod
+    def set_access(access: str) -> SetAccess:
+        """Set data access for CAP_DAC_OVERRIDE accounts (inspector/normal)."""
+        return SetAccess(access)
+
     @staticmethod
     def list_config() -> List:
         """List protected directories and configuration."""
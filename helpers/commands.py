@@ -1,14 +1,36 @@
 """QDocSEConsole command wrappers."""
 import re
 import logging
-from typing import Any, Optional, TypeVar, Union
+from typing import TYPE_CHECKING, Any, Callable, Optional, TypeVar, Union
 
 from .executor import get_executor
 from .result import ExecResult
 
+if TYPE_CHECKING:
+    from .background import BackgroundOperation
+
 logger = logging.getLogger(__name__)
 T = TypeVar("T", bound="Command")
 
+CommandListener = Callable[["Command"], None]
+
+_listeners: list[CommandListener] = []
+
+
+def add_listener(listener: CommandListener) -> None:
+    """Call ``listener(command)`` after every Command gets its result.
+
+    Unlike executor observers, listeners see the Command object itself
+    (subcommand, arguments, ``parse()``), e.g. to mirror configuration.
+    """
+    if listener not in _listeners:
+        _listeners.append(listener)
+
+
+def remove_listener(listener: CommandListener) -> None:
+    if listener in _listeners:
+        _listeners.remove(listener)
+
 
 class Command:
     """Base command class with fluent API and assertion helpers."""
@@ -26,8 +48,16 @@ class Command:
     def execute(self: T, timeout: int = 30) -> T:
         self._result = get_executor().run(self.build(), timeout)
         logger.info(self._result)
+        self._notify()
         return self
 
+    def _notify(self) -> None:
+        for listener in list(_listeners):
+            try:
+                listener(self)
+            except Exception as e:
+                logger.warning(f"Command listener {listener!r} failed: {e}")
+
     @property
     def result(self) -> ExecResult:
         if self._result is None:
@@ -471,7 +501,15 @@ class View(Command):
         }
 
 
-class Protect(Command):
+class _Background:
+    """Completion handle for commands that support -B (see helpers.background)."""
+
+    def execute_background(self, output: Optional[str] = None, timeout: int = 30) -> "BackgroundOperation":
+        from .background import BackgroundOperation
+        return BackgroundOperation.start(self, output=output, timeout=timeout)
+
+
+class Protect(_Background, Command):
     """Protect directory with optional encryption."""
 
     def __init__(self, directory: Optional[str] = None, *, encrypt: Optional[bool] = None):
@@ -490,7 +528,7 @@ class Protect(Command):
     def threads(self, n: int): return self._opt("-t", n)
 
 
-class Unprotect(Command):
+class Unprotect(_Background, Command):
     """Remove protection from directory."""
 
     def __init__(self, directory: Optional[str] = None):
@@ -504,7 +542,7 @@ class Unprotect(Command):
     def background(self): return self._flag("-B")
 
 
-class Encrypt(Command):
+class Encrypt(_Background, Command):
     """Encrypt files in directory."""
 
     def __init__(self, directory: Optional[str] = None, *, encrypt_new_only: bool = False):
@@ -526,7 +564,7 @@ class Encrypt(Command):
     def new_only(self): return self._flag("-N")
 
 
-class Unencrypt(Command):
+class Unencrypt(_Background, Command):
     """Decrypt encrypted files."""
 
     def __init__(self, directory: Optional[str] = None):
@@ -569,6 +607,14 @@ class SetMode(Command):
     def mode(self, m: str): return self._opt("-m", m)
 
 
+class SetAccess(Command):
+    """Set the data access mode for CAP_DAC_OVERRIDE accounts (inspector/normal)."""
+
+    def __init__(self, access: str):
+        super().__init__("set_access")
+        self.args.append(access)
+
+
 class List(Command):
     """List protected directories and configuration."""
 
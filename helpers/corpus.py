@@ -0,0 +1,265 @@
+"""
+Deterministic corpus generator.
+
+Streams seeded file trees to disk with bounded memory (one chunk per file at
+a time) and records a manifest of sizes and SHA-256 digests while writing, so
+a tree can later be verified without keeping or re-reading the source.
+
+Every file's content depends only on ``(spec.seed, file index)``, so the same
+spec always produces byte-identical trees.
+
+Content types:
+    random      uniformly random bytes (incompressible, ciphertext-like)
+    text        English-like words and lines (typical documents/logs)
+    sparse      mostly holes with scattered random 4 KiB blocks
+    compressed  zlib stream of text (high entropy but not uniform)
+
+Size distributions:
+    fixed       every file is ``max_size``
+    uniform     uniform between ``min_size`` and ``max_size``
+    loguniform  log-uniform between ``min_size`` and ``max_size``
+    pareto      heavy-tailed (alpha 1.2) from ``min_size``, capped at ``max_size``
+
+When ``total_size`` is set, sizes are rescaled to add up to it.
+
+Usage:
+    from helpers.corpus import CorpusSpec, generate
+
+    spec = CorpusSpec(files=2000, distribution="loguniform",
+                      min_size=1024, max_size=256 * 1024 * 1024,
+                      total_size=10 * 1024**3, depth=2, content="random")
+    manifest = generate("/data/bench", spec)
+    manifest.dump("/data/bench.manifest.json")
+    assert not manifest.verify("/data/bench")
+"""
+import hashlib
+import json
+import math
+import os
+import random
+import zlib
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Any, BinaryIO, Optional, Union
+
+CHUNK_SIZE = 1 << 20
+
+KB = 1024
+MB = 1024 * KB
+GB = 1024 * MB
+
+CONTENT_TYPES = ("random", "text", "sparse", "compressed")
+DISTRIBUTIONS = ("fixed", "uniform", "loguniform", "pareto")
+
+# Sparse files: one random block of this size every _SPARSE_STRIDE bytes
+_SPARSE_BLOCK = 4 * KB
+_SPARSE_STRIDE = 64 * KB
+
+_WORDS = (
+    "the of and to in is that for it as was with be by on not he this are or "
+    "his from at which but have an they you were her she there been one all "
+    "would their we him has when who will more no if out so said what up its "
+    "about into than them can only other new some could time these two may "
+    "then do first any my now such like our over man me even most made after "
+    "also did many before must through back years where much your way well "
+    "down should because each just those people how too little state good "
+    "very make world still own see men work long get here between both life "
+    "being under never day same another know while last might us great old "
+    "access control list protected directory encrypted program user group"
+).split()
+
+
+@dataclass
+class CorpusSpec:
+    """Shape of a generated corpus."""
+    files: int = 100
+    distribution: str = "fixed"
+    min_size: int = 1 * KB
+    max_size: int = 64 * KB
+    total_size: Optional[int] = None
+    depth: int = 0
+    fanout: int = 8
+    content: str = "random"
+    seed: Union[int, str] = 0
+    prefix: str = "file"
+    suffix: str = ".bin"
+
+    def __post_init__(self):
+        if self.content not in CONTENT_TYPES:
+            raise ValueError(f"content must be one of {CONTENT_TYPES}, got {self.content!r}")
+        if self.distribution not in DISTRIBUTIONS:
+            raise ValueError(
+                f"distribution must be one of {DISTRIBUTIONS}, got {self.distribution!r}"
+            )
+        if self.files < 0 or self.min_size < 0 or self.max_size < self.min_size:
+            raise ValueError("files and sizes must be non-negative with min_size <= max_size")
+        if self.fanout < 1:
+            raise ValueError("fanout must be at least 1")
+
+    def sizes(self) -> list[int]:
+        """Per-file sizes, deterministic for the spec."""
+        rng = random.Random(f"{self.seed}:sizes")
+        lo, hi = self.min_size, self.max_size
+        if self.distribution == "fixed":
+            raw = [float(hi)] * self.files
+        elif self.distribution == "uniform":
+            raw = [rng.uniform(lo, hi) for _ in range(self.files)]
+        elif self.distribution == "loguniform":
+            a, b = math.log(max(lo, 1)), math.log(max(hi, 1))
+            raw = [math.exp(rng.uniform(a, b)) for _ in range(self.files)]
+        else:
+            raw = [min(max(lo, 1) * rng.paretovariate(1.2), hi) for _ in range(self.files)]
+
+        if self.total_size is not None and raw:
+            scale = self.total_size / (sum(raw) or 1)
+            sizes = [int(r * scale) for r in raw]
+            sizes[-1] += self.total_size - sum(sizes)
+            return sizes
+        return [int(r) for r in raw]
+
+    def path_for(self, index: int) -> str:
+        """Relative path of file ``index``: ``depth`` levels of ``fanout`` dirs."""
+        parts = []
+        n = index
+        for level in range(self.depth):
+            parts.append(f"d{level}_{n % self.fanout:03d}")
+            n //= self.fanout
+        parts.append(f"{self.prefix}{index:06d}{self.suffix}")
+        return os.path.join(*parts)
+
+
+@dataclass
+class ManifestEntry:
+    path: str
+    size: int
+    sha256: str
+
+
+@dataclass
+class Manifest:
+    """Sizes and digests of a generated tree."""
+    spec: dict[str, Any]
+    entries: list[ManifestEntry] = field(default_factory=list)
+
+    @property
+    def total_size(self) -> int:
+        return sum(e.size for e in self.entries)
+
+    def dump(self, path: Union[str, Path]) -> Path:
+        path = Path(path)
+        path.write_text(json.dumps(
+            {"spec": self.spec, "entries": [asdict(e) for e in self.entries]}, indent=1,
+        ))
+        return path
+
+    @classmethod
+    def load(cls, path: Union[str, Path]) -> "Manifest":
+        data = json.loads(Path(path).read_text())
+        return cls(data["spec"], [ManifestEntry(**e) for e in data["entries"]])
+
+    def verify(self, root: Union[str, Path], chunk_size: int = CHUNK_SIZE) -> list[str]:
+        """Re-hash the tree under ``root``; return a description per mismatch."""
+        problems = []
+        buf = bytearray(chunk_size)
+        view = memoryview(buf)
+        for entry in self.entries:
+            path = os.path.join(root, entry.path)
+            try:
+                size = os.path.getsize(path)
+            except OSError as e:
+                problems.append(f"{entry.path}: {e.strerror or e}")
+                continue
+            if size != entry.size:
+                problems.append(f"{entry.path}: size {size} != {entry.size}")
+                continue
+            h = hashlib.sha256()
+            with open(path, "rb", buffering=0) as f:
+                while n := f.readinto(buf):
+                    h.update(view[:n])
+            if h.hexdigest() != entry.sha256:
+                problems.append(f"{entry.path}: digest mismatch")
+        return problems
+
+
+class _HashingWriter:
+    """Write-through wrapper that hashes everything written (holes included)."""
+
+    def __init__(self, f: BinaryIO):
+        self.f = f
+        self.hash = hashlib.sha256()
+        self.pos = 0
+
+    def write(self, data: bytes) -> None:
+        self.f.write(data)
+        self.hash.update(data)
+        self.pos += len(data)
+
+    def hole(self, n: int, zeros: bytes) -> None:
+        """Skip ``n`` bytes (sparse hole) while hashing them as zeros."""
+        self.f.seek(n, os.SEEK_CUR)
+        self.pos += n
+        while n:
+            k = min(n, len(zeros))
+            self.hash.update(zeros[:k])
+            n -= k
+
+
+def _text_chunk(rng: random.Random, n: int) -> bytes:
+    words = rng.choices(_WORDS, k=n // 5 + 8)
+    lines, line = [], []
+    for w in words:
+        line.append(w)
+        if len(line) >= 12 or rng.random() < 0.08:
+            lines.append(" ".join(line).capitalize() + ".")
+            line = []
+    lines.append(" ".join(line))
+    return ("\n".join(lines) + "\n").encode()[:n]
+
+
+def _write_content(w: _HashingWriter, size: int, content: str, rng: random.Random,
+                   chunk_size: int) -> None:
+    if content == "random":
+        while w.pos < size:
+            w.write(rng.randbytes(min(chunk_size, size - w.pos)))
+    elif content == "text":
+        while w.pos < size:
+            w.write(_text_chunk(rng, min(chunk_size, size - w.pos)))
+    elif content == "sparse":
+        zeros = bytes(min(chunk_size, _SPARSE_STRIDE))
+        while w.pos < size:
+            block = min(_SPARSE_BLOCK, size - w.pos)
+            w.write(rng.randbytes(block))
+            w.hole(min(_SPARSE_STRIDE - block, size - w.pos), zeros)
+        w.f.truncate(size)
+    else:
+        comp = zlib.compressobj(6)
+        while w.pos < size:
+            out = comp.compress(_text_chunk(rng, chunk_size)) or comp.flush(zlib.Z_FULL_FLUSH)
+            w.write(out[:size - w.pos])
+
+
+def write_file(path: Union[str, Path], size: int, content: str = "random",
+               seed: Union[int, str] = 0, chunk_size: int = CHUNK_SIZE) -> str:
+    """Write one deterministic file and return its SHA-256 hex digest."""
+    rng = random.Random(seed)
+    with open(path, "wb") as f:
+        w = _HashingWriter(f)
+        _write_content(w, size, content, rng, chunk_size)
+    return w.hash.hexdigest()
+
+
+def generate(root: Union[str, Path], spec: CorpusSpec, chunk_size: int = CHUNK_SIZE) -> Manifest:
+    """Write the corpus described by ``spec`` under ``root``.
+
+    Memory use is bounded by ``chunk_size`` regardless of file or corpus size.
+    """
+    root = Path(root)
+    root.mkdir(parents=True, exist_ok=True)
+    manifest = Manifest(spec=asdict(spec))
+    for index, size in enumerate(spec.sizes()):
+        rel = spec.path_for(index)
+        path = root / rel
+        path.parent.mkdir(parents=True, exist_ok=True)
+        digest = write_file(path, size, spec.content, f"{spec.seed}:{index}", chunk_size)
+        manifest.entries.append(ManifestEntry(rel, size, digest))
+    return manifest
@@ -0,0 +1,305 @@
+"""
+Differential testing: QDocSEConsole against the helpers.simulator model.
+
+``generate`` builds a random sequence of ACL and protection steps from a
+seed. Steps name ACLs and directories by slot (``{acl0}``, ``{dir1}``) rather
+than by id. They stay meaningful when a shrink drops the step that created
+or protected them, and the model then predicts the error instead.
+
+``run_case`` gives a sequence its own ACLs and scratch directories, runs it
+on a target, and after every step compares:
+
+- the outcome (accepted / rejected) with ``Simulator.expect``;
+- the parsed ``acl_list`` / ``view -w`` state with ``Simulator.state``.
+
+The state is restricted to the case's own ACLs and directories.
+``ConsoleTarget`` sends the whole sequence, each step followed by its two
+listings, as one ``run_batch`` round trip. A case therefore costs three round
+trips (setup, steps, cleanup), whatever its length.
+
+On a divergence, ``shrink`` delta-debugs the steps up to the diverging one
+(helpers.fuzz.ddmin) down to a minimal sequence with the same kind of
+divergence on the same subcommand.
+
+Usage:
+    failure = check(cases=200, length=25, seed=1)
+    if failure:
+        print(failure.report())
+"""
+import logging
+import random
+import shlex
+import uuid
+from dataclasses import dataclass, field
+from typing import Optional, Protocol, Sequence
+
+from .batch import run_batch
+from .client import QDocSE
+from .commands import ACLCreate, Command
+from .fuzz import ddmin
+from .reconcile import EntrySpec, watchpoint_encrypted
+from .simulator import DEFAULT_PRINCIPALS, Simulator, State
+
+logger = logging.getLogger(__name__)
+
+ACL_SLOTS = 3
+DIR_SLOTS = 2
+SCRATCH_ROOT = "/tmp/qdocse_differential"
+
+# Documented-invalid values for each argument kind
+BAD_IDS = ["0", "-1", "abc", "4294967296"]
+BAD_MODES = ["", "xyz", "rwa", "-1"]
+BAD_PRINCIPALS = ["", "-1", "no_such_principal_qdocse"]
+TIMES = ["09:00:00-17:00:00", "00:00:00-12:00:00", "08:30:00-16:00:00"]
+MODES = ["r", "w", "x", "rw", "wr", "rx", "xr", "wx", "rwx", "xwr"]
+WORDS = ["first", "top", "last", "end", "bottom", "begin", "up", "down", "middle"]
+
+
+@dataclass(frozen=True)
+class Step:
+    """One console command; ``{aclN}``/``{dirN}``/``{missing}`` are filled in per case."""
+    cmd: str
+    args: tuple[str, ...] = ()
+
+    def command(self, acl_ids: Sequence[int], dirs: Sequence[str], missing: str) -> Command:
+        values = {f"acl{i}": str(a) for i, a in enumerate(acl_ids)}
+        values.update({f"dir{i}": d for i, d in enumerate(dirs)})
+        values["missing"] = missing
+        command = ACLCreate() if self.cmd == "acl_create" else Command(self.cmd)
+        command.args = [a.format(**values) for a in self.args]
+        return command
+
+    def __str__(self) -> str:
+        return shlex.join([self.cmd, *self.args])
+
+
+def generate(rng: random.Random, length: int, acls: int = ACL_SLOTS, dirs: int = DIR_SLOTS,
+             principals: Sequence[str] = ("root", "0")) -> list[Step]:
+    """Random steps, mostly valid for the state the sequence builds up.
+
+    A rough entry count per slot steers entry numbers towards existing
+    entries; the model, not this count, decides what is expected.
+    """
+    sizes = [0] * acls
+    out: list[Step] = []
+
+    def acl() -> str:
+        return rng.choice(BAD_IDS) if rng.random() < 0.05 else f"{{acl{rng.randrange(acls)}}}"
+
+    def entry(slot_size: int) -> str:
+        if rng.random() < 0.15:
+            return rng.choice(["0", "-1", str(slot_size + 1), "x"])
+        return str(rng.randint(1, max(slot_size, 1)))
+
+    for _ in range(length):
+        slot = rng.randrange(acls)
+        ref = f"{{acl{slot}}}"
+        roll = rng.random()
+        if roll < 0.40:
+            valid = rng.random() > 0.15
+            principal = ["-u" if rng.random() < 0.6 else "-g",
+                         rng.choice(principals) if valid else rng.choice(BAD_PRINCIPALS)]
+            args = ["-i", ref if valid else acl(), "-d" if rng.random() < 0.3 else "-a", *principal,
+                    "-m", rng.choice(MODES) if valid else rng.choice(BAD_MODES)]
+            if rng.random() < 0.2:
+                args += ["-t", rng.choice(TIMES)]
+            if not valid and rng.random() < 0.3:
+                args.remove("-a" if "-a" in args else "-d")
+            out.append(Step("acl_add", tuple(args)))
+            sizes[slot] += valid
+        elif roll < 0.55:
+            if rng.random() < 0.15:
+                out.append(Step("acl_remove", ("-i", ref, "-A")))
+                sizes[slot] = 0
+            else:
+                out.append(Step("acl_remove", ("-i", ref, "-e", entry(sizes[slot]))))
+                sizes[slot] = max(sizes[slot] - 1, 0)
+        elif roll < 0.72:
+            position = rng.choice(WORDS) if rng.random() < 0.4 else entry(sizes[slot])
+            out.append(Step("acl_edit", ("-i", ref, "-e", entry(sizes[slot]), "-p", position)))
+        elif roll < 0.78:
+            out.append(Step("acl_destroy", ("-i", acl(), *(["-f"] if rng.random() < 0.5 else []))))
+        elif roll < 0.80:
+            out.append(Step("acl_create"))
+        elif roll < 0.92:
+            path = f"{{dir{rng.randrange(dirs)}}}" if rng.random() > 0.1 else "{missing}"
+            encrypt = rng.choice(["yes", "no", "yes", "no", "maybe"])
+            out.append(Step("protect", ("-d", path, "-e", encrypt)))
+        else:
+            path = f"{{dir{rng.randrange(dirs)}}}" if rng.random() > 0.1 else "{missing}"
+            out.append(Step("unprotect", ("-d", path)))
+    return out
+
+
+# =============================================================================
+# Targets
+# =============================================================================
+
+@dataclass
+class Observation:
+    """What the target did for one step, and its state afterwards."""
+    accepted: bool
+    output: str
+    state: State
+
+
+class Target(Protocol):
+    def setup(self, acls: int, dirs: int) -> tuple[list[int], list[str], str]: ...
+    def run(self, commands: Sequence[Command], acl_ids: set[int], dirs: set[str]) -> list[Observation]: ...
+    def cleanup(self, acl_ids: set[int], dirs: Sequence[str]) -> None: ...
+
+
+def read_state(acl_list: Command, view: Command, acl_ids: set[int], dirs: set[str]) -> State:
+    """State of the given ACLs and directories from parsed listings."""
+    acls = {a["acl_id"]: tuple(EntrySpec.from_parsed(e) for e in a["entries"])
+            for a in acl_list.parse()["acls"] if a["acl_id"] in acl_ids}
+    watchpoints = {w["path"]: watchpoint_encrypted(w["encryption"])
+                   for w in view.parse()["watchpoints"] if w["path"] in dirs}
+    return State(acls, watchpoints)
+
+
+class ConsoleTarget:
+    """The console behind the current executor; one batch per phase."""
+
+    def __init__(self, root: str = SCRATCH_ROOT):
+        self.root = root
+
+    def setup(self, acls: int, dirs: int) -> tuple[list[int], list[str], str]:
+        case = f"{self.root}/{uuid.uuid4().hex[:8]}"
+        paths = [f"{case}/d{i}" for i in range(dirs)]
+        creates = [QDocSE.acl_create() for _ in range(acls)]
+        results = run_batch([["mkdir", "-p", *paths], *creates])
+        results[0].raise_on_error("Cannot create differential scratch directories")
+        ids = [c.ok("acl_create failed during differential setup").parse()["acl_id"] for c in creates]
+        return ids, paths, f"{case}/missing"
+
+    def run(self, commands: Sequence[Command], acl_ids: set[int], dirs: set[str]) -> list[Observation]:
+        # A step may create an ACL; listings are filtered after the fact
+        listings = [(QDocSE.acl_list(), QDocSE.view().watchpoints()) for _ in commands]
+        run_batch([c for command, pair in zip(commands, listings) for c in (command, *pair)])
+        observations = []
+        known = set(acl_ids)
+        for command, (acl_list, view) in zip(commands, listings):
+            acl_list.ok("acl_list failed during differential run")
+            view.ok("view -w failed during differential run")
+            if command.cmd == "acl_create" and command.result.success:
+                created = command.parse()["acl_id"]
+                if created is not None:
+                    known.add(created)
+            observations.append(Observation(
+                command.result.success,
+                (command.result.stdout + command.result.stderr).strip(),
+                read_state(acl_list, view, known, dirs),
+            ))
+        return observations
+
+    def cleanup(self, acl_ids: set[int], dirs: Sequence[str]) -> None:
+        items: list = [QDocSE.unprotect(d) for d in dirs]
+        items += [QDocSE.acl_destroy(i, force=True) for i in sorted(acl_ids)]
+        if dirs:
+            items.append(["rm", "-rf", dirs[0].rsplit("/", 1)[0]])
+        run_batch(items)
+
+
+# =============================================================================
+# Cases
+# =============================================================================
+
+@dataclass
+class Divergence:
+    """First step where console and model disagree."""
+    step: int
+    command: str
+    kind: str  # "outcome", "state" or "invariant"
+    detail: str
+
+    def __str__(self) -> str:
+        return f"step {self.step + 1} `{self.command}`: {self.kind}: {self.detail}"
+
+
+def run_case(steps: Sequence[Step], target: Target, users: Optional[dict[str, int]] = None,
+             groups: Optional[dict[str, int]] = None) -> Optional[Divergence]:
+    """Run ``steps`` on ``target`` and the model; the first divergence, if any."""
+    acl_ids, dirs, missing = target.setup(ACL_SLOTS, DIR_SLOTS)
+    model = Simulator(acls={i: [] for i in acl_ids}, dirs=dirs, users=users, groups=groups)
+    commands = [s.command(acl_ids, dirs, missing) for s in steps]
+    try:
+        observed = target.run(commands, set(acl_ids), set(dirs))
+        for i, (command, seen) in enumerate(zip(commands, observed)):
+            text = " ".join(command.build()[1:])
+            expected = model.expect(command)
+            if expected is not None and expected != seen.accepted:
+                verdict = "accepted" if seen.accepted else "rejected"
+                return Divergence(i, text, "outcome",
+                                  f"console {verdict}, model expected the opposite: {seen.output[:200]}")
+            if seen.accepted:
+                try:
+                    model.apply(command)
+                except ValueError as e:
+                    return Divergence(i, text, "invariant", str(e))
+            diff = model.state().diff(seen.state)
+            if diff:
+                return Divergence(i, text, "state", "; ".join(diff))
+        return None
+    finally:
+        created = {c.parse()["acl_id"] for c in commands
+                   if c.cmd == "acl_create" and c._result is not None and c.result.success}
+        target.cleanup(set(acl_ids) | (created - {None}), dirs)
+
+
+def shrink(steps: Sequence[Step], divergence: Divergence, target: Target, **principals) -> tuple[list[Step], Divergence]:
+    """Minimal sub-sequence diverging the same way (kind and subcommand)."""
+    want = (divergence.kind, steps[divergence.step].cmd)
+    last = {"divergence": divergence}
+
+    def diverges(candidate: list[Step]) -> bool:
+        found = run_case(candidate, target, **principals)
+        if found is not None and (found.kind, candidate[found.step].cmd) == want:
+            last["divergence"] = found
+            return True
+        return False
+
+    minimal = ddmin(list(steps[:divergence.step + 1]), diverges)
+    final = run_case(minimal, target, **principals) or last["divergence"]
+    return minimal, final
+
+
+@dataclass
+class Failure:
+    seed: int
+    case: int
+    steps: list[Step]
+    divergence: Divergence
+    minimal: list[Step] = field(default_factory=list)
+    minimal_divergence: Optional[Divergence] = None
+
+    def report(self) -> str:
+        lines = [f"Divergence in case {self.case} (seed {self.seed}): {self.divergence}",
+                 f"Minimal reproduction ({len(self.minimal)} of {self.divergence.step + 1} steps):"]
+        lines += [f"  {i + 1}. {step}" for i, step in enumerate(self.minimal)]
+        if self.minimal_divergence:
+            lines.append(f"  -> {self.minimal_divergence}")
+        return "\n".join(lines)
+
+
+def check(cases: int = 100, length: int = 20, seed: int = 0, target: Optional[Target] = None,
+          users: Optional[dict[str, int]] = None, groups: Optional[dict[str, int]] = None,
+          shrink_failures: bool = True) -> Optional[Failure]:
+    """Run ``cases`` random sequences; the first failure, shrunk."""
+    target = target or ConsoleTarget()
+    principals = {"users": users, "groups": groups}
+    names = sorted(set(users or DEFAULT_PRINCIPALS) & set(groups or DEFAULT_PRINCIPALS))
+    for case in range(cases):
+        rng = random.Random(f"{seed}:{case}")
+        steps = generate(rng, length, principals=names)
+        divergence = run_case(steps, target, **principals)
+        if divergence is None:
+            continue
+        failure = Failure(seed, case, steps, divergence)
+        logger.warning(f"[Differential] {divergence}; shrinking")
+        if shrink_failures:
+            failure.minimal, failure.minimal_divergence = shrink(steps, divergence, target, **principals)
+        else:
+            failure.minimal = steps[:divergence.step + 1]
+        return failure
+    return None
@@ -0,0 +1,280 @@
+"""
+Pool of pre-protected directories, keyed by content template and encryption.
+
+``protect`` (and ``protect -e yes`` + ``push_config`` even more) is one of
+the slowest console operations. ``ProtectedDirPool`` protects a directory
+once per (template, encrypt) pair and hands it out again after each lease,
+resetting it by restoring the template's files instead of re-protecting.
+
+A lease whose directory had its protection changed by the test (acl_file,
+encrypt/unencrypt, protect/unprotect on it, on a parent or through a ``-dp``
+pattern reaching into it, seen through the command listener hook) is not
+reused; a pattern whose base directory cannot be resolved taints every lease. an ACL association can be replaced but not
+dropped (``acl_file -A 0`` is invalid), so the directory is unprotected and
+removed when it is released. Like the per-test fixtures it replaces, that
+unprotect is committed by the next ``push_config``. Idle directories are
+unprotected when the pool drains, in one batch and one push_config.
+
+Only encrypted directories are pushed after ``protect``, as the
+``encrypted_dir`` fixture always did.
+
+Usage:
+    pool = ProtectedDirPool()
+    path = pool.lease({"secret.txt": "secret content"}, encrypt=True)
+    ...
+    pool.release(path)
+    pool.drain()
+    pool.stats.saved_seconds
+"""
+import hashlib
+import logging
+import os
+import re
+import shutil
+import stat
+import tempfile
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Optional, Union
+
+from .batch import run_batch
+from .client import QDocSE
+from .commands import Command, add_listener, remove_listener
+
+logger = logging.getLogger(__name__)
+
+Template = dict[str, Union[str, bytes]]
+
+# Commands that change a directory's protection or ACL association
+TAINTING = {"acl_file", "encrypt", "unencrypt", "protect", "unprotect"}
+
+FILE_MODE = 0o644
+
+_GLOB = re.compile(r"[*?\[]")
+
+
+def template_key(files: Template) -> str:
+    """Stable digest of a template (relative path -> content)."""
+    h = hashlib.sha256()
+    for name in sorted(files):
+        data = files[name].encode() if isinstance(files[name], str) else files[name]
+        h.update(f"{name}\0{len(data)}\0".encode())
+        h.update(data)
+    return h.hexdigest()[:16]
+
+
+@dataclass
+class PoolStats:
+    """Protect cost paid vs. avoided by reuse."""
+    created: int = 0
+    reused: int = 0
+    discarded: int = 0
+    protect_seconds: float = 0.0
+    reset_seconds: float = 0.0
+    saved_seconds: float = 0.0
+
+
+@dataclass
+class _PooledDir:
+    path: str
+    key: tuple[str, bool]
+    files: Template
+    protect_seconds: float
+    tainted: bool = False
+    reused: bool = False  # set once released clean; the next lease saves a protect
+
+
+class ProtectedDirPool:
+    """Pre-protected directories by (template, encrypt); see module docstring."""
+
+    def __init__(self, root: Optional[str] = None):
+        self.root = root
+        self.stats = PoolStats()
+        self._idle: dict[tuple[str, bool], list[_PooledDir]] = {}
+        self._leased: dict[str, _PooledDir] = {}
+        self._retired: list[_PooledDir] = []
+        self._lock = threading.Lock()
+        add_listener(self._observe)
+
+    # -------------------------------------------------------------------------
+    # Leases
+    # -------------------------------------------------------------------------
+
+    def lease(self, files: Template, encrypt: bool = False) -> str:
+        """Protected directory holding ``files``; raises CommandError if protect fails."""
+        key = (template_key(files), encrypt)
+        with self._lock:
+            idle = self._idle.get(key)
+            entry = idle.pop() if idle else None
+        if entry is None:
+            entry = self._create(files, key)
+        with self._lock:
+            if entry.reused:
+                self.stats.reused += 1
+                self.stats.saved_seconds += entry.protect_seconds
+            self._leased[entry.path] = entry
+        return entry.path
+
+    def release(self, path: str) -> None:
+        """Return a lease; the directory is reset for reuse, or unprotected if tainted."""
+        with self._lock:
+            entry = self._leased.pop(path, None)
+        if entry is None:
+            return
+        if not entry.tainted:
+            start = time.perf_counter()
+            try:
+                self._reset(entry)
+            except OSError as e:
+                logger.info(f"[DirPool] Cannot reset {path}: {e}")
+                entry.tainted = True
+            with self._lock:
+                self.stats.reset_seconds += time.perf_counter() - start
+        if entry.tainted:
+            self._retire(entry)
+            return
+        entry.reused = True
+        with self._lock:
+            self._idle.setdefault(entry.key, []).append(entry)
+
+    def discard(self, path: str) -> None:
+        """Do not reuse this lease; it is unprotected when released."""
+        with self._lock:
+            if path in self._leased:
+                self._leased[path].tainted = True
+
+    def _retire(self, entry: _PooledDir) -> None:
+        """Unprotect and remove a tainted directory; kept for drain() if that fails."""
+        result = QDocSE.unprotect(entry.path).execute().result
+        with self._lock:
+            self.stats.discarded += 1
+            if result.failed:
+                self._retired.append(entry)
+        if result.failed:
+            logger.warning(f"[DirPool] Unprotect failed for {entry.path}: {result.stderr}")
+        else:
+            shutil.rmtree(entry.path, ignore_errors=True)
+
+    def _create(self, files: Template, key: tuple[str, bool]) -> _PooledDir:
+        path = tempfile.mkdtemp(prefix="qdocse_pool_", dir=self.root)
+        _write_template(path, files)
+        start = time.perf_counter()
+        result = QDocSE.protect(path, encrypt=key[1]).execute()
+        if result.result.failed:
+            shutil.rmtree(path, ignore_errors=True)
+            result.ok(f"Cannot protect pooled directory {path}")
+        if key[1]:
+            QDocSE.push_config().execute().ok()
+        seconds = time.perf_counter() - start
+        with self._lock:
+            self.stats.created += 1
+            self.stats.protect_seconds += seconds
+        return _PooledDir(path, key, dict(files), seconds)
+
+    def _reset(self, entry: _PooledDir) -> None:
+        """Restore the template: drop extra entries, rewrite changed files."""
+        wanted = {os.path.normpath(name) for name in entry.files}
+        parents = {os.path.dirname(name) for name in wanted}
+        parents |= {p for name in parents for p in _ancestors(name)}
+        for root, dirs, names in os.walk(entry.path, topdown=True):
+            rel_root = os.path.relpath(root, entry.path)
+            for d in list(dirs):
+                rel = os.path.normpath(os.path.join(rel_root, d))
+                if rel not in parents or os.path.islink(os.path.join(root, d)):
+                    _remove(os.path.join(root, d))
+                    dirs.remove(d)
+            for n in names:
+                if os.path.normpath(os.path.join(rel_root, n)) not in wanted:
+                    os.unlink(os.path.join(root, n))
+        _write_template(entry.path, entry.files, only_changed=True)
+
+    # -------------------------------------------------------------------------
+    # Taint tracking and draining
+    # -------------------------------------------------------------------------
+
+    def _observe(self, command: Command) -> None:
+        if command.cmd not in TAINTING:
+            return
+        targets = _targets(command.args)
+        if not targets:
+            return
+        with self._lock:
+            for path, entry in self._leased.items():
+                if any(t is None or _overlaps(t, path) for t in targets):
+                    entry.tainted = True
+
+    def drain(self, timeout: int = 300) -> None:
+        """Unprotect every pooled directory in one batch, then remove them."""
+        remove_listener(self._observe)
+        with self._lock:
+            entries = [e for idle in self._idle.values() for e in idle]
+            entries += self._retired + list(self._leased.values())
+            self._idle, self._retired, self._leased = {}, [], {}
+        if not entries:
+            return
+        commands = [QDocSE.unprotect(e.path) for e in entries] + [QDocSE.push_config()]
+        run_batch(commands, timeout=timeout)
+        for entry, cmd in zip(entries, commands):
+            if cmd.result.failed:
+                logger.warning(f"[DirPool] Unprotect failed for {entry.path}: {cmd.result.stderr}")
+            shutil.rmtree(entry.path, ignore_errors=True)
+
+
+def _targets(args: list[str]) -> list[Optional[str]]:
+    """Directories named by ``-d`` and ``-dp``; None for a pattern that cannot be resolved."""
+    targets: list[Optional[str]] = []
+    for flag, value in zip(args, args[1:] + [None]):
+        if flag == "-d" and value:
+            targets.append(os.path.normpath(value))
+        elif flag == "-dp":
+            targets.append(_pattern_base(value) if value else None)
+    return targets
+
+
+def _pattern_base(pattern: str) -> Optional[str]:
+    """Directory part of ``pattern`` before its first wildcard; None if relative."""
+    if not os.path.isabs(pattern):
+        return None
+    parts = []
+    for part in pattern.split("/"):
+        if _GLOB.search(part):
+            break
+        parts.append(part)
+    return os.path.normpath("/".join(parts) or "/")
+
+
+def _overlaps(a: str, b: str) -> bool:
+    """Whether one of the two paths contains the other."""
+    return os.path.commonpath([a, b]) in (a, b)
+
+
+def _ancestors(rel: str) -> list[str]:
+    out = []
+    while rel not in ("", "."):
+        out.append(rel)
+        rel = os.path.dirname(rel)
+    return out
+
+
+def _remove(path: str) -> None:
+    if os.path.isdir(path) and not os.path.islink(path):
+        shutil.rmtree(path)
+    else:
+        os.unlink(path)
+
+
+def _write_template(root: str, files: Template, only_changed: bool = False) -> None:
+    for name, content in files.items():
+        data = content.encode() if isinstance(content, str) else content
+        path = Path(root, name)
+        if only_changed and path.is_file() and not path.is_symlink():
+            st = path.stat()
+            if st.st_size == len(data) and stat.S_IMODE(st.st_mode) == FILE_MODE and path.read_bytes() == data:
+                continue
+        if path.is_symlink() or path.is_dir():
+            _remove(str(path))
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_bytes(data)
+        path.chmod(FILE_MODE)
@@ -1,21 +1,139 @@
 """Command executors for local and SSH execution."""
+import base64
+import os
+import shlex
+import selectors
+import socket
 import subprocess
 import logging
+import time
+import threading
 from abc import ABC, abstractmethod
-from typing import Optional
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Callable, Iterator, Optional
 
-from .result import ExecResult
+from .hang import DIAG_TIMEOUT, collect_local, diagnostics_script
+from .result import AnyResult, BinaryExecResult, ExecResult, OutputBuffer
 
 logger = logging.getLogger(__name__)
 
+# Binary-mode stdout larger than this is spilled to a temp file and mmap'ed
+SPILL_THRESHOLD = 64 * 1024 * 1024
+
+_READ_CHUNK = 64 * 1024
+# paramiko channel timeouts raise socket.timeout, an alias of TimeoutError only from 3.10
+_TIMEOUTS = (socket.timeout, TimeoutError)
+# Bytes per command for the default write_file (base64 stays below the 128 KiB argv string limit)
+_WRITE_CHUNK = 64 * 1024
+
+
+@dataclass
+class CommandEvent:
+    """One finished executor command, as passed to observers."""
+    argv: list[str]
+    result: AnyResult
+    start: float  # time.perf_counter() when the command started
+    duration: float  # wall time in seconds
+    thread_id: int = field(default_factory=threading.get_ident)
+
+    @property
+    def subcommand(self) -> str:
+        return subcommand_of(self.argv)
+
+
+CommandObserver = Callable[[CommandEvent], None]
+
+_observers: list[CommandObserver] = []
+
+
+def add_observer(observer: CommandObserver) -> None:
+    """Call ``observer(event)`` after every command run by any executor."""
+    if observer not in _observers:
+        _observers.append(observer)
+
+
+def remove_observer(observer: CommandObserver) -> None:
+    if observer in _observers:
+        _observers.remove(observer)
+
+
+def notify_observers(event: CommandEvent) -> None:
+    """Pass ``event`` to every registered observer; observer errors are logged."""
+    for observer in list(_observers):
+        try:
+            observer(event)
+        except Exception as e:
+            logger.warning(f"Command observer {observer!r} failed: {e}")
+
+
+def subcommand_of(argv: list[str]) -> str:
+    """Name a command for reporting: the ``-c`` subcommand for QDocSEConsole,
+    otherwise the program name."""
+    if not argv:
+        return ""
+    program = os.path.basename(argv[0])
+    if program == "QDocSEConsole" and "-c" in argv:
+        i = argv.index("-c")
+        if i + 1 < len(argv):
+            return argv[i + 1]
+    return program
+
 
 class Executor(ABC):
-    """Base executor interface."""
+    """Base executor interface.
+
+    Subclasses implement ``_run``; ``run`` times each command and notifies
+    observers registered with ``add_observer``. ``read_file``/``write_file``
+    default to commands run through ``run`` and may be overridden.
+
+    With ``binary=True`` executors return a ``BinaryExecResult`` whose output
+    is kept as raw bytes (decoded lazily) instead of stripped text.
+
+    With ``notify=False`` observers are not called; the caller reports the
+    command itself (helpers.batch reports each command of a batch).
+    """
+
+    spill_threshold: Optional[int] = SPILL_THRESHOLD
+
+    def run(self, cmd: list[str], timeout: int = 30, *, binary: bool = False, notify: bool = True) -> AnyResult:
+        start = time.perf_counter()
+        result = self._run(cmd, timeout, binary=binary)
+        if notify and _observers:
+            notify_observers(CommandEvent(list(cmd), result, start, time.perf_counter() - start))
+        return result
 
     @abstractmethod
-    def run(self, cmd: list[str], timeout: int = 30) -> ExecResult:
+    def _run(self, cmd: list[str], timeout: int, *, binary: bool = False) -> AnyResult:
         pass
 
+    def read_file(self, path: str) -> bytes:
+        """Contents of ``path`` on the target.
+
+        The default runs ``cat`` in binary mode; executors with a cheaper
+        channel (local I/O, SFTP) override it.
+        """
+        result = self.run(["cat", path], binary=True)
+        if result.failed:
+            raise OSError(f"Cannot read {path}: {result.stderr}")
+        with result:
+            return bytes(result.raw_stdout)
+
+    def write_file(self, path: str, data: bytes) -> None:
+        """Create or replace ``path`` on the target.
+
+        The default sends base64 chunks as arguments (``run`` has no stdin),
+        so it costs one command per ``_WRITE_CHUNK`` bytes; executors with a
+        cheaper channel override it.
+        """
+        chunks = [data[i:i + _WRITE_CHUNK] for i in range(0, len(data), _WRITE_CHUNK)] or [b""]
+        for i, chunk in enumerate(chunks):
+            redirect = ">" if i == 0 else ">>"
+            script = f'printf %s "$2" | base64 -d {redirect} "$1"'
+            result = self.run(["sh", "-c", script, "sh", path, base64.b64encode(chunk).decode()])
+            if result.failed:
+                raise OSError(f"Cannot write {path}: {result.stderr}")
+
     def close(self) -> None:
         pass
 
@@ -23,17 +141,71 @@ class Executor(ABC):
 class LocalExecutor(Executor):
     """Execute commands locally via subprocess."""
 
-    def run(self, cmd: list[str], timeout: int = 30) -> ExecResult:
+    def __init__(self, spill_threshold: Optional[int] = SPILL_THRESHOLD):
+        self.spill_threshold = spill_threshold
+
+    def _run(self, cmd: list[str], timeout: int, *, binary: bool = False) -> AnyResult:
         cmd_str = " ".join(cmd)
         logger.debug(f"[Local] {cmd_str}")
+        if binary:
+            return self._run_binary(cmd, cmd_str, timeout)
+        try:
+            proc = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True)
+        except FileNotFoundError:
+            return ExecResult(cmd_str, "", f"Command not found: {cmd[0]}", -2)
+        with proc:
+            try:
+                stdout, stderr = proc.communicate(timeout=timeout)
+            except subprocess.TimeoutExpired:
+                return self._timed_out(proc, cmd_str)
+        return ExecResult(cmd_str, stdout.strip(), stderr.strip(), proc.returncode)
+
+    @staticmethod
+    def _timed_out(proc: subprocess.Popen, cmd_str: str) -> ExecResult:
+        """Capture hang diagnostics, then kill ``proc``."""
+        diagnostics = collect_local(proc.pid)
+        proc.kill()
+        proc.communicate()
+        return ExecResult(cmd_str, "", "Timeout", -1, diagnostics)
+
+    def _run_binary(self, cmd: list[str], cmd_str: str, timeout: int) -> AnyResult:
         try:
-            r = subprocess.run(cmd, capture_output=True, text=True, timeout=timeout)
-            return ExecResult(cmd_str, r.stdout.strip(), r.stderr.strip(), r.returncode)
-        except subprocess.TimeoutExpired:
-            return ExecResult(cmd_str, "", "Timeout", -1)
+            proc = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
         except FileNotFoundError:
             return ExecResult(cmd_str, "", f"Command not found: {cmd[0]}", -2)
 
+        out = OutputBuffer(self.spill_threshold)
+        err = bytearray()
+        deadline = time.monotonic() + timeout
+        with proc, selectors.DefaultSelector() as sel:
+            sel.register(proc.stdout, selectors.EVENT_READ, out.write)
+            sel.register(proc.stderr, selectors.EVENT_READ, err.extend)
+            while sel.get_map():
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    out.close()
+                    return self._timed_out(proc, cmd_str)
+                for key, _ in sel.select(remaining):
+                    chunk = os.read(key.fd, _READ_CHUNK)
+                    if chunk:
+                        key.data(chunk)
+                    else:
+                        sel.unregister(key.fileobj)
+            try:
+                code = proc.wait(max(deadline - time.monotonic(), 0))
+            except subprocess.TimeoutExpired:
+                out.close()
+                return self._timed_out(proc, cmd_str)
+        return BinaryExecResult(cmd_str, out, memoryview(err).toreadonly(), code)
+
+    def read_file(self, path: str) -> bytes:
+        with open(path, "rb") as f:
+            return f.read()
+
+    def write_file(self, path: str, data: bytes) -> None:
+        with open(path, "wb") as f:
+            f.write(data)
+
 
 class SSHExecutor(Executor):
     """Execute commands remotely via SSH."""
@@ -45,9 +217,11 @@ class SSHExecutor(Executor):
         port: int = 22,
         key_file: Optional[str] = None,
         password: Optional[str] = None,
+        spill_threshold: Optional[int] = SPILL_THRESHOLD,
     ):
         import paramiko
         self.host = host
+        self.spill_threshold = spill_threshold
         self.client = paramiko.SSHClient()
         self.client.set_missing_host_key_policy(paramiko.AutoAddPolicy())
 
@@ -60,37 +234,180 @@ class SSHExecutor(Executor):
         logger.info(f"[SSH] Connecting {user}@{host}")
         self.client.connect(**kwargs)
 
-    def run(self, cmd: list[str], timeout: int = 30) -> ExecResult:
-        cmd_str = " ".join(cmd)
+    def _run(self, cmd: list[str], timeout: int, *, binary: bool = False) -> AnyResult:
+        cmd_str = shlex.join(cmd)
         logger.debug(f"[SSH] {cmd_str}")
+        if binary:
+            return self._run_binary(cmd_str, timeout)
+        pid = None
         try:
-            _, stdout, stderr = self.client.exec_command(cmd_str, timeout=timeout)
-            code = stdout.channel.recv_exit_status()
+            stdout, stderr, pid = self._exec(cmd_str, timeout)
+            code = self._exit_status(stdout.channel, timeout)
+            if code is None:
+                return self._timed_out(cmd_str, pid)
             return ExecResult(
                 cmd_str,
                 stdout.read().decode().strip(),
                 stderr.read().decode().strip(),
                 code,
             )
+        except _TIMEOUTS:
+            return self._timed_out(cmd_str, pid)
         except Exception as e:
             return ExecResult(cmd_str, "", str(e), -1)
 
+    def _run_binary(self, cmd_str: str, timeout: int) -> AnyResult:
+        out = OutputBuffer(self.spill_threshold)
+        pid = None
+        try:
+            stdout, stderr, pid = self._exec(cmd_str, timeout)
+            while True:
+                chunk = stdout.read(_READ_CHUNK)
+                if not chunk:
+                    break
+                out.write(chunk)
+            err = stderr.read()
+            code = self._exit_status(stdout.channel, timeout)
+        except _TIMEOUTS:
+            out.close()
+            return self._timed_out(cmd_str, pid)
+        except Exception as e:
+            out.close()
+            return ExecResult(cmd_str, "", str(e), -1)
+        if code is None:
+            out.close()
+            return self._timed_out(cmd_str, pid)
+        return BinaryExecResult(cmd_str, out, err, code)
+
+    def _exec(self, cmd_str: str, timeout: int):
+        """Start ``cmd_str`` as the shell itself (``exec``) and read its pid first."""
+        _, stdout, stderr = self.client.exec_command(f"echo $$; exec {cmd_str}", timeout=timeout)
+        line = stdout.readline().strip()
+        return stdout, stderr, int(line) if line.isdigit() else None
+
+    def _timed_out(self, cmd_str: str, pid: Optional[int]) -> ExecResult:
+        """Capture hang diagnostics for the remote process, then kill it."""
+        diagnostics = None
+        if pid is not None:
+            script = diagnostics_script(pid) + f"\npkill -KILL -P {pid}; kill -KILL {pid}\n"
+            try:
+                _, stdout, _ = self.client.exec_command(script, timeout=DIAG_TIMEOUT)
+                diagnostics = stdout.read().decode(errors="replace")
+            except Exception as e:
+                diagnostics = f"(diagnostics failed: {e})"
+        return ExecResult(cmd_str, "", "Timeout", -1, diagnostics)
+
+    @staticmethod
+    def _exit_status(channel, timeout: int) -> Optional[int]:
+        """Exit status, or None (channel closed) if it does not arrive in time.
+
+        ``recv_exit_status()`` waits forever on a hung target or dead session.
+        """
+        if not channel.status_event.wait(timeout):
+            channel.close()
+            return None
+        return channel.exit_status
+
+    def read_file(self, path: str) -> bytes:
+        with self.client.open_sftp() as sftp, sftp.open(path, "rb") as f:
+            return f.read()
+
+    def write_file(self, path: str, data: bytes) -> None:
+        with self.client.open_sftp() as sftp, sftp.open(path, "wb") as f:
+            f.write(data)
+
     def close(self) -> None:
         self.client.close()
 
 
+class PooledExecutor(Executor):
+    """Spread concurrent commands over up to ``size`` executors from ``factory``.
+
+    Each command borrows an idle member, creating one while fewer than
+    ``size`` exist, so threads running commands at the same time each get
+    their own connection. Observers are notified once, by this executor.
+    """
+
+    def __init__(self, factory: Callable[[], Executor], size: int = 4):
+        self.factory = factory
+        self.size = max(1, size)
+        self._members: list[Executor] = []
+        self._idle: list[Executor] = []
+        self._creating = 0
+        self._cond = threading.Condition()
+
+    @contextmanager
+    def _borrow(self) -> Iterator[Executor]:
+        with self._cond:
+            while not self._idle and len(self._members) + self._creating >= self.size:
+                self._cond.wait()
+            member = self._idle.pop() if self._idle else None
+            if member is None:
+                self._creating += 1
+        if member is None:
+            try:
+                member = self.factory()
+            finally:
+                with self._cond:
+                    self._creating -= 1
+                    self._cond.notify()
+            with self._cond:
+                self._members.append(member)
+        try:
+            yield member
+        finally:
+            with self._cond:
+                self._idle.append(member)
+                self._cond.notify()
+
+    def _run(self, cmd: list[str], timeout: int, *, binary: bool = False) -> AnyResult:
+        with self._borrow() as member:
+            return member._run(cmd, timeout, binary=binary)
+
+    def read_file(self, path: str) -> bytes:
+        with self._borrow() as member:
+            return member.read_file(path)
+
+    def write_file(self, path: str, data: bytes) -> None:
+        with self._borrow() as member:
+            member.write_file(path, data)
+
+    def close(self) -> None:
+        with self._cond:
+            members, self._members, self._idle = self._members, [], []
+        for member in members:
+            member.close()
+
+
 # Global executor instance
 _executor: Optional[Executor] = None
+# Per-thread override (use_executor)
+_local = threading.local()
 
 
 def get_executor() -> Executor:
-    """Get current executor (default: LocalExecutor)."""
+    """Get current executor: the thread's use_executor() binding, else the
+    global one (default: LocalExecutor)."""
     global _executor
+    bound = getattr(_local, "executor", None)
+    if bound is not None:
+        return bound
     if _executor is None:
         _executor = LocalExecutor()
     return _executor
 
 
+@contextmanager
+def use_executor(executor: Executor) -> Iterator[Executor]:
+    """Route this thread's commands to ``executor`` (e.g. another target)."""
+    previous = getattr(_local, "executor", None)
+    _local.executor = executor
+    try:
+        yield executor
+    finally:
+        _local.executor = previous
+
+
 def set_executor(executor: Executor) -> None:
     """Set global executor, closing previous if exists."""
     global _executor
@@ -0,0 +1,222 @@
+"""
+Fleet fan-out: run the same tests against many targets at once.
+
+``run_fleet`` starts one pytest worker per host concurrently, each with
+``--target ssh --host <host>`` and its own report directory, so every host
+gets an isolated session (executor, pools, mirror, purge). Workers stream
+their test reports as JSON lines (``--fleet-report``, fixtures/fleet.py), and
+``FleetMatrix`` aggregates them into a host x test outcome matrix. A fleet
+pass therefore takes as long as the slowest host, not the sum.
+
+Inside a worker, the SSH connection pool is sized by ``--parallel-fixtures``
+as usual.
+
+``on_host`` binds the calling thread's executor to another target for ad-hoc
+concurrent checks from one process (see helpers.executor.use_executor).
+
+Usage:
+    runs = run_fleet(["qa1", "qa2"], ["tests/integration", "-x"], Path("reports/fleet"))
+    matrix = FleetMatrix.from_runs(runs)
+    print(matrix.render())
+"""
+import json
+import logging
+import os
+import subprocess
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Callable, Optional, Sequence, TypeVar
+
+from .executor import Executor, use_executor
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+# Worst first: a test's cell shows its worst phase outcome
+OUTCOME_RANK = {"error": 0, "failed": 1, "missing": 2, "skipped": 3, "passed": 4}
+
+# Options that name a single target or a report file; replaced per worker
+WORKER_OPTIONS = {
+    "--hosts", "--fleet-workers", "--host", "--target",
+    "--latency-report", "--trace-timeline", "--budget-report",
+    "--fleet-report", "--junitxml", "--junit-xml",
+    "--shard-targets", "--shard-file", "--durations-cache",
+}
+
+
+@dataclass
+class HostRun:
+    """One worker session."""
+    host: str
+    returncode: Optional[int] = None
+    seconds: float = 0.0
+    log: Optional[Path] = None
+    reports: list[dict] = field(default_factory=list)
+    error: Optional[str] = None
+
+
+def worker_args(args: Sequence[str]) -> list[str]:
+    """``args`` without target- and report-specific options."""
+    out, skip = [], False
+    for arg in args:
+        if skip:
+            skip = False
+            continue
+        name = arg.split("=", 1)[0]
+        if name in WORKER_OPTIONS:
+            skip = "=" not in arg
+            continue
+        out.append(arg)
+    return out
+
+
+def host_dir(root: Path, host: str) -> Path:
+    return root / "".join(c if c.isalnum() or c in "-._" else "_" for c in host)
+
+
+def _run_host(host: str, args: Sequence[str], root: Path, timeout: Optional[float], extra: Sequence[str]) -> HostRun:
+    out_dir = host_dir(root, host)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    run = HostRun(host, log=out_dir / "pytest.log")
+    report = out_dir / "reports.jsonl"
+    report.unlink(missing_ok=True)
+    cmd = [
+        sys.executable, "-m", "pytest", *worker_args(args),
+        "--target", "ssh", "--host", host,
+        "--fleet-report", str(report),
+        "--latency-report", str(out_dir / "command_latency.json"),
+        "--trace-timeline", str(out_dir / "session_trace.json"),
+        "--budget-report", str(out_dir / "command_budget.json"),
+        *extra,
+    ]
+    start = time.perf_counter()
+    try:
+        with open(run.log, "wb") as log:
+            proc = subprocess.run(
+                cmd, stdout=log, stderr=subprocess.STDOUT, timeout=timeout,
+                env={**os.environ, "PYTHONUNBUFFERED": "1"},
+            )
+        run.returncode = proc.returncode
+    except subprocess.TimeoutExpired:
+        run.error = f"worker timed out after {timeout}s"
+    except OSError as e:
+        run.error = str(e)
+    run.seconds = time.perf_counter() - start
+    if report.exists():
+        run.reports = [json.loads(line) for line in report.read_text().splitlines() if line.strip()]
+    return run
+
+
+def run_fleet(
+    hosts: Sequence[str],
+    args: Sequence[str],
+    root: Path,
+    workers: Optional[int] = None,
+    timeout: Optional[float] = None,
+    on_done: Optional[Callable[[HostRun], None]] = None,
+    host_args: Optional[Callable[[str], list[str]]] = None,
+) -> list[HostRun]:
+    """Run pytest ``args`` against every host concurrently; one HostRun per host.
+
+    ``host_args(host)`` adds host-specific worker options (e.g. a shard).
+    """
+    workers = workers or len(hosts) or 1
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="fleet") as pool:
+        futures = [
+            pool.submit(_run_host, host, args, root, timeout, host_args(host) if host_args else [])
+            for host in hosts
+        ]
+        runs = []
+        for future in futures:
+            run = future.result()
+            if on_done:
+                on_done(run)
+            runs.append(run)
+    return runs
+
+
+def on_host(executors: dict[str, Executor], fn: Callable[[str], T], workers: Optional[int] = None) -> dict[str, T]:
+    """Call ``fn(host)`` concurrently with each thread's executor bound to that host."""
+    def call(host: str) -> T:
+        with use_executor(executors[host]):
+            return fn(host)
+
+    with ThreadPoolExecutor(max_workers=workers or len(executors) or 1, thread_name_prefix="fleet") as pool:
+        return dict(zip(executors, pool.map(call, executors)))
+
+
+class FleetMatrix:
+    """Host x test outcome matrix built from worker reports."""
+
+    def __init__(self, hosts: Sequence[str]):
+        self.hosts = list(hosts)
+        self.cells: dict[str, dict[str, str]] = {}
+        self.seconds: dict[str, float] = {}
+        self.errors: dict[str, str] = {}
+
+    @classmethod
+    def from_runs(cls, runs: Sequence[HostRun]) -> "FleetMatrix":
+        matrix = cls([r.host for r in runs])
+        for run in runs:
+            matrix.seconds[run.host] = run.seconds
+            if run.error or (run.returncode not in (0, 1, 5) and not run.reports):
+                matrix.errors[run.host] = run.error or f"pytest exited {run.returncode}"
+            for report in run.reports:
+                matrix.add(run.host, report["nodeid"], cell_outcome(report))
+        return matrix
+
+    def add(self, host: str, nodeid: str, outcome: str) -> None:
+        row = self.cells.setdefault(nodeid, {})
+        current = row.get(host)
+        if current is None or OUTCOME_RANK[outcome] < OUTCOME_RANK[current]:
+            row[host] = outcome
+
+    def outcome(self, nodeid: str, host: str) -> str:
+        return self.cells.get(nodeid, {}).get(host, "missing")
+
+    def divergent(self) -> list[str]:
+        """Tests that did not pass on every host."""
+        return [t for t in self.cells if any(self.outcome(t, h) != "passed" for h in self.hosts)]
+
+    def totals(self, host: str) -> dict[str, int]:
+        counts: dict[str, int] = {}
+        for nodeid in self.cells:
+            o = self.outcome(nodeid, host)
+            counts[o] = counts.get(o, 0) + 1
+        return counts
+
+    def to_dict(self) -> dict:
+        return {
+            "hosts": self.hosts,
+            "seconds": self.seconds,
+            "errors": self.errors,
+            "tests": {t: {h: self.outcome(t, h) for h in self.hosts} for t in self.cells},
+        }
+
+    def render(self, only_divergent: bool = True) -> str:
+        """Fixed-width table, one column per host."""
+        tests = self.divergent() if only_divergent else list(self.cells)
+        width = max([len(t) for t in tests] + [len("test")])
+        cols = [max(len(h), 7) for h in self.hosts]
+        lines = [f"{'test':<{width}}  " + "  ".join(f"{h:<{c}}" for h, c in zip(self.hosts, cols))]
+        for t in tests:
+            lines.append(f"{t:<{width}}  " + "  ".join(
+                f"{self.outcome(t, h):<{c}}" for h, c in zip(self.hosts, cols)))
+        return "\n".join(lines)
+
+
+def cell_outcome(report: dict) -> str:
+    """Outcome of one phase report; failures outside the call phase are errors."""
+    if report["outcome"] == "failed" and report["when"] != "call":
+        return "error"
+    return report["outcome"]
+
+
+def write_matrix(matrix: FleetMatrix, path: Path) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(matrix.to_dict(), indent=2))
+
@@ -0,0 +1,506 @@
+"""
+Grammar-based argv fuzzer for QDocSEConsole.
+
+The grammar is derived from the Command builder methods rather than written
+by hand: every builder is called once on a fresh instance and the arguments
+it appends give the option and whether it takes a value; the parameter's
+annotation and name pick the value kind (int, mode, time, principal, path,
+yes/no). ``derive_grammar()`` therefore follows commands.py automatically.
+
+Each input starts as a plausible command line for one subcommand and then
+gets a few mutations seeded from the docs/case_*.txt edge cases: huge,
+negative and malformed IDs, repeated and conflicting flags, odd modes and
+times, options from other subcommands, unknown options and oversized
+values. Inputs run directly against the local console (no executor or
+observers; fork/exec is the cost) on a process pool. Each worker generates
+its own batch from a seed, so only crashes cross process boundaries.
+
+A crash is a death by signal (or exit > 128 through a wrapper) or a hang.
+Crashes are deduplicated by (kind, signal, normalized stderr) and each
+unique one is minimized with delta debugging over argv tokens followed by
+per-token shrinking.
+
+Path values always point inside ``scratch`` so that a fuzzed
+export/protect cannot touch real data: the console runs with ``scratch`` as
+its working directory, and any token that would resolve outside it is
+replaced by ``scratch`` itself. By default only ``SAFE_SUBCOMMANDS``
+(read-only queries) are fuzzed: ACL edits would be committed by the next
+``push_config``. Every ``-c`` value is either one of the chosen subcommands
+or junk that names no subcommand. Minimization only runs trials that pass
+the same checks (``Generator.safe``), so shrinking a token or dropping one
+cannot reach a real path or an excluded subcommand either.
+
+Usage:
+    report = fuzz(seconds=60, scratch="/tmp/qdocse_fuzz")
+    for crash in report.crashes.values():
+        print(crash.key, crash.minimized)
+"""
+import inspect
+import os
+import random
+import re
+import select
+import shutil
+import signal
+import tempfile
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from dataclasses import dataclass, field
+from typing import Callable, Optional, Sequence, get_args
+
+from . import commands
+from .commands import Command
+
+# Subcommands fuzzed by default: read-only, nothing for a later push_config to commit
+SAFE_SUBCOMMANDS = ("acl_list", "acl_export", "view", "show_mode", "list")
+
+BATCH = 200
+EXEC_TIMEOUT = 5.0
+# Below the kernel's per-string (128 KiB) and total argv limits
+MAX_TOKEN = 32 * 1024
+MAX_ARGV = 1024 * 1024
+
+
+@dataclass(frozen=True)
+class OptionSpec:
+    """One option of a subcommand: ``flag`` plus value kind (None = no value)."""
+    flag: str
+    kind: Optional[str] = None
+
+
+Grammar = dict[str, list[OptionSpec]]
+
+_SAMPLE = {int: 7, str: "s", bool: True}
+
+
+def _kind(name: str, annotation) -> str:
+    types = get_args(annotation) or (annotation,)
+    if bool in types:
+        return "yesno"
+    if name in ("m", "mode"):
+        return "mode"
+    if name == "spec":
+        return "time"
+    if name in ("path", "directory", "filename"):
+        return "path"
+    if (str in types and int in types) or name in ("u", "g"):
+        return "principal"
+    if int in types:
+        return "int"
+    return "str"
+
+
+def _instance(cls: type) -> Command:
+    """``cls`` built with sample values for its required arguments."""
+    params = list(inspect.signature(cls.__init__).parameters.values())[1:]
+    required = [p for p in params if p.default is p.empty and p.kind is p.POSITIONAL_OR_KEYWORD]
+    return cls(*(_sample(p.annotation) for p in required))
+
+
+def _sample(annotation):
+    types = get_args(annotation) or (annotation,)
+    return next((_SAMPLE[t] for t in types if t in _SAMPLE), "s")
+
+
+def derive_grammar() -> Grammar:
+    """Options of every Command subclass, found by calling its builders."""
+    grammar: Grammar = {}
+    base = set(dir(Command))
+    for _, cls in inspect.getmembers(commands, inspect.isclass):
+        if not issubclass(cls, Command) or cls is Command or cls.__module__ != commands.__name__:
+            continue
+        sub = _instance(cls).cmd
+        specs = []
+        for name, method in inspect.getmembers(cls, inspect.isfunction):
+            if name.startswith("_") or name in base:
+                continue
+            params = list(inspect.signature(method).parameters.values())[1:]
+            if len(params) > 1 or any(p.kind is p.VAR_POSITIONAL for p in params):
+                continue
+            cmd = _instance(cls)
+            before = len(cmd.args)
+            try:
+                if params:
+                    method(cmd, _sample(params[0].annotation))
+                else:
+                    method(cmd)
+            except Exception:
+                continue
+            added = cmd.args[before:]
+            if not added or not added[0].startswith("-"):
+                continue
+            kind = _kind(params[0].name, params[0].annotation) if params and len(added) > 1 else None
+            spec = OptionSpec(added[0], kind)
+            if spec not in specs:
+                specs.append(spec)
+        grammar[sub] = specs
+    return grammar
+
+
+# Interesting values per kind (docs/case_*.txt edge cases)
+_INTS = ["0", "1", "-1", "2", "255", "256", "65535", "2147483647", "2147483648", "-2147483648",
+         "4294967295", "4294967296", "9223372036854775807", "9223372036854775808",
+         "99999999999999999999999999", "1e9", "0x10", "010", "+1", " 1", "1 ", "1a", "", "-0", "1.5"]
+VALUES: dict[str, list[str]] = {
+    "int": _INTS,
+    "principal": _INTS + ["root", "nobody", "nosuchuser", "@", "root:root", "%s%n%x", "0" * 64],
+    "mode": ["r", "w", "x", "rw", "rx", "wx", "rwx", "wr", "xr", "xwr", "rrr", "rwxrwx", "R",
+             "a", "rwxa", "-", "", " ", "r w", "rw-", "0", "7", "r" * 4096],
+    "time": ["09:00-18:00", "00:00-23:59", "23:59-00:00", "00:00-00:00", "24:00-25:00",
+             "9-18", "09:00", "09:00-", "-18:00", "aa:bb-cc:dd", "09:60-10:00", "-1:00-2:00",
+             "09:00-18:00-20:00", "", "9999999999:00-1:00"],
+    "yesno": ["yes", "no", "YES", "y", "n", "1", "0", "", "maybe"],
+    "str": ["", " ", "*", "*.txt", "**", "[", "\\", "%s%s%s%n", "..", "é", "‮", "a" * 4096],
+}
+_SUBCOMMAND_JUNK = ["", "ACL_ADD", "acl", "acl_add ", "acl_add\t", "-c", "help", "--help", "x" * 300]
+_UNKNOWN_OPTIONS = ["-", "--", "-Z", "--zzz", "-h", "--help", "-c", "-ii", "-i1", "-" + "a" * 200]
+
+
+def path_values(scratch: str) -> list[str]:
+    return [
+        scratch, f"{scratch}/", f"{scratch}/missing", f"{scratch}/a/..", f"{scratch}/sub/file",
+        f"{scratch}/" + "n" * 255, f"{scratch}/" + "n" * 5000, f"{scratch}/" + "d/" * 600,
+        f"{scratch}/%s%n", f"{scratch}/é", "",
+    ]
+
+
+class Generator:
+    """Grammar-driven argv producer; ``argv()`` excludes the executable."""
+
+    def __init__(self, grammar: Grammar, rng: random.Random, scratch: str,
+                 subcommands: Sequence[str] = SAFE_SUBCOMMANDS, max_mutations: int = 4):
+        self.grammar = grammar
+        self.rng = rng
+        self.subcommands = [s for s in subcommands if s in grammar]
+        self.scratch = os.path.normpath(scratch)
+        self.values = {**VALUES, "path": path_values(scratch)}
+        self.all_options = sorted({o for specs in grammar.values() for o in specs}, key=lambda o: o.flag)
+        self.max_mutations = max_mutations
+
+    def value(self, kind: Optional[str]) -> str:
+        if kind is None or self.rng.random() < 0.1:
+            kind = self.rng.choice(list(self.values))
+        return self.rng.choice(self.values[kind])
+
+    def seed(self) -> list[str]:
+        sub = self.rng.choice(self.subcommands)
+        args = ["-c", sub]
+        for opt in self.grammar[sub]:
+            if self.rng.random() < 0.6:
+                args.append(opt.flag)
+                if opt.kind:
+                    args.append(self.value(opt.kind))
+        return args
+
+    def mutate(self, args: list[str]) -> list[str]:
+        rng = self.rng
+        args = list(args)
+        i = rng.randrange(len(args) + 1)
+        op = rng.randrange(10)
+        if op == 0 and len(args) > 2:                        # replace any token
+            args[rng.randrange(2, len(args))] = self.value(None)
+        elif op == 1 and len(args) > 2:                      # repeat an option
+            j = rng.randrange(2, len(args))
+            args[j:j] = args[j:j + 2]
+        elif op == 2 and args:                               # drop a token
+            del args[rng.randrange(len(args))]
+        elif op == 3:                                        # option from any subcommand
+            opt = rng.choice(self.all_options)
+            args[i:i] = [opt.flag] + ([self.value(opt.kind)] if opt.kind else [])
+        elif op == 4:                                        # unknown option
+            args.insert(i, rng.choice(_UNKNOWN_OPTIONS))
+        elif op == 5 and len(args) > 3:                      # swap two tokens
+            a, b = rng.sample(range(2, len(args)), 2)
+            args[a], args[b] = args[b], args[a]
+        elif op == 6 and len(args) > 1:                      # odd subcommand
+            args[1] = rng.choice(_SUBCOMMAND_JUNK + self.subcommands)
+        elif op == 7 and len(args) > 2:                      # inflate a value
+            j = rng.randrange(2, len(args))
+            args[j] = args[j] * rng.choice([2, 16, 1024])
+        elif op == 8 and len(args) > 2:                      # numeric edge
+            j = rng.randrange(2, len(args))
+            try:
+                n = int(args[j])
+                args[j] = str(rng.choice([n + 1, n - 1, -n, n << rng.randrange(1, 64), ~n]))
+            except ValueError:
+                args[j] = rng.choice(_INTS)
+        else:                                                # option without its value
+            opt = rng.choice(self.all_options)
+            args.append(opt.flag)
+        return args
+
+    def inside(self, token: str) -> bool:
+        """Whether ``token``, taken as a path from ``scratch``, stays inside it."""
+        resolved = os.path.normpath(os.path.join(self.scratch, token))
+        return resolved == self.scratch or resolved.startswith(self.scratch + "/")
+
+    def excluded(self, prev: Optional[str], token: str) -> bool:
+        """Whether ``token`` after ``prev`` selects a subcommand outside the allowed set."""
+        return prev == "-c" and token in self.grammar and token not in self.subcommands
+
+    def safe(self, args: Sequence[str]) -> bool:
+        """Whether every token stays inside scratch and every ``-c`` is allowed."""
+        return all(self.inside(t) and not self.excluded(p, t) for p, t in zip([None, *args], args))
+
+    def argv(self) -> list[str]:
+        args = self.seed()
+        for _ in range(self.rng.randint(0, self.max_mutations)):
+            args = self.mutate(args)
+        out, size = [], 0
+        for token in args:
+            token = token[:MAX_TOKEN]
+            if not self.inside(token):
+                token = self.scratch
+            elif self.excluded(out[-1] if out else None, token):
+                # A repeated or moved -c must not reach an excluded subcommand
+                token = self.rng.choice(self.subcommands)
+            size += len(token.encode()) + 1
+            if size > MAX_ARGV:
+                break
+            out.append(token)
+        return out
+
+
+# =============================================================================
+# Execution and crash classification
+# =============================================================================
+
+@dataclass
+class Outcome:
+    returncode: Optional[int]  # None = hang (killed after timeout)
+    stderr: str
+
+
+class _Runner:
+    """posix_spawn with stdio on /dev/null and a scratch stderr file.
+
+    Cheaper than subprocess (no pipes, no extra pid bookkeeping); the child
+    is awaited through a pidfd so a hang costs one poll() timeout. Stderr is
+    only read back for crashes.
+    """
+
+    def __init__(self):
+        self.pid = os.getpid()
+        self.devnull = os.open(os.devnull, os.O_RDWR)
+        self.err = tempfile.TemporaryFile()
+        fd = self.err.fileno()
+        self.actions = [(os.POSIX_SPAWN_DUP2, self.devnull, 0), (os.POSIX_SPAWN_DUP2, self.devnull, 1),
+                        (os.POSIX_SPAWN_DUP2, fd, 2)]
+
+    def run(self, executable: str, args: Sequence[str], timeout: float) -> Outcome:
+        fd = self.err.fileno()
+        os.ftruncate(fd, 0)
+        os.lseek(fd, 0, os.SEEK_SET)
+        pid = os.posix_spawn(executable, [executable, *args], os.environ, file_actions=self.actions)
+        pidfd = os.pidfd_open(pid)
+        try:
+            poller = select.poll()
+            poller.register(pidfd, select.POLLIN)
+            hung = not poller.poll(timeout * 1000)
+            if hung:
+                os.kill(pid, signal.SIGKILL)
+        finally:
+            os.close(pidfd)
+        _, status = os.waitpid(pid, 0)
+        rc = None if hung else os.waitstatus_to_exitcode(status)
+        if rc is not None and 0 <= rc <= 128:
+            return Outcome(rc, "")
+        os.lseek(fd, 0, os.SEEK_SET)
+        return Outcome(rc, os.read(fd, 64 * 1024).decode(errors="replace"))
+
+
+_runner: Optional[_Runner] = None
+
+
+def run_argv(executable: str, args: Sequence[str], timeout: float = EXEC_TIMEOUT) -> Outcome:
+    """Run ``executable`` (a path) with ``args``; stderr is kept for crashes only."""
+    global _runner
+    if _runner is None or _runner.pid != os.getpid():  # not shared with forked workers
+        _runner = _Runner()
+    return _runner.run(executable, args, timeout)
+
+
+_NOISE = [(re.compile(r"0x[0-9a-fA-F]+"), "ADDR"), (re.compile(r"\d+"), "N")]
+
+
+def crash_key(outcome: Outcome) -> Optional[tuple]:
+    """(kind, signal name, normalized stderr head) for crashes, else None."""
+    rc = outcome.returncode
+    if rc is None:
+        kind, sig = "hang", ""
+    elif rc < 0:
+        kind, sig = "signal", _signal_name(-rc)
+    elif rc > 128:
+        kind, sig = "signal", _signal_name(rc - 128)
+    else:
+        return None
+    text = "\n".join(outcome.stderr.strip().splitlines()[:3])
+    for pattern, repl in _NOISE:
+        text = pattern.sub(repl, text)
+    return kind, sig, text
+
+
+def _signal_name(num: int) -> str:
+    try:
+        return signal.Signals(num).name
+    except ValueError:
+        return f"signal {num}"
+
+
+@dataclass
+class Crash:
+    key: tuple
+    argv: list[str]
+    returncode: Optional[int]
+    stderr: str
+    count: int = 1
+    minimized: Optional[list[str]] = None
+
+
+@dataclass
+class FuzzReport:
+    execs: int = 0
+    seconds: float = 0.0
+    crashes: dict[tuple, Crash] = field(default_factory=dict)
+
+    @property
+    def per_second(self) -> float:
+        return self.execs / self.seconds if self.seconds > 0 else 0.0
+
+
+def _batch(job: tuple) -> tuple[int, list[Crash]]:
+    """Worker: generate and run ``count`` inputs from ``seed``."""
+    seed, count, grammar, subcommands, executable, scratch, timeout = job
+    os.chdir(scratch)  # relative path values resolve inside scratch
+    gen = Generator(grammar, random.Random(seed), scratch, subcommands)
+    found: dict[tuple, Crash] = {}
+    for _ in range(count):
+        args = gen.argv()
+        outcome = run_argv(executable, args, timeout)
+        key = crash_key(outcome)
+        if key is None:
+            continue
+        if key in found:
+            found[key].count += 1
+        else:
+            found[key] = Crash(key, args, outcome.returncode, outcome.stderr)
+    return count, list(found.values())
+
+
+def fuzz(
+    seconds: Optional[float] = None,
+    iterations: Optional[int] = None,
+    scratch: str = "/tmp/qdocse_fuzz",
+    subcommands: Sequence[str] = SAFE_SUBCOMMANDS,
+    workers: Optional[int] = None,
+    executable: str = Command.EXECUTABLE,
+    seed: int = 0,
+    timeout: float = EXEC_TIMEOUT,
+    minimize_crashes: bool = True,
+) -> FuzzReport:
+    """Fuzz for ``seconds`` or ``iterations`` (whichever is given) on a process pool."""
+    if seconds is None and iterations is None:
+        raise ValueError("give seconds or iterations")
+    path = shutil.which(executable)
+    if path is None:
+        raise FileNotFoundError(f"{executable} not found")
+    executable = os.path.abspath(path)
+    scratch = os.path.abspath(scratch)
+    os.makedirs(scratch, exist_ok=True)
+    grammar = derive_grammar()
+    workers = workers or os.cpu_count() or 1
+    report = FuzzReport()
+    start = time.perf_counter()
+    deadline = start + seconds if seconds is not None else None
+    submitted = 0
+
+    def more() -> bool:
+        if iterations is not None and submitted >= iterations:
+            return False
+        return deadline is None or time.perf_counter() < deadline
+
+    def job() -> tuple:
+        nonlocal submitted
+        count = BATCH if iterations is None else min(BATCH, iterations - submitted)
+        submitted += count
+        return seed * 1_000_003 + submitted, count, grammar, tuple(subcommands), executable, scratch, timeout
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        pending = {pool.submit(_batch, job()) for _ in range(workers * 2) if more()}
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                count, crashes = future.result()
+                report.execs += count
+                for crash in crashes:
+                    known = report.crashes.get(crash.key)
+                    if known:
+                        known.count += crash.count
+                    else:
+                        report.crashes[crash.key] = crash
+                if more():
+                    pending.add(pool.submit(_batch, job()))
+    report.seconds = time.perf_counter() - start
+    if minimize_crashes and report.crashes:
+        guard = Generator(grammar, random.Random(seed), scratch, subcommands)
+        cwd = os.getcwd()
+        os.chdir(scratch)
+        try:
+            for crash in report.crashes.values():
+                crash.minimized = minimize(
+                    crash.argv,
+                    lambda a, k=crash.key: guard.safe(a) and crash_key(run_argv(executable, a, timeout)) == k)
+        finally:
+            os.chdir(cwd)
+    return report
+
+
+# =============================================================================
+# Minimization
+# =============================================================================
+
+def ddmin(tokens: list, still_fails: Callable[[list], bool]) -> list:
+    """Zeller's delta debugging: a 1-minimal sublist that still fails."""
+    n = 2
+    while len(tokens) >= 2:
+        chunk = max(len(tokens) // n, 1)
+        subsets = [tokens[i:i + chunk] for i in range(0, len(tokens), chunk)]
+        reduced = False
+        for i, subset in enumerate(subsets):
+            complement = [t for j, s in enumerate(subsets) if j != i for t in s]
+            if still_fails(subset):
+                tokens, n, reduced = subset, 2, True
+                break
+            if n > 2 and still_fails(complement):
+                tokens, n, reduced = complement, max(n - 1, 2), True
+                break
+        if not reduced:
+            if n >= len(tokens):
+                break
+            n = min(n * 2, len(tokens))
+    return tokens
+
+
+def _shrink_token(token: str) -> list[str]:
+    """Simpler candidates for one token, simplest first."""
+    out = []
+    if re.fullmatch(r"-?\d+", token) and token not in ("0", "1"):
+        out += ["0", "1"]
+    if len(token) > 1:
+        out += [token[:len(token) // 2], token[:1]]
+    return out
+
+
+def minimize(args: list[str], still_fails: Callable[[list[str]], bool]) -> list[str]:
+    """ddmin over argv tokens, then shrink each remaining token while it still fails."""
+    args = ddmin(list(args), still_fails)
+    changed = True
+    while changed:
+        changed = False
+        for i, token in enumerate(args):
+            for candidate in _shrink_token(token):
+                trial = args[:i] + [candidate] + args[i + 1:]
+                if still_fails(trial):
+                    args, changed = trial, True
+                    break
+    return args
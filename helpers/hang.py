@@ -0,0 +1,43 @@
+"""
+Hang diagnostics for timed-out commands.
+
+Just before a timed-out command is killed, the executor runs
+``diagnostics_script`` on the target. For the stuck process, its children
+and every QDocSEService daemon, the script prints ``/proc/<pid>/status``,
+``wchan``, the kernel ``stack`` (root only) and the open fds. The text ends
+up in ``ExecResult.diagnostics`` and, through fixtures/health.py, in the
+test report. That is enough to tell a kernel lock from a config lock or
+blocked I/O without a re-run.
+"""
+import subprocess
+
+DAEMON = "QDocSEService"
+DIAG_TIMEOUT = 10
+
+
+def diagnostics_script(pid: int) -> str:
+    """POSIX sh script printing the state of ``pid``, its children and the daemon."""
+    return f"""
+show() {{
+    echo "=== pid $1 ($2): $(tr '\\0' ' ' < /proc/$1/cmdline 2>/dev/null)"
+    for f in status wchan stack; do
+        echo "--- $f"; cat /proc/$1/$f 2>&1; echo
+    done
+    echo "--- fds"; ls -l /proc/$1/fd 2>&1
+}}
+show {pid} command
+for p in $(pgrep -P {pid}); do show $p child; done
+for p in $(pgrep -x {DAEMON}); do show $p daemon; done
+"""
+
+
+def collect_local(pid: int) -> str:
+    """Run ``diagnostics_script`` for a local process."""
+    try:
+        r = subprocess.run(
+            ["sh", "-c", diagnostics_script(pid)],
+            capture_output=True, text=True, timeout=DIAG_TIMEOUT,
+        )
+        return r.stdout
+    except (OSError, subprocess.TimeoutExpired) as e:
+        return f"(diagnostics failed: {e})"
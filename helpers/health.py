@@ -0,0 +1,179 @@
+"""
+Target health tracking: circuit breaker around the command executor.
+
+A hung target or a dead SSH session makes every command wait out its full
+timeout, so a broken run takes hours to fail. ``GuardedExecutor`` wraps the
+real executor and feeds each result to a ``CircuitBreaker``:
+
+- ``threshold`` consecutive timeouts / transport errors (returncode -1) open
+  the breaker;
+- while open, commands return at once with ``CIRCUIT_OPEN`` and the cause;
+- when the next attempt is due, the executor is reconnected (rebuilt from its
+  factory) and probed with ``QDocSEConsole -c version``; success closes the
+  breaker, failure doubles the wait (up to ``max_delay``).
+
+Usage:
+    breaker = CircuitBreaker(threshold=3)
+    QDocSE.use_ssh(host, breaker=breaker)
+    ...
+    breaker.is_open, breaker.cause
+"""
+import logging
+import threading
+import time
+from typing import Callable, Optional
+
+from .executor import Executor
+from .result import ExecResult
+
+logger = logging.getLogger(__name__)
+
+# Returncode of commands refused while the breaker is open
+CIRCUIT_OPEN = -4
+
+PROBE = ["QDocSEConsole", "-c", "version"]
+PROBE_TIMEOUT = 5
+
+
+def is_unhealthy(result: ExecResult) -> bool:
+    """Timeout or transport error (not a command that ran and failed)."""
+    return result.returncode == -1
+
+
+class CircuitBreaker:
+    """Consecutive-failure breaker with exponential backoff between probes."""
+
+    def __init__(
+        self,
+        threshold: int = 3,
+        base_delay: float = 1.0,
+        max_delay: float = 60.0,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.threshold = threshold
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.clock = clock
+        self.failures = 0
+        self.cause: Optional[str] = None
+        self.last_probe: Optional[str] = None
+        self.trips = 0
+        self.is_open = False
+        self._delay = base_delay
+        self._next_attempt = 0.0
+        self._lock = threading.Lock()
+
+    def record(self, failed: bool, cause: str = "") -> None:
+        """Feed one command outcome; opens the breaker at ``threshold`` failures."""
+        with self._lock:
+            if not failed:
+                self.failures = 0
+                return
+            self.failures += 1
+            if not self.is_open and self.failures >= self.threshold:
+                self.is_open = True
+                self.trips += 1
+                self.cause = f"{self.failures} consecutive failures, last: {cause}"
+                self._delay = self.base_delay
+                self._next_attempt = self.clock() + self._delay
+                logger.warning(f"[Health] Circuit open: {self.cause}")
+
+    def attempt_due(self) -> bool:
+        """True (once) when an open breaker should try to recover now.
+
+        The next attempt is scheduled immediately, so concurrent callers keep
+        failing fast while one thread probes.
+        """
+        with self._lock:
+            if not self.is_open or self.clock() < self._next_attempt:
+                return False
+            self._next_attempt = self.clock() + self._delay
+            self._delay = min(self._delay * 2, self.max_delay)
+            return True
+
+    def probe_result(self, ok: bool, cause: str = "") -> None:
+        """Outcome of a recovery attempt; success closes the breaker."""
+        with self._lock:
+            if ok:
+                logger.info(f"[Health] Circuit closed after: {self.cause}")
+                self.is_open = False
+                self.failures = 0
+                self.cause = None
+                self.last_probe = None
+            else:
+                self.last_probe = cause
+
+    @property
+    def retry_in(self) -> float:
+        """Seconds until the next recovery attempt (0 when closed)."""
+        return max(self._next_attempt - self.clock(), 0.0) if self.is_open else 0.0
+
+
+class GuardedExecutor(Executor):
+    """Executor from ``factory`` behind a CircuitBreaker; see module docstring."""
+
+    def __init__(self, factory: Callable[[], Executor], breaker: Optional[CircuitBreaker] = None):
+        self.factory = factory
+        self.breaker = breaker or CircuitBreaker()
+        self.inner = factory()
+        self.spill_threshold = self.inner.spill_threshold
+
+    def available(self) -> bool:
+        """Closed, or recovered by a reconnect + probe that was due now."""
+        if not self.breaker.is_open:
+            return True
+        if not self.breaker.attempt_due():
+            return False
+        return self._recover()
+
+    def _recover(self) -> bool:
+        try:
+            fresh = self.factory()
+        except Exception as e:
+            self.breaker.probe_result(False, f"reconnect failed: {e}")
+            return False
+        old, self.inner = self.inner, fresh
+        try:
+            old.close()
+        except Exception:
+            pass
+        probe = fresh._run(PROBE, PROBE_TIMEOUT)
+        ok = probe.returncode >= 0
+        self.breaker.probe_result(ok, probe.stderr or f"exit {probe.returncode}")
+        return ok
+
+    def describe(self) -> str:
+        b = self.breaker
+        probe = f"; last probe: {b.last_probe}" if b.last_probe else ""
+        return f"Circuit open ({b.cause}{probe}; retry in {b.retry_in:.0f}s)"
+
+    def _refused(self, cmd: list[str]) -> ExecResult:
+        return ExecResult(" ".join(cmd), "", self.describe(), CIRCUIT_OPEN)
+
+    def _run(self, cmd: list[str], timeout: int, *, binary: bool = False) -> ExecResult:
+        if not self.available():
+            return self._refused(cmd)
+        result = self.inner._run(cmd, timeout, binary=binary)
+        failed = is_unhealthy(result)
+        self.breaker.record(failed, result.stderr if failed else "")
+        return result
+
+    def _guarded(self, op: Callable[[Executor], object]):
+        if not self.available():
+            raise ConnectionError(self.describe())
+        try:
+            value = op(self.inner)
+        except (OSError, EOFError) as e:
+            self.breaker.record(True, str(e))
+            raise
+        self.breaker.record(False)
+        return value
+
+    def read_file(self, path: str) -> bytes:
+        return self._guarded(lambda inner: inner.read_file(path))
+
+    def write_file(self, path: str, data: bytes) -> None:
+        self._guarded(lambda inner: inner.write_file(path, data))
+
+    def close(self) -> None:
+        self.inner.close()
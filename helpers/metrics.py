@@ -0,0 +1,214 @@
+"""
+Command latency metrics.
+
+``LatencyHistogram`` is an HDR-style histogram: values are bucketed on a
+log-linear scale so every recorded value keeps a fixed relative precision
+(about 1% by default) from microseconds up to hours, in constant memory.
+
+``LatencyRecorder`` is an executor observer that files each command's wall
+time under its subcommand (``acl_add``, ``push_config``, ...) and under the
+scope that issued it (normally the test module).
+
+Usage:
+    from helpers.executor import add_observer
+    from helpers.metrics import LatencyRecorder
+
+    recorder = LatencyRecorder()
+    add_observer(recorder.observe)
+    ...
+    recorder.dump("reports/command_latency.json")
+"""
+import json
+import math
+import threading
+from pathlib import Path
+from typing import Any, Optional, Union
+
+from .executor import CommandEvent
+
+# Histograms record integer microseconds
+_UNIT = 1e-6
+
+PERCENTILES = (50, 95, 99)
+
+
+class LatencyHistogram:
+    """Log-linear histogram of durations in seconds.
+
+    Each power-of-two range above ``sub_buckets`` microseconds is split into
+    ``sub_buckets / 2`` linear buckets, so the relative error of any reported
+    value is below ``2 / sub_buckets``.
+
+    Args:
+        significant_digits: Decimal digits of precision to preserve (1-4).
+    """
+
+    def __init__(self, significant_digits: int = 2):
+        if not 1 <= significant_digits <= 4:
+            raise ValueError("significant_digits must be between 1 and 4")
+        self.significant_digits = significant_digits
+        self._sub_bits = math.ceil(math.log2(2 * 10 ** significant_digits))
+        self.sub_buckets = 1 << self._sub_bits
+        self._buckets: dict[tuple[int, int], int] = {}
+        self.count = 0
+        self.total = 0.0
+        self.min: Optional[float] = None
+        self.max: Optional[float] = None
+
+    def _key(self, units: int) -> tuple[int, int]:
+        shift = max(units.bit_length() - self._sub_bits, 0)
+        return shift, units >> shift
+
+    @staticmethod
+    def _bucket_value(key: tuple[int, int]) -> float:
+        """Midpoint of a bucket, in seconds."""
+        shift, sub = key
+        low = sub << shift
+        high = ((sub + 1) << shift) - 1
+        return (low + high) / 2 * _UNIT
+
+    def record(self, seconds: float) -> None:
+        units = max(int(round(seconds / _UNIT)), 0)
+        key = self._key(units)
+        self._buckets[key] = self._buckets.get(key, 0) + 1
+        self.count += 1
+        self.total += seconds
+        self.min = seconds if self.min is None else min(self.min, seconds)
+        self.max = seconds if self.max is None else max(self.max, seconds)
+
+    def merge(self, other: "LatencyHistogram") -> None:
+        if other.sub_buckets != self.sub_buckets:
+            raise ValueError("Cannot merge histograms with different precision")
+        for key, n in other._buckets.items():
+            self._buckets[key] = self._buckets.get(key, 0) + n
+        self.count += other.count
+        self.total += other.total
+        for v in (other.min, other.max):
+            if v is not None:
+                self.min = v if self.min is None else min(self.min, v)
+                self.max = v if self.max is None else max(self.max, v)
+
+    def percentile(self, p: float) -> Optional[float]:
+        """Value at percentile ``p`` (0-100), in seconds."""
+        if not self.count:
+            return None
+        if p >= 100:
+            return self.max
+        rank = max(math.ceil(p / 100 * self.count), 1)
+        seen = 0
+        for key in sorted(self._buckets, key=lambda k: k[1] << k[0]):
+            seen += self._buckets[key]
+            if seen >= rank:
+                return min(max(self._bucket_value(key), self.min), self.max)
+        return self.max
+
+    @property
+    def mean(self) -> Optional[float]:
+        return self.total / self.count if self.count else None
+
+    def summary(self) -> dict[str, Any]:
+        """Count, total, min/mean/max and percentiles in seconds."""
+        data: dict[str, Any] = {
+            "count": self.count,
+            "total": self.total,
+            "min": self.min,
+            "mean": self.mean,
+            "max": self.max,
+        }
+        for p in PERCENTILES:
+            data[f"p{p}"] = self.percentile(p)
+        return data
+
+    def to_dict(self) -> dict[str, Any]:
+        """Summary plus raw buckets, enough to rebuild with ``from_dict``."""
+        data = self.summary()
+        data["significant_digits"] = self.significant_digits
+        data["buckets"] = [[shift, sub, n] for (shift, sub), n in sorted(self._buckets.items())]
+        return data
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any]) -> "LatencyHistogram":
+        hist = cls(data.get("significant_digits", 2))
+        for shift, sub, n in data.get("buckets", []):
+            hist._buckets[(shift, sub)] = n
+        hist.count = data.get("count", 0)
+        hist.total = data.get("total", 0.0)
+        hist.min = data.get("min")
+        hist.max = data.get("max")
+        return hist
+
+
+class LatencyRecorder:
+    """Collect command latencies per subcommand and per scope.
+
+    ``scope`` is a free-form label set by the caller (the pytest plugin uses
+    the test module path) and is read when each command finishes.
+    """
+
+    def __init__(self, significant_digits: int = 2):
+        self.significant_digits = significant_digits
+        self.scope: str = "(startup)"
+        self.by_command: dict[str, LatencyHistogram] = {}
+        self.by_scope: dict[str, dict[str, LatencyHistogram]] = {}
+        self._lock = threading.Lock()
+
+    def _hist(self, table: dict[str, LatencyHistogram], key: str) -> LatencyHistogram:
+        hist = table.get(key)
+        if hist is None:
+            hist = table[key] = LatencyHistogram(self.significant_digits)
+        return hist
+
+    def record(self, subcommand: str, seconds: float, scope: Optional[str] = None) -> None:
+        scope = scope or self.scope
+        with self._lock:
+            self._hist(self.by_command, subcommand).record(seconds)
+            self._hist(self.by_scope.setdefault(scope, {}), subcommand).record(seconds)
+
+    def observe(self, event: CommandEvent) -> None:
+        """Executor observer entry point."""
+        self.record(event.subcommand, event.duration)
+
+    def scope_totals(self) -> dict[str, LatencyHistogram]:
+        """One histogram per scope, merged across subcommands."""
+        totals: dict[str, LatencyHistogram] = {}
+        for scope, table in self.by_scope.items():
+            merged = LatencyHistogram(self.significant_digits)
+            for hist in table.values():
+                merged.merge(hist)
+            totals[scope] = merged
+        return totals
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "unit": "seconds",
+            "by_command": {k: h.to_dict() for k, h in sorted(self.by_command.items())},
+            "by_scope": {
+                scope: {k: h.to_dict() for k, h in sorted(table.items())}
+                for scope, table in sorted(self.by_scope.items())
+            },
+        }
+
+    def dump(self, path: Union[str, Path]) -> Path:
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps(self.to_dict(), indent=2))
+        return path
+
+    def format_table(self, rows: dict[str, LatencyHistogram], title: str) -> list[str]:
+        """Render histograms as a fixed-width table (milliseconds)."""
+        def ms(v: Optional[float]) -> str:
+            return f"{v * 1000:.1f}" if v is not None else "-"
+
+        width = max([len(title)] + [len(k) for k in rows])
+        header = (
+            f"{title:<{width}}  {'count':>7}  {'total_s':>9}  "
+            f"{'p50_ms':>9}  {'p95_ms':>9}  {'p99_ms':>9}  {'max_ms':>9}"
+        )
+        lines = [header, "-" * len(header)]
+        for key, hist in sorted(rows.items(), key=lambda kv: -kv[1].total):
+            lines.append(
+                f"{key:<{width}}  {hist.count:>7}  {hist.total:>9.2f}  "
+                f"{ms(hist.percentile(50)):>9}  {ms(hist.percentile(95)):>9}  "
+                f"{ms(hist.percentile(99)):>9}  {ms(hist.max):>9}"
+            )
+        return lines
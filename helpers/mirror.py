@@ -0,0 +1,407 @@
+"""
+Client-side mirror of the target configuration.
+
+``ConfigMirror`` keeps ACL tables, watchpoints, program lists and the mode in
+memory. Registered as a command listener (``commands.add_listener``) it sees
+every Command that runs: mutating commands are replayed on the model, and
+listings (acl_list, view, show_mode) replace the part they show. Tests can
+then ask the mirror instead of re-running acl_list / view after their own
+changes.
+
+What cannot be modelled exactly (acl_import, user names instead of ids,
+filtered acl_remove, protect patterns, ...) marks the affected part stale;
+the next query for it refreshes from the target.
+
+``verify`` reads the real listings in one batch, hashes every object on both
+sides and returns a ``Drift`` for each one whose digest differs.
+
+Usage:
+    mirror = ConfigMirror()
+    add_listener(mirror.observe)
+    mirror.sync()
+
+    QDocSE.acl_add(acl_id, user=1000, mode="r").execute().ok()
+    assert mirror.acl(acl_id) == [EntrySpec(user=1000, mode="r")]
+    assert not mirror.verify()
+"""
+import hashlib
+import logging
+import threading
+from dataclasses import dataclass
+from typing import Any, Optional
+
+from .batch import run_batch
+from .client import QDocSE
+from .commands import Command
+from .reconcile import MODE_NAMES, EntrySpec, watchpoint_encrypted
+
+logger = logging.getLogger(__name__)
+
+# Arguments that take no value, per subcommand (everything else is "-opt value")
+FLAGS = {
+    "acl_add": {"-a", "-d", "-b", "-l"},
+    "acl_remove": {"-A", "-a", "-d"},
+    "acl_destroy": {"-f"},
+    "protect": {"-s", "-B"},
+    "unprotect": {"-B"},
+    "encrypt": {"-B", "-N"},
+    "unencrypt": {"-B"},
+    "view": {"-a", "-b", "-l", "-w"},
+}
+
+SECTIONS = ("acls", "watchpoints", "programs", "mode")
+
+# Object kind (as in ``objects()`` keys) -> section that tracks it
+KIND_SECTION = {
+    "acl": "acls",
+    "watchpoint": "watchpoints",
+    "authorized": "programs",
+    "blocked": "programs",
+    "mode": "mode",
+}
+
+
+def split_args(command: Command) -> tuple[dict[str, str], set[str]]:
+    """Split ``command.args`` into options (last value wins) and flags."""
+    flags = FLAGS.get(command.cmd, set())
+    opts: dict[str, str] = {}
+    seen: set[str] = set()
+    args = iter(command.args)
+    for a in args:
+        if a in flags:
+            seen.add(a)
+        else:
+            opts[a] = next(args, "")
+    return opts, seen
+
+
+def _int(value: Optional[str]) -> Optional[int]:
+    return None if value is None else int(value)
+
+
+def _digest(value: Any) -> str:
+    return hashlib.sha256(repr(value).encode()).hexdigest()[:16]
+
+
+@dataclass(frozen=True)
+class Drift:
+    """One object that differs between mirror and target (None = absent)."""
+    kind: str
+    key: Any
+    expected: Any
+    actual: Any
+
+    def __str__(self) -> str:
+        return f"{self.kind} {self.key}: mirror={self.expected!r} target={self.actual!r}"
+
+
+class ConfigMirror:
+    """In-memory model of the target configuration, fed by command listeners."""
+
+    def __init__(self):
+        self.acls: dict[int, list[EntrySpec]] = {}
+        self.watchpoints: dict[str, Optional[bool]] = {}  # path -> encrypted (None: unknown)
+        self.authorized: dict[str, Optional[int]] = {}  # path -> program ACL id
+        self.blocked: set[str] = set()
+        self.mode: Optional[str] = None
+        self.stale: set[str] = set(SECTIONS)
+        self.stale_acls: set[int] = set()
+        self.mutations = 0
+        # (list, index) -> path, from the last full view; adjust by index needs it
+        self._program_index: dict[tuple[str, int], str] = {}
+        self._lock = threading.RLock()
+
+    # -------------------------------------------------------------------------
+    # Listener
+    # -------------------------------------------------------------------------
+
+    def observe(self, command: Command) -> None:
+        """Command listener: apply ``command`` and its result to the model."""
+        result = command._result
+        handler = getattr(self, f"_on_{command.cmd}", None)
+        if handler is None or result is None or result.failed:
+            return
+        opts, flags = split_args(command)
+        with self._lock:
+            try:
+                handler(command, opts, flags)
+            except (KeyError, ValueError, IndexError) as e:
+                logger.debug(f"[Mirror] Cannot model {command}: {e}")
+                self.stale.add(self._section_of(command.cmd))
+
+    @staticmethod
+    def _section_of(cmd: str) -> str:
+        if cmd.startswith("acl_"):
+            return "acls"
+        return {"adjust": "programs", "view": "programs",
+                "set_mode": "mode", "show_mode": "mode"}.get(cmd, "watchpoints")
+
+    def _acl_entries(self, opts: dict[str, str]) -> Optional[list[EntrySpec]]:
+        acl_id = int(opts["-i"])
+        if acl_id in self.acls and acl_id not in self.stale_acls:
+            return self.acls[acl_id]
+        self.stale_acls.add(acl_id)
+        return None
+
+    def _on_acl_create(self, command, opts, flags):
+        acl_id = command.parse()["acl_id"]
+        if acl_id is None:
+            self.stale.add("acls")
+            return
+        self.acls[acl_id] = []
+        self.mutations += 1
+
+    def _on_acl_add(self, command, opts, flags):
+        entries = self._acl_entries(opts)
+        if entries is None:
+            return
+        if "-m" not in opts:
+            raise ValueError("default mode is not known")
+        entries.append(EntrySpec(
+            allow="-d" not in flags,
+            user=_int(opts.get("-u")),
+            group=_int(opts.get("-g")),
+            program=_int(opts.get("-p")),
+            mode=opts["-m"],
+            time=opts.get("-t"),
+        ))
+        self.mutations += 1
+
+    def _on_acl_remove(self, command, opts, flags):
+        entries = self._acl_entries(opts)
+        if entries is None:
+            return
+        if "-A" in flags:
+            entries.clear()
+        elif set(opts) == {"-i", "-e"} and not flags:
+            entries.pop(int(opts["-e"]) - 1)
+        else:
+            self.stale_acls.add(int(opts["-i"]))
+        self.mutations += 1
+
+    def _on_acl_edit(self, command, opts, flags):
+        entries = self._acl_entries(opts)
+        if entries is None:
+            return
+        src = int(opts["-e"])
+        named = {"first": 1, "last": len(entries), "up": src - 1, "down": src + 1}
+        dst = named[opts["-p"]] if opts["-p"] in named else int(opts["-p"])
+        entries.insert(max(1, min(dst, len(entries))) - 1, entries.pop(src - 1))
+        self.mutations += 1
+
+    def _on_acl_destroy(self, command, opts, flags):
+        if "-i" in opts:
+            self.acls.pop(int(opts["-i"]), None)
+            self.stale_acls.discard(int(opts["-i"]))
+        else:
+            self.stale.add("acls")
+        self.mutations += 1
+
+    def _on_acl_import(self, command, opts, flags):
+        self.stale.add("acls")
+        self.mutations += 1
+
+    def _on_acl_list(self, command, opts, flags):
+        listed = {a["acl_id"]: [EntrySpec.from_parsed(e) for e in a["entries"]]
+                  for a in command.parse()["acls"]}
+        if "-i" in opts:
+            acl_id = int(opts["-i"])
+            if acl_id in listed:
+                self.acls[acl_id] = listed[acl_id]
+            self.stale_acls.discard(acl_id)
+            return
+        self.acls = listed
+        self.stale.discard("acls")
+        self.stale_acls.clear()
+
+    def _on_protect(self, command, opts, flags):
+        if "-dp" in opts or "-excl" in opts:
+            raise ValueError("pattern watchpoints are not modelled")
+        self.watchpoints[opts["-d"]] = opts["-e"] == "yes" if "-e" in opts else None
+        self.mutations += 1
+
+    def _on_unprotect(self, command, opts, flags):
+        if "-dp" in opts or "-excl" in opts:
+            raise ValueError("pattern watchpoints are not modelled")
+        self.watchpoints.pop(opts["-d"], None)
+        self.mutations += 1
+
+    def _on_encrypt(self, command, opts, flags):
+        if opts.get("-d") in self.watchpoints and "-dp" not in opts:
+            self.watchpoints[opts["-d"]] = True
+        self.mutations += 1
+
+    def _on_unencrypt(self, command, opts, flags):
+        if opts.get("-d") in self.watchpoints and "-dp" not in opts:
+            self.watchpoints[opts["-d"]] = False
+        self.mutations += 1
+
+    def _on_adjust(self, command, opts, flags):
+        index = self._program_index
+        self._program_index = {}  # indexes may shift after any move
+        if "-apf" in opts or "-api" in opts:
+            path = opts["-apf"] if "-apf" in opts else index[("blocked", int(opts["-api"]))]
+            self.blocked.discard(path)
+            self.authorized[path] = _int(opts.get("-A"))
+        elif "-bpf" in opts or "-b" in opts:
+            path = opts["-bpf"] if "-bpf" in opts else index[("authorized", int(opts["-b"]))]
+            self.authorized.pop(path, None)
+            self.blocked.add(path)
+        self.mutations += 1
+
+    def _on_view(self, command, opts, flags):
+        parsed = command.parse()
+        if "-w" in flags:
+            self.watchpoints = {wp["path"]: watchpoint_encrypted(wp["encryption"])
+                                for wp in parsed["watchpoints"]}
+            self.stale.discard("watchpoints")
+        if flags & {"-w", "-l"}:
+            return
+        if "-b" not in flags:
+            self.authorized = {p["path"]: p["acl"] for p in parsed["authorized"]}
+        if "-a" not in flags:
+            self.blocked = {p["path"] for p in parsed["blocked"]}
+        if not flags:
+            self._program_index = {(kind, p["index"]): p["path"]
+                                   for kind in ("authorized", "blocked") for p in parsed[kind]}
+            self.stale.discard("programs")
+
+    def _on_show_mode(self, command, opts, flags):
+        self.mode = command.parse()["mode"]
+        self.stale.discard("mode")
+
+    def _on_set_mode(self, command, opts, flags):
+        self.mode = MODE_NAMES[opts["-m"]]
+        self.mutations += 1
+
+    # -------------------------------------------------------------------------
+    # Queries - answered from memory, refreshed only when stale
+    # -------------------------------------------------------------------------
+
+    def _listing(self, section: str) -> Command:
+        return {
+            "acls": QDocSE.acl_list,
+            "watchpoints": lambda: QDocSE.view().watchpoints(),
+            "programs": QDocSE.view,
+            "mode": QDocSE.show_mode,
+        }[section]()
+
+    def _fresh(self, section: str) -> None:
+        if section in self.stale or (section == "acls" and self.stale_acls):
+            self.observe(self._listing(section).execute().ok())
+
+    def sync(self) -> None:
+        """Load everything from the target in one batch."""
+        commands = [self._listing(s) for s in SECTIONS]
+        run_batch(commands)
+        for command in commands:
+            command.ok("Cannot read QDocSE configuration")
+            # Batched commands notify listeners; observe again when not registered
+            self.observe(command)
+
+    def acl(self, acl_id: int) -> Optional[list[EntrySpec]]:
+        """Entries of ``acl_id`` in order, or None if it does not exist."""
+        self._fresh("acls")
+        entries = self.acls.get(acl_id)
+        return None if entries is None else list(entries)
+
+    def acl_ids(self) -> list[int]:
+        self._fresh("acls")
+        return sorted(self.acls)
+
+    def is_protected(self, path: str) -> bool:
+        self._fresh("watchpoints")
+        return path in self.watchpoints
+
+    def is_encrypted(self, path: str) -> Optional[bool]:
+        self._fresh("watchpoints")
+        if path in self.watchpoints and self.watchpoints[path] is None:
+            self.stale.add("watchpoints")
+            self._fresh("watchpoints")
+        return self.watchpoints.get(path)
+
+    def is_authorized(self, path: str) -> bool:
+        self._fresh("programs")
+        return path in self.authorized
+
+    def is_blocked(self, path: str) -> bool:
+        self._fresh("programs")
+        return path in self.blocked
+
+    def program_acl(self, path: str) -> Optional[int]:
+        self._fresh("programs")
+        return self.authorized.get(path)
+
+    def current_mode(self) -> Optional[str]:
+        self._fresh("mode")
+        return self.mode
+
+    # -------------------------------------------------------------------------
+    # Drift detection
+    # -------------------------------------------------------------------------
+
+    def objects(self) -> dict[tuple[str, Any], Any]:
+        """Every modelled object, keyed by (kind, key); stale parts left out."""
+        with self._lock:
+            out: dict[tuple[str, Any], Any] = {}
+            if "acls" not in self.stale:
+                out.update((("acl", i), tuple(e)) for i, e in self.acls.items() if i not in self.stale_acls)
+            if "watchpoints" not in self.stale:
+                out.update((("watchpoint", p), enc) for p, enc in self.watchpoints.items())
+            if "programs" not in self.stale:
+                out.update((("authorized", p), acl) for p, acl in self.authorized.items())
+                out.update((("blocked", p), True) for p in self.blocked)
+            if "mode" not in self.stale:
+                out[("mode", "")] = self.mode
+            return out
+
+    def digests(self) -> dict[tuple[str, Any], str]:
+        return {key: _digest(value) for key, value in self.objects().items()}
+
+    def checksum(self) -> str:
+        """One digest over the whole modelled configuration."""
+        lines = sorted(f"{kind} {key} {d}" for (kind, key), d in self.digests().items())
+        return hashlib.sha256("\n".join(lines).encode()).hexdigest()
+
+    def diff(self, actual: "ConfigMirror") -> list[Drift]:
+        """Objects whose digest differs from ``actual`` (a mirror of the target)."""
+        mine, theirs = self.objects(), actual.objects()
+        kinds = {kind for kind, section in KIND_SECTION.items() if section not in self.stale}
+        skipped = {("acl", i) for i in self.stale_acls}
+        drift = []
+        for key in sorted(set(mine) | set(theirs), key=repr):
+            if key[0] not in kinds or key in skipped:
+                continue
+            expected, real = mine.get(key), theirs.get(key)
+            if key[0] == "watchpoint" and key in mine and key in theirs and expected is None:
+                continue  # encryption not known locally; presence matches
+            if key not in mine or key not in theirs or _digest(expected) != _digest(real):
+                drift.append(Drift(key[0], key[1], expected, real))
+        return drift
+
+    def verify(self) -> list[Drift]:
+        """Compare with the target (one batched read), then re-base on it."""
+        with self._lock:
+            snapshot = ConfigMirror()
+            snapshot._load(self)
+        actual = ConfigMirror()
+        commands = [self._listing(s) for s in SECTIONS]
+        run_batch(commands)
+        for command in commands:
+            actual.observe(command.ok("Cannot read QDocSE configuration"))
+        drift = snapshot.diff(actual)
+        with self._lock:
+            self._load(actual)
+        for d in drift:
+            logger.warning(f"[Mirror] Drift: {d}")
+        return drift
+
+    def _load(self, other: "ConfigMirror") -> None:
+        self.acls = {i: list(e) for i, e in other.acls.items()}
+        self.watchpoints = dict(other.watchpoints)
+        self.authorized = dict(other.authorized)
+        self.blocked = set(other.blocked)
+        self.mode = other.mode
+        self.stale = set(other.stale)
+        self.stale_acls = set(other.stale_acls)
+        self._program_index = dict(other._program_index)
@@ -0,0 +1,138 @@
+"""
+Pre-run purge of stale ACLs, watchpoints and programs.
+
+``purge_stale`` runs the three purges concurrently. Each one lists its
+objects and removes them in framed multi-command round trips (see
+helpers.batch, ``batch_size`` commands per trip) instead of one command per
+object. A single ``push_config`` commits everything at the end.
+
+What counts as stale matches the session fixtures: every ACL, watchpoints
+under /tmp/, and authorized programs under /tmp/. Programs cannot be
+removed, only moved to the blocked list. They are blocked by index
+(``adjust -b``) as the session fixture always did, because stale programs
+are usually deleted files and blocking by path (``-bpf``) evaluates the
+file. Indices are issued in descending order, so blocking one never shifts
+an index still to come.
+
+Usage:
+    report = purge_stale()
+    print(report.summary())
+"""
+import logging
+import re
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Callable, Optional, Sequence
+
+from .batch import run_batch
+from .client import QDocSE
+from .commands import Command
+
+logger = logging.getLogger(__name__)
+
+# Commands per framed round trip
+BATCH_SIZE = 200
+
+STALE_PREFIX = "/tmp/"
+
+
+@dataclass
+class PurgeResult:
+    """Outcome of one kind of purge."""
+    kind: str
+    found: int = 0
+    purged: int = 0
+    failed: list[str] = field(default_factory=list)
+    seconds: float = 0.0
+    error: Optional[str] = None
+
+    @property
+    def per_second(self) -> Optional[float]:
+        return self.purged / self.seconds if self.seconds > 0 else None
+
+
+@dataclass
+class PurgeReport:
+    """All purges plus the final push_config."""
+    results: list[PurgeResult]
+    push_seconds: float = 0.0
+    seconds: float = 0.0
+
+    @property
+    def purged(self) -> int:
+        return sum(r.purged for r in self.results)
+
+    @property
+    def per_second(self) -> Optional[float]:
+        return self.purged / self.seconds if self.seconds > 0 else None
+
+    def summary(self) -> str:
+        parts = [f"{r.kind}={r.purged}/{r.found}" for r in self.results]
+        rate = f"{self.per_second:.0f}/s" if self.per_second else "-"
+        return f"{self.purged} object(s) in {self.seconds:.2f}s ({rate}; {', '.join(parts)})"
+
+
+def stale_acls() -> list[tuple[str, Command]]:
+    result = QDocSE.acl_list().execute().ok("Cannot list ACLs")
+    ids = [int(m) for m in re.findall(r"ACL ID (\d+)", result.result.stdout)]
+    return [(f"ACL {aid}", QDocSE.acl_destroy(aid, force=True)) for aid in ids]
+
+
+def stale_watchpoints() -> list[tuple[str, Command]]:
+    parsed = QDocSE.view().watchpoints().execute().ok("Cannot list watchpoints").parse()
+    return [(wp["path"], QDocSE.unprotect(wp["path"]))
+            for wp in parsed["watchpoints"] if STALE_PREFIX in wp["path"]]
+
+
+def stale_programs() -> list[tuple[str, Command]]:
+    parsed = QDocSE.view().execute().ok("Cannot list programs").parse()
+    stale = [p for p in parsed["authorized"] if STALE_PREFIX in p["path"]]
+    stale.sort(key=lambda p: p["index"], reverse=True)
+    return [(p["path"], QDocSE.adjust().block_index(p["index"])) for p in stale]
+
+
+# kind -> lister returning (label, removal command) per stale object
+PURGES: dict[str, Callable[[], list[tuple[str, Command]]]] = {
+    "acls": stale_acls,
+    "watchpoints": stale_watchpoints,
+    "programs": stale_programs,
+}
+
+
+def _purge(kind: str, batch_size: int, timeout: int) -> PurgeResult:
+    result = PurgeResult(kind)
+    start = time.perf_counter()
+    try:
+        targets = PURGES[kind]()
+        result.found = len(targets)
+        for i in range(0, len(targets), batch_size):
+            chunk = targets[i:i + batch_size]
+            run_batch([cmd for _, cmd in chunk], timeout=timeout)
+            for label, cmd in chunk:
+                if cmd.result.success:
+                    result.purged += 1
+                else:
+                    result.failed.append(label)
+    except Exception as e:
+        result.error = str(e)
+    result.seconds = time.perf_counter() - start
+    return result
+
+
+def purge_stale(
+    kinds: Sequence[str] = tuple(PURGES),
+    batch_size: int = BATCH_SIZE,
+    timeout: int = 300,
+) -> PurgeReport:
+    """Purge ``kinds`` concurrently, then commit with one push_config."""
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=len(kinds) or 1, thread_name_prefix="purge") as pool:
+        results = list(pool.map(lambda kind: _purge(kind, batch_size, timeout), kinds))
+    report = PurgeReport(results)
+    if report.purged:
+        push_start = time.perf_counter()
+        QDocSE.push_config().execute(timeout)
+        report.push_seconds = time.perf_counter() - push_start
+    report.seconds = time.perf_counter() - start
+    return report
@@ -0,0 +1,549 @@
+"""
+Declarative QDocSE configuration - describe the state, converge with a diff.
+
+A ``DesiredState`` lists named ACLs (ordered entries), protected directories
+(pattern, encryption, ACL associations), authorized/blocked programs and the
+working mode. ``Reconciler.converge`` reads the current state in one batched
+query, plans the smallest set of ``acl_*`` / ``protect`` / ``adjust``
+commands that gets there, and applies them with a single ``push_config``
+(a mode switch is committed by its own: before the changes when leaving
+normal mode, after them otherwise).
+
+The reconciler only touches what it created: ACLs it made (by name),
+directories and programs it configured. Existing ACLs it manages are edited
+in place when that is cheaper than creating new ones, so consecutive tests
+that want near-identical state pay only for the delta.
+
+Note:
+- acl_file associations are not visible in acl_list / view output; the
+  reconciler remembers what it applied and re-applies when unsure
+- programs cannot be removed, only blocked (see purge_stale_programs)
+
+Usage:
+    from helpers.reconcile import ACLSpec, DesiredState, DirSpec, EntrySpec, Reconciler
+
+    state = DesiredState(
+        acls=[ACLSpec("readers", [EntrySpec(user=1000, mode="r"),
+                                  EntrySpec(allow=False, group=100, mode="rw")])],
+        dirs=[DirSpec("/data/a", encrypt=True, user_acl="readers")],
+    )
+    plan = reconciler.converge(state)
+    acl_id = plan.acl_ids["readers"]
+"""
+import bisect
+import logging
+import re
+from dataclasses import dataclass, field
+from typing import Callable, Optional, Union
+
+from .batch import run_batch
+from .client import QDocSE
+from .commands import Command
+
+logger = logging.getLogger(__name__)
+
+# set_mode argument -> what show_mode reports
+MODE_NAMES = {"normal": "de-elevated", "elevated": "elevated", "learning": "learning"}
+
+ALL_DAYS = 7
+FULL_DAY = "00:00:00-23:59:59"
+
+_TIME_RE = re.compile(r"^\d{1,2}(:\d{2}){0,2}-\d{1,2}(:\d{2}){0,2}$")
+
+
+class ReconcileError(Exception):
+    """Desired state cannot be reached from the current state."""
+
+
+def _mode(mode: str) -> str:
+    """Canonical permission string: letters of ``rwx`` in order."""
+    letters = set(mode.replace("-", ""))
+    if letters - set("rwx"):
+        raise ValueError(f"Invalid mode {mode!r}")
+    return "".join(c for c in "rwx" if c in letters)
+
+
+def _time(spec: Optional[str]) -> Optional[str]:
+    """``09:00-18:00`` -> ``09:00:00-18:00:00``; full day -> None."""
+    if not spec:
+        return None
+    if not _TIME_RE.match(spec):
+        return spec
+    ends = []
+    for t in spec.split("-"):
+        parts = t.strip().split(":")
+        ends.append(":".join(p.zfill(2) for p in (parts + ["00", "00"])[:3]))
+    normalized = "-".join(ends)
+    return None if normalized == FULL_DAY else normalized
+
+
+@dataclass(frozen=True)
+class EntrySpec:
+    """One ACL entry; exactly one of user, group or program."""
+    allow: bool = True
+    user: Optional[int] = None
+    group: Optional[int] = None
+    program: Optional[int] = None
+    mode: str = "r"
+    time: Optional[str] = None
+
+    def __post_init__(self):
+        if sum(p is not None for p in (self.user, self.group, self.program)) != 1:
+            raise ValueError("EntrySpec needs exactly one of user, group, program")
+        object.__setattr__(self, "mode", _mode(self.mode))
+        object.__setattr__(self, "time", _time(self.time))
+
+    @classmethod
+    def from_parsed(cls, entry: dict) -> "EntrySpec":
+        """Entry dict from ``ACLList.parse``."""
+        rules = entry.get("time") or []
+        if not rules:
+            time = None
+        elif len(rules) == 1 and len(rules[0]["days"]) == ALL_DAYS:
+            time = rules[0]["range"]
+        else:
+            # Day-restricted schedules cannot be expressed here; never equal
+            time = "|".join(f"{','.join(r['days'])} {r['range']}" for r in rules)
+        return cls(
+            allow=entry["type"] == "Allow",
+            user=entry["user"],
+            group=entry["group"],
+            program=entry["program"],
+            mode=entry["mode"] or "",
+            time=time,
+        )
+
+    def command(self, acl_id: int) -> Command:
+        cmd = QDocSE.acl_add(acl_id, allow=self.allow, user=self.user, group=self.group,
+                             mode=self.mode or None)
+        if self.program is not None:
+            cmd.program(self.program)
+        if self.time:
+            cmd.time(self.time)
+        return cmd
+
+
+@dataclass
+class ACLSpec:
+    """Named ACL with ordered entries (first match wins)."""
+    name: str
+    entries: list[EntrySpec] = field(default_factory=list)
+
+
+@dataclass(frozen=True)
+class DirSpec:
+    """Protected directory; ACLs are referenced by ACLSpec name."""
+    path: str
+    encrypt: bool = False
+    pattern: Optional[str] = None
+    user_acl: Optional[str] = None
+    prog_acl: Optional[str] = None
+
+
+@dataclass(frozen=True)
+class ProgramSpec:
+    """Program on the authorized (optionally with an ACL) or blocked list."""
+    path: str
+    authorized: bool = True
+    acl: Optional[str] = None
+
+
+@dataclass
+class DesiredState:
+    """What the target should look like after ``converge``.
+
+    ``prune`` removes what the reconciler configured earlier but is no longer
+    listed: managed ACLs are destroyed, directories unprotected, programs
+    blocked.
+    """
+    acls: list[ACLSpec] = field(default_factory=list)
+    dirs: list[DirSpec] = field(default_factory=list)
+    programs: list[ProgramSpec] = field(default_factory=list)
+    mode: Optional[str] = None
+    prune: bool = True
+
+    def __post_init__(self):
+        names = [a.name for a in self.acls]
+        if len(names) != len(set(names)):
+            raise ValueError("Duplicate ACL names")
+        refs = {d.user_acl for d in self.dirs} | {d.prog_acl for d in self.dirs}
+        refs |= {p.acl for p in self.programs}
+        missing = refs - set(names) - {None}
+        if missing:
+            raise ValueError(f"Unknown ACL names: {sorted(missing)}")
+        if self.mode is not None and self.mode not in MODE_NAMES:
+            raise ValueError(f"Unknown mode {self.mode!r}, expected one of {sorted(MODE_NAMES)}")
+
+
+@dataclass
+class CurrentState:
+    """Target state as read by ``Reconciler.read_state``."""
+    acls: dict[int, list[EntrySpec]] = field(default_factory=dict)
+    watchpoints: list[dict] = field(default_factory=list)
+    authorized: list[dict] = field(default_factory=list)
+    blocked: list[dict] = field(default_factory=list)
+    mode: Optional[str] = None
+
+
+# =============================================================================
+# Entry diff
+# =============================================================================
+
+# ("remove", entry) | ("add", EntrySpec) | ("move", entry, position); 1-based
+EntryOp = tuple
+
+
+def _lis(seq: list[int]) -> set[int]:
+    """Indexes into ``seq`` of one longest strictly increasing subsequence."""
+    tails: list[int] = []
+    tail_at: list[int] = []
+    prev = [-1] * len(seq)
+    for i, v in enumerate(seq):
+        k = bisect.bisect_left(tails, v)
+        if k == len(tails):
+            tails.append(v)
+            tail_at.append(i)
+        else:
+            tails[k] = v
+            tail_at[k] = i
+        prev[i] = tail_at[k - 1] if k else -1
+    keep = set()
+    i = tail_at[-1] if tail_at else -1
+    while i >= 0:
+        keep.add(i)
+        i = prev[i]
+    return keep
+
+
+def entry_edits(current: list[EntrySpec], target: list[EntrySpec]) -> list[EntryOp]:
+    """Fewest acl_remove / acl_add / acl_edit steps from ``current`` to ``target``.
+
+    Entries in both lists are kept; the rest are removed (highest index first,
+    so indexes stay valid) or appended. Then everything outside a longest
+    in-order run is moved next to its predecessor in ``target``.
+    """
+    # Pair equal entries in order; duplicates match first-to-first
+    slots: dict[EntrySpec, list[int]] = {}
+    for i, e in enumerate(target):
+        slots.setdefault(e, []).append(i)
+    kept: list[tuple[int, int]] = []  # (current index, target index)
+    ops: list[EntryOp] = []
+    for i, e in enumerate(current):
+        if slots.get(e):
+            kept.append((i, slots[e].pop(0)))
+        else:
+            ops.append(("remove", i + 1))
+    ops.reverse()
+
+    order = [t for _, t in kept]
+    for t in sorted(i for free in slots.values() for i in free):
+        ops.append(("add", target[t]))
+        order.append(t)
+
+    stay = _lis(order)
+    movers = sorted(order[i] for i in range(len(order)) if i not in stay)
+    for t in movers:
+        src = order.index(t)
+        order.pop(src)
+        at = order.index(t - 1) + 1 if t else 0
+        order.insert(at, t)
+        ops.append(("move", src + 1, at + 1))
+    return ops
+
+
+def watchpoint_encrypted(text: str) -> bool:
+    """Watchpoint encryption column ("Encrypted", "Yes" / "No", "Not encrypted")."""
+    t = text.strip().lower()
+    return bool(t) and not re.search(r"\b(no|not|none|off|unencrypted|plain)\b", t)
+
+
+# =============================================================================
+# Plan
+# =============================================================================
+
+
+@dataclass
+class Step:
+    """One planned command; ``build`` gets the ACL name -> id map."""
+    description: str
+    build: Callable[[dict[str, int]], Command]
+
+
+@dataclass
+class Plan:
+    """Commands from the current to the desired state, in apply order.
+
+    ``before`` (a switch out of normal mode, with its push) runs first, then
+    ``creates`` (their ids are only known afterwards), then ``steps``, one
+    ``push_config``, then ``after_push`` (a switch to the final mode, with
+    its push).
+    """
+    desired: DesiredState
+    creates: list[str] = field(default_factory=list)
+    steps: list[Step] = field(default_factory=list)
+    before: list[Step] = field(default_factory=list)
+    after_push: list[Step] = field(default_factory=list)
+    acl_ids: dict[str, int] = field(default_factory=dict)
+    spares: set[int] = field(default_factory=set)
+    kept_dirs: dict[str, tuple] = field(default_factory=dict)
+    kept_programs: set[str] = field(default_factory=set)
+
+    @property
+    def changes(self) -> bool:
+        return bool(self.before or self.creates or self.steps or self.after_push)
+
+    def describe(self) -> list[str]:
+        lines = [s.description for s in self.before]
+        lines += [f"acl_create ({name})" for name in self.creates]
+        lines += [s.description for s in self.steps]
+        if self.creates or self.steps:
+            lines.append("push_config")
+        return lines + [s.description for s in self.after_push]
+
+    def __len__(self) -> int:
+        return len(self.describe())
+
+
+def _entry_steps(label: str, acl: Union[int, str], ops: list[EntryOp]) -> list[Step]:
+    """Steps for ``entry_edits`` ops on an existing id or an ACL to be created."""
+    def acl_id(ids):
+        return ids[acl] if isinstance(acl, str) else acl
+
+    steps = []
+    for op in ops:
+        if op[0] == "remove":
+            steps.append(Step(f"acl_remove {label} entry {op[1]}",
+                              lambda ids, k=op[1]: QDocSE.acl_remove(acl_id(ids), entry=k)))
+        elif op[0] == "add":
+            steps.append(Step(f"acl_add {label} {op[1]}",
+                              lambda ids, e=op[1]: e.command(acl_id(ids))))
+        else:
+            steps.append(Step(f"acl_edit {label} entry {op[1]} -> {op[2]}",
+                              lambda ids, src=op[1], dst=op[2]:
+                              QDocSE.acl_edit(acl_id(ids), entry=src, position=dst)))
+    return steps
+
+
+class Reconciler:
+    """Converges the target to a ``DesiredState``; remembers what it manages.
+
+    One instance should live as long as the configuration it manages
+    (typically the test session), so that later ``converge`` calls can reuse
+    and edit the ACLs, directories and programs set up by earlier ones.
+    """
+
+    def __init__(self, timeout: int = 120):
+        self.timeout = timeout
+        self.acl_ids: dict[str, int] = {}
+        self.spares: set[int] = set()
+        # path -> (DirSpec, user ACL id, program ACL id) as last applied
+        self.dirs: dict[str, tuple] = {}
+        self.programs: set[str] = set()
+
+    def read_state(self) -> CurrentState:
+        """Current ACLs, watchpoints, programs and mode in one batch."""
+        commands = [QDocSE.acl_list(), QDocSE.view(), QDocSE.view().watchpoints(), QDocSE.show_mode()]
+        run_batch(commands, timeout=self.timeout)
+        listing, view, watch, mode = (c.ok("Cannot read QDocSE state").parse() for c in commands)
+        return CurrentState(
+            acls={a["acl_id"]: [EntrySpec.from_parsed(e) for e in a["entries"]]
+                  for a in listing["acls"]},
+            watchpoints=watch["watchpoints"],
+            authorized=view["authorized"],
+            blocked=view["blocked"],
+            mode=mode["mode"],
+        )
+
+    # -------------------------------------------------------------------------
+    # Planning
+    # -------------------------------------------------------------------------
+
+    def _plan_acls(self, desired: DesiredState, current: CurrentState, plan: Plan) -> None:
+        free = {i for i in set(self.acl_ids.values()) | self.spares if i in current.acls}
+        ids = plan.acl_ids
+
+        # Unchanged ACLs: still bound to the same name, or an identical spare
+        todo = []
+        for spec in desired.acls:
+            bound = self.acl_ids.get(spec.name)
+            if bound in free and current.acls[bound] == spec.entries:
+                ids[spec.name] = bound
+                free.discard(bound)
+            else:
+                todo.append(spec)
+        rest = []
+        for spec in todo:
+            same = next((i for i in sorted(free) if current.acls[i] == spec.entries), None)
+            if same is None:
+                rest.append(spec)
+            else:
+                ids[spec.name] = same
+                free.discard(same)
+
+        # Edit a managed ACL in place where that beats create + add (+ destroy)
+        candidates = []
+        for spec in rest:
+            create_cost = 1 + len(spec.entries) + (1 if desired.prune else 0)
+            for i in free:
+                ops = entry_edits(current.acls[i], spec.entries)
+                if len(ops) < create_cost:
+                    candidates.append((len(ops), self.acl_ids.get(spec.name) != i, spec.name, i, ops))
+        edits = {}
+        for cost, _, name, i, ops in sorted(candidates, key=lambda c: c[:4]):
+            if name not in edits and i in free:
+                edits[name] = (i, ops)
+                free.discard(i)
+
+        for spec in rest:
+            if spec.name in edits:
+                i, ops = edits[spec.name]
+                ids[spec.name] = i
+                plan.steps += _entry_steps(f"{spec.name}#{i}", i, ops)
+            else:
+                plan.creates.append(spec.name)
+                plan.steps += _entry_steps(spec.name, spec.name, [("add", e) for e in spec.entries])
+
+        if desired.prune:
+            for i in sorted(free):
+                plan.steps.append(Step(f"acl_destroy {i}",
+                                       lambda ids, i=i: QDocSE.acl_destroy(i, force=True)))
+        else:
+            plan.spares = free
+
+    def _plan_dirs(self, desired: DesiredState, current: CurrentState, plan: Plan) -> None:
+        protected = {wp["path"]: wp for wp in current.watchpoints}
+        wanted = {d.path for d in desired.dirs}
+
+        for path in sorted(set(self.dirs) - wanted):
+            if desired.prune:
+                if path in protected:
+                    plan.steps.append(Step(f"unprotect {path}", lambda ids, p=path: QDocSE.unprotect(p)))
+            else:
+                plan.kept_dirs[path] = self.dirs[path]
+
+        for d in desired.dirs:
+            wp = protected.get(d.path)
+            applied = self.dirs.get(d.path)
+            # An association can be replaced but not dropped: re-protect for that
+            dropped = applied is not None and (
+                (applied[1] is not None and d.user_acl is None)
+                or (applied[2] is not None and d.prog_acl is None))
+            reprotect = wp is None or dropped or (applied is not None and applied[0].pattern != d.pattern)
+            if reprotect:
+                if wp is not None:
+                    plan.steps.append(Step(f"unprotect {d.path}", lambda ids, p=d.path: QDocSE.unprotect(p)))
+                plan.steps.append(Step(f"protect {d.path} encrypt={d.encrypt}", lambda ids, d=d: (
+                    QDocSE.protect(d.path, encrypt=d.encrypt).pattern(d.pattern) if d.pattern
+                    else QDocSE.protect(d.path, encrypt=d.encrypt))))
+            elif watchpoint_encrypted(wp["encryption"]) != d.encrypt:
+                if d.encrypt:
+                    plan.steps.append(Step(f"encrypt {d.path}", lambda ids, p=d.path: QDocSE.encrypt(p)))
+                else:
+                    plan.steps.append(Step(f"unencrypt {d.path}", lambda ids, p=d.path: QDocSE.unencrypt(p)))
+
+            if d.user_acl is None and d.prog_acl is None:
+                continue
+            names = (d.user_acl, d.prog_acl)
+            want = tuple(plan.acl_ids.get(n) if n not in plan.creates else None for n in names)
+            if reprotect or applied is None or applied[1:] != want or any(
+                    n in plan.creates for n in names if n is not None):
+                plan.steps.append(Step(f"acl_file {d.path} user={d.user_acl} prog={d.prog_acl}", lambda ids, d=d: (
+                    QDocSE.acl_file(d.path, user_acl=ids.get(d.user_acl), prog_acl=ids.get(d.prog_acl),
+                                    pattern=d.pattern))))
+
+    def _plan_programs(self, desired: DesiredState, current: CurrentState, plan: Plan) -> None:
+        authorized = {p["path"]: p for p in current.authorized}
+        blocked = {p["path"] for p in current.blocked}
+        wanted = {p.path for p in desired.programs}
+
+        for p in desired.programs:
+            if p.authorized:
+                cur = authorized.get(p.path)
+                want = plan.acl_ids.get(p.acl) if p.acl else None
+                if cur is None or cur["acl"] != want or p.acl in plan.creates:
+                    plan.steps.append(Step(f"adjust authorize {p.path} acl={p.acl}", lambda ids, p=p: (
+                        QDocSE.adjust().auth_path(p.path).with_acl(ids[p.acl]) if p.acl
+                        else QDocSE.adjust().auth_path(p.path))))
+            elif p.path in authorized or p.path not in blocked:
+                plan.steps.append(Step(f"adjust block {p.path}",
+                                       lambda ids, p=p: QDocSE.adjust().block_path(p.path)))
+
+        for path in sorted(self.programs - wanted):
+            if not desired.prune:
+                plan.kept_programs.add(path)
+            elif path in authorized:
+                plan.steps.append(Step(f"adjust block {path}",
+                                       lambda ids, p=path: QDocSE.adjust().block_path(p)))
+
+    def plan(self, desired: DesiredState, current: Optional[CurrentState] = None) -> Plan:
+        """Minimal commands from ``current`` (read if omitted) to ``desired``."""
+        if current is None:
+            current = self.read_state()
+        plan = Plan(desired)
+        self._plan_acls(desired, current, plan)
+        # Directories and programs may reference ACLs; destroys go last
+        destroys = [s for s in plan.steps if s.description.startswith("acl_destroy")]
+        plan.steps = [s for s in plan.steps if s not in destroys]
+        self._plan_dirs(desired, current, plan)
+        self._plan_programs(desired, current, plan)
+        plan.steps += destroys
+
+        if desired.mode and MODE_NAMES[desired.mode] != current.mode:
+            switch = [Step(f"set_mode {desired.mode}", lambda ids, m=desired.mode: QDocSE.set_mode(m)),
+                      Step("push_config", lambda ids: QDocSE.push_config())]
+            # Changes need elevated or learning mode: leave normal mode before them
+            if current.mode == MODE_NAMES["normal"]:
+                plan.before = switch
+            else:
+                plan.after_push = switch
+        working = MODE_NAMES[desired.mode] if plan.before else current.mode
+        if working == MODE_NAMES["normal"] and (plan.creates or plan.steps):
+            raise ReconcileError("Configuration changes need elevated or learning mode, "
+                                 f"target stays {working}: {plan.describe()}")
+        return plan
+
+    # -------------------------------------------------------------------------
+    # Applying
+    # -------------------------------------------------------------------------
+
+    def apply(self, plan: Plan) -> Plan:
+        """Run ``plan`` in at most two batches; fills in ``plan.acl_ids``."""
+        ids = plan.acl_ids
+        try:
+            before = [s.build(ids) for s in plan.before]
+            if plan.creates:
+                creates = [QDocSE.acl_create() for _ in plan.creates]
+                run_batch(before + creates, timeout=self.timeout, stop_on_error=True)
+                for cmd in before:
+                    cmd.ok("Reconcile mode switch failed")
+                for name, cmd in zip(plan.creates, creates):
+                    ids[name] = cmd.ok(f"Cannot create ACL {name!r}").parse()["acl_id"]
+                before = []
+            commands = [s.build(ids) for s in plan.steps]
+            if plan.creates or commands:
+                commands.append(QDocSE.push_config())
+            commands = before + commands + [s.build(ids) for s in plan.after_push]
+            run_batch(commands, timeout=self.timeout, stop_on_error=True)
+            for cmd in commands:
+                cmd.ok("Reconcile step failed")
+        except Exception:
+            # Unknown how far it got: keep every ACL for cleanup, forget associations
+            self.spares |= set(ids.values()) | set(self.acl_ids.values())
+            self.acl_ids = {}
+            self.dirs = {p: (DirSpec(p), None, None) for p in set(self.dirs) | {d.path for d in plan.desired.dirs}}
+            self.programs |= {p.path for p in plan.desired.programs}
+            raise
+
+        self.acl_ids = {spec.name: ids[spec.name] for spec in plan.desired.acls}
+        self.spares = set(plan.spares)
+        self.dirs = dict(plan.kept_dirs)
+        for d in plan.desired.dirs:
+            self.dirs[d.path] = (d, ids.get(d.user_acl), ids.get(d.prog_acl))
+        self.programs = plan.kept_programs | {p.path for p in plan.desired.programs}
+        return plan
+
+    def converge(self, desired: DesiredState) -> Plan:
+        """Read, plan and apply; returns the applied plan (``acl_ids`` by name)."""
+        plan = self.plan(desired)
+        logger.info("[Reconcile] %d command(s): %s", len(plan), plan.describe())
+        return self.apply(plan)
@@ -1,5 +1,8 @@
 """Command execution result."""
+import mmap
+import tempfile
 from dataclasses import dataclass
+from typing import Optional, Union
 
 
 class CommandError(Exception):
@@ -14,6 +17,8 @@ class ExecResult:
     stdout: str
     stderr: str
     returncode: int
+    # Process state captured before a timed-out command was killed (helpers.hang)
+    diagnostics: Optional[str] = None
 
     @property
     def success(self) -> bool:
@@ -32,6 +37,8 @@ class ExecResult:
                 f"Stdout: {self.stdout[:300] or '(empty)'}\n"
                 f"Stderr: {self.stderr[:300] or '(empty)'}"
             )
+            if self.diagnostics:
+                error += f"\nHang diagnostics:\n{self.diagnostics[:2000]}"
             if msg:
                 error = f"{msg}\n{error}"
             raise CommandError(error)
@@ -40,3 +47,162 @@ class ExecResult:
     def __str__(self) -> str:
         status = "✓" if self.success else "✗"
         return f"[{status}] {self.command} -> {self.returncode}"
+
+
+class OutputBuffer:
+    """
+    Append-only output buffer that spills to a temp file past a threshold.
+
+    Output stays in a single ``bytearray`` while small. Once it grows past
+    ``spill_threshold`` bytes it is moved to an anonymous temp file and later
+    exposed through ``mmap``, so huge outputs never need to fit in RAM.
+    """
+
+    def __init__(self, spill_threshold: Optional[int] = None):
+        self.spill_threshold = spill_threshold
+        self.size = 0
+        self._buf: Optional[bytearray] = bytearray()
+        self._file = None
+        self._mmap: Optional[mmap.mmap] = None
+        self._view: Optional[memoryview] = None
+
+    @property
+    def spilled(self) -> bool:
+        return self._file is not None
+
+    def write(self, chunk: Union[bytes, bytearray, memoryview]) -> None:
+        if self._file is None:
+            self._buf.extend(chunk)
+            if self.spill_threshold is not None and len(self._buf) > self.spill_threshold:
+                self._file = tempfile.TemporaryFile(prefix="qdocse_out_")
+                self._file.write(self._buf)
+                self._buf = None
+        else:
+            self._file.write(chunk)
+        self.size += len(chunk)
+
+    def view(self) -> memoryview:
+        """Read-only view of everything written so far (no copy)."""
+        if self._view is None:
+            if self._file is None:
+                self._view = memoryview(self._buf).toreadonly()
+            elif self.size == 0:
+                self._view = memoryview(b"")
+            else:
+                self._file.flush()
+                self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+                self._view = memoryview(self._mmap)
+        return self._view
+
+    def close(self) -> None:
+        """Release the view, mapping and temp file."""
+        if self._view is not None:
+            self._view.release()
+            self._view = None
+        if self._mmap is not None:
+            self._mmap.close()
+            self._mmap = None
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+        self._buf = None
+
+
+class BinaryExecResult:
+    """
+    Result of a ``binary=True`` run that keeps raw output bytes.
+
+    Not an ``ExecResult`` subclass: it wraps one. ``raw_stdout``/``raw_stderr``
+    are returned as produced by the executor (``bytes`` or a ``memoryview``
+    over a buffer or mmap). ``text()`` decodes them once into an
+    ``ExecResult``; ``stdout``, ``stderr`` and ``raise_on_error`` go through
+    it, so assertion helpers keep working. ``success``, ``failed`` and
+    ``str()`` never decode.
+
+    Spilled outputs hold an open temp file; call ``close()`` (or use the
+    result as a context manager) when done with ``raw_stdout``.
+    """
+
+    def __init__(
+        self,
+        command: str,
+        stdout: Union[bytes, memoryview, OutputBuffer],
+        stderr: Union[bytes, memoryview],
+        returncode: int,
+        encoding: str = "utf-8",
+    ):
+        self.command = command
+        self.returncode = returncode
+        self.encoding = encoding
+        self.diagnostics: Optional[str] = None
+        self._buffer = stdout if isinstance(stdout, OutputBuffer) else None
+        self._raw_stdout = stdout
+        self._raw_stderr = stderr
+        self._text: Optional[ExecResult] = None
+
+    @property
+    def raw_stdout(self) -> Union[bytes, memoryview]:
+        if self._buffer is not None:
+            return self._buffer.view()
+        return self._raw_stdout
+
+    @property
+    def raw_stderr(self) -> Union[bytes, memoryview]:
+        return self._raw_stderr
+
+    @property
+    def spilled(self) -> bool:
+        """True if stdout was spilled to a temp file and is mmap-backed."""
+        return self._buffer is not None and self._buffer.spilled
+
+    def text(self) -> ExecResult:
+        """Decoded, stripped ExecResult (built on first use)."""
+        if self._text is None:
+            self._text = ExecResult(
+                self.command,
+                str(self.raw_stdout, self.encoding, "replace").strip(),
+                str(self._raw_stderr, self.encoding, "replace").strip(),
+                self.returncode,
+                self.diagnostics,
+            )
+        return self._text
+
+    @property
+    def stdout(self) -> str:
+        return self.text().stdout
+
+    @property
+    def stderr(self) -> str:
+        return self.text().stderr
+
+    @property
+    def success(self) -> bool:
+        return self.returncode == 0
+
+    @property
+    def failed(self) -> bool:
+        return not self.success
+
+    def raise_on_error(self, msg: str = "") -> "BinaryExecResult":
+        """Raise CommandError if command failed."""
+        if self.failed:
+            self.text().raise_on_error(msg)
+        return self
+
+    def close(self) -> None:
+        if self._buffer is not None:
+            self._buffer.close()
+
+    def __enter__(self) -> "BinaryExecResult":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def __str__(self) -> str:
+        status = "✓" if self.success else "✗"
+        return f"[{status}] {self.command} -> {self.returncode}"
+
+
+# Either result an executor may return (BinaryExecResult for ``binary=True``)
+AnyResult = Union[ExecResult, BinaryExecResult]
@@ -0,0 +1,302 @@
+"""
+In-Python reference model of QDocSE's ACL tables and watchpoints.
+
+``Simulator`` implements the documented behaviour (docs/case_*.txt and the
+user guide) of acl_create, acl_add, acl_remove, acl_edit, acl_destroy,
+protect and unprotect. ``expect(command)`` predicts whether the console
+accepts a command. ``apply(command)`` then performs an accepted command on
+the model. Where the documentation leaves the outcome open ("Success or
+Error"), ``expect`` returns None and the model follows whatever the console
+did.
+
+Unlike helpers.mirror, the simulator never reads the target: it is the
+specification that helpers.differential checks the console against.
+
+Principals are only valid if they appear in ``users`` / ``groups`` (name or
+numeric id -> id). Unknown names are treated as nonexistent, unknown numeric
+ids as unspecified.
+
+Usage:
+    sim = Simulator(acls={7: []}, dirs={"/tmp/d"})
+    cmd = QDocSE.acl_add(7, user=0, mode="rw")
+    assert sim.expect(cmd) is True
+    sim.apply(cmd)
+    sim.state().acls[7]
+"""
+import re
+from dataclasses import dataclass, field
+from typing import Iterable, Optional
+
+from .commands import Command
+from .mirror import split_args
+from .reconcile import EntrySpec
+
+DEFAULT_PRINCIPALS = {"root": 0, "0": 0}
+
+# acl_edit -p words -> target position (n = entries, e = current position)
+POSITIONS = {
+    "first": lambda n, e: 1, "begin": lambda n, e: 1, "beginning": lambda n, e: 1, "top": lambda n, e: 1,
+    "last": lambda n, e: n, "end": lambda n, e: n, "bottom": lambda n, e: n,
+    "up": lambda n, e: e - 1, "down": lambda n, e: e + 1,
+}
+
+_TIME_RE = re.compile(r"^(\d{2}):(\d{2}):(\d{2})-(\d{2}):(\d{2}):(\d{2})$")
+_ACL_ID_RE = re.compile(r"^\d+$")
+
+
+@dataclass
+class State:
+    """ACL tables and watchpoints (path -> encrypted, None = not known)."""
+    acls: dict[int, tuple[EntrySpec, ...]] = field(default_factory=dict)
+    watchpoints: dict[str, Optional[bool]] = field(default_factory=dict)
+
+    def diff(self, actual: "State") -> list[str]:
+        """Differences from ``actual``, one line each (empty = same)."""
+        out = []
+        for acl_id in sorted(set(self.acls) | set(actual.acls)):
+            expected, real = self.acls.get(acl_id), actual.acls.get(acl_id)
+            if expected != real:
+                out.append(f"ACL {acl_id}: model={_entries(expected)} console={_entries(real)}")
+        for path in sorted(set(self.watchpoints) | set(actual.watchpoints)):
+            expected, real = self.watchpoints.get(path, "absent"), actual.watchpoints.get(path, "absent")
+            if expected is None and real != "absent":
+                continue  # encryption not predicted; presence matches
+            if expected != real:
+                out.append(f"watchpoint {path}: model={expected} console={real}")
+        return out
+
+
+def _entries(entries: Optional[tuple[EntrySpec, ...]]) -> str:
+    if entries is None:
+        return "absent"
+    return "[" + ", ".join(
+        f"{'allow' if e.allow else 'deny'} "
+        f"{'u' if e.user is not None else 'g' if e.group is not None else 'p'}"
+        f"{e.user if e.user is not None else e.group if e.group is not None else e.program} "
+        f"{e.mode}{' ' + e.time if e.time else ''}"
+        for e in entries) + "]"
+
+
+class Simulator:
+    """Reference model; see the module docstring."""
+
+    def __init__(
+        self,
+        acls: Optional[dict[int, list[EntrySpec]]] = None,
+        dirs: Iterable[str] = (),
+        watchpoints: Optional[dict[str, Optional[bool]]] = None,
+        users: Optional[dict[str, int]] = None,
+        groups: Optional[dict[str, int]] = None,
+    ):
+        self.acls: dict[int, list[EntrySpec]] = {i: list(e) for i, e in (acls or {}).items()}
+        self.dirs = set(dirs)
+        self.watchpoints: dict[str, Optional[bool]] = dict(watchpoints or {})
+        self.users = users if users is not None else DEFAULT_PRINCIPALS
+        self.groups = groups if groups is not None else DEFAULT_PRINCIPALS
+        # Every ACL id the model has known; destroyed ones are expected absent
+        self.known: set[int] = set(self.acls)
+        self.high_water = max(self.acls, default=0)
+
+    def expect(self, command: Command) -> Optional[bool]:
+        """True/False if the console must accept/reject ``command``, None if unspecified."""
+        check = getattr(self, f"_check_{command.cmd}", None)
+        if check is None:
+            return None
+        opts, flags = split_args(command)
+        if len(command.args) != len(flags) + 2 * len(opts):
+            return None  # repeated options or a missing last value
+        return check(command.args, opts, flags)
+
+    def apply(self, command: Command) -> None:
+        """Perform ``command``, which the console accepted.
+
+        Raises ValueError if the model cannot follow (an unmodelled form, or
+        a result that breaks a documented invariant).
+        """
+        handler = getattr(self, f"_do_{command.cmd}", None)
+        if handler is None:
+            raise ValueError(f"{command.cmd} is not modelled")
+        opts, flags = split_args(command)
+        handler(command, opts, flags)
+
+    def state(self) -> State:
+        return State(
+            acls={i: tuple(e) for i, e in self.acls.items()},
+            watchpoints=dict(self.watchpoints),
+        )
+
+    # -------------------------------------------------------------------------
+    # Argument checks
+    # -------------------------------------------------------------------------
+
+    def _acl(self, opts: dict[str, str]) -> Optional[list[EntrySpec]]:
+        """Entries of the ACL named by ``-i`` (None: missing or not a valid id)."""
+        value = opts.get("-i", "")
+        if not _ACL_ID_RE.match(value):
+            return None
+        return self.acls.get(int(value))
+
+    @staticmethod
+    def _index(value: str, size: int) -> Optional[int]:
+        """1-based entry number if it names an existing entry."""
+        if not re.fullmatch(r"-?\d+", value):
+            return None
+        n = int(value)
+        return n if 1 <= n <= size else None
+
+    @staticmethod
+    def _principal_valid(value: str, known: dict[str, int]) -> Optional[bool]:
+        if value in known:
+            return True
+        if re.fullmatch(r"\d+", value):
+            return None  # existence depends on the target's passwd/group
+        return False
+
+    # -------------------------------------------------------------------------
+    # Per-command rules: _check_* predicts, _do_* performs
+    # -------------------------------------------------------------------------
+
+    def _check_acl_create(self, args, opts, flags):
+        return True if not args else None
+
+    def _do_acl_create(self, command, opts, flags):
+        acl_id = command.parse()["acl_id"]
+        if acl_id is None:
+            raise ValueError("acl_create printed no ACL ID")
+        if acl_id <= self.high_water:
+            raise ValueError(f"acl_create returned ACL ID {acl_id}, IDs must not be reused (last {self.high_water})")
+        self.acls[acl_id] = []
+        self.known.add(acl_id)
+        self.high_water = acl_id
+
+    def _check_acl_add(self, args, opts, flags):
+        if self._acl(opts) is None:
+            return False
+        if ("-a" in flags) == ("-d" in flags):
+            return False
+        principals = [o for o in ("-u", "-g", "-p") if o in opts]
+        if len(principals) != 1:
+            return False
+        if "-p" in opts:
+            return None  # depends on the authorized program list
+        known = self.users if "-u" in opts else self.groups
+        valid = self._principal_valid(opts[principals[0]], known)
+        if valid is not True:
+            return valid
+        mode = opts.get("-m", "")
+        if not mode or set(mode) - set("rwx"):
+            return None if mode.isdigit() else False
+        if len(set(mode)) != len(mode):
+            return None
+        if "-t" in opts:
+            m = _TIME_RE.match(opts["-t"])
+            if not m or m.group(1, 2, 3) >= m.group(4, 5, 6):
+                return None
+        return True
+
+    def _do_acl_add(self, command, opts, flags):
+        entries = self._acl(opts)
+        if entries is None or "-p" in opts:
+            raise ValueError(f"cannot model {command}")
+        option, known = ("-u", self.users) if "-u" in opts else ("-g", self.groups)
+        if opts[option] not in known:
+            raise ValueError(f"principal {opts[option]!r} is not known to the model")
+        principal = known[opts[option]]
+        entries.append(EntrySpec(allow="-a" in flags,
+                                 user=principal if option == "-u" else None,
+                                 group=principal if option == "-g" else None,
+                                 mode=opts.get("-m", ""), time=opts.get("-t")))
+
+    def _check_acl_remove(self, args, opts, flags):
+        entries = self._acl(opts)
+        if entries is None:
+            return False
+        selection = set(opts) - {"-i"} | flags
+        if "-A" in flags:
+            if selection != {"-A"}:
+                return False
+            return True if entries else None
+        if not selection:
+            return False
+        if selection == {"-e"}:
+            return self._index(opts["-e"], len(entries)) is not None
+        return None  # filtered removal: which entries go is not specified
+
+    def _do_acl_remove(self, command, opts, flags):
+        entries = self._acl(opts)
+        if entries is None:
+            raise ValueError(f"cannot model {command}")
+        if "-A" in flags:
+            entries.clear()
+        elif set(opts) == {"-i", "-e"} and not flags:
+            entries.pop(int(opts["-e"]) - 1)
+        else:
+            raise ValueError(f"filtered acl_remove is not modelled: {command}")
+
+    def _edit_target(self, entries: list, opts: dict[str, str]) -> tuple[Optional[int], Optional[int]]:
+        """(source, destination) positions, None where not valid."""
+        src = self._index(opts.get("-e", ""), len(entries))
+        pos = opts.get("-p", "")
+        if src is not None and pos in POSITIONS:
+            dst = POSITIONS[pos](len(entries), src)
+            return src, dst if 1 <= dst <= len(entries) else None
+        return src, self._index(pos, len(entries))
+
+    def _check_acl_edit(self, args, opts, flags):
+        entries = self._acl(opts)
+        if entries is None or "-e" not in opts or "-p" not in opts:
+            return False
+        src, dst = self._edit_target(entries, opts)
+        if src is None:
+            return False
+        pos = opts["-p"]
+        if pos in POSITIONS:
+            return True if dst is not None and dst != src else None
+        if pos.lower() in POSITIONS:
+            return None  # case sensitivity is not specified
+        return dst is not None and dst != src
+
+    def _do_acl_edit(self, command, opts, flags):
+        entries = self._acl(opts)
+        src, dst = self._edit_target(entries, opts) if entries is not None else (None, None)
+        if src is None:
+            raise ValueError(f"cannot model {command}")
+        if dst is not None:
+            entries.insert(dst - 1, entries.pop(src - 1))
+
+    def _check_acl_destroy(self, args, opts, flags):
+        entries = self._acl(opts)
+        if entries is None:
+            return False
+        return not entries or "-f" in flags
+
+    def _do_acl_destroy(self, command, opts, flags):
+        if self._acl(opts) is None:
+            raise ValueError(f"cannot model {command}")
+        del self.acls[int(opts["-i"])]
+
+    def _check_protect(self, args, opts, flags):
+        if "-dp" in opts or "-excl" in opts or flags:
+            return None
+        if opts.get("-d") not in self.dirs:
+            return False
+        if "-e" in opts and opts["-e"] not in ("yes", "no"):
+            return False
+        return None if opts["-d"] in self.watchpoints else True
+
+    def _do_protect(self, command, opts, flags):
+        if "-dp" in opts or "-excl" in opts or "-d" not in opts:
+            raise ValueError(f"pattern watchpoints are not modelled: {command}")
+        self.watchpoints[opts["-d"]] = opts["-e"] == "yes" if "-e" in opts else None
+
+    def _check_unprotect(self, args, opts, flags):
+        if "-dp" in opts or "-excl" in opts or flags:
+            return None
+        if opts.get("-d") not in self.dirs:
+            return False
+        return True if opts["-d"] in self.watchpoints else None
+
+    def _do_unprotect(self, command, opts, flags):
+        if "-dp" in opts or "-excl" in opts or "-d" not in opts:
+            raise ValueError(f"pattern watchpoints are not modelled: {command}")
+        self.watchpoints.pop(opts["-d"], None)
@@ -0,0 +1,151 @@
+"""
+Chrome trace-event timeline.
+
+Collects spans in the Chrome trace-event format (the JSON ``traceEvents``
+array understood by chrome://tracing and https://ui.perfetto.dev). Spans are
+written as complete ("X") events; the viewer nests spans on the same thread
+by time.
+
+Usage:
+    from helpers.executor import add_observer
+    from helpers.trace import Tracer
+
+    tracer = Tracer()
+    add_observer(tracer.observe)          # one span per executor command
+    tracer.patch_sleep()                  # one span per time.sleep()
+
+    with tracer.span("protect", "setup"):
+        ...
+
+    tracer.dump("reports/session_trace.json")
+"""
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Callable, Iterator, Optional, Union
+
+from .executor import CommandEvent
+
+
+class Tracer:
+    """Thread-safe collector of trace events."""
+
+    def __init__(self, process_name: str = "pytest"):
+        self.origin = time.perf_counter()
+        self.pid = os.getpid()
+        self.events: list[dict[str, Any]] = []
+        self._lock = threading.Lock()
+        self._tids: dict[int, int] = {}
+        self._real_sleep: Optional[Callable[[float], None]] = None
+        self._metadata("process_name", 0, {"name": process_name})
+
+    def _us(self, perf: float) -> float:
+        return round((perf - self.origin) * 1e6, 3)
+
+    def _tid(self, ident: Optional[int] = None) -> int:
+        """Small, stable thread ids in order of first appearance."""
+        ident = threading.get_ident() if ident is None else ident
+        tid = self._tids.get(ident)
+        if tid is None:
+            tid = self._tids[ident] = len(self._tids) + 1
+            name = "main" if ident == threading.main_thread().ident else f"thread-{tid}"
+            self._metadata("thread_name", tid, {"name": name})
+        return tid
+
+    def _metadata(self, name: str, tid: int, args: dict[str, Any]) -> None:
+        self.events.append({"name": name, "ph": "M", "pid": self.pid, "tid": tid, "args": args})
+
+    def complete(
+        self,
+        name: str,
+        cat: str,
+        start: float,
+        duration: float,
+        *,
+        thread: Optional[int] = None,
+        args: Optional[dict[str, Any]] = None,
+    ) -> None:
+        """Add a finished span. ``start`` is a ``time.perf_counter()`` value."""
+        with self._lock:
+            event = {
+                "name": name,
+                "cat": cat,
+                "ph": "X",
+                "ts": self._us(start),
+                "dur": round(duration * 1e6, 3),
+                "pid": self.pid,
+                "tid": self._tid(thread),
+            }
+            if args:
+                event["args"] = args
+            self.events.append(event)
+
+    def instant(self, name: str, cat: str, args: Optional[dict[str, Any]] = None) -> None:
+        with self._lock:
+            event = {
+                "name": name,
+                "cat": cat,
+                "ph": "i",
+                "s": "t",
+                "ts": self._us(time.perf_counter()),
+                "pid": self.pid,
+                "tid": self._tid(),
+            }
+            if args:
+                event["args"] = args
+            self.events.append(event)
+
+    @contextmanager
+    def span(self, name: str, cat: str, **args: Any) -> Iterator[None]:
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.complete(name, cat, start, time.perf_counter() - start, args=args or None)
+
+    def observe(self, event: CommandEvent) -> None:
+        """Executor observer: one span per command."""
+        self.complete(
+            event.subcommand,
+            "command",
+            event.start,
+            event.duration,
+            thread=event.thread_id,
+            args={"argv": " ".join(event.argv), "returncode": event.result.returncode},
+        )
+
+    def patch_sleep(self) -> None:
+        """Record every ``time.sleep()`` call as a span until ``restore_sleep()``."""
+        if self._real_sleep is not None:
+            return
+        real_sleep = self._real_sleep = time.sleep
+
+        def traced_sleep(seconds: float) -> None:
+            start = time.perf_counter()
+            try:
+                real_sleep(seconds)
+            finally:
+                self.complete(
+                    "sleep", "sleep", start, time.perf_counter() - start,
+                    args={"requested_s": seconds},
+                )
+
+        time.sleep = traced_sleep
+
+    def restore_sleep(self) -> None:
+        if self._real_sleep is not None:
+            time.sleep = self._real_sleep
+            self._real_sleep = None
+
+    def to_dict(self) -> dict[str, Any]:
+        with self._lock:
+            return {"traceEvents": list(self.events), "displayTimeUnit": "ms"}
+
+    def dump(self, path: Union[str, Path]) -> Path:
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps(self.to_dict()))
+        return path
@@ -0,0 +1,210 @@
+"""
+File I/O workload engine (fio-style, pure Python).
+
+Runs sequential or random reads and writes against one file with a fixed
+block size, a queue depth (worker threads issuing ``pread``/``pwrite`` on a
+shared descriptor; both release the GIL) and buffered or ``O_DIRECT`` I/O.
+Per-operation latencies go into a ``LatencyHistogram``.
+
+Patterns use fio's names: ``read``, ``write``, ``randread``, ``randwrite``.
+
+``O_DIRECT`` needs block-aligned offsets, sizes and buffers; buffers are
+anonymous mmaps, which are page aligned. Filesystems without ``O_DIRECT``
+support (tmpfs, some FUSE mounts) raise ``OSError(EINVAL)`` on open.
+
+Usage:
+    from helpers.workload import Workload, prepare_file, run_workload
+
+    path = prepare_file(os.path.join(encrypted_dir, "io.dat"), 256 * MB)
+    result = run_workload(path, Workload("randread", block_size=4096, queue_depth=8))
+    print(result.iops, result.mb_per_s, result.latency.percentile(99))
+"""
+import mmap
+import os
+import random
+import threading
+import time
+from dataclasses import asdict, dataclass
+from typing import Any, Optional
+
+from .corpus import MB, write_file
+from .metrics import LatencyHistogram
+
+PATTERNS = ("read", "write", "randread", "randwrite")
+
+_DIRECT = getattr(os, "O_DIRECT", 0)
+
+
+@dataclass(frozen=True)
+class Workload:
+    """One fio-style job.
+
+    Args:
+        pattern: read | write | randread | randwrite
+        block_size: Bytes per operation.
+        queue_depth: Concurrent workers (threads) issuing I/O.
+        direct: Open with O_DIRECT (bypass the page cache).
+        io_size: Bytes to transfer in total (default: the whole file once).
+        runtime: Stop after this many seconds, whichever comes first.
+        invalidate: Drop the file's cached pages before starting.
+        fsync: fsync after a write job (included in the elapsed time).
+        seed: Seed for random offsets.
+    """
+    pattern: str = "read"
+    block_size: int = 4096
+    queue_depth: int = 1
+    direct: bool = False
+    io_size: Optional[int] = None
+    runtime: Optional[float] = None
+    invalidate: bool = True
+    fsync: bool = True
+    seed: int = 0
+
+    def __post_init__(self):
+        if self.pattern not in PATTERNS:
+            raise ValueError(f"pattern must be one of {PATTERNS}, got {self.pattern!r}")
+        if self.block_size <= 0 or self.queue_depth <= 0:
+            raise ValueError("block_size and queue_depth must be positive")
+
+    @property
+    def is_write(self) -> bool:
+        return self.pattern.endswith("write")
+
+    @property
+    def is_random(self) -> bool:
+        return self.pattern.startswith("rand")
+
+    @property
+    def label(self) -> str:
+        mode = "direct" if self.direct else "buffered"
+        return f"{self.pattern}-bs{self.block_size}-qd{self.queue_depth}-{mode}"
+
+
+@dataclass
+class WorkloadResult:
+    """Outcome of one job."""
+    workload: Workload
+    ops: int
+    bytes: int
+    seconds: float
+    latency: LatencyHistogram
+
+    @property
+    def iops(self) -> float:
+        return self.ops / self.seconds if self.seconds > 0 else 0.0
+
+    @property
+    def mb_per_s(self) -> float:
+        return self.bytes / MB / self.seconds if self.seconds > 0 else 0.0
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "workload": asdict(self.workload),
+            "ops": self.ops,
+            "bytes": self.bytes,
+            "seconds": self.seconds,
+            "iops": self.iops,
+            "mb_per_s": self.mb_per_s,
+            "latency": self.latency.summary(),
+        }
+
+
+def prepare_file(path: str, size: int, seed: str = "workload") -> str:
+    """Lay out a file of random (incompressible) data for a job to run on."""
+    write_file(path, size, content="random", seed=seed)
+    return path
+
+
+class _Offsets:
+    """Hands out block offsets to workers until the byte budget is used."""
+
+    def __init__(self, workload: Workload, file_blocks: int):
+        self.bs = workload.block_size
+        self.blocks = file_blocks
+        self.remaining = (workload.io_size or file_blocks * self.bs) // self.bs
+        self.random = workload.is_random
+        self.deadline = (
+            time.perf_counter() + workload.runtime if workload.runtime else None
+        )
+        self._next = 0
+        self._lock = threading.Lock()
+
+    def take(self, rng: random.Random) -> Optional[int]:
+        with self._lock:
+            if self.remaining <= 0:
+                return None
+            self.remaining -= 1
+            block = self._next % self.blocks
+            self._next += 1
+        if self.deadline is not None and time.perf_counter() >= self.deadline:
+            return None
+        if self.random:
+            block = rng.randrange(self.blocks)
+        return block * self.bs
+
+
+def run_workload(path: str, workload: Workload) -> WorkloadResult:
+    """Run ``workload`` against the existing file ``path``."""
+    size = os.path.getsize(path)
+    blocks = size // workload.block_size
+    if blocks == 0:
+        raise ValueError(f"{path} is smaller than one block ({workload.block_size} bytes)")
+
+    flags = os.O_RDWR if workload.is_write else os.O_RDONLY
+    if workload.direct:
+        if not _DIRECT:
+            raise OSError("O_DIRECT is not available on this platform")
+        flags |= _DIRECT
+    fd = os.open(path, flags)
+    try:
+        if workload.invalidate and hasattr(os, "posix_fadvise"):
+            os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_DONTNEED)
+
+        offsets = _Offsets(workload, blocks)
+        histograms = [LatencyHistogram() for _ in range(workload.queue_depth)]
+        done = [0] * workload.queue_depth
+        errors: list[BaseException] = []
+
+        def worker(index: int) -> None:
+            rng = random.Random(f"{workload.seed}:{index}")
+            buf = mmap.mmap(-1, workload.block_size)
+            try:
+                if workload.is_write:
+                    buf.write(rng.randbytes(workload.block_size))
+                hist = histograms[index]
+                clock = time.perf_counter
+                while (offset := offsets.take(rng)) is not None:
+                    start = clock()
+                    if workload.is_write:
+                        n = os.pwritev(fd, [buf], offset)
+                    else:
+                        n = os.preadv(fd, [buf], offset)
+                    hist.record(clock() - start)
+                    done[index] += n
+            except BaseException as e:
+                errors.append(e)
+            finally:
+                buf.close()
+
+        threads = [
+            threading.Thread(target=worker, args=(i,), name=f"workload-{i}")
+            for i in range(workload.queue_depth)
+        ]
+        start = time.perf_counter()
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        if workload.is_write and workload.fsync:
+            os.fsync(fd)
+        elapsed = time.perf_counter() - start
+    finally:
+        os.close(fd)
+
+    if errors:
+        raise errors[0]
+
+    latency = LatencyHistogram()
+    for hist in histograms:
+        latency.merge(hist)
+    return WorkloadResult(workload, latency.count, sum(done), elapsed, latency)
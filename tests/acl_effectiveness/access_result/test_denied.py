@@ -9,14 +9,14 @@ from conftest import apply_acl
 class TestDeniedByEmptyACL:
     """Empty ACL denies all by default"""
 
-    def test_empty_acl_denies_read(self, protected_dir, empty_acl):
-        apply_acl(protected_dir, empty_acl)
+    def test_empty_acl_denies_read(self, protected_dir, shared_empty_acl):
+        apply_acl(protected_dir, shared_empty_acl)
 
         with pytest.raises(PermissionError):
             Path(protected_dir, "test.txt").read_text()
 
-    def test_empty_acl_denies_write(self, protected_dir, empty_acl):
-        apply_acl(protected_dir, empty_acl)
+    def test_empty_acl_denies_write(self, protected_dir, shared_empty_acl):
+        apply_acl(protected_dir, shared_empty_acl)
 
         with pytest.raises(PermissionError):
             Path(protected_dir, "new.txt").write_text("fail")
@@ -25,14 +25,14 @@ class TestDeniedByEmptyACL:
 class TestDeniedByExplicitDeny:
     """Explicit Deny entry denies access"""
 
-    def test_explicit_deny_blocks_read(self, protected_dir, deny_acl):
-        apply_acl(protected_dir, deny_acl)
+    def test_explicit_deny_blocks_read(self, protected_dir, shared_deny_acl):
+        apply_acl(protected_dir, shared_deny_acl)
 
         with pytest.raises(PermissionError):
             Path(protected_dir, "test.txt").read_text()
 
-    def test_explicit_deny_blocks_write(self, protected_dir, deny_acl):
-        apply_acl(protected_dir, deny_acl)
+    def test_explicit_deny_blocks_write(self, protected_dir, shared_deny_acl):
+        apply_acl(protected_dir, shared_deny_acl)
 
         with pytest.raises(PermissionError):
             Path(protected_dir, "test.txt").write_text("fail")
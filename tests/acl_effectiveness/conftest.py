@@ -2,13 +2,29 @@
 
 ACL cleanup is handled by the session-level purge_stale_acls fixture.
 Post-test state is preserved for manual inspection on failure.
+
+``shared_*`` fixtures hand one instance to every test in the session
+(ACLs) or module (``shared_protected_dir``). They are for tests that only
+read: after each test that used one, its fingerprint is checked and a change
+fails the test loudly (the object is then restored for later consumers).
 """
+import hashlib
 import pytest
 import os
 import tempfile
 import shutil
+from dataclasses import dataclass
 from pathlib import Path
-from helpers import QDocSE
+from typing import Callable
+from helpers import CommandError, QDocSE
+from helpers.batch import run_batch
+from helpers.commands import Command
+from helpers.reconcile import EntrySpec
+
+
+# Known plaintext long enough for a ciphertext verdict (helpers/ciphertext.py)
+BULK_FILE = "bulk.txt"
+BULK_PLAINTEXT = b"This data should be encrypted at rest. 0123456789\n" * 1024
 
 
 # =============================================================================
@@ -35,8 +51,9 @@ def protected_dir(temp_dir, request):
 
 @pytest.fixture
 def encrypted_dir(temp_dir, request):
-    """Protected and encrypted directory"""
+    """Protected and encrypted directory (secret.txt, plus BULK_FILE for ciphertext checks)"""
     Path(temp_dir, "secret.txt").write_text("secret content")
+    Path(temp_dir, BULK_FILE).write_bytes(BULK_PLAINTEXT)
     QDocSE.protect(temp_dir, encrypt=True).execute()
     QDocSE.push_config().execute()
     request.addfinalizer(lambda: QDocSE.unprotect(temp_dir).execute())
@@ -99,10 +116,205 @@ def deny_acl():
     return acl_id
 
 
+# =============================================================================
+# Shared Read-Only Fixtures
+# =============================================================================
+
+@dataclass
+class SharedObject:
+    """A shared fixture value plus how to fingerprint and restore it."""
+    name: str
+    probes: Callable[[], list[Command]]  # listings that make up the fingerprint
+    digest: Callable[[list[Command]], str]  # fingerprint from the executed probes
+    restore: Callable[[], None]
+    fingerprint: str = ""
+
+
+_shared: dict[str, SharedObject] = {}
+_broken: dict[str, str] = {}  # name -> why it can no longer be shared
+
+
+def _fingerprints(objects):
+    """Current fingerprint of each object, all probes in one batch."""
+    probes = [obj.probes() for obj in objects]
+    run_batch([c for group in probes for c in group])
+    return [obj.digest([c.ok() for c in group]) for obj, group in zip(objects, probes)]
+
+
+def _register(obj):
+    obj.fingerprint = _fingerprints([obj])[0]
+    _shared[obj.name] = obj
+    _broken.pop(obj.name, None)
+    return obj
+
+
+def _shared_acl(name, entries):
+    """Session-wide ACL with ``entries``; returns its id."""
+    acl_id = QDocSE.acl_create().execute().ok().parse()["acl_id"]
+
+    def fill():
+        for e in entries:
+            e.command(acl_id).execute().ok()
+        QDocSE.push_config().execute().ok()
+
+    def restore():
+        QDocSE.acl_remove(acl_id, all=True).execute().ok()
+        fill()
+
+    def digest(probes):
+        acls = probes[0].parse()["acls"]
+        listed = [[EntrySpec.from_parsed(e) for e in a["entries"]] for a in acls]
+        return hashlib.sha256(repr(listed).encode()).hexdigest()
+
+    fill()
+    _register(SharedObject(name, lambda: [QDocSE.acl_list(acl_id)], digest, restore))
+    return acl_id
+
+
+def _shared_dir(name, filename, content, encrypt):
+    """Protected directory with one file; returns (path, teardown)."""
+    path = tempfile.mkdtemp(prefix="acl_shared_")
+
+    def protect():
+        Path(path, filename).write_text(content)
+        QDocSE.protect(path, encrypt=encrypt).execute().ok()
+        QDocSE.push_config().execute().ok()
+
+    def restore():
+        QDocSE.unprotect(path).execute()
+        QDocSE.push_config().execute()
+        for child in Path(path).iterdir():
+            shutil.rmtree(child) if child.is_dir() else child.unlink()
+        protect()
+
+    def digest(probes):
+        watchpoints = [wp for wp in probes[0].parse()["watchpoints"] if wp["path"] == path]
+        files = sorted((os.path.relpath(os.path.join(root, f), path), os.lstat(os.path.join(root, f)).st_size)
+                       for root, _, names in os.walk(path) for f in names)
+        return hashlib.sha256(repr((watchpoints, files)).encode()).hexdigest()
+
+    def teardown():
+        _shared.pop(name, None)
+        QDocSE.unprotect(path).execute()
+        QDocSE.push_config().execute()
+        shutil.rmtree(path, ignore_errors=True)
+
+    protect()
+    _register(SharedObject(name, lambda: [QDocSE.view().watchpoints()], digest, restore))
+    return path, teardown
+
+
+def _drop(obj, reason):
+    """Stop handing out ``obj``: later consumers fail at setup with ``reason``."""
+    _shared.pop(obj.name, None)
+    _broken[obj.name] = reason
+
+
+@pytest.hookimpl(tryfirst=True)
+def pytest_runtest_setup(item):
+    for name in getattr(item, "fixturenames", ()):
+        if name in _broken:
+            pytest.fail(f"Shared fixture {name} is broken: {_broken[name]}", pytrace=False)
+
+
+@pytest.hookimpl(hookwrapper=True)
+def pytest_runtest_makereport(item, call):
+    """Fail a test that changed a shared fixture, then restore the fixture.
+
+    Checked right after the call phase, while the fixtures are still set up,
+    so the test itself is reported failed rather than erroring at teardown.
+    A CommandError while checking or restoring fails the test instead of
+    escaping the hook, and the object is dropped for later consumers.
+    """
+    outcome = yield
+    if call.when != "call":
+        return
+    used = [_shared[n] for n in getattr(item, "fixturenames", ()) if n in _shared]
+    if not used:
+        return
+    problems = []
+    try:
+        changed = [obj for obj, fp in zip(used, _fingerprints(used)) if fp != obj.fingerprint]
+    except CommandError as e:
+        changed = []
+        problems.append(f"Cannot fingerprint shared fixture(s) {', '.join(o.name for o in used)}: {e}")
+        for obj in used:
+            _drop(obj, f"fingerprint failed: {e}")
+    for obj in changed:
+        try:
+            obj.restore()
+            obj.fingerprint = _fingerprints([obj])[0]
+            problems.append(f"Read-only test changed shared fixture {obj.name} (restored for later tests)")
+        except CommandError as e:
+            _drop(obj, f"restore failed: {e}")
+            problems.append(f"Read-only test changed shared fixture {obj.name}; restore failed: {e}")
+    report = outcome.get_result()
+    if problems and report.passed:
+        report.outcome = "failed"
+        report.longrepr = "\n".join(problems)
+    elif problems:
+        report.sections.append(("Shared fixtures", "\n".join(problems)))
+
+
+@pytest.fixture(scope="session")
+def shared_empty_acl():
+    """Empty ACL (default deny), shared read-only"""
+    return _shared_acl("shared_empty_acl", [])
+
+
+@pytest.fixture(scope="session")
+def shared_allow_r_acl():
+    """Allow read, shared read-only"""
+    return _shared_acl("shared_allow_r_acl", [EntrySpec(user=os.getuid(), mode="r")])
+
+
+@pytest.fixture(scope="session")
+def shared_allow_rw_acl():
+    """Allow read and write, shared read-only"""
+    return _shared_acl("shared_allow_rw_acl", [EntrySpec(user=os.getuid(), mode="rw")])
+
+
+@pytest.fixture(scope="session")
+def shared_allow_rwx_acl():
+    """Allow all permissions, shared read-only"""
+    return _shared_acl("shared_allow_rwx_acl", [EntrySpec(user=os.getuid(), mode="rwx")])
+
+
+@pytest.fixture(scope="session")
+def shared_deny_acl():
+    """Deny current user, shared read-only"""
+    return _shared_acl("shared_deny_acl", [EntrySpec(allow=False, user=os.getuid(), mode="rwx")])
+
+
+@pytest.fixture(scope="module")
+def shared_protected_dir():
+    """Protected directory (not encrypted), shared read-only within the module.
+
+    acl_file associations are not visible in any listing, so the fingerprint
+    cannot see apply_acl: tests that apply an ACL need protected_dir.
+    """
+    path, teardown = _shared_dir("shared_protected_dir", "test.txt", "test content", encrypt=False)
+    yield path
+    teardown()
+
+
 # =============================================================================
 # Helper Functions
 # =============================================================================
 
+def read_ciphertext(path):
+    """Raw stored bytes of ``path``, read in inspector access mode.
+
+    Inspector mode only exposes ciphertext to a CAP_DAC_OVERRIDE account
+    that the file's ACL denies; otherwise the read is decrypted as usual.
+    """
+    QDocSE.set_access("inspector").execute().ok()
+    try:
+        return Path(path).read_bytes()
+    finally:
+        QDocSE.set_access("normal").execute()
+
+
 def apply_acl(directory, acl_id):
     """Apply ACL to directory"""
     QDocSE.acl_file(directory, user_acl=acl_id).execute().ok()
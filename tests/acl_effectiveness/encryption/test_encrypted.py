@@ -1,7 +1,8 @@
 """ACL Control for Encrypted Files"""
 import pytest
 from pathlib import Path
-from conftest import apply_acl
+from conftest import BULK_PLAINTEXT, apply_acl, read_ciphertext
+from helpers.ciphertext import assert_ciphertext
 
 
 class TestEncryptedFile:
@@ -29,6 +30,15 @@ class TestEncryptedFile:
         
         with pytest.raises(PermissionError):
             Path(encrypted_dir, "secret.txt").read_text()
+    
+    @pytest.mark.requires_cap("CAP_DAC_OVERRIDE")
+    def test_new_file_stored_as_ciphertext(self, encrypted_dir, deny_acl):
+        """Data written into the directory is stored encrypted"""
+        new_file = Path(encrypted_dir) / "new_bulk.txt"
+        new_file.write_bytes(BULK_PLAINTEXT)
+        apply_acl(encrypted_dir, deny_acl)
+        
+        assert_ciphertext(read_ciphertext(new_file), plaintext=BULK_PLAINTEXT[:64])
 
 
 class TestUnencryptedFile:
@@ -46,11 +46,8 @@ class TestNoMatchFallthrough:
 class TestACLIDZero:
     """ACL ID 0 (built-in allow)"""
     
-    def test_default_allows(self, protected_dir):
+    def test_default_allows(self, shared_protected_dir):
         """Uses default (ID 0) allow access when ACL not specified"""
-        # Only protect, do not set ACL
-        QDocSE.protect(protected_dir, encrypt=False).execute()
-        QDocSE.push_config().execute()
-        
-        content = Path(protected_dir, "test.txt").read_text()
+        # Protected only, no ACL set
+        content = Path(shared_protected_dir, "test.txt").read_text()
         assert content == "test content"
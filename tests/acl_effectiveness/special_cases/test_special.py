@@ -2,23 +2,17 @@
 import pytest
 from pathlib import Path
 from helpers import QDocSE
+from helpers.ciphertext import assert_ciphertext
 
 
 class TestACLIDZero:
     """ACL ID 0 (built-in allow access)"""
     
-    def test_default_uses_acl_zero(self, protected_dir):
+    def test_default_uses_acl_zero(self, shared_protected_dir):
         """Uses ID 0 when ACL not specified"""
-        # Only protect, do not set ACL
-        QDocSE.protect(protected_dir, encrypt=False).execute()
-        QDocSE.push_config().execute()
-        
-        try:
-            # Default should allow access
-            content = Path(protected_dir, "test.txt").read_text()
-            assert content == "test content"
-        finally:
-            QDocSE.unprotect(protected_dir).execute()
+        # Protected only, no ACL set: default should allow access
+        content = Path(shared_protected_dir, "test.txt").read_text()
+        assert content == "test content"
     
     def test_cannot_modify_acl_zero(self):
         """Cannot modify ACL ID 0"""
@@ -37,17 +31,12 @@ class TestInspectorMode:
     @pytest.mark.requires_cap("CAP_DAC_OVERRIDE")
     def test_inspector_allows_ciphertext_read(self, encrypted_dir, deny_acl, request):
         """Inspector mode allows reading ciphertext"""
-        from conftest import apply_acl
+        from conftest import BULK_FILE, BULK_PLAINTEXT, apply_acl, read_ciphertext
         
         apply_acl(encrypted_dir, deny_acl)
-        QDocSE.set_access("inspector").execute()
         
-        try:
-            content = Path(encrypted_dir, "secret.txt").read_bytes()
-            # Should be ciphertext (not plaintext)
-            assert len(content) > 0
-        finally:
-            QDocSE.set_access("normal").execute()
+        content = read_ciphertext(Path(encrypted_dir, BULK_FILE))
+        assert_ciphertext(content, plaintext=BULK_PLAINTEXT[:64])
     
     def test_normal_mode_denies_blocked_user(self, encrypted_dir, deny_acl, request):
         """Normal mode denies blocked user"""
@@ -12,6 +12,7 @@ import time
 from datetime import datetime, timedelta
 from pathlib import Path
 from helpers import QDocSE
+from helpers.acl_oracle import ACLOracle
 
 
 def cleanup(acl_id):
@@ -114,9 +115,6 @@ class TestMidnightCrossing:
         
         Note: This test assumes current time is inside or outside window
         """
-        now = datetime.now()
-        current_hour = now.hour
-        
         # Create 22:00-02:00 window
         acl_id = QDocSE.acl_create().execute().ok().parse()["acl_id"]
         QDocSE.acl_add(acl_id, allow=True, user=os.getuid(), mode="rw") \
@@ -126,10 +124,9 @@ class TestMidnightCrossing:
             QDocSE.acl_file(protected_dir, user_acl=acl_id).execute()
             QDocSE.push_config().execute()
             
-            # Determine if currently inside window
-            in_window = current_hour >= 22 or current_hour < 2
+            expected = ACLOracle.load(acl_id).allowed(os.getuid(), os.getgroups(), mode="r")
             
-            if in_window:
+            if expected:
                 content = Path(protected_dir, "test.txt").read_text()
                 assert content is not None
             else:
@@ -143,9 +140,6 @@ class TestMidnightCrossing:
         """
         Comparison test: normal window not crossing midnight
         """
-        now = datetime.now()
-        current_hour = now.hour
-        
         # Create 09:00-17:00 window
         acl_id = QDocSE.acl_create().execute().ok().parse()["acl_id"]
         QDocSE.acl_add(acl_id, allow=True, user=os.getuid(), mode="rw") \
@@ -155,10 +149,9 @@ class TestMidnightCrossing:
             QDocSE.acl_file(protected_dir, user_acl=acl_id).execute()
             QDocSE.push_config().execute()
             
-            # Determine if currently inside window
-            in_window = 9 <= current_hour < 17
+            expected = ACLOracle.load(acl_id).allowed(os.getuid(), os.getgroups(), mode="r")
             
-            if in_window:
+            if expected:
                 content = Path(protected_dir, "test.txt").read_text()
                 assert content is not None
             else:
@@ -0,0 +1,84 @@
+"""
+Integration Tests - Bulk ACL Provisioning via acl_import
+
+Pins helpers.acl_export against the real console: the calibrated layout must
+decode what acl_export writes, and a synthesized file must be accepted by
+acl_import and show up in acl_list.
+
+Note:
+- acl_import replaces the whole ACL configuration; each test exports the
+  current configuration first and re-imports it afterwards
+- calibration adds and destroys a few ACLs (see CALIBRATION_PLAN)
+"""
+import pytest
+from helpers import QDocSE
+from helpers.acl_export import (
+    ACLRecord, EntryRecord, ExportFormatError, export_bytes, load_layout, parse_export, provision,
+)
+from helpers.executor import get_executor
+
+pytestmark = [
+    pytest.mark.requires_mode("elevated", "learning"),
+    pytest.mark.requires_license("A"),
+]
+
+BULK_ACLS = 1000
+
+
+@pytest.fixture(scope="module")
+def layout():
+    try:
+        return load_layout(refresh=True)
+    except ExportFormatError as e:
+        pytest.skip(f"Export format does not fit the fixed-record model: {e}")
+
+
+@pytest.fixture
+def restore_config(layout):
+    """Re-import the configuration as it was before the test."""
+    backup = export_bytes()
+    yield
+    path = "/tmp/qdocse_acl_restore.acl"
+    get_executor().write_file(path, backup)
+    QDocSE.acl_import(path).execute().ok()
+    QDocSE.push_config().execute()
+    get_executor().run(["rm", "-f", path], timeout=10)
+
+
+@pytest.mark.integration
+class TestACLExportLayout:
+    """Calibrated layout vs. real acl_export output."""
+
+    def test_reader_matches_acl_list(self, layout, restore_config, some_valid_uids):
+        acl_id = QDocSE.acl_create().execute().ok().parse()["acl_id"]
+        QDocSE.acl_add(acl_id, allow=True, user=some_valid_uids[0], mode="rw").execute().ok()
+        QDocSE.acl_add(acl_id, allow=False, group=0, mode="x").execute().ok()
+
+        decoded = {a.acl_id: a for a in parse_export(export_bytes(), layout)}
+        listing = QDocSE.acl_list().execute().ok().parse()["acls"]
+        assert sorted(decoded) == sorted(a["acl_id"] for a in listing)
+        assert decoded[acl_id].entries == [
+            EntryRecord(True, user=some_valid_uids[0], mode="rw"),
+            EntryRecord(False, group=0, mode="x"),
+        ]
+
+
+@pytest.mark.integration
+@pytest.mark.slow
+class TestBulkProvision:
+    """One acl_import instead of thousands of acl_create/acl_add calls."""
+
+    def test_bulk_import(self, layout, restore_config):
+        acls = [
+            ACLRecord(10000 + i, [EntryRecord(True, user=400000 + i, mode="r"),
+                                  EntryRecord(False, user=400000 + i, mode="w")])
+            for i in range(BULK_ACLS)
+        ]
+        configured = provision(acls, layout, keep_existing=True)
+        QDocSE.push_config().execute().ok()
+
+        listing = QDocSE.acl_list().execute().ok().parse()["acls"]
+        assert len(listing) == len(configured)
+        by_id = {a["acl_id"]: a for a in listing}
+        sample = by_id[10000 + BULK_ACLS - 1]
+        assert [e["user"] for e in sample["entries"]] == [400000 + BULK_ACLS - 1] * 2
@@ -0,0 +1,54 @@
+"""
+QDocSEConsole Argument Fuzzing
+
+Runs helpers.fuzz against the local console for ``--fuzz-seconds`` and fails
+if any input crashed it (signal) or hung it. Unique crashes with their
+minimized command lines go to reports/fuzz/crashes.json; the exec rate is
+shown in the "QDocSE fuzzing" terminal summary.
+
+Run:
+    pytest tests/integration/test_console_fuzz.py --fuzz-seconds=300
+"""
+import json
+import shutil
+
+import pytest
+from fixtures.metrics import REPORTS_DIR
+from helpers.commands import Command
+from helpers.fuzz import SAFE_SUBCOMMANDS, derive_grammar, fuzz
+
+pytestmark = pytest.mark.fuzz
+
+
+def test_console_survives_fuzzing(pytestconfig, tmp_path, fuzz_summary):
+    if pytestconfig.getoption("--target") != "local":
+        pytest.skip("fuzzing execs the console directly; use --target local")
+    if shutil.which(Command.EXECUTABLE) is None:
+        pytest.skip(f"{Command.EXECUTABLE} not installed")
+    subcommands = list(derive_grammar()) if pytestconfig.getoption("--fuzz-all-commands") else SAFE_SUBCOMMANDS
+
+    report = fuzz(
+        seconds=pytestconfig.getoption("--fuzz-seconds"),
+        scratch=str(tmp_path),
+        subcommands=subcommands,
+        workers=pytestconfig.getoption("--fuzz-workers"),
+    )
+
+    out = REPORTS_DIR / "fuzz" / "crashes.json"
+    out.parent.mkdir(parents=True, exist_ok=True)
+    out.write_text(json.dumps({
+        "execs": report.execs,
+        "execs_per_second": round(report.per_second),
+        "crashes": [
+            {"kind": c.key[0], "signal": c.key[1], "stderr": c.stderr[:2000], "count": c.count,
+             "argv": c.argv, "minimized": c.minimized}
+            for c in report.crashes.values()
+        ],
+    }, indent=2))
+    fuzz_summary.append(
+        f"{report.execs} execs, {report.per_second:.0f}/s, {len(report.crashes)} unique crash(es); details: {out}")
+
+    assert not report.crashes, "\n".join(
+        f"{c.key[0]} {c.key[1]} x{c.count}: {Command.EXECUTABLE} {' '.join(c.minimized or c.argv)}"
+        for c in report.crashes.values()
+    ) + f"\nDetails: {out}"
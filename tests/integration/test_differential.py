@@ -0,0 +1,26 @@
+"""
+Differential Test - QDocSEConsole vs. the reference model
+
+Runs seeded random sequences of acl_create/add/remove/edit/destroy and
+protect/unprotect against the console and helpers.simulator, comparing the
+outcome and the parsed acl_list / view -w state after every step. A failure
+shows the shrunk, minimal command sequence.
+
+Every case uses its own ACLs and scratch directories and removes them again.
+"""
+import pytest
+from helpers.differential import check
+
+pytestmark = [
+    pytest.mark.integration,
+    pytest.mark.requires_mode("elevated", "learning"),
+]
+
+CASES = 50
+LENGTH = 20
+
+
+@pytest.mark.parametrize("seed", [0, 1])
+def test_console_matches_model(seed):
+    failure = check(cases=CASES, length=LENGTH, seed=seed)
+    assert failure is None, failure.report()
@@ -0,0 +1,166 @@
+"""
+ACL Evaluation Cost Benchmark
+
+Measures how open() latency on a protected file grows with ACL length and
+with the position of the entry that decides access. Entries are evaluated
+first-match (see entry_order/), so a request that only matches the last of
+N entries, or none, pays for scanning all N.
+
+For each entry count (1, 10, 100, 1,000, 10,000) one user ACL is built with
+N-1 filler entries for other UIDs plus one "Allow <current uid> r" entry.
+The matching entry is then moved with acl_edit so the same ACL is measured
+with it first, in the middle and last; finally it is replaced by a filler
+(absent: default Deny, open() fails with EACCES after a full scan).
+
+Each placement is timed over many os.open()/os.close() repetitions. The
+report gives p50/p99/mean latency and ``ns_per_entry``: extra mean latency
+over the 1-entry allow baseline divided by the entries scanned before the decision.
+
+Results: reports/benchmarks/acl_eval_cost.json plus a latency-vs-entries plot.
+
+Run:
+    pytest tests/performance/test_acl_eval_cost.py --benchmark --bench-scale=medium
+"""
+import os
+import shutil
+import tempfile
+import time
+from pathlib import Path
+
+import pytest
+from helpers import QDocSE
+from helpers.bench import BenchReport
+from helpers.metrics import LatencyHistogram
+
+pytestmark = [
+    pytest.mark.benchmark,
+    pytest.mark.slow,
+    pytest.mark.requires_mode("elevated", "learning"),
+    pytest.mark.requires_license("A"),
+]
+
+ENTRY_COUNTS = {
+    "small": [1, 10, 100, 1000],
+    "medium": [1, 10, 100, 1000, 10000],
+    "full": [1, 10, 100, 1000, 10000],
+}
+REPETITIONS = {"small": 2000, "medium": 10000, "full": 50000}
+WARMUP = 200
+
+# Filler UIDs: numeric, distinct, never the current user
+FILLER_UID_BASE = 200000
+
+
+@pytest.fixture(scope="module")
+def eval_report():
+    report = BenchReport("acl_eval_cost")
+    yield report
+
+    # With one entry every placement but "absent" is the same ACL
+    base = [r for r in report.select("open", entries=1) if r.params["position"] != "absent"]
+    if base:
+        base_mean = base[0].extra["mean_ns"]
+        for r in report.select("open"):
+            scanned = r.extra["scanned"]
+            if scanned > 1:
+                r.extra["ns_per_entry"] = (r.extra["mean_ns"] - base_mean) / (scanned - 1)
+    report.dump()
+    report.plot("entries", "p50_ns", "position", operation="open")
+
+
+@pytest.fixture(scope="module")
+def protected_file():
+    """Module-wide protected directory with one file to open."""
+    root = tempfile.mkdtemp(prefix="qdocse_acl_eval_")
+    target = Path(root, "hot.dat")
+    target.write_bytes(b"\0" * 4096)
+    QDocSE.protect(root, encrypt=False).execute().ok()
+    QDocSE.push_config().execute().ok()
+    yield root, str(target)
+    QDocSE.unprotect(root).execute()
+    QDocSE.push_config().execute()
+    shutil.rmtree(root, ignore_errors=True)
+
+
+def _filler_uid(i):
+    uid = FILLER_UID_BASE + i
+    return uid + 1 if uid == os.getuid() else uid
+
+
+def _build_acl(entries):
+    """ACL with entries-1 fillers followed by the matching entry (entry N)."""
+    acl_id = QDocSE.acl_create().execute().ok().parse()["acl_id"]
+    for i in range(entries - 1):
+        QDocSE.acl_add(acl_id, allow=True, user=_filler_uid(i), mode="r").execute().ok()
+    QDocSE.acl_add(acl_id, allow=True, user=os.getuid(), mode="r").execute().ok()
+    return acl_id
+
+
+def _time_open(path, repetitions):
+    """Latency histogram of open()+close(); EACCES counts as a completed evaluation."""
+    hist = LatencyHistogram(significant_digits=3)
+    clock = time.perf_counter_ns
+    for i in range(WARMUP + repetitions):
+        start = clock()
+        try:
+            os.close(os.open(path, os.O_RDONLY))
+        except PermissionError:
+            pass
+        elapsed = clock() - start
+        if i >= WARMUP:
+            hist.record(elapsed / 1e9)
+    return hist
+
+
+class TestACLEvalCost:
+    """open() latency by ACL length and matching-entry position."""
+
+    def test_open_latency(self, protected_file, bench_scale, eval_report):
+        root, path = protected_file
+        reps = REPETITIONS[bench_scale]
+
+        for entries in ENTRY_COUNTS[bench_scale]:
+            acl_id = _build_acl(entries)
+            try:
+                QDocSE.acl_file(root, user_acl=acl_id).execute().ok()
+                self._measure_placements(acl_id, entries, path, reps, eval_report)
+            finally:
+                QDocSE.acl_destroy(acl_id, force=True).execute()
+                QDocSE.push_config().execute()
+
+    @staticmethod
+    def _measure_placements(acl_id, entries, path, reps, report):
+        # (position, 1-based index of the matching entry); N=1 has one placement
+        placements = [("last", entries), ("middle", entries // 2 + 1), ("first", 1), ("absent", None)]
+        current = entries
+        seen = set()
+        for name, index in placements:
+            if name == "absent":
+                QDocSE.acl_remove(acl_id, entry=current).execute().ok()
+                QDocSE.acl_add(acl_id, allow=True, user=_filler_uid(entries), mode="r").execute().ok()
+                scanned = entries
+            else:
+                if index in seen:
+                    continue
+                seen.add(index)
+                if index != current:
+                    QDocSE.acl_edit(acl_id, entry=current, position=index).execute().ok()
+                    current = index
+                scanned = index
+            QDocSE.push_config().execute().ok()
+
+            if name != "absent":
+                Path(path).read_bytes()  # the placement must really allow reads
+
+            hist = _time_open(path, reps)
+            report.add(
+                "open", {"entries": entries, "position": name},
+                hist.total,
+                extra={
+                    "scanned": scanned,
+                    "repetitions": hist.count,
+                    "mean_ns": hist.mean * 1e9,
+                    "p50_ns": hist.percentile(50) * 1e9,
+                    "p99_ns": hist.percentile(99) * 1e9,
+                },
+            )
@@ -0,0 +1,125 @@
+"""
+Encryption Throughput Benchmark
+
+Measures encrypt / unencrypt throughput (MB/s, files/s) across thread counts
+(-t 1..N) on deterministic corpora:
+
+- tiny:  many small files (per-file overhead dominates)
+- huge:  a few very large files (cipher and disk bandwidth dominate)
+- mixed: log-uniform sizes; at --bench-scale=full this is the User Guide's
+         reference workload of ~2000 files / 10 GB
+
+PDF reference (Encryption time estimate): 10 GB over 2000 files takes about
+32 s including ~0.9 s file overhead on a 2-core CentOS 7.6 VM. The mixed
+corpus records that figure alongside our own numbers for comparison.
+
+Each corpus is generated once per module; encrypt and unencrypt alternate
+so every thread count starts from the same plaintext. Results go to
+reports/benchmarks/encrypt_throughput.json with MB/s-vs-threads plots.
+
+Run:
+    pytest tests/performance/test_encrypt_throughput.py --benchmark --bench-scale=medium
+"""
+import shutil
+import tempfile
+
+import pytest
+from helpers import QDocSE
+from helpers.bench import MB, BenchReport, timed
+from helpers.corpus import GB, KB, CorpusSpec, generate
+
+pytestmark = [
+    pytest.mark.benchmark,
+    pytest.mark.slow,
+    pytest.mark.requires_mode("elevated", "learning"),
+    pytest.mark.requires_license("A"),
+]
+
+# name -> CorpusSpec keyword arguments
+CORPORA = {
+    "small": {
+        "tiny": dict(files=500, max_size=4 * KB),
+        "huge": dict(files=2, max_size=64 * MB),
+        "mixed": dict(files=200, distribution="loguniform", min_size=KB,
+                      max_size=64 * MB, total_size=256 * MB),
+    },
+    "medium": {
+        "tiny": dict(files=5000, max_size=4 * KB),
+        "huge": dict(files=4, max_size=1 * GB),
+        "mixed": dict(files=2000, distribution="loguniform", min_size=KB,
+                      max_size=512 * MB, total_size=2 * GB),
+    },
+    "full": {
+        "tiny": dict(files=50000, max_size=4 * KB),
+        "huge": dict(files=4, max_size=8 * GB),
+        "mixed": dict(files=2000, distribution="loguniform", min_size=KB,
+                      max_size=2560 * MB, total_size=10 * GB),
+    },
+}
+
+GUIDE_MB_PER_S = 10 * 1024 / 32
+GUIDE_FILES_OVERHEAD_S = 0.9 / 2000
+
+# Generous per-command timeout: assume at least 20 MB/s plus 10 ms per file
+MIN_TIMEOUT = 300
+
+
+@pytest.fixture(scope="module")
+def encrypt_report():
+    report = BenchReport("encrypt_throughput")
+    yield report
+    report.dump()
+    for op in ("encrypt", "unencrypt"):
+        if report.select(op):
+            report.plot("threads", "mb_per_s", "corpus", operation=op)
+            report.plot("threads", "files_per_s", "corpus", operation=op)
+
+
+@pytest.fixture(scope="module", params=["tiny", "huge", "mixed"])
+def corpus(request, bench_scale):
+    """Deterministic corpus directory: (name, path, total bytes, file count)."""
+    name = request.param
+    spec = CorpusSpec(depth=1, fanout=16, seed=f"{name}-{bench_scale}",
+                      **CORPORA[bench_scale][name])
+
+    root = tempfile.mkdtemp(prefix=f"qdocse_bench_{name}_")
+    request.addfinalizer(lambda: shutil.rmtree(root, ignore_errors=True))
+    manifest = generate(root, spec)
+    return name, root, manifest.total_size, len(manifest.entries)
+
+
+def _timeout(total_bytes, files):
+    return max(MIN_TIMEOUT, int(total_bytes / (20 * MB) + files * 0.01))
+
+
+class TestEncryptThroughput:
+    """encrypt / unencrypt scaling across -t values."""
+
+    def test_thread_scaling(self, corpus, bench_threads, encrypt_report):
+        name, root, total, files = corpus
+        timeout = _timeout(total, files)
+
+        for threads in bench_threads:
+            with timed() as t:
+                QDocSE.encrypt(root).threads(threads).execute(timeout=timeout).ok()
+            enc = encrypt_report.add(
+                "encrypt", {"corpus": name, "threads": threads},
+                t.seconds, bytes=total, files=files,
+            )
+
+            with timed() as t:
+                QDocSE.unencrypt(root).threads(threads).execute(timeout=timeout).ok()
+            encrypt_report.add(
+                "unencrypt", {"corpus": name, "threads": threads},
+                t.seconds, bytes=total, files=files,
+            )
+
+            if name == "mixed":
+                enc.extra["guide_mb_per_s"] = GUIDE_MB_PER_S
+                enc.extra["guide_expected_s"] = (
+                    total / MB / GUIDE_MB_PER_S + files * GUIDE_FILES_OVERHEAD_S
+                )
+
+        base = encrypt_report.select("encrypt", corpus=name, threads=bench_threads[0])[0]
+        for r in encrypt_report.select("encrypt", corpus=name):
+            r.extra["speedup"] = base.seconds / r.seconds if r.seconds else None
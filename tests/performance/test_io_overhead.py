@@ -0,0 +1,133 @@
+"""
+TDE / ACL I/O Overhead Benchmark
+
+Runs the same fio-style jobs (helpers.workload) against three directories on
+the same filesystem:
+
+- plain:     unprotected control directory
+- protected: protected_dir (ACL enforcement, no encryption)
+- encrypted: encrypted_dir (ACL enforcement + transparent encryption)
+
+Jobs cover sequential 1 MiB and random 4 KiB reads and writes, at queue depth
+1 and 8, buffered and O_DIRECT. Each result records IOPS, MB/s and latency
+percentiles; protected and encrypted rows also get ``relative_to_plain``
+(throughput ratio against the control) so overhead can be tracked per release.
+
+O_DIRECT jobs are skipped where the filesystem rejects O_DIRECT (EINVAL); the
+skipped jobs are listed under ``meta.o_direct_unsupported`` and warned about.
+
+Results: reports/benchmarks/io_overhead.json plus IOPS-vs-queue-depth plots.
+
+Run:
+    pytest tests/performance/test_io_overhead.py --benchmark --bench-scale=medium
+"""
+import dataclasses
+import errno
+import os
+import warnings
+
+import pytest
+from helpers.bench import MB, BenchReport
+from helpers.corpus import GB, KB
+from helpers.workload import Workload, prepare_file, run_workload
+
+pytestmark = [
+    pytest.mark.benchmark,
+    pytest.mark.slow,
+    pytest.mark.requires_mode("elevated", "learning"),
+]
+
+FILE_SIZE = {"small": 64 * MB, "medium": 512 * MB, "full": 4 * GB}
+
+# Cap random jobs so they finish in bounded time on slow targets
+RANDOM_IO_SIZE = 32 * MB
+RUNTIME = 30.0
+
+JOBS = [
+    Workload("read", block_size=1 * MB),
+    Workload("write", block_size=1 * MB),
+    Workload("randread", block_size=4 * KB, queue_depth=1),
+    Workload("randread", block_size=4 * KB, queue_depth=8),
+    Workload("randwrite", block_size=4 * KB, queue_depth=1),
+    Workload("randwrite", block_size=4 * KB, queue_depth=8),
+    Workload("read", block_size=1 * MB, direct=True),
+    Workload("randread", block_size=4 * KB, queue_depth=8, direct=True),
+]
+
+TARGETS = ["plain", "protected", "encrypted"]
+
+
+@pytest.fixture(scope="module")
+def io_report():
+    report = BenchReport("io_overhead")
+    yield report
+
+    for r in report.results:
+        if r.params["target"] == "plain":
+            continue
+        base = report.select(r.operation, target="plain", job=r.params["job"])
+        if base and base[0].seconds and r.seconds:
+            r.extra["relative_to_plain"] = (r.bytes / r.seconds) / (base[0].bytes / base[0].seconds)
+    report.dump()
+    for op in ("randread", "randwrite"):
+        if report.select(op):
+            report.plot("queue_depth", "iops", "target", operation=op)
+
+
+@pytest.fixture
+def target_dir(request, tmp_path):
+    """Directory for one target; the protected ones come from the directory fixtures."""
+    name = request.param
+    if name == "plain":
+        d = tmp_path / "plain_control"
+        d.mkdir()
+        return name, str(d)
+    fixture = {"protected": "protected_dir", "encrypted": "encrypted_dir"}[name]
+    return name, request.getfixturevalue(fixture)
+
+
+def _job_io_size(job, file_size):
+    return min(RANDOM_IO_SIZE, file_size) if job.is_random else file_size
+
+
+@pytest.mark.parametrize("target_dir", TARGETS, indirect=True)
+class TestIOOverhead:
+    """Same job matrix on plain, protected and encrypted directories."""
+
+    def test_job_matrix(self, target_dir, bench_scale, io_report):
+        target, root = target_dir
+        size = FILE_SIZE[bench_scale]
+        path = prepare_file(os.path.join(root, "workload.dat"), size)
+
+        skipped = []
+        for job in JOBS:
+            job = dataclasses.replace(job, io_size=_job_io_size(job, size), runtime=RUNTIME)
+            try:
+                result = run_workload(path, job)
+            except OSError as e:
+                if job.direct and e.errno == errno.EINVAL:
+                    skipped.append(job.label)
+                    continue
+                raise
+
+            lat = result.latency
+            io_report.add(
+                job.pattern,
+                {
+                    "target": target, "job": job.label, "block_size": job.block_size,
+                    "queue_depth": job.queue_depth, "direct": job.direct,
+                },
+                result.seconds,
+                bytes=result.bytes,
+                extra={
+                    "iops": result.iops,
+                    "p50_us": lat.percentile(50) * 1e6,
+                    "p95_us": lat.percentile(95) * 1e6,
+                    "p99_us": lat.percentile(99) * 1e6,
+                    "max_us": lat.max * 1e6,
+                },
+            )
+
+        if skipped:
+            io_report.meta.setdefault("o_direct_unsupported", {})[target] = skipped
+            warnings.warn(f"{target}: O_DIRECT unsupported, skipped {', '.join(skipped)}")
@@ -0,0 +1,194 @@
+"""
+push_config Scaling Benchmark
+
+push_config is a global commit, so its cost may grow with the size of the
+whole configuration rather than with the size of the change. This benchmark
+grows one dimension of the configuration at a time:
+
+- acls:        empty ACLs (up to 10,000)
+- entries:     ACL entries, 1,000 per ACL (up to 100,000)
+- watchpoints: protected directories (up to thousands)
+- programs:    authorized programs, distinct copies of /bin/true
+
+At each step the growth itself is committed, then a one-entry probe change
+is pushed PROBE_REPEATS times. For every probe push the report records the
+wall time and the daemon's CPU time (``--daemon-pattern``, sampled from
+/proc). At module end a complexity model (O(1) .. O(n^2)) is fitted per
+dimension and stored in the report's ``meta.fits``.
+
+Cleanup destroys ACLs, unprotects directories and blocks the program copies
+(while they still exist), in one batch before the final push. QDocSE has no
+command to forget a program, so the programs dimension leaves its copies on
+the blocked list; run it on a disposable target (it is skipped at
+--bench-scale=small).
+
+Results: reports/benchmarks/push_config_scaling.json plus latency plots.
+
+Run:
+    pytest tests/performance/test_push_config_scaling.py --benchmark --bench-scale=medium
+"""
+import os
+import shutil
+import statistics
+import tempfile
+from pathlib import Path
+
+import pytest
+from helpers import QDocSE
+from helpers.batch import run_batch
+from helpers.bench import BenchReport, fit_complexity, timed
+
+pytestmark = [
+    pytest.mark.benchmark,
+    pytest.mark.slow,
+    pytest.mark.requires_mode("elevated", "learning"),
+    pytest.mark.requires_license("A"),
+]
+
+STEPS = {
+    "small": {
+        "acls": [10, 100, 1000],
+        "entries": [100, 1000, 10000],
+        "watchpoints": [10, 100, 500],
+        "programs": [],
+    },
+    "medium": {
+        "acls": [10, 100, 1000, 10000],
+        "entries": [100, 1000, 10000, 100000],
+        "watchpoints": [10, 100, 1000, 2000],
+        "programs": [10, 100, 1000, 2000],
+    },
+    "full": {
+        "acls": [10, 100, 1000, 10000],
+        "entries": [100, 1000, 10000, 100000],
+        "watchpoints": [10, 100, 1000, 5000],
+        "programs": [10, 100, 1000, 5000],
+    },
+}
+
+ENTRIES_PER_ACL = 1000
+PROBE_REPEATS = 3
+FILLER_UID_BASE = 300000
+
+# Commits of large growth steps can take a while
+PUSH_TIMEOUT = 1800
+
+
+@pytest.fixture(scope="module")
+def push_report():
+    report = BenchReport("push_config_scaling")
+    yield report
+
+    fits = {}
+    for dim in STEPS["full"]:
+        rows = report.select("push_config", dimension=dim)
+        if len(rows) >= 2:
+            fit = fit_complexity([r.params["size"] for r in rows], [r.seconds for r in rows])
+            fits[dim] = fit.to_dict()
+    report.meta["fits"] = fits
+    report.dump()
+    report.plot("size", "seconds", "dimension", operation="push_config")
+
+
+class ConfigGrower:
+    """Grows one configuration dimension and remembers what to clean up."""
+
+    def __init__(self, dimension):
+        self.dimension = dimension
+        self.size = 0
+        self.acls = []
+        self.entries_in_last = ENTRIES_PER_ACL
+        self.dirs = []
+        self.programs = []
+        self.workdir = tempfile.mkdtemp(prefix=f"qdocse_push_{dimension}_")
+
+    def grow_to(self, size):
+        grow = getattr(self, f"_grow_{self.dimension}")
+        while self.size < size:
+            grow(self.size)
+            self.size += 1
+
+    def _grow_acls(self, i):
+        self.acls.append(QDocSE.acl_create().execute().ok().parse()["acl_id"])
+
+    def _grow_entries(self, i):
+        if self.entries_in_last >= ENTRIES_PER_ACL:
+            self._grow_acls(i)
+            self.entries_in_last = 0
+        QDocSE.acl_add(self.acls[-1], allow=True, user=FILLER_UID_BASE + self.entries_in_last,
+                       mode="r").execute().ok()
+        self.entries_in_last += 1
+
+    def _grow_watchpoints(self, i):
+        d = Path(self.workdir, f"wp{i:05d}")
+        d.mkdir()
+        (d / "data.txt").write_text("watch point data")
+        QDocSE.protect(str(d), encrypt=False).execute().ok()
+        self.dirs.append(str(d))
+
+    def _grow_programs(self, i):
+        prog = Path(self.workdir, f"prog{i:05d}")
+        shutil.copy("/bin/true", prog)
+        with open(prog, "ab") as f:
+            f.write(i.to_bytes(4, "little"))  # distinct content per copy
+        os.chmod(prog, 0o755)
+        QDocSE.adjust().auth_path(str(prog)).execute().ok()
+        self.programs.append(str(prog))
+
+    def cleanup(self):
+        commands = [QDocSE.acl_destroy(acl_id, force=True) for acl_id in self.acls]
+        commands += [QDocSE.unprotect(d) for d in self.dirs]
+        commands += [QDocSE.adjust().block_path(prog) for prog in self.programs]
+        run_batch(commands + [QDocSE.push_config()], timeout=PUSH_TIMEOUT)
+        shutil.rmtree(self.workdir, ignore_errors=True)
+
+
+@pytest.fixture
+def probe_acl(request):
+    acl_id = QDocSE.acl_create().execute().ok().parse()["acl_id"]
+    request.addfinalizer(lambda: QDocSE.acl_destroy(acl_id, force=True).execute())
+    return acl_id
+
+
+def _probe(probe_acl, daemon_cpu):
+    """One small change pushed: (wall seconds, daemon CPU seconds or None)."""
+    QDocSE.acl_add(probe_acl, allow=True, user=FILLER_UID_BASE - 1, mode="r").execute().ok()
+    before = daemon_cpu.sample() if daemon_cpu else None
+    with timed() as t:
+        QDocSE.push_config().execute(timeout=PUSH_TIMEOUT).ok()
+    after = daemon_cpu.sample() if daemon_cpu else None
+    QDocSE.acl_remove(probe_acl, entry=1).execute().ok()
+    QDocSE.push_config().execute(timeout=PUSH_TIMEOUT).ok()
+    cpu = after - before if before is not None and after is not None else None
+    return t.seconds, cpu
+
+
+class TestPushConfigScaling:
+    """push_config latency and daemon CPU as the configuration grows."""
+
+    @pytest.mark.parametrize("dimension", ["acls", "entries", "watchpoints", "programs"])
+    def test_push_latency(self, request, dimension, bench_scale, probe_acl, daemon_cpu, push_report):
+        steps = STEPS[bench_scale][dimension]
+        if not steps:
+            pytest.skip(f"{dimension} is not run at --bench-scale={bench_scale}")
+
+        grower = ConfigGrower(dimension)
+        request.addfinalizer(grower.cleanup)
+
+        for size in steps:
+            grower.grow_to(size)
+            with timed() as commit:
+                QDocSE.push_config().execute(timeout=PUSH_TIMEOUT).ok()
+
+            probes = [_probe(probe_acl, daemon_cpu) for _ in range(PROBE_REPEATS)]
+            walls = [w for w, _ in probes]
+            cpus = [c for _, c in probes if c is not None]
+            push_report.add(
+                "push_config", {"dimension": dimension, "size": size},
+                statistics.median(walls),
+                extra={
+                    "wall_s": walls,
+                    "daemon_cpu_s": statistics.median(cpus) if cpus else None,
+                    "growth_commit_s": commit.seconds,
+                },
+            )
@@ -0,0 +1,181 @@
+"""
+acl_export Format Library Unit Tests
+
+Offline checks for helpers.acl_export. The real format is learned from the
+target, so these tests stand in two synthetic "product" encoders with
+different layouts and check that calibration recovers each one, and that the
+reader, writer and validator agree with the product byte for byte.
+"""
+import hashlib
+import zlib
+
+import pytest
+from helpers.acl_export import (
+    CALIBRATION_PLAN, ACLRecord, EntryRecord, ExportFormatError, ExportLayout, Sample,
+    calibrate, encode_export, parse_export, read_export, validate_export, write_export,
+)
+
+
+class FakeProduct:
+    """Reference encoder for one made-up export layout."""
+
+    def __init__(self, digest_at_start=True, entry_total=True, mode_bits=(4, 2, 1)):
+        self.digest_at_start = digest_at_start
+        self.entry_total = entry_total
+        self.mode_bits = dict(zip("rwx", mode_bits))
+
+    def export(self, acls):
+        total = sum(len(a.entries) for a in acls)
+        header = b"QACL\x01\x00" + b"\x00\x07" + len(acls).to_bytes(4, "little")
+        header += total.to_bytes(4, "little") if self.entry_total else b""
+        header += b"\xee" * 4
+        body = bytearray()
+        for acl in acls:
+            body += acl.acl_id.to_bytes(4, "little") + len(acl.entries).to_bytes(2, "little")
+            body += b"\xa5\xa5" + bytes(8)
+            for e in acl.entries:
+                body += bytes([1 if e.user is not None else 2, 0x11 if e.allow else 0x22])
+                body += bytes([sum(self.mode_bits[c] for c in e.mode), 0])
+                body += (e.user or 0).to_bytes(4, "little") + (e.group or 0).to_bytes(4, "little")
+                body += b"\x5a" * 8
+        data = header + bytes(body)
+        if self.digest_at_start:
+            return data[:6] + hashlib.sha256(data[6:]).digest() + data[6:]
+        return data + zlib.crc32(data).to_bytes(4, "little")
+
+    def samples(self, base):
+        """What calibrate_from_target would collect from a console."""
+        next_id = 100
+        out = {}
+        for name, plan in CALIBRATION_PLAN.items():
+            added = []
+            for entries in plan:
+                added.append(ACLRecord(next_id, list(entries)))
+                next_id += 1
+            out[name] = Sample(self.export(base + added), added)
+        return out
+
+
+BASE = [ACLRecord(7, [EntryRecord(True, user=1000, mode="rw"), EntryRecord(False, group=50, mode="x")])]
+
+PRODUCTS = {
+    "sha256-after-magic": FakeProduct(),
+    "crc32-trailer": FakeProduct(digest_at_start=False, entry_total=False),
+}
+
+
+def _calibrated(product, base=BASE):
+    return calibrate(product.export(base), len(base), sum(len(a.entries) for a in base),
+                     product.samples(base))
+
+
+def _config(n):
+    return [
+        ACLRecord(i + 1, [EntryRecord(i % 3 != 0, user=2000 + i, mode="r"),
+                          EntryRecord(True, group=i, mode="rwx")][: i % 3])
+        for i in range(n)
+    ]
+
+
+@pytest.fixture(params=list(PRODUCTS))
+def product(request):
+    return PRODUCTS[request.param]
+
+
+@pytest.fixture
+def layout(product):
+    return _calibrated(product)
+
+
+@pytest.mark.unit
+class TestCalibration:
+
+    def test_recovers_layout(self, product, layout):
+        assert layout.magic.startswith(b"QACL\x01\x00")
+        assert layout.acl_size == 16
+        assert layout.entry_size == 20
+        assert layout.mode_bits == {"r": 4, "w": 2, "x": 1}
+        assert (layout.entry_total is not None) == product.entry_total
+        expected = "sha256" if product.digest_at_start else "crc32"
+        assert layout.digest.algorithm == expected
+
+    def test_empty_base(self, product):
+        layout = _calibrated(product, base=[])
+        assert encode_export(BASE, layout) == product.export(BASE)
+
+    def test_layout_roundtrip_json(self, layout, tmp_path):
+        loaded = ExportLayout.load(layout.dump(tmp_path / "layout.json"))
+        assert loaded == layout
+
+    def test_non_bitmask_mode_rejected(self):
+        with pytest.raises(ExportFormatError, match="bitmask"):
+            _calibrated(FakeProduct(mode_bits=(1, 2, 4 | 1)))
+
+    def test_missing_samples(self, product):
+        with pytest.raises(ValueError):
+            calibrate(product.export(BASE), 1, 2, {})
+
+
+@pytest.mark.unit
+class TestReadWrite:
+
+    def test_writer_matches_product(self, product, layout):
+        acls = _config(50)
+        assert encode_export(acls, layout) == product.export(acls)
+
+    def test_streaming_reader(self, product, layout, tmp_path):
+        acls = _config(500)
+        path = tmp_path / "export.acl"
+        path.write_bytes(product.export(acls))
+        assert list(read_export(path, layout)) == acls
+
+    def test_write_then_validate(self, layout, tmp_path):
+        path = write_export(tmp_path / "synth.acl", _config(20), layout)
+        assert validate_export(path, layout) == []
+
+    def test_empty_config(self, product, layout):
+        assert parse_export(product.export([]), layout) == []
+
+    def test_duplicate_ids_rejected(self, layout, tmp_path):
+        with pytest.raises(ValueError):
+            write_export(tmp_path / "dup.acl", [ACLRecord(1), ACLRecord(1)], layout)
+
+    def test_id_overflow_rejected(self, layout, tmp_path):
+        with pytest.raises(ValueError):
+            write_export(tmp_path / "big.acl", [ACLRecord(1, [EntryRecord(True, user=2**64)])], layout)
+
+
+@pytest.mark.unit
+class TestValidate:
+
+    def _write(self, tmp_path, data):
+        path = tmp_path / "bad.acl"
+        path.write_bytes(data)
+        return path
+
+    def test_bad_magic(self, product, layout, tmp_path):
+        data = bytearray(product.export(BASE))
+        data[0] ^= 0xFF
+        problems = validate_export(self._write(tmp_path, bytes(data)), layout)
+        assert any("magic" in p for p in problems)
+
+    def test_digest_mismatch(self, product, layout, tmp_path):
+        data = bytearray(product.export(_config(5)))
+        data[6 if product.digest_at_start else -1] ^= 0x01
+        problems = validate_export(self._write(tmp_path, bytes(data)), layout)
+        assert len(problems) == 1 and "Digest mismatch" in problems[0]
+
+    def test_truncated(self, product, layout, tmp_path):
+        data = product.export(_config(5))
+        problems = validate_export(self._write(tmp_path, data[:-7]), layout)
+        assert problems
+
+    def test_unknown_entry_kind(self, product, layout, tmp_path):
+        acls = [ACLRecord(1, [EntryRecord(True, user=5)])]
+        data = bytearray(encode_export(acls, layout))
+        entry_start = len(layout.header) + layout.acl_size
+        if product.digest_at_start:
+            entry_start += layout.digest.size
+        data[entry_start] = 9  # neither user (1) nor group (2)
+        path = self._write(tmp_path, bytes(data))
+        assert any("Unrecognized entry" in p for p in validate_export(path, layout))
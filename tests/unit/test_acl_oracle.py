@@ -0,0 +1,132 @@
+"""
+ACL Oracle Unit Tests
+
+Offline checks for helpers.acl_oracle: the documented evaluation order,
+weekly schedules (midnight and week wrap, inclusive ends), parsing from
+acl_list output, and agreement with a linear reference evaluation.
+"""
+import random
+from datetime import datetime
+
+import pytest
+from helpers.acl_oracle import DAY, WEEK, ACLOracle, WeeklySchedule, week_second
+from helpers.commands import ACLList
+from helpers.reconcile import EntrySpec
+from helpers.result import ExecResult
+
+# 2024-01-01 was a Monday
+MONDAY = datetime(2024, 1, 1)
+
+
+def at(day: int, hms: str) -> datetime:
+    h, m, s = map(int, hms.split(":"))
+    return MONDAY.replace(day=1 + day, hour=h, minute=m, second=s)
+
+
+@pytest.mark.unit
+class TestWeeklySchedule:
+
+    def test_daily_window_crossing_midnight(self):
+        schedule = WeeklySchedule.from_spec("22:00:00-02:00:00")
+        assert week_second(at(0, "23:30:00")) in schedule
+        assert week_second(at(1, "02:00:00")) in schedule      # end is inclusive
+        assert week_second(at(1, "02:00:01")) not in schedule
+        assert week_second(at(1, "21:59:59")) not in schedule
+        assert week_second(at(0, "00:30:00")) in schedule      # Sunday's window wraps to Monday
+
+    def test_day_restricted_window_wraps_week(self):
+        schedule = WeeklySchedule.from_rules([{"days": ["Sunday"], "range": "22:00:00-02:00:00"}])
+        assert week_second(at(6, "23:00:00")) in schedule
+        assert week_second(at(0, "01:00:00")) in schedule
+        assert week_second(at(0, "23:00:00")) not in schedule
+        assert len(schedule) == 2
+
+    def test_full_day_merges_to_whole_week(self):
+        schedule = WeeklySchedule.from_spec("00:00:00-23:59:59")
+        assert (schedule.starts, schedule.ends) == ([0], [WEEK])
+        assert WEEK - 1 in schedule and DAY in schedule
+
+
+@pytest.mark.unit
+class TestDecision:
+
+    def test_first_principal_match_decides(self):
+        oracle = ACLOracle.from_specs([
+            EntrySpec(allow=False, group=20, mode="r"),
+            EntrySpec(allow=True, user=1000, mode="rw"),
+            EntrySpec(allow=True, group=30, mode="rwx"),
+        ])
+        assert oracle.allowed(1000, [30], mode="rw")
+        assert not oracle.allowed(1000, [20, 30], mode="r")    # group 20 entry comes first
+        assert oracle.decide(1000, [20]).entry == 1
+        assert oracle.allowed(2000, [30], mode="x")
+        assert oracle.decide(2000, [40]).entry is None
+
+    def test_matching_principal_with_wrong_mode_or_time_denies(self):
+        oracle = ACLOracle.from_specs([
+            EntrySpec(user=1000, mode="r"),
+            EntrySpec(user=1000, mode="rw"),
+            EntrySpec(user=2000, mode="rw", time="09:00:00-17:00:00"),
+            EntrySpec(group=5, mode="rw"),
+        ])
+        assert not oracle.allowed(1000, [5], mode="rw")         # does not fall through
+        assert oracle.decide(1000, mode="w").entry == 1
+        assert oracle.allowed(2000, mode="r", when=at(2, "12:00:00"))
+        assert not oracle.allowed(2000, [5], mode="r", when=at(2, "18:00:00"))
+
+    def test_empty_acl_and_program_entries(self):
+        assert not ACLOracle.from_specs([]).allowed(0)
+        oracle = ACLOracle.from_specs([EntrySpec(program=2, mode="x")])
+        assert oracle.allowed(1000, program=2, mode="x")
+        assert not oracle.allowed(1000, program=3, mode="x")
+
+    def test_from_acl_list_output(self):
+        listing = ACLList(7)
+        listing._result = ExecResult("acl_list -i 7", (
+            "ACL ID 7:\n"
+            "  Entry: 1\n    Type: Deny\n    User: 1000 (alice)\n    Mode: rw-\n"
+            "    Time:\n      01 Saturday, Sunday:\n        00:00:00-23:59:59\n"
+            "  Entry: 2\n    Type: Allow\n    Group: 100 (users)\n    Mode: r--\n"
+        ), "", 0)
+        oracle = ACLOracle.from_parsed(listing.parse()["acls"][0])
+        weekend = oracle.index[("user", 1000)][0].schedule
+        assert (weekend.starts, weekend.ends) == ([5 * DAY], [WEEK])
+        assert not oracle.allowed(1000, [100], mode="r", when=at(5, "10:00:00"))
+        assert not oracle.allowed(1000, [100], mode="r", when=at(2, "10:00:00"))  # entry 1 still decides
+        assert oracle.allowed(2000, [100], mode="r", when=at(2, "10:00:00"))
+
+
+def _in_daily_window(tod: int, spec: str) -> bool:
+    start, end = (sum(int(p) * f for p, f in zip(t.split(":"), (3600, 60, 1))) for t in spec.split("-"))
+    return start <= tod <= end if start <= end else tod >= start or tod <= end
+
+
+def _linear(entries, uid, gids, program, mode, when):
+    """Reference: walk the entries in order as the guide describes."""
+    second = week_second(when)
+    for e in entries:
+        if e.user == uid if e.user is not None else e.group in gids if e.group is not None else e.program == program:
+            if not set(mode) <= set(e.mode):
+                return False
+            if e.time and not _in_daily_window(second % DAY, e.time):
+                return False
+            return e.allow
+    return False
+
+
+@pytest.mark.unit
+def test_agrees_with_linear_evaluation():
+    rng = random.Random(50)
+    times = [None, "09:00:00-17:00:00", "22:00:00-02:00:00", "12:00:00-12:00:00"]
+    for _ in range(200):
+        entries = []
+        for _ in range(rng.randint(0, 12)):
+            kind = rng.choice(["user", "group", "program"])
+            entries.append(EntrySpec(allow=rng.random() < 0.6, mode=rng.choice(["r", "w", "rw", "rwx", "x"]),
+                                     time=rng.choice(times), **{kind: rng.randint(0, 3)}))
+        oracle = ACLOracle.from_specs(entries)
+        for _ in range(20):
+            uid, gids = rng.randint(0, 3), set(rng.sample(range(4), rng.randint(0, 2)))
+            program, mode = rng.choice([None, 0, 1, 2, 3]), rng.choice(["r", "w", "rw", "x"])
+            when = rng.uniform(0, 4 * WEEK) + MONDAY.timestamp()
+            assert oracle.allowed(uid, gids, program, mode, when) == _linear(entries, uid, gids, program, mode, when)
@@ -0,0 +1,125 @@
+"""
+Background Operation Unit Tests
+
+Offline checks for helpers.background: progress parsing, completion and
+state detection from probe output, and the adaptive wait loop (the probe is
+replaced, so no QDocSE installation is needed).
+"""
+import pytest
+from helpers import background
+from helpers.background import BackgroundOperation, parse_progress, wait_all
+from helpers.commands import Encrypt, Protect, Unprotect
+from helpers.result import ExecResult
+
+DIR = "/tmp/qdocse_bg_dir"
+PS_RUNNING = f"  101 /usr/bin/sh -c true\n  202 /usr/bin/QDocSEConsole -c encrypt -d {DIR} -B -o /tmp/x.log\n"
+WP_ENCRYPTED = [{"path": DIR, "encryption": "Encrypted"}]
+WP_PLAIN = [{"path": DIR, "encryption": "Not Encrypted"}]
+
+
+def _out(text):
+    return [ExecResult("cat", text, "", 0)]
+
+
+@pytest.mark.unit
+class TestBackground:
+
+    def test_parse_progress(self):
+        assert parse_progress("") == (None, None)
+        assert parse_progress("Encrypted 3/10 files\nEncrypted 7/10 files (70%)") == ((7, 10), 0.7)
+        assert parse_progress("processed 12 of 40") == ((12, 40), None)
+
+    def test_running_then_done(self):
+        op = BackgroundOperation(Encrypt(DIR).background())
+        op._update(PS_RUNNING, WP_PLAIN, _out("Encrypted 3/10 files"))
+        assert not op.done()
+        assert op.progress == (3, 10)
+        op._update("  101 /usr/bin/sh -c true\n", WP_ENCRYPTED, _out("Encrypted 10/10 files"))
+        assert op.done()
+        assert op.result(timeout=0).success
+        assert op.progress == (10, 10)
+
+    def test_wrong_final_state_fails_after_settle_time(self, monkeypatch):
+        clock = [1000.0]
+        monkeypatch.setattr(background.time, "monotonic", lambda: clock[0])
+        op = BackgroundOperation(Protect(DIR, encrypt=True).background())
+        op._update("", WP_PLAIN, [])
+        assert not op.done()
+        clock[0] += background.SETTLE_TIME
+        op._update("", WP_PLAIN, [])
+        assert op.result(timeout=0).failed
+
+        op = BackgroundOperation(Unprotect(DIR).background())
+        op._update("", [], [])
+        assert op.result(timeout=0).success
+
+    def test_state_may_converge_after_exit(self):
+        op = BackgroundOperation(Protect(DIR, encrypt=True).background())
+        op._update("", WP_PLAIN, [])
+        assert not op.done()
+        op._update("", WP_ENCRYPTED, [])
+        assert op.result(timeout=0).success
+
+    def test_generated_output_removed(self, monkeypatch):
+        calls = []
+
+        class Recorder:
+            def run(self, cmd, timeout=30, **kwargs):
+                calls.append(cmd)
+                return ExecResult(" ".join(cmd), "", "", 0)
+
+        def launched():
+            cmd = Encrypt(DIR)
+            cmd._result = ExecResult("encrypt", "", "", 0)
+            monkeypatch.setattr(cmd, "execute", lambda timeout=30: cmd)
+            return cmd
+
+        monkeypatch.setattr(background, "get_executor", Recorder)
+        op = BackgroundOperation.start(launched())
+        assert op.output_path.startswith("/tmp/qdocse_bg_")
+        op._update("", WP_ENCRYPTED, _out("done"))
+        assert calls == [["rm", "-f", op.output_path]]
+
+        calls.clear()
+        BackgroundOperation.start(launched(), output="/tmp/keep.log")._update("", WP_ENCRYPTED, [])
+        assert calls == []
+
+    def test_other_processes_ignored(self):
+        op = BackgroundOperation(Protect(DIR).background())
+        ps = (f"  7 /usr/bin/QDocSEConsole -c encrypt -d {DIR} -B\n"
+              f"  8 /usr/bin/QDocSEConsole -c protect -d {DIR}/sub -B\n")
+        assert not any(op._is_mine(line) for line in ps.splitlines())
+        assert op._is_mine(f"  9 QDocSEConsole -c protect -d {DIR} -B")
+
+    def test_wait_all_backoff(self, monkeypatch):
+        ops = [BackgroundOperation(Encrypt(DIR).background()) for _ in range(2)]
+        script = iter([
+            (PS_RUNNING, WP_PLAIN, "1/4"),
+            (PS_RUNNING, WP_PLAIN, "1/4"),
+            (PS_RUNNING, WP_PLAIN, "1/4"),
+            (PS_RUNNING, WP_PLAIN, "3/4"),
+            ("", WP_ENCRYPTED, "4/4"),
+        ])
+        probes, sleeps = [], []
+
+        def probe(pending):
+            probes.append(len(pending))
+            ps, wps, text = next(script)
+            for op in pending:
+                op._update(ps, wps, _out(text))
+
+        monkeypatch.setattr(background, "_probe", probe)
+        monkeypatch.setattr(background.time, "sleep", sleeps.append)
+        results = wait_all(ops, timeout=60)
+        assert all(r.success for r in results)
+        assert probes == [2] * 5
+        # first poll moved progress; then backoff grows; progress resets it
+        assert sleeps[0] == background.MIN_INTERVAL
+        assert sleeps[1] < sleeps[2]
+        assert sleeps[3] == background.MIN_INTERVAL
+
+    def test_timeout(self, monkeypatch):
+        op = BackgroundOperation(Encrypt(DIR).background())
+        monkeypatch.setattr(background, "_probe", lambda pending: pending[0]._update(PS_RUNNING, WP_PLAIN, []))
+        with pytest.raises(TimeoutError, match="encrypt"):
+            op.result(timeout=0.01)
@@ -0,0 +1,64 @@
+"""
+Batched Execution Tests
+
+Offline tests for helpers.batch using ordinary local commands - no QDocSE
+installation required.
+"""
+import pytest
+from helpers.batch import NOT_RUN, run_batch
+from helpers.commands import Command
+from helpers.executor import CommandEvent, add_observer, get_executor, remove_observer
+
+
+@pytest.mark.unit
+class TestRunBatch:
+
+    def test_results_per_command(self):
+        results = run_batch([["echo", "one"], ["sh", "-c", "echo two >&2; exit 3"], ["printf", "no-newline"]])
+        assert [r.stdout for r in results] == ["one", "", "no-newline"]
+        assert results[1].stderr == "two"
+        assert [r.returncode for r in results] == [0, 3, 0]
+
+    def test_arguments_are_quoted(self, tmp_path):
+        (tmp_path / "a b").write_text("x")
+        results = run_batch([["ls", str(tmp_path / "a b")], ["echo", "*", "$HOME", "'q'"]])
+        assert results[0].success
+        assert results[1].stdout == "* $HOME 'q'"
+
+    def test_stop_on_error(self):
+        results = run_batch([["true"], ["false"], ["echo", "skipped"]], stop_on_error=True)
+        assert [r.returncode for r in results] == [0, 1, NOT_RUN]
+        assert results[2].stdout == ""
+
+    def test_sets_command_result(self):
+        cmd = Command("ignored")
+        cmd.build = lambda: ["echo", "from-batch"]
+        run_batch([cmd])
+        assert cmd.ok().result.stdout == "from-batch"
+
+    def test_one_executor_call(self, monkeypatch):
+        calls = []
+        executor = get_executor()
+        original = executor._run
+        monkeypatch.setattr(executor, "_run", lambda *a, **k: calls.append(a) or original(*a, **k))
+        run_batch([["true"]] * 5)
+        assert len(calls) == 1
+
+    def test_one_event_per_command(self, tmp_path):
+        console = tmp_path / "QDocSEConsole"
+        console.write_text("#!/bin/sh\nexit 0\n")
+        console.chmod(0o755)
+        events: list[CommandEvent] = []
+        add_observer(events.append)
+        try:
+            run_batch([[str(console), "-c", "push_config"], ["sleep", "0.05"], ["false"], ["true"]],
+                      stop_on_error=True)
+        finally:
+            remove_observer(events.append)
+        assert [e.subcommand for e in events] == ["push_config", "sleep", "false"]
+        assert events[1].duration >= 0.05
+        assert events[0].start <= events[1].start <= events[2].start
+        assert events[2].result.returncode == 1
+
+    def test_empty(self):
+        assert run_batch([]) == []
@@ -0,0 +1,64 @@
+"""
+Benchmark Helper Unit Tests
+
+Offline checks for helpers.bench: results, report selection/dump, text
+plots and complexity fitting.
+"""
+import json
+import math
+
+import pytest
+from helpers.bench import BenchReport, BenchResult, fit_complexity
+
+SIZES = [10, 100, 1000, 10000, 100000]
+
+
+@pytest.mark.unit
+class TestBenchReport:
+
+    def test_rates(self):
+        r = BenchResult("encrypt", {}, seconds=2.0, bytes=4 * 1024 * 1024, files=10)
+        assert r.mb_per_s == 2.0
+        assert r.files_per_s == 5.0
+        assert BenchResult("x", {}, seconds=0.0).mb_per_s is None
+
+    def test_select_dump_plot(self, tmp_path):
+        report = BenchReport("demo", out_dir=tmp_path)
+        for t in (1, 2, 4):
+            report.add("encrypt", {"threads": t, "corpus": "tiny"}, 1.0 / t, bytes=1024 * 1024)
+        report.add("unencrypt", {"threads": 1, "corpus": "tiny"}, 1.0)
+        assert len(report.select("encrypt", corpus="tiny")) == 3
+        assert len(report.select(threads=1)) == 2
+
+        data = json.loads(report.dump().read_text())
+        assert data["results"][2]["mb_per_s"] == 4.0
+        path = report.plot("threads", "mb_per_s", "corpus", operation="encrypt")
+        assert path.exists()
+
+
+@pytest.mark.unit
+class TestFitComplexity:
+
+    @pytest.mark.parametrize("model,f", [
+        ("O(1)", lambda n: 5.0),
+        ("O(log n)", lambda n: 2 + 0.3 * math.log2(n)),
+        ("O(n)", lambda n: 0.1 + 1e-4 * n),
+        ("O(n log n)", lambda n: 1e-5 * n * math.log2(n)),
+        ("O(n^2)", lambda n: 1e-9 * n * n),
+    ])
+    def test_recovers_model(self, model, f):
+        fit = fit_complexity(SIZES, [f(n) for n in SIZES])
+        assert fit.model == model
+        assert fit.r2 > 0.99
+
+    def test_noisy_constant_stays_constant(self):
+        ys = [1.00, 1.02, 0.98, 1.01, 0.99]
+        assert fit_complexity(SIZES, ys).model == "O(1)"
+
+    def test_predict(self):
+        fit = fit_complexity(SIZES, [3 + 2e-3 * n for n in SIZES])
+        assert fit.predict(50000) == pytest.approx(103, rel=1e-6)
+
+    def test_needs_two_points(self):
+        with pytest.raises(ValueError):
+            fit_complexity([1], [1.0])
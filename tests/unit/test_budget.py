@@ -0,0 +1,55 @@
+"""
+Command Budget Tests
+
+Offline tests for helpers.budget - no QDocSE installation required.
+"""
+import pytest
+from helpers.budget import BudgetLedger, CommandUsage, output_size, overruns
+from helpers.executor import CommandEvent
+from helpers.result import BinaryExecResult, ExecResult
+
+
+def _event(argv, stdout="", stderr=""):
+    return CommandEvent(argv, ExecResult(" ".join(argv), stdout, stderr, 0), 0.0, 0.01)
+
+
+@pytest.mark.unit
+class TestBudgetLedger:
+
+    def test_counts_per_scope(self):
+        ledger = BudgetLedger()
+        ledger.observe(_event(["QDocSEConsole", "-c", "acl_create"], "ACL ID 5 created"))
+        ledger.scope = "test_a"
+        ledger.observe(_event(["QDocSEConsole", "-c", "acl_add", "-i", "5"], stderr="warn"))
+        ledger.observe(_event(["QDocSEConsole", "-c", "push_config"]))
+        ledger.observe(_event(["QDocSEConsole", "-c", "push_config"]))
+        assert ledger.get("(session)") == CommandUsage(commands=1, pushes=0, bytes=16)
+        assert ledger.get("test_a") == CommandUsage(commands=3, pushes=2, bytes=4)
+        assert ledger.get("test_b") == CommandUsage()
+
+    def test_push_counted_by_subcommand_only(self):
+        ledger = BudgetLedger()
+        ledger.observe(_event(["sh", "-c", "QDocSEConsole -c push_config"]))
+        ledger.observe(_event(["QDocSEConsole", "-c", "view", "push_config"]))
+        assert ledger.get("(session)").pushes == 0
+
+    def test_binary_output_is_not_decoded(self):
+        result = BinaryExecResult("cat", b"\xff\xfe\x00", b"e", 0)
+        assert output_size(result) == 4
+        ledger = BudgetLedger()
+        ledger.observe(CommandEvent(["cat"], result, 0.0, 0.01))
+        assert ledger.get("(session)").bytes == 4
+
+
+@pytest.mark.unit
+class TestOverruns:
+
+    def test_within_budget(self):
+        usage = CommandUsage(commands=12, pushes=2, bytes=100)
+        assert overruns(usage, n=12, push=2, bytes=100) == []
+        assert overruns(usage) == []
+
+    def test_each_exceeded_limit_reported(self):
+        usage = CommandUsage(commands=13, pushes=3, bytes=100)
+        assert overruns(usage, n=12, push=2, bytes=1000) == ["n=13 > budget 12", "push=3 > budget 2"]
+        assert overruns(usage, bytes=99) == ["bytes=100 > budget 99"]
@@ -0,0 +1,151 @@
+"""
+Ciphertext Detector Tests
+
+Offline tests for helpers.ciphertext - no QDocSE installation required.
+Random bytes stand in for ciphertext; text and constant payloads stand in
+for plaintext.
+"""
+import io
+import os
+import random
+from collections import Counter
+
+import pytest
+from helpers import ciphertext
+from helpers.ciphertext import (
+    CHUNK_SIZE, ByteHistogram, assert_ciphertext, assert_plaintext, score_bytes,
+    score_file, score_stream,
+)
+
+
+def _random_bytes(n: int, seed: int = 1234) -> bytes:
+    return random.Random(seed).randbytes(n)
+
+
+TEXT = b"The quick brown fox jumps over the lazy dog. 0123456789\n" * 2000
+
+
+@pytest.mark.unit
+class TestClassification:
+    """Verdicts for typical payloads."""
+
+    @pytest.mark.parametrize("size", [256, 4096, 1 << 16])
+    def test_random_is_encrypted(self, size):
+        assert score_bytes(_random_bytes(size)).encrypted
+
+    def test_text_is_plaintext(self):
+        score = score_bytes(TEXT)
+        assert score.plaintext
+        assert score.printable_ratio == 1.0
+
+    def test_constant_is_plaintext(self):
+        score = score_bytes(b"x" * 10000)
+        assert score.plaintext
+        assert score.entropy == 0.0
+
+    def test_short_input_is_inconclusive(self):
+        assert score_bytes(_random_bytes(32)).verdict == "inconclusive"
+
+    def test_empty_input(self):
+        score = score_bytes(b"")
+        assert score.size == 0
+        assert score.verdict == "inconclusive"
+
+
+@pytest.mark.unit
+class TestStreaming:
+    """Chunked scoring matches one-shot scoring."""
+
+    def test_chunk_boundaries_do_not_change_histograms(self):
+        data = _random_bytes(50_000)
+        whole = ByteHistogram()
+        whole.update(data)
+        chunked = ByteHistogram()
+        for i in range(0, len(data), 777):
+            chunked.update(data[i:i + 777])
+        assert chunked.counts() == whole.counts()
+        assert chunked.pair_counts() == whole.pair_counts()
+        assert chunked.bigram_size == len(data) - 1
+
+    def test_available_backend_matches_fallback(self, monkeypatch):
+        """Whichever backend is installed (NumPy or not) counts like the fallback."""
+        data = _random_bytes(30_000) + TEXT[:20_000]
+
+        def histogram():
+            h = ByteHistogram()
+            for i in range(0, len(data), 4099):
+                h.update(data[i:i + 4099])
+            return h
+
+        available = histogram()
+        monkeypatch.setattr(ciphertext, "np", None)
+        fallback = histogram()
+
+        pairs = Counter((a << 8) | b for a, b in zip(data, data[1:]))
+        assert available.counts() == fallback.counts() == [data.count(b) for b in range(256)]
+        assert available.pair_counts() == fallback.pair_counts() == [pairs[i] for i in range(65536)]
+        assert available.score() == fallback.score()
+
+    def test_stream_limit(self):
+        data = _random_bytes(10_000)
+        score = score_stream(io.BytesIO(data), chunk_size=1000, limit=2500)
+        assert score.size == 2500
+
+    def test_score_file(self, tmp_path):
+        path = tmp_path / "blob.bin"
+        path.write_bytes(_random_bytes(1 << 16))
+        assert score_file(str(path)).encrypted
+
+    def test_memoryview_input(self):
+        data = bytearray(TEXT)
+        assert score_bytes(memoryview(data)).plaintext
+
+
+@pytest.mark.unit
+class TestAssertions:
+    """assert_ciphertext / assert_plaintext helpers."""
+
+    def test_assert_ciphertext_passes(self):
+        assert_ciphertext(_random_bytes(4096))
+
+    def test_assert_ciphertext_rejects_text(self):
+        with pytest.raises(AssertionError, match="does not look encrypted"):
+            assert_ciphertext(TEXT)
+
+    def test_assert_ciphertext_rejects_embedded_plaintext(self):
+        secret = b"secret content"
+        data = _random_bytes(4096) + secret
+        with pytest.raises(AssertionError, match="Plaintext found"):
+            assert_ciphertext(data, plaintext=secret)
+
+    def test_assert_ciphertext_accepts_path(self, tmp_path):
+        path = tmp_path / "blob.bin"
+        path.write_bytes(os.urandom(4096))
+        assert_ciphertext(path)
+
+    @pytest.mark.parametrize("offset", [0, CHUNK_SIZE - 5, CHUNK_SIZE + 100])
+    def test_assert_ciphertext_searches_path(self, tmp_path, offset):
+        secret = b"secret content"
+        data = bytearray(_random_bytes(CHUNK_SIZE + 4096))
+        data[offset:offset + len(secret)] = secret
+        path = tmp_path / "blob.bin"
+        path.write_bytes(data)
+        with pytest.raises(AssertionError, match="Plaintext found"):
+            assert_ciphertext(path, plaintext=secret)
+        assert_ciphertext(path, plaintext=b"not in there at all")
+
+    @pytest.mark.parametrize("chunk_size", [1, 3, 13, 14, 15, 4096])
+    def test_search_with_chunks_shorter_than_needle(self, chunk_size):
+        secret = b"secret content"
+        for offset in (0, 1, 2000, 4096 - len(secret)):
+            data = bytearray(_random_bytes(4096))
+            data[offset:offset + len(secret)] = secret
+            _, found = ciphertext._scan(io.BytesIO(bytes(data)), chunk_size, needle=secret)
+            assert found, (chunk_size, offset)
+        _, found = ciphertext._scan(io.BytesIO(_random_bytes(4096)), chunk_size, needle=secret)
+        assert not found
+
+    def test_assert_plaintext(self):
+        assert_plaintext(TEXT)
+        with pytest.raises(AssertionError, match="looks encrypted"):
+            assert_plaintext(_random_bytes(4096))
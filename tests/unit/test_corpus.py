@@ -0,0 +1,83 @@
+"""
+Corpus Generator Unit Tests
+
+Offline checks for helpers.corpus: determinism, size distributions, tree
+layout, content types and manifest verification.
+"""
+import os
+
+import pytest
+from helpers.ciphertext import score_file
+from helpers.corpus import KB, CorpusSpec, Manifest, generate
+
+
+@pytest.mark.unit
+class TestCorpusSpec:
+
+    def test_sizes_deterministic(self):
+        spec = CorpusSpec(files=50, distribution="loguniform", min_size=1, max_size=KB * KB, seed=7)
+        assert spec.sizes() == CorpusSpec(**vars(spec)).sizes()
+        assert spec.sizes() != CorpusSpec(**{**vars(spec), "seed": 8}).sizes()
+
+    @pytest.mark.parametrize("dist", ["fixed", "uniform", "loguniform", "pareto"])
+    def test_sizes_within_bounds(self, dist):
+        sizes = CorpusSpec(files=200, distribution=dist, min_size=KB, max_size=64 * KB).sizes()
+        assert len(sizes) == 200
+        assert all(KB <= s <= 64 * KB for s in sizes)
+
+    def test_total_size_exact(self):
+        spec = CorpusSpec(files=37, distribution="pareto", min_size=10, max_size=10 * KB,
+                          total_size=123457)
+        assert sum(spec.sizes()) == 123457
+
+    def test_path_depth(self):
+        spec = CorpusSpec(depth=2, fanout=4)
+        assert spec.path_for(5) == os.path.join("d0_001", "d1_001", "file000005.bin")
+
+    def test_invalid_content(self):
+        with pytest.raises(ValueError):
+            CorpusSpec(content="zeros")
+
+
+@pytest.mark.unit
+class TestGenerate:
+
+    def test_reproducible_and_verifiable(self, tmp_path):
+        spec = CorpusSpec(files=6, distribution="uniform", min_size=0, max_size=300 * KB,
+                          depth=1, fanout=3, seed="x")
+        a = generate(tmp_path / "a", spec, chunk_size=64 * KB)
+        b = generate(tmp_path / "b", spec)
+        assert [e.sha256 for e in a.entries] == [e.sha256 for e in b.entries]
+        assert a.verify(tmp_path / "a") == []
+
+    def test_manifest_roundtrip_detects_changes(self, tmp_path):
+        manifest = generate(tmp_path / "c", CorpusSpec(files=3, max_size=4 * KB))
+        loaded = Manifest.load(manifest.dump(tmp_path / "m.json"))
+        victim = tmp_path / "c" / loaded.entries[1].path
+        victim.write_bytes(b"\0" + victim.read_bytes()[1:])
+        os.remove(tmp_path / "c" / loaded.entries[2].path)
+        problems = loaded.verify(tmp_path / "c")
+        assert len(problems) == 2
+        assert "digest mismatch" in problems[0]
+
+    @pytest.mark.parametrize("content,verdict", [
+        ("random", "encrypted"),
+        ("text", "plaintext"),
+        ("sparse", "plaintext"),
+    ])
+    def test_content_types(self, tmp_path, content, verdict):
+        m = generate(tmp_path, CorpusSpec(files=1, max_size=256 * KB, content=content))
+        path = tmp_path / m.entries[0].path
+        assert path.stat().st_size == 256 * KB
+        assert score_file(str(path)).verdict == verdict
+
+    def test_sparse_has_holes(self, tmp_path):
+        m = generate(tmp_path, CorpusSpec(files=1, max_size=4 * 1024 * KB, content="sparse"))
+        st = (tmp_path / m.entries[0].path).stat()
+        assert st.st_blocks * 512 <= st.st_size
+        assert m.verify(tmp_path) == []
+
+    def test_compressed_is_high_entropy(self, tmp_path):
+        m = generate(tmp_path, CorpusSpec(files=1, max_size=512 * KB, content="compressed"))
+        score = score_file(str(tmp_path / m.entries[0].path))
+        assert score.entropy > 7.5
@@ -0,0 +1,157 @@
+"""
+Differential Testing Unit Tests
+
+Offline checks for helpers.simulator (documented ACL / watchpoint rules) and
+helpers.differential (generation, per-step comparison, shrinking). The
+"console" here is a second Simulator, optionally with a planted bug.
+"""
+import random
+
+import pytest
+from helpers.client import QDocSE
+from helpers.commands import Command
+from helpers.differential import Observation, Step, check, generate, run_case
+from helpers.reconcile import EntrySpec
+from helpers.result import ExecResult
+from helpers.simulator import Simulator
+
+
+class ModelTarget:
+    """Target whose console is a Simulator (``console_class``)."""
+
+    def __init__(self, console_class=Simulator):
+        self.console_class = console_class
+        self.next_id = 100
+        self.cleaned: list[set[int]] = []
+
+    def setup(self, acls, dirs):
+        ids = list(range(self.next_id, self.next_id + acls))
+        self.next_id += acls
+        paths = [f"/scratch/{ids[0]}/d{i}" for i in range(dirs)]
+        self.console = self.console_class(acls={i: [] for i in ids}, dirs=paths)
+        return ids, paths, f"/scratch/{ids[0]}/missing"
+
+    def run(self, commands, acl_ids, dirs):
+        observations = []
+        for command in commands:
+            stdout = ""
+            if command.cmd == "acl_create":
+                stdout = f"ACL ID {self.next_id} created"
+                self.next_id += 1
+            accepted = self.console.expect(command) is not False
+            command._result = ExecResult(str(command), stdout, "", 0 if accepted else 1)
+            if accepted:
+                self.console.apply(command)
+            observations.append(Observation(accepted, stdout, self.console.state()))
+        return observations
+
+    def cleanup(self, acl_ids, dirs):
+        self.cleaned.append(acl_ids)
+
+
+class OffByOneRemove(Simulator):
+    """Console bug: acl_remove -e N removes entry N+1 when there is one."""
+
+    def _do_acl_remove(self, command, opts, flags):
+        entries = self._acl(opts)
+        n = int(opts.get("-e", 0))
+        if "-e" in opts and n < len(entries):
+            entries.pop(n)
+        else:
+            super()._do_acl_remove(command, opts, flags)
+
+
+def _cmd(cmd: str, *args: str) -> Command:
+    command = Command(cmd)
+    command.args = list(args)
+    return command
+
+
+@pytest.mark.unit
+class TestSimulator:
+
+    def test_acl_add_rules(self):
+        sim = Simulator(acls={5: []})
+        assert sim.expect(QDocSE.acl_add(5, user=0, mode="wr")) is True
+        assert sim.expect(QDocSE.acl_add(6, user=0, mode="r")) is False      # no such ACL
+        assert sim.expect(_cmd("acl_add", "-i", "5", "-u", "0", "-m", "r")) is False  # no -a/-d
+        assert sim.expect(_cmd("acl_add", "-i", "5", "-a", "-d", "-u", "0", "-m", "r")) is False
+        assert sim.expect(QDocSE.acl_add(5, user=0, group=0, mode="r")) is False
+        assert sim.expect(QDocSE.acl_add(5, user=0, mode="rwa")) is False
+        assert sim.expect(QDocSE.acl_add(5, user="nobody_here", mode="r")) is False
+        assert sim.expect(QDocSE.acl_add(5, user=4242, mode="r")) is None   # target-dependent
+        assert sim.expect(QDocSE.acl_add(5, user=0, mode="rrr")) is None    # "Success or Error"
+        sim.apply(QDocSE.acl_add(5, allow=False, group="root", mode="xr"))
+        assert sim.state().acls[5] == (EntrySpec(allow=False, group=0, mode="rx"),)
+
+    def test_remove_edit_destroy(self):
+        entries = [EntrySpec(user=u) for u in (1, 2, 3)]
+        sim = Simulator(acls={5: entries})
+        assert sim.expect(_cmd("acl_remove", "-i", "5", "-e", "4")) is False
+        assert sim.expect(_cmd("acl_remove", "-i", "5", "-A", "-e", "1")) is False
+        assert sim.expect(_cmd("acl_edit", "-i", "5", "-e", "2", "-p", "2")) is False  # no change
+        assert sim.expect(_cmd("acl_edit", "-i", "5", "-e", "1", "-p", "up")) is None
+        sim.apply(_cmd("acl_edit", "-i", "5", "-e", "1", "-p", "last"))
+        assert [e.user for e in sim.acls[5]] == [2, 3, 1]
+        sim.apply(_cmd("acl_remove", "-i", "5", "-e", "1"))
+        assert [e.user for e in sim.acls[5]] == [3, 1]
+        assert sim.expect(QDocSE.acl_destroy(5)) is False
+        assert sim.expect(QDocSE.acl_destroy(5, force=True)) is True
+        sim.apply(QDocSE.acl_destroy(5, force=True))
+        assert 5 not in sim.state().acls and 5 in sim.known
+
+    def test_acl_ids_are_never_reused(self):
+        sim = Simulator(acls={5: []})
+        create = QDocSE.acl_create()
+        create._result = ExecResult("acl_create", "ACL ID 3 created", "", 0)
+        with pytest.raises(ValueError, match="reused"):
+            sim.apply(create)
+
+    def test_protect_rules(self):
+        sim = Simulator(dirs={"/s/a"})
+        assert sim.expect(_cmd("protect", "-d", "/s/missing", "-e", "no")) is False
+        assert sim.expect(_cmd("protect", "-d", "/s/a", "-e", "maybe")) is False
+        assert sim.expect(_cmd("unprotect", "-d", "/s/a")) is None
+        sim.apply(_cmd("protect", "-d", "/s/a", "-e", "yes"))
+        assert sim.state().watchpoints == {"/s/a": True}
+        assert sim.expect(_cmd("protect", "-d", "/s/a", "-e", "no")) is None
+
+
+@pytest.mark.unit
+class TestDifferential:
+
+    def test_generation_is_seeded(self):
+        assert generate(random.Random(7), 30) == generate(random.Random(7), 30)
+        assert generate(random.Random(7), 30) != generate(random.Random(8), 30)
+
+    def test_conforming_console_passes(self):
+        assert check(cases=60, length=30, seed=3, target=ModelTarget()) is None
+
+    def test_divergence_is_found_and_shrunk(self):
+        target = ModelTarget(OffByOneRemove)
+        failure = check(cases=60, length=30, seed=3, target=target)
+        assert failure is not None
+        assert failure.minimal_divergence.kind == "state"
+        assert failure.minimal[-1].cmd == "acl_remove"
+        # Two entries in one ACL, then remove the first
+        assert len(failure.minimal) == 3
+        assert run_case(failure.minimal, ModelTarget(OffByOneRemove)) is not None
+        assert run_case(failure.minimal, ModelTarget()) is None
+        assert "Minimal reproduction (3 of" in failure.report()
+
+    def test_rejection_mismatch_is_an_outcome_divergence(self):
+        class AcceptsEverything(Simulator):
+            def expect(self, command):
+                return True
+
+            def apply(self, command):
+                pass
+
+        steps = [Step("acl_destroy", ("-i", "0"))]
+        divergence = run_case(steps, ModelTarget(AcceptsEverything))
+        assert divergence.kind == "outcome" and divergence.step == 0
+
+    def test_created_acls_are_cleaned_up(self):
+        target = ModelTarget()
+        run_case([Step("acl_create")], target)
+        assert len(target.cleaned[-1]) == 4
@@ -0,0 +1,122 @@
+"""
+Protected Directory Pool Unit Tests
+
+Offline checks for helpers.dir_pool: template keys, reset and taint
+tracking. Creation is stubbed at the method level so no directory is
+actually protected.
+"""
+import os
+
+import pytest
+from helpers import ExecResult, QDocSE
+from helpers.commands import remove_listener
+from helpers.executor import Executor, use_executor
+from helpers.dir_pool import ProtectedDirPool, _PooledDir, _write_template, template_key
+
+FILES = {"a.txt": "alpha", "sub/b.bin": b"\x00\x01beta"}
+
+
+class OfflinePool(ProtectedDirPool):
+    """Pool whose directories are created but not protected."""
+
+    def _create(self, files, key):
+        path = os.path.join(self.root, f"d{self.stats.created}")
+        os.makedirs(path)
+        _write_template(path, files)
+        self.stats.created += 1
+        self.stats.protect_seconds += 2.0
+        return _PooledDir(path, key, dict(files), 2.0)
+
+
+class Succeeding(Executor):
+    """Every command succeeds; records argv."""
+
+    def __init__(self):
+        self.calls = []
+
+    def _run(self, cmd, timeout, *, binary=False):
+        self.calls.append(cmd)
+        return ExecResult(" ".join(cmd), "", "", 0)
+
+    def read_file(self, path):
+        return b""
+
+    def write_file(self, path, data):
+        pass
+
+
+@pytest.fixture
+def pool(tmp_path):
+    p = OfflinePool(root=str(tmp_path))
+    yield p
+    remove_listener(p._observe)
+
+
+def _notify(command):
+    command._result = ExecResult(str(command), "", "", 0)
+    command._notify()
+
+
+@pytest.mark.unit
+class TestDirPool:
+
+    def test_template_key(self):
+        assert template_key(FILES) == template_key(dict(reversed(list(FILES.items()))))
+        assert template_key(FILES) != template_key({**FILES, "a.txt": "alpha2"})
+
+    def test_reuse_after_reset(self, pool):
+        path = pool.lease(FILES)
+        with open(os.path.join(path, "a.txt"), "w") as f:
+            f.write("changed")
+        os.makedirs(os.path.join(path, "extra/deep"))
+        open(os.path.join(path, "sub", "new.txt"), "w").close()
+        pool.release(path)
+
+        assert pool.lease(FILES) == path
+        assert sorted(os.listdir(path)) == ["a.txt", "sub"]
+        assert os.listdir(os.path.join(path, "sub")) == ["b.bin"]
+        assert open(os.path.join(path, "a.txt")).read() == "alpha"
+        assert pool.stats.reused == 1 and pool.stats.saved_seconds == 2.0
+
+    def test_keyed_by_encryption(self, pool):
+        plain = pool.lease(FILES)
+        pool.release(plain)
+        assert pool.lease(FILES, encrypt=True) != plain
+
+    def test_tainted_lease_not_reused(self, pool):
+        path = pool.lease(FILES)
+        _notify(QDocSE.acl_file(os.path.join(path, "sub"), user_acl=1))
+        pool.release(path)
+        assert pool.lease(FILES) != path
+        assert pool.stats.discarded == 1
+
+    def test_tainted_lease_unprotected_on_release(self, pool):
+        path = pool.lease(FILES)
+        pool.discard(path)
+        with use_executor(Succeeding()) as executor:
+            pool.release(path)
+        assert executor.calls == [["QDocSEConsole", "-c", "unprotect", "-d", path]]
+        assert not os.path.exists(path)
+        assert not pool._retired
+
+    def test_other_paths_do_not_taint(self, pool):
+        path = pool.lease(FILES)
+        _notify(QDocSE.acl_file(path + "-other", user_acl=1))
+        pool.release(path)
+        assert pool.lease(FILES) == path
+
+    @pytest.mark.parametrize("pattern", ["{path}/*.txt", "{path}/s*/b.bin", "{root}/d*", "*.txt"])
+    def test_patterns_taint(self, pool, pattern):
+        path = pool.lease(FILES)
+        _notify(QDocSE.acl_file(pattern=pattern.format(path=path, root=pool.root), user_acl=1))
+        pool.release(path)
+        assert pool.lease(FILES) != path
+
+    def test_unrelated_pattern_and_bare_flag(self, pool):
+        path = pool.lease(FILES)
+        _notify(QDocSE.acl_file(pattern=path + "-other/*.txt", user_acl=1))
+        cmd = QDocSE.protect(path)
+        cmd.args[cmd.args.index("-d") + 1:] = []
+        _notify(cmd)
+        pool.release(path)
+        assert pool.lease(FILES) == path
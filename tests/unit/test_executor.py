@@ -0,0 +1,188 @@
+"""
+Executor Tests
+
+Offline tests for helpers.executor using ordinary local commands - no QDocSE
+installation required.
+"""
+import os
+import socket
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from helpers import BinaryExecResult, CommandError, ExecResult, LocalExecutor, PooledExecutor
+from helpers.executor import Executor, SSHExecutor
+
+
+@pytest.fixture
+def binary_file(tmp_path):
+    """File with every byte value, including invalid UTF-8 sequences."""
+    data = bytes(range(256)) * 64 + b"\xff\xfe\x00trailing\n"
+    path = tmp_path / "blob.bin"
+    path.write_bytes(data)
+    return str(path), data
+
+
+@pytest.mark.unit
+class TestTextMode:
+    """Default text mode is unchanged."""
+
+    def test_stdout_is_stripped_text(self):
+        r = LocalExecutor().run(["echo", "  hello  "])
+        assert r.success
+        assert r.stdout == "hello"
+
+    def test_command_not_found(self):
+        r = LocalExecutor().run(["definitely-not-a-command-xyz"])
+        assert r.returncode == -2
+
+
+@pytest.mark.unit
+class TestBinaryMode:
+    """Binary mode keeps raw bytes."""
+
+    def test_raw_bytes_are_preserved(self, binary_file):
+        path, data = binary_file
+        r = LocalExecutor().run(["cat", path], binary=True)
+        assert isinstance(r, BinaryExecResult)
+        assert r.success
+        assert bytes(r.raw_stdout) == data
+        assert not r.spilled
+
+    def test_lazy_text_decode(self, binary_file):
+        path, _ = binary_file
+        r = LocalExecutor().run(["cat", path], binary=True)
+        assert r.stdout.endswith("trailing")
+        assert "�" in r.stdout
+
+    def test_stderr_and_returncode(self, tmp_path):
+        missing = str(tmp_path / "missing")
+        r = LocalExecutor().run(["cat", missing], binary=True)
+        assert r.failed
+        assert b"No such file" in bytes(r.raw_stderr)
+        assert "No such file" in r.stderr
+
+    def test_spill_to_mmap(self, tmp_path):
+        data = os.urandom(256 * 1024)
+        path = tmp_path / "big.bin"
+        path.write_bytes(data)
+        with LocalExecutor(spill_threshold=4096).run(["cat", str(path)], binary=True) as r:
+            assert r.spilled
+            assert len(r.raw_stdout) == len(data)
+            assert r.raw_stdout[:1024] == data[:1024]
+            assert bytes(r.raw_stdout) == data
+
+    def test_wraps_decoded_exec_result(self, tmp_path):
+        missing = str(tmp_path / "missing")
+        r = LocalExecutor().run(["cat", missing], binary=True)
+        assert not isinstance(r, ExecResult)
+        text = r.text()
+        assert isinstance(text, ExecResult)
+        assert r.text() is text
+        assert (text.command, text.stderr, text.returncode) == (r.command, r.stderr, r.returncode)
+        with pytest.raises(CommandError, match="No such file"):
+            r.raise_on_error()
+
+    def test_timeout(self):
+        r = LocalExecutor().run(["sleep", "5"], timeout=1, binary=True)
+        assert r.returncode == -1
+        assert r.stderr == "Timeout"
+
+
+@pytest.mark.unit
+class TestHangDiagnostics:
+    """Timed-out commands carry /proc state captured before the kill."""
+
+    @pytest.mark.parametrize("binary", [False, True])
+    def test_timeout_diagnostics(self, binary):
+        r = LocalExecutor().run(["sleep", "30"], timeout=1, binary=binary)
+        assert r.returncode == -1
+        assert r.stderr == "Timeout"
+        assert "(command): sleep 30" in r.diagnostics
+        assert "--- wchan" in r.diagnostics
+        assert "State:" in r.diagnostics
+        assert "--- fds" in r.diagnostics
+
+    def test_no_diagnostics_without_timeout(self):
+        assert LocalExecutor().run(["true"]).diagnostics is None
+
+
+@pytest.mark.unit
+class TestPooledExecutor:
+    """Concurrent commands spread over a bounded set of member executors."""
+
+    def test_members_bounded_and_reused(self):
+        created = []
+        lock = threading.Lock()
+
+        def factory():
+            with lock:
+                created.append(LocalExecutor())
+                return created[-1]
+
+        pooled = PooledExecutor(factory, size=3)
+        with ThreadPoolExecutor(max_workers=8) as threads:
+            results = list(threads.map(lambda i: pooled.run(["sh", "-c", f"sleep 0.05; echo {i}"]), range(16)))
+        assert [r.stdout for r in results] == [str(i) for i in range(16)]
+        assert 1 <= len(created) <= 3
+        pooled.close()
+
+    def test_factory_error_releases_slot(self):
+        calls = []
+
+        def factory():
+            calls.append(1)
+            if len(calls) == 1:
+                raise OSError("connect failed")
+            return LocalExecutor()
+
+        pooled = PooledExecutor(factory, size=1)
+        with pytest.raises(OSError):
+            pooled.run(["true"])
+        assert pooled.run(["echo", "ok"]).stdout == "ok"
+
+
+class RunOnly(Executor):
+    """Executor that only implements ``_run``; file I/O uses the defaults."""
+
+    def _run(self, cmd, timeout, *, binary=False):
+        return LocalExecutor()._run(cmd, timeout, binary=binary)
+
+
+@pytest.mark.unit
+class TestDefaultFileIO:
+    """read_file/write_file fall back to commands for executors without them."""
+
+    def test_round_trip(self, tmp_path):
+        path = str(tmp_path / "blob.bin")
+        data = os.urandom(150 * 1024) + bytes(range(256))
+        executor = RunOnly()
+        executor.write_file(path, data)
+        assert open(path, "rb").read() == data
+        assert executor.read_file(path) == data
+        executor.write_file(path, b"")
+        assert executor.read_file(path) == b""
+
+    def test_errors_raise_oserror(self, tmp_path):
+        with pytest.raises(OSError, match="Cannot read"):
+            RunOnly().read_file(str(tmp_path / "missing"))
+        with pytest.raises(OSError, match="Cannot write"):
+            RunOnly().write_file(str(tmp_path / "no" / "such" / "dir"), b"x")
+
+
+@pytest.mark.unit
+class TestSSHTimeout:
+    """socket.timeout (not a TimeoutError before 3.10) still counts as a hang."""
+
+    @pytest.mark.parametrize("binary", [False, True])
+    def test_socket_timeout_is_a_timeout(self, monkeypatch, binary):
+        executor = SSHExecutor.__new__(SSHExecutor)
+        executor.spill_threshold = None
+
+        def hang(cmd_str, timeout):
+            raise socket.timeout("timed out")
+
+        monkeypatch.setattr(executor, "_exec", hang)
+        monkeypatch.setattr(executor, "_timed_out", lambda cmd_str, pid: ExecResult(cmd_str, "", "Timeout", -1, "diag"))
+        r = executor._run(["sleep", "30"], 1, binary=binary)
+        assert (r.returncode, r.stderr, r.diagnostics) == (-1, "Timeout", "diag")
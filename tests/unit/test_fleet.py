@@ -0,0 +1,60 @@
+"""
+Fleet Fan-out Unit Tests
+
+Offline checks for helpers.fleet and fixtures/fleet.py: worker argument
+rewriting, host node ids, matrix aggregation and per-thread executor binding.
+"""
+import pytest
+from fixtures.fleet import host_nodeid
+from helpers.executor import LocalExecutor, get_executor, use_executor
+from helpers.fleet import FleetMatrix, HostRun, on_host, worker_args
+
+
+def _report(nodeid, when, outcome):
+    return {"nodeid": nodeid, "when": when, "outcome": outcome, "duration": 0.1, "longrepr": None}
+
+
+@pytest.mark.unit
+class TestFleet:
+
+    def test_worker_args(self):
+        args = ["tests/integration", "--hosts", "a,b", "-x", "--host=old", "--target", "ssh",
+                "--latency-report=x.json", "--user", "qa", "-k", "acl"]
+        assert worker_args(args) == ["tests/integration", "-x", "--user", "qa", "-k", "acl"]
+
+    def test_host_nodeid(self):
+        assert host_nodeid("t.py::test_a", "qa1") == "t.py::test_a[qa1]"
+        assert host_nodeid("t.py::test_b[r-w]", "qa1") == "t.py::test_b[r-w-qa1]"
+
+    def test_matrix(self):
+        runs = [
+            HostRun("qa1", 0, 3.0, reports=[
+                _report("t::a", "setup", "passed"), _report("t::a", "call", "passed"),
+                _report("t::a", "teardown", "passed"),
+                _report("t::b", "setup", "passed"), _report("t::b", "call", "passed"),
+            ]),
+            HostRun("qa2", 1, 5.0, reports=[
+                _report("t::a", "setup", "passed"), _report("t::a", "call", "failed"),
+                _report("t::b", "setup", "failed"),
+            ]),
+            HostRun("qa3", None, 9.0, error="worker timed out after 9s"),
+        ]
+        matrix = FleetMatrix.from_runs(runs)
+        assert matrix.outcome("t::a", "qa1") == "passed"
+        assert matrix.outcome("t::a", "qa2") == "failed"
+        assert matrix.outcome("t::b", "qa2") == "error"
+        assert matrix.outcome("t::b", "qa3") == "missing"
+        assert matrix.errors == {"qa3": "worker timed out after 9s"}
+        assert matrix.divergent() == ["t::a", "t::b"]
+        assert matrix.totals("qa2") == {"failed": 1, "error": 1}
+        assert "qa3" in matrix.render().splitlines()[0]
+
+    def test_on_host_binds_executor_per_thread(self):
+        executors = {"qa1": LocalExecutor(), "qa2": LocalExecutor()}
+        default = get_executor()
+        seen = on_host(executors, lambda host: get_executor() is executors[host])
+        assert seen == {"qa1": True, "qa2": True}
+        assert get_executor() is default
+        with use_executor(executors["qa1"]):
+            assert get_executor() is executors["qa1"]
+        assert get_executor() is default
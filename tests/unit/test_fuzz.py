@@ -0,0 +1,113 @@
+"""
+Fuzzer Unit Tests
+
+Offline checks for helpers.fuzz: grammar derivation from the Command
+builders, generation safety, crash classification, minimization, and a short
+pool run against a stand-in console that segfaults on one input.
+"""
+import os
+import random
+
+import pytest
+from helpers.fuzz import (
+    SAFE_SUBCOMMANDS, Generator, OptionSpec, Outcome, crash_key, ddmin, derive_grammar, fuzz, minimize,
+)
+
+FAKE_CONSOLE = """#!/bin/sh
+for a in "$@"; do
+  if [ "$a" = "rrr" ]; then echo "assert at 0x7ffd12 line 42" >&2; kill -SEGV $$; fi
+done
+exit 1
+"""
+
+
+@pytest.mark.unit
+class TestGrammar:
+
+    def test_builders_become_options(self):
+        grammar = derive_grammar()
+        assert OptionSpec("-i", "int") in grammar["acl_add"]
+        assert OptionSpec("-m", "mode") in grammar["acl_add"]
+        assert OptionSpec("-u", "principal") in grammar["acl_add"]
+        assert OptionSpec("-t", "time") in grammar["acl_add"]
+        assert OptionSpec("-f", None) in grammar["acl_destroy"]
+        assert OptionSpec("-w", None) in grammar["view"]
+        assert OptionSpec("-m", "mode") in grammar["set_mode"]
+
+    def test_generated_paths_stay_in_scratch(self):
+        gen = Generator(derive_grammar(), random.Random(0), "/tmp/fz", SAFE_SUBCOMMANDS + ("acl_file",))
+        for _ in range(2000):
+            for value in gen.argv():
+                resolved = os.path.normpath(os.path.join("/tmp/fz", value))
+                assert resolved == "/tmp/fz" or resolved.startswith("/tmp/fz/")
+
+    def test_subcommands_stay_in_allowed_set(self):
+        grammar = derive_grammar()
+        gen = Generator(grammar, random.Random(1), "/tmp/fz")
+        for _ in range(20000):
+            args = gen.argv()
+            for flag, value in zip(args, args[1:]):
+                if flag == "-c":
+                    assert value in SAFE_SUBCOMMANDS or value not in grammar
+            if len(args) > 1:
+                assert args[1] in SAFE_SUBCOMMANDS or args[1] not in grammar
+
+
+    def test_safe_rejects_escapes(self):
+        gen = Generator(derive_grammar(), random.Random(0), "/tmp/fz")
+        assert gen.safe(["-c", "acl_list", "-i", "3", "/tmp/fz/x", "sub/.."])
+        assert not gen.safe(["-c", "view", "/"])
+        assert not gen.safe(["-c", "view", "/tmp/fz/../etc"])
+        assert not gen.safe(["-c", "acl_list", "-c", "protect"])
+        assert not gen.safe(["-c", "acl_add"])
+
+    def test_minimize_keeps_trials_safe(self):
+        gen = Generator(derive_grammar(), random.Random(0), "/tmp/fz")
+        args = ["-c", "view", "-c", "unprotect", "-d", "/tmp/fz/sub/file"]
+        trials = []
+        fails = lambda a: gen.safe(a) and not trials.append(a) and any(t.startswith("/") for t in a)
+        result = minimize(args, fails)
+        assert result == ["/tmp/fz/"]
+        assert all(gen.safe(t) for t in trials)
+
+
+@pytest.mark.unit
+class TestCrashKey:
+
+    def test_clean_exits_are_not_crashes(self):
+        assert crash_key(Outcome(0, "")) is None
+        assert crash_key(Outcome(1, "Invalid ACL ID")) is None
+
+    def test_signal_and_normalized_stderr(self):
+        a = crash_key(Outcome(-11, "fault at 0xdeadbeef in entry 17"))
+        b = crash_key(Outcome(139, "fault at 0x1234 in entry 99"))
+        assert a == b == ("signal", "SIGSEGV", "fault at ADDR in entry N")
+        assert crash_key(Outcome(-6, "fault at 0x1 in entry 1")) != a
+        assert crash_key(Outcome(None, ""))[0] == "hang"
+
+
+@pytest.mark.unit
+class TestMinimize:
+
+    def test_ddmin_finds_failure_inducing_pair(self):
+        tokens = list("abcdefghijklmnop")
+        assert ddmin(tokens, lambda t: "c" in t and "n" in t) == ["c", "n"]
+
+    def test_tokens_are_shrunk(self):
+        args = ["-c", "acl_add", "-i", "123456", "-m", "rwxrwx", "-b"]
+        fails = lambda a: "-i" in a and any(x.isdigit() and len(x) >= 1 for x in a)
+        assert minimize(args, fails) == ["-i", "0"]
+
+
+@pytest.mark.unit
+def test_pool_run_dedupes_and_minimizes(tmp_path):
+    console = tmp_path / "QDocSEConsole"
+    console.write_text(FAKE_CONSOLE)
+    console.chmod(0o755)
+    report = fuzz(iterations=1500, scratch=str(tmp_path / "scratch"), workers=2,
+                  executable=str(console), seed=48)
+    assert report.execs == 1500
+    assert list(report.crashes) == [("signal", "SIGSEGV", "assert at ADDR line N")]
+    crash = next(iter(report.crashes.values()))
+    assert crash.count >= 1
+    assert crash.minimized == ["rrr"]
@@ -0,0 +1,100 @@
+"""
+Circuit Breaker Unit Tests
+
+Offline checks for helpers.health: a scripted inner executor and a fake
+clock drive the breaker through tripping, fast refusal, backoff and recovery.
+"""
+import pytest
+from helpers.executor import Executor
+from helpers.health import CIRCUIT_OPEN, CircuitBreaker, GuardedExecutor
+from helpers.result import ExecResult
+
+
+class Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class Scripted(Executor):
+    """Returns ``returncode`` for every command; counts calls."""
+
+    returncode = 0
+    connects = 0
+
+    def __init__(self):
+        Scripted.connects += 1
+        self.calls = []
+
+    def _run(self, cmd, timeout, *, binary=False):
+        self.calls.append(cmd)
+        stderr = "Timeout" if Scripted.returncode == -1 else ""
+        return ExecResult(" ".join(cmd), "", stderr, Scripted.returncode)
+
+    def read_file(self, path):
+        return b""
+
+    def write_file(self, path, data):
+        pass
+
+
+@pytest.fixture
+def guarded():
+    Scripted.returncode, Scripted.connects = 0, 0
+    clock = Clock()
+    breaker = CircuitBreaker(threshold=3, base_delay=1.0, max_delay=4.0, clock=clock)
+    return GuardedExecutor(Scripted, breaker), clock
+
+
+@pytest.mark.unit
+class TestCircuitBreaker:
+
+    def test_trips_after_consecutive_failures(self, guarded):
+        ex, _ = guarded
+        Scripted.returncode = -1
+        ex.run(["a"])
+        ex.run(["b"])
+        Scripted.returncode = 1  # ran and failed: the target is responsive
+        ex.run(["c"])
+        Scripted.returncode = -1
+        for _ in range(3):
+            ex.run(["d"])
+        assert ex.breaker.is_open
+        assert "Timeout" in ex.breaker.cause
+
+    def test_refuses_fast_while_open(self, guarded):
+        ex, _ = guarded
+        Scripted.returncode = -1
+        for _ in range(3):
+            ex.run(["x"])
+        calls = len(ex.inner.calls)
+        r = ex.run(["y"])
+        assert r.returncode == CIRCUIT_OPEN
+        assert "Circuit open" in r.stderr
+        assert len(ex.inner.calls) == calls
+        with pytest.raises(ConnectionError):
+            ex.read_file("/etc/hostname")
+
+    def test_backoff_and_recovery(self, guarded):
+        ex, clock = guarded
+        Scripted.returncode = -1
+        for _ in range(3):
+            ex.run(["x"])
+        attempts = []
+        for t in range(1, 16):
+            clock.now = float(t)
+            before = Scripted.connects
+            ex.available()
+            if Scripted.connects > before:
+                attempts.append(t)
+        # probes at 1s, then waits of 1, 2, 4, 4 seconds
+        assert attempts == [1, 2, 4, 8, 12]
+        assert "Timeout" in ex.breaker.last_probe
+
+        Scripted.returncode = 0
+        clock.now = 16.0
+        assert ex.run(["z"]).success
+        assert not ex.breaker.is_open
+        assert ex.breaker.trips == 1
@@ -0,0 +1,78 @@
+"""
+Latency Histogram Tests
+
+Offline tests for helpers.metrics - no QDocSE installation required.
+"""
+import json
+import random
+
+import pytest
+from helpers.executor import CommandEvent, subcommand_of
+from helpers.metrics import LatencyHistogram, LatencyRecorder
+from helpers.result import ExecResult
+
+
+@pytest.mark.unit
+class TestLatencyHistogram:
+    """Percentiles stay within the configured relative precision."""
+
+    def test_percentiles_match_exact_values(self):
+        rng = random.Random(7)
+        values = [rng.lognormvariate(-3, 1.5) for _ in range(20000)]
+        hist = LatencyHistogram()
+        for v in values:
+            hist.record(v)
+        values.sort()
+        for p in (50, 95, 99):
+            exact = values[int(p / 100 * len(values)) - 1]
+            assert hist.percentile(p) == pytest.approx(exact, rel=0.02, abs=2e-6)
+        assert hist.max == values[-1]
+        assert hist.count == len(values)
+
+    def test_empty(self):
+        hist = LatencyHistogram()
+        assert hist.percentile(50) is None
+        assert hist.summary()["count"] == 0
+
+    def test_merge_and_roundtrip(self):
+        a, b = LatencyHistogram(), LatencyHistogram()
+        for v in (0.001, 0.002, 0.003):
+            a.record(v)
+        for v in (1.0, 2.0):
+            b.record(v)
+        a.merge(b)
+        assert a.count == 5
+        assert a.max == 2.0
+        restored = LatencyHistogram.from_dict(json.loads(json.dumps(a.to_dict())))
+        assert restored.percentile(50) == a.percentile(50)
+        assert restored.count == 5
+
+    def test_invalid_precision(self):
+        with pytest.raises(ValueError):
+            LatencyHistogram(significant_digits=0)
+
+
+@pytest.mark.unit
+class TestLatencyRecorder:
+    """Recorder files events by subcommand and scope."""
+
+    def test_subcommand_of(self):
+        assert subcommand_of(["QDocSEConsole", "-c", "acl_add", "-i", "1"]) == "acl_add"
+        assert subcommand_of(["/usr/bin/cat", "/etc/passwd"]) == "cat"
+        assert subcommand_of([]) == ""
+
+    def test_observe(self, tmp_path):
+        recorder = LatencyRecorder()
+        recorder.scope = "tests/unit/test_x.py"
+        argv = ["QDocSEConsole", "-c", "push_config"]
+        recorder.observe(CommandEvent(argv, ExecResult("", "", "", 0), 0.0, 0.25))
+        recorder.observe(CommandEvent(argv, ExecResult("", "", "", 0), 0.0, 0.75))
+
+        assert recorder.by_command["push_config"].count == 2
+        assert recorder.scope_totals()["tests/unit/test_x.py"].total == pytest.approx(1.0)
+        lines = recorder.format_table(recorder.by_command, "subcommand")
+        assert "push_config" in lines[2]
+
+        data = json.loads(recorder.dump(tmp_path / "latency.json").read_text())
+        assert data["by_command"]["push_config"]["count"] == 2
+        assert "tests/unit/test_x.py" in data["by_scope"]
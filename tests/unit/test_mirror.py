@@ -0,0 +1,129 @@
+"""
+Config Mirror Unit Tests
+
+Offline checks for helpers.mirror: commands are given canned results and fed
+to the mirror's listener directly; nothing is executed.
+"""
+import pytest
+from helpers import ExecResult, QDocSE
+from helpers.mirror import ConfigMirror
+from helpers.reconcile import EntrySpec
+
+ACL_LIST = """ACL ID 5:
+Entry: 1
+  Type: Allow
+  User: 1000 (alice)
+  Mode: r--
+Entry: 2
+  Type: Deny
+  Group: 50 (staff)
+  Mode: rw-
+ACL ID 6: No entries (Deny)
+"""
+
+VIEW = """#### Programs
+List of programs authorized to access protected data files:
+(1)  /usr/bin/cat  ACL: 5
+(2)  /usr/bin/vi
+List of programs denied access to any protected data files:
+(1)  /usr/bin/nc
+####
+"""
+
+WATCHPOINTS = """List of watch points:
+1  /data/a  Encrypted  2026-01-01 10:00:00
+2  /data/b  Not encrypted  2026-01-01 10:00:00
+####
+"""
+
+
+def feed(mirror, command, stdout="", rc=0):
+    command._result = ExecResult(str(command), stdout, "", rc)
+    mirror.observe(command)
+    return command
+
+
+@pytest.fixture
+def mirror():
+    m = ConfigMirror()
+    feed(m, QDocSE.acl_list(), ACL_LIST)
+    feed(m, QDocSE.view(), VIEW)
+    feed(m, QDocSE.view().watchpoints(), WATCHPOINTS)
+    feed(m, QDocSE.show_mode(), "Current mode: Elevated")
+    assert not m.stale
+    return m
+
+
+@pytest.mark.unit
+class TestListings:
+
+    def test_seeded(self, mirror):
+        assert mirror.acl(5) == [EntrySpec(user=1000, mode="r"), EntrySpec(allow=False, group=50, mode="rw")]
+        assert mirror.acl(6) == []
+        assert mirror.is_encrypted("/data/a") and mirror.is_encrypted("/data/b") is False
+        assert mirror.program_acl("/usr/bin/cat") == 5
+        assert mirror.is_blocked("/usr/bin/nc")
+        assert mirror.current_mode() == "elevated"
+
+
+@pytest.mark.unit
+class TestMutations:
+
+    def test_acl_lifecycle(self, mirror):
+        feed(mirror, QDocSE.acl_create(), "ACL ID 7 created")
+        feed(mirror, QDocSE.acl_add(7, user=1, mode="r"))
+        feed(mirror, QDocSE.acl_add(7, allow=False, group=2, mode="w"))
+        feed(mirror, QDocSE.acl_add(7, user=3, mode="x", time_start="09:00", time_end="17:00"))
+        feed(mirror, QDocSE.acl_edit(7, entry=3, position="first"))
+        feed(mirror, QDocSE.acl_remove(7, entry=2))
+        assert mirror.acl(7) == [EntrySpec(user=3, mode="x", time="09:00-17:00"),
+                                 EntrySpec(allow=False, group=2, mode="w")]
+        feed(mirror, QDocSE.acl_destroy(7, force=True))
+        assert mirror.acl(7) is None
+        assert mirror.mutations == 7
+
+    def test_failed_command_ignored(self, mirror):
+        feed(mirror, QDocSE.acl_destroy(5), rc=1)
+        assert mirror.acl(5) is not None
+
+    def test_unmodelled_marks_stale(self, mirror):
+        feed(mirror, QDocSE.acl_add(5, user="alice", mode="r"))
+        assert "acls" in mirror.stale
+        feed(mirror, QDocSE.acl_add(6, user=1))  # no -m: default mode unknown
+        assert 6 in mirror.stale_acls or "acls" in mirror.stale
+
+    def test_watchpoints_and_programs(self, mirror):
+        feed(mirror, QDocSE.protect("/data/c", encrypt=True))
+        feed(mirror, QDocSE.unencrypt("/data/a"))
+        feed(mirror, QDocSE.unprotect("/data/b"))
+        assert mirror.watchpoints == {"/data/a": False, "/data/c": True}
+        feed(mirror, QDocSE.adjust().block_index(2))
+        feed(mirror, QDocSE.adjust().auth_path("/usr/bin/nc").with_acl(6))
+        assert mirror.authorized == {"/usr/bin/cat": 5, "/usr/bin/nc": 6}
+        assert mirror.blocked == {"/usr/bin/vi"}
+
+
+@pytest.mark.unit
+class TestDrift:
+
+    def test_in_sync(self, mirror):
+        other = ConfigMirror()
+        other._load(mirror)
+        assert mirror.diff(other) == []
+        assert mirror.checksum() == other.checksum()
+
+    def test_reports_diverged_objects(self, mirror):
+        target = ConfigMirror()
+        target._load(mirror)
+        feed(target, QDocSE.acl_add(5, user=2000, mode="r"))
+        feed(target, QDocSE.unprotect("/data/a"))
+        drift = {(d.kind, d.key) for d in mirror.diff(target)}
+        assert drift == {("acl", 5), ("watchpoint", "/data/a")}
+        assert mirror.checksum() != target.checksum()
+
+    def test_stale_parts_not_compared(self, mirror):
+        target = ConfigMirror()
+        target._load(mirror)
+        feed(mirror, QDocSE.acl_import("/tmp/x.acl"))
+        feed(target, QDocSE.acl_destroy(6))
+        assert mirror.diff(target) == []
@@ -0,0 +1,78 @@
+"""
+Parallel Fixture Unit Tests
+
+Offline checks for fixtures/parallel.py: independent @parallel_fixture
+fixtures are set up concurrently on the pool, dependent ones are not, and
+teardown still runs in pytest's reverse setup order.
+"""
+import threading
+
+import pytest
+from fixtures.parallel import independent, parallel_fixture
+
+pytestmark = pytest.mark.unit
+
+events = []
+
+
+@pytest.fixture
+def plain_dep():
+    events.append("plain_dep")
+    return "dep"
+
+
+def _slow(name):
+    barrier_wait()
+    events.append(f"setup {name} {threading.current_thread().name}")
+    yield name
+    events.append(f"teardown {name}")
+
+
+_barrier = threading.Barrier(2, timeout=5)
+
+
+def barrier_wait():
+    # both bodies must be in flight at once, otherwise this times out
+    _barrier.wait()
+
+
+@parallel_fixture
+def slow_a(plain_dep):
+    yield from _slow("a")
+
+
+@parallel_fixture
+def slow_b():
+    yield from _slow("b")
+
+
+@parallel_fixture
+def slow_c(slow_a):
+    return f"{slow_a}+c"
+
+
+def test_independent():
+    argnames = {"a": ("x",), "b": (), "c": ("a",), "d": ("e",), "e": ("b",)}
+    assert independent(["a", "b", "c", "d"], argnames) == ["a", "b"]
+
+
+def test_request_not_allowed():
+    with pytest.raises(TypeError):
+        @parallel_fixture
+        def uses_request(request):
+            pass
+
+
+@pytest.mark.skipif("not config.getoption('--parallel-fixtures')")
+def test_concurrent_setup(slow_a, slow_b, slow_c):
+    assert (slow_a, slow_b, slow_c) == ("a", "b", "a+c")
+    assert events[0] == "plain_dep"
+    setups = [e for e in events if e.startswith("setup")]
+    assert len(setups) == 2
+    assert all("fixture" in e for e in setups)
+
+
+@pytest.mark.skipif("not config.getoption('--parallel-fixtures')")
+def test_teardown_order():
+    # pytest set up slow_a before slow_b, so slow_b is torn down first
+    assert events[-2:] == ["teardown b", "teardown a"]
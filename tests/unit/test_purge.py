@@ -0,0 +1,89 @@
+"""
+Pre-run Purge Unit Tests
+
+Offline checks for helpers.purge: the listers are replaced with local
+commands, so batching, counting and failure handling run for real without
+a QDocSE installation.
+"""
+import pytest
+from helpers import purge
+from helpers.commands import Command
+from helpers.executor import add_observer, get_executor, remove_observer
+
+
+def _local(argv):
+    cmd = Command("local")
+    cmd.build = lambda: argv
+    return cmd
+
+
+@pytest.fixture
+def fake_purges(monkeypatch):
+    listers = {
+        "acls": lambda: [(f"ACL {i}", _local(["true"])) for i in range(25)],
+        "watchpoints": lambda: [("/tmp/a", _local(["true"])), ("/tmp/b", _local(["false"]))],
+        "programs": lambda: [],
+    }
+    monkeypatch.setattr(purge, "PURGES", listers)
+    return listers
+
+
+@pytest.mark.unit
+class TestPurge:
+
+    def test_counts_and_failures(self, fake_purges):
+        report = purge.purge_stale(kinds=list(fake_purges), batch_size=10)
+        by_kind = {r.kind: r for r in report.results}
+        assert by_kind["acls"].purged == 25
+        assert by_kind["watchpoints"].failed == ["/tmp/b"]
+        assert by_kind["programs"].found == 0
+        assert report.purged == 26
+        assert report.per_second > 0
+
+    def test_batched_round_trips(self, fake_purges, monkeypatch):
+        argvs = []
+        executor = get_executor()
+        original = executor._run
+        monkeypatch.setattr(executor, "_run", lambda cmd, *a, **k: argvs.append(cmd) or original(cmd, *a, **k))
+        purge.purge_stale(kinds=["acls"], batch_size=10)
+        batches = [a for a in argvs if a[:2] == ["sh", "-c"]]
+        assert len(batches) == 3
+
+    def test_batched_commands_reach_observers(self, fake_purges):
+        argvs = []
+        observer = lambda event: argvs.append(event.argv)  # noqa: E731
+        add_observer(observer)
+        try:
+            purge.purge_stale(kinds=["acls"], batch_size=10)
+        finally:
+            remove_observer(observer)
+        assert argvs.count(["true"]) == 25
+        assert not [a for a in argvs if a[:2] == ["sh", "-c"]]
+
+    def test_lister_error_reported(self, fake_purges, monkeypatch):
+        def broken():
+            raise RuntimeError("listing failed")
+        monkeypatch.setitem(purge.PURGES, "programs", broken)
+        report = purge.purge_stale(kinds=["programs"])
+        assert report.results[0].error == "listing failed"
+        assert report.push_seconds == 0.0
+
+    def test_programs_blocked_by_descending_index(self, monkeypatch):
+        class View:
+            def execute(self):
+                return self
+
+            def ok(self, message=""):
+                return self
+
+            def parse(self):
+                return {"authorized": [
+                    {"index": 2, "path": "/tmp/a", "acl": None},
+                    {"index": 3, "path": "/usr/bin/keep", "acl": None},
+                    {"index": 5, "path": "/tmp/b", "acl": None},
+                ]}
+
+        monkeypatch.setattr(purge.QDocSE, "view", lambda: View())
+        targets = purge.stale_programs()
+        assert [label for label, _ in targets] == ["/tmp/b", "/tmp/a"]
+        assert [cmd.args for _, cmd in targets] == [["-b", "5"], ["-b", "2"]]
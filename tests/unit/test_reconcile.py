@@ -0,0 +1,174 @@
+"""
+Reconciler Unit Tests
+
+Offline checks for helpers.reconcile: the entry diff and the command plan
+against hand-built current states. Nothing is executed.
+"""
+import itertools
+import random
+
+import pytest
+from helpers.reconcile import (
+    ACLSpec, CurrentState, DesiredState, DirSpec, EntrySpec, ProgramSpec, ReconcileError,
+    Reconciler, entry_edits,
+)
+
+E = [EntrySpec(user=1000 + i, mode="r") for i in range(8)]
+
+
+def _apply(current, ops):
+    entries = list(current)
+    for op in ops:
+        if op[0] == "remove":
+            entries.pop(op[1] - 1)
+        elif op[0] == "add":
+            entries.append(op[1])
+        else:
+            entries.insert(op[2] - 1, entries.pop(op[1] - 1))
+    return entries
+
+
+def _kinds(plan):
+    return [line.split()[0] for line in plan.describe()]
+
+
+@pytest.mark.unit
+class TestEntrySpec:
+
+    def test_normalizes(self):
+        assert EntrySpec(user=1, mode="wr") == EntrySpec(user=1, mode="rw-")
+        assert EntrySpec(user=1, time="09:00-18:00").time == "09:00:00-18:00:00"
+        assert EntrySpec(user=1, time="00:00-23:59:59").time is None
+
+    def test_from_parsed(self):
+        parsed = {"type": "Deny", "user": None, "group": 50, "program": None, "mode": "-w-",
+                  "time": [{"days": ["Sunday", "Monday", "Tuesday", "Wednesday", "Thursday",
+                                     "Friday", "Saturday"], "range": "09:00:00-18:00:00"}]}
+        assert EntrySpec.from_parsed(parsed) == EntrySpec(allow=False, group=50, mode="w", time="09:00-18:00")
+
+    def test_needs_one_principal(self):
+        with pytest.raises(ValueError):
+            EntrySpec(user=1, group=2)
+
+
+@pytest.mark.unit
+class TestEntryEdits:
+
+    @pytest.mark.parametrize("current,target,cost", [
+        (E[:3], E[:3], 0),
+        (E[:3], E[:4], 1),
+        (E[:4], E[:3], 1),
+        (E[:4], [E[3]] + E[:3], 1),
+        (E[:4], E[1:4] + [E[0]], 1),
+        ([E[1], E[0]] + E[2:5], E[:5], 1),
+        (E[:3], [E[0], E[5], E[2]], 3),  # acl_add appends, then one move
+        (E[:3], E[3:6], 6),
+    ])
+    def test_minimal(self, current, target, cost):
+        ops = entry_edits(current, target)
+        assert _apply(current, ops) == target
+        assert len(ops) == cost
+
+    def test_random_lists_converge(self):
+        rng = random.Random(7)
+        for _ in range(200):
+            current = rng.sample(E, rng.randint(0, 8))
+            target = rng.sample(E, rng.randint(0, 8))
+            assert _apply(current, entry_edits(current, target)) == target
+
+    def test_duplicates(self):
+        current = [E[0], E[1], E[0]]
+        for target in itertools.permutations([E[0], E[0], E[1]]):
+            assert _apply(current, entry_edits(current, list(target))) == list(target)
+
+
+@pytest.mark.unit
+class TestPlan:
+
+    def _reconciler(self, **acl_ids):
+        r = Reconciler()
+        r.acl_ids = dict(acl_ids)
+        return r
+
+    def test_fresh_state(self):
+        desired = DesiredState(
+            acls=[ACLSpec("a", E[:2])],
+            dirs=[DirSpec("/data/x", encrypt=True, user_acl="a")],
+            programs=[ProgramSpec("/usr/bin/app", acl="a")],
+        )
+        plan = Reconciler().plan(desired, CurrentState(mode="elevated"))
+        assert plan.creates == ["a"]
+        assert _kinds(plan) == ["acl_create", "acl_add", "acl_add", "protect", "acl_file",
+                                "adjust", "push_config"]
+
+    def test_converged_state_is_empty(self):
+        r = self._reconciler(a=5)
+        desired = DesiredState(acls=[ACLSpec("a", E[:2])], dirs=[DirSpec("/data/x", user_acl="a")])
+        r.dirs = {"/data/x": (desired.dirs[0], 5, None)}
+        current = CurrentState(acls={5: E[:2]}, mode="learning",
+                               watchpoints=[{"path": "/data/x", "encryption": "Not encrypted"}])
+        plan = r.plan(desired, current)
+        assert not plan.changes and len(plan) == 0
+        assert plan.acl_ids == {"a": 5}
+
+    def test_edits_managed_acl_in_place(self):
+        r = self._reconciler(a=5)
+        desired = DesiredState(acls=[ACLSpec("b", E[:3])])
+        plan = r.plan(desired, CurrentState(acls={5: E[:2], 9: E[:3]}, mode="elevated"))
+        # 9 is not managed: left alone even though identical
+        assert plan.acl_ids == {"b": 5}
+        assert _kinds(plan) == ["acl_add", "push_config"]
+
+    def test_recreates_when_cheaper(self):
+        r = self._reconciler(a=5)
+        desired = DesiredState(acls=[ACLSpec("a", [E[7]])])
+        plan = r.plan(desired, CurrentState(acls={5: E[:6]}, mode="elevated"))
+        assert plan.creates == ["a"]
+        assert "acl_destroy" in _kinds(plan)
+
+    def test_prune_false_keeps_spares(self):
+        r = self._reconciler(a=5)
+        r.dirs = {"/data/old": (DirSpec("/data/old"), None, None)}
+        desired = DesiredState(prune=False)
+        plan = r.plan(desired, CurrentState(acls={5: E[:1]}, mode="elevated",
+                                            watchpoints=[{"path": "/data/old", "encryption": "No"}]))
+        assert not plan.changes
+        assert plan.spares == {5}
+
+    def test_prune_unprotects_and_blocks(self):
+        r = self._reconciler()
+        r.dirs = {"/data/old": (DirSpec("/data/old"), None, None)}
+        r.programs = {"/usr/bin/old"}
+        current = CurrentState(mode="elevated",
+                               watchpoints=[{"path": "/data/old", "encryption": "No"}],
+                               authorized=[{"index": 1, "path": "/usr/bin/old", "acl": None}])
+        assert _kinds(r.plan(DesiredState(), current)) == ["unprotect", "adjust", "push_config"]
+
+    def test_encryption_toggle(self):
+        r = Reconciler()
+        r.dirs = {"/d": (DirSpec("/d"), None, None)}
+        current = CurrentState(mode="elevated", watchpoints=[{"path": "/d", "encryption": "No"}])
+        assert _kinds(r.plan(DesiredState(dirs=[DirSpec("/d", encrypt=True)]), current)) == [
+            "encrypt", "push_config"]
+
+    def test_mode_switch_after_push(self):
+        desired = DesiredState(acls=[ACLSpec("a")], mode="normal")
+        assert _kinds(Reconciler().plan(desired, CurrentState(mode="elevated")))[-3:] == [
+            "push_config", "set_mode", "push_config"]
+
+    def test_leaves_normal_mode_before_changes(self):
+        desired = DesiredState(acls=[ACLSpec("a", E[:1])], mode="elevated")
+        assert _kinds(Reconciler().plan(desired, CurrentState(mode="de-elevated"))) == [
+            "set_mode", "push_config", "acl_create", "acl_add", "push_config"]
+        assert _kinds(Reconciler().plan(DesiredState(mode="learning"), CurrentState(mode="de-elevated"))) == [
+            "set_mode", "push_config"]
+
+    def test_changes_rejected_in_normal_mode(self):
+        with pytest.raises(ReconcileError):
+            Reconciler().plan(DesiredState(acls=[ACLSpec("a")]), CurrentState(mode="de-elevated"))
+        with pytest.raises(ReconcileError):
+            Reconciler().plan(DesiredState(acls=[ACLSpec("a")], mode="normal"), CurrentState(mode="de-elevated"))
+
+    def test_unknown_acl_reference(self):
+        with pytest.raises(ValueError):
+            DesiredState(dirs=[DirSpec("/d", user_acl="missing")])
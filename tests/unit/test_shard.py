@@ -0,0 +1,58 @@
+"""
+Sharding Unit Tests
+
+Offline checks for helpers.shard: LPT assignment quality and order, unknown
+durations, and the persisted duration cache.
+"""
+import random
+
+import pytest
+from helpers.shard import DurationCache, lpt
+
+
+@pytest.mark.unit
+class TestLPT:
+
+    def test_classic_example(self):
+        # Graham's bad case for LPT: optimum is 10/10/10, LPT gives 11 (<= 4/3 OPT)
+        durations = {f"t{i}": d for i, d in enumerate([7, 6, 5, 4, 3, 3, 2])}
+        shards = lpt(durations, ["a", "b", "c"])
+        assert sorted(s.predicted for s in shards.values()) == [9, 10, 11]
+        assert sorted(t for s in shards.values() for t in s.tests) == sorted(durations)
+
+    def test_makespan_near_average(self):
+        rng = random.Random(47)
+        durations = {f"t{i}": rng.uniform(0.1, 20) for i in range(400)}
+        shards = lpt(durations, [f"h{i}" for i in range(6)])
+        average = sum(durations.values()) / 6
+        assert max(s.predicted for s in shards.values()) <= average * 1.02
+
+    def test_collection_order_kept_and_unknown_uses_median(self):
+        durations = {"a": 1.0, "b": None, "c": 3.0, "d": 5.0}
+        shards = lpt(durations, ["x", "y"])
+        for shard in shards.values():
+            assert shard.tests == sorted(shard.tests)
+        assert sum(s.predicted for s in shards.values()) == pytest.approx(12.0)
+
+    def test_more_hosts_than_tests(self):
+        shards = lpt({"a": 1.0}, ["x", "y", "z"])
+        assert [len(s.tests) for s in shards.values()] == [1, 0, 0]
+
+
+@pytest.mark.unit
+class TestDurationCache:
+
+    def test_roundtrip_and_smoothing(self, tmp_path):
+        path = tmp_path / "durations.json"
+        cache = DurationCache(path)
+        assert cache.get("t") is None
+        cache.update("t", 4.0)
+        cache.save()
+        cache = DurationCache(path)
+        cache.update("t", 2.0)
+        assert cache.get("t") == pytest.approx(3.0)
+
+    def test_unreadable_file_ignored(self, tmp_path):
+        path = tmp_path / "durations.json"
+        path.write_text("{not json")
+        assert DurationCache(path).durations == {}
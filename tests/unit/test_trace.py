@@ -0,0 +1,68 @@
+"""
+Session Timeline Tests
+
+Offline tests for helpers.trace - no QDocSE installation required.
+"""
+import json
+import threading
+import time
+
+import pytest
+from helpers.executor import CommandEvent
+from helpers.result import ExecResult
+from helpers.trace import Tracer
+
+
+def _spans(tracer, cat):
+    return [e for e in tracer.events if e.get("ph") == "X" and e["cat"] == cat]
+
+
+@pytest.mark.unit
+class TestTracer:
+    """Trace events in Chrome trace-event format."""
+
+    def test_nested_spans(self):
+        tracer = Tracer()
+        with tracer.span("outer", "test"):
+            with tracer.span("inner", "fixture", scope="function"):
+                pass
+        inner, outer = _spans(tracer, "fixture")[0], _spans(tracer, "test")[0]
+        assert outer["ts"] <= inner["ts"]
+        assert inner["ts"] + inner["dur"] <= outer["ts"] + outer["dur"]
+        assert inner["args"] == {"scope": "function"}
+
+    def test_command_span(self):
+        tracer = Tracer()
+        start = time.perf_counter()
+        argv = ["QDocSEConsole", "-c", "push_config"]
+        tracer.observe(CommandEvent(argv, ExecResult("", "", "", 0), start, 0.5))
+        span = _spans(tracer, "command")[0]
+        assert span["name"] == "push_config"
+        assert span["dur"] == 500000.0
+        assert span["args"]["returncode"] == 0
+
+    def test_sleep_patch(self):
+        tracer = Tracer()
+        tracer.patch_sleep()
+        try:
+            time.sleep(0.01)
+        finally:
+            tracer.restore_sleep()
+        time.sleep(0)
+        sleeps = _spans(tracer, "sleep")
+        assert len(sleeps) == 1
+        assert sleeps[0]["args"]["requested_s"] == 0.01
+
+    def test_threads_get_distinct_tids(self, tmp_path):
+        tracer = Tracer()
+        with tracer.span("main", "test"):
+            pass
+        t = threading.Thread(target=lambda: tracer.instant("worker", "test"))
+        t.start()
+        t.join()
+        tids = {e["tid"] for e in tracer.events if e.get("ph") in ("X", "i")}
+        assert len(tids) == 2
+
+        data = json.loads(tracer.dump(tmp_path / "trace.json").read_text())
+        names = [e["args"]["name"] for e in data["traceEvents"] if e["name"] == "thread_name"]
+        assert "main" in names
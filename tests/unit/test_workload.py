@@ -0,0 +1,65 @@
+"""
+Workload Engine Unit Tests
+
+Offline checks for helpers.workload against a local temp file.
+"""
+import errno
+
+import pytest
+from helpers.workload import Workload, prepare_file, run_workload
+
+KB = 1024
+
+
+@pytest.fixture
+def data_file(tmp_path):
+    return prepare_file(str(tmp_path / "io.dat"), 256 * KB)
+
+
+@pytest.mark.unit
+class TestWorkload:
+
+    def test_invalid_pattern(self):
+        with pytest.raises(ValueError):
+            Workload("readwrite")
+
+    def test_label(self):
+        assert Workload("randread", 4096, 8, direct=True).label == "randread-bs4096-qd8-direct"
+
+    def test_sequential_read_covers_file(self, data_file):
+        result = run_workload(data_file, Workload("read", block_size=64 * KB))
+        assert result.ops == 4
+        assert result.bytes == 256 * KB
+        assert result.latency.count == 4
+        assert result.iops > 0 and result.mb_per_s > 0
+
+    @pytest.mark.parametrize("pattern", ["randread", "randwrite", "write"])
+    def test_queue_depth_io_size(self, data_file, pattern):
+        job = Workload(pattern, block_size=4 * KB, queue_depth=4, io_size=128 * KB)
+        result = run_workload(data_file, job)
+        assert result.ops == 32
+        assert result.bytes == 128 * KB
+
+    def test_runtime_limit(self, data_file):
+        job = Workload("randread", block_size=4 * KB, io_size=1 << 40, runtime=0.05)
+        result = run_workload(data_file, job)
+        assert 0 < result.ops < (1 << 40) // (4 * KB)
+
+    def test_file_smaller_than_block(self, tmp_path):
+        path = prepare_file(str(tmp_path / "tiny.dat"), 100)
+        with pytest.raises(ValueError):
+            run_workload(path, Workload("read", block_size=4 * KB))
+
+    def test_direct_read(self, data_file):
+        try:
+            result = run_workload(data_file, Workload("read", block_size=4 * KB, direct=True))
+        except OSError as e:
+            if e.errno == errno.EINVAL:
+                pytest.skip("O_DIRECT not supported on this filesystem")
+            raise
+        assert result.bytes == 256 * KB
+
+    def test_to_dict(self, data_file):
+        data = run_workload(data_file, Workload("read", block_size=64 * KB)).to_dict()
+        assert data["workload"]["pattern"] == "read"
+        assert data["latency"]["count"] == 4